@@ -1,9 +1,14 @@
 # -*- mode: python ; coding: utf-8 -*-
+import os
+
 from PyInstaller.utils.hooks import collect_all
 
-datas = [('index.html', '.'), ('logistic_regression_model.joblib', '.'), ('.env.example', '.')]
+# Paths relative to this spec file, wherever the repository is checked out
+spec_dir = os.path.dirname(os.path.abspath(SPEC))
+
+datas = [(os.path.join(spec_dir, name), '.') for name in ('index.html', 'logistic_regression_model.joblib', '.env.example')]
 binaries = []
-hiddenimports = ['flask', 'flask_cors', 'joblib', 'numpy', 'pandas', 'sklearn', 'sklearn.linear_model', 'sklearn.linear_model._logistic', 'google.generativeai', 'dotenv', 'webbrowser', 'threading']
+hiddenimports = ['flask', 'flask_cors', 'joblib', 'numpy', 'pandas', 'sklearn', 'sklearn.linear_model', 'sklearn.linear_model._logistic', 'feature_encoder', 'google.generativeai', 'dotenv', 'webbrowser', 'threading']
 tmp_ret = collect_all('flask')
 datas += tmp_ret[0]; binaries += tmp_ret[1]; hiddenimports += tmp_ret[2]
 tmp_ret = collect_all('sklearn')
@@ -13,8 +18,8 @@ datas += tmp_ret[0]; binaries += tmp_ret[1]; hiddenimports += tmp_ret[2]
 
 
 a = Analysis(
-    ['F:\\gihtub\\Dengue_Prefict\\Dengue_Simplified\\app.py'],
-    pathex=[],
+    [os.path.join(spec_dir, 'app.py')],
+    pathex=[spec_dir],
     binaries=binaries,
     datas=datas,
     hiddenimports=hiddenimports,
@@ -17,6 +17,9 @@ import time
 from dotenv import load_dotenv
 import traceback
 
+# Copy of dengue_predictor/core/feature_encoder.py, so this app stays standalone
+from feature_encoder import FeatureEncoder
+
 # Helper function to get resource paths (works in both dev and exe mode)
 def get_resource_path(relative_path):
     """Get absolute path to resource, works for dev and for PyInstaller"""
@@ -50,10 +53,13 @@ else:
 try:
     model_path = get_resource_path('logistic_regression_model.joblib')
     model = joblib.load(model_path)
+    # Built once from model.feature_names_in_ and reused by every request
+    feature_encoder = FeatureEncoder.from_model(model)
     print("✅ ML model loaded successfully")
 except Exception as e:
     print(f"❌ Error loading model: {e}")
     model = None
+    feature_encoder = None
 
 # District-Area mapping
 AREAS_BY_DISTRICT = {
@@ -95,86 +101,9 @@ def get_basic_recommendation(risk_level, area):
 def preprocess_input(data):
     """Preprocess input data for the ML model - creates one-hot encoded features"""
     try:
-        # Create a dictionary with all required one-hot encoded features
-        # Based on the model's feature_names_in_
-        feature_data = {
-            'Gender': data.get('Gender', 0),
-            'Age': data.get('Age', 0),
-            'NS1': data.get('NS1', 0),
-            'IgG': data.get('IgG', 0),
-            'IgM': data.get('IgM', 0),
-            # One-hot encode Areas
-            'Area_Adabor': 1 if data.get('Area') == 'Adabor' else 0,
-            'Area_Badda': 1 if data.get('Area') == 'Badda' else 0,
-            'Area_Banasree': 1 if data.get('Area') == 'Banasree' else 0,
-            'Area_Bangshal': 1 if data.get('Area') == 'Bangshal' else 0,
-            'Area_Biman Bandar': 1 if data.get('Area') == 'Biman Bandar' else 0,
-            'Area_Bosila': 1 if data.get('Area') == 'Bosila' else 0,
-            'Area_Cantonment': 1 if data.get('Area') == 'Cantonment' else 0,
-            'Area_Chawkbazar': 1 if data.get('Area') == 'Chawkbazar' else 0,
-            'Area_Demra': 1 if data.get('Area') == 'Demra' else 0,
-            'Area_Dhanmondi': 1 if data.get('Area') == 'Dhanmondi' else 0,
-            'Area_Gendaria': 1 if data.get('Area') == 'Gendaria' else 0,
-            'Area_Gulshan': 1 if data.get('Area') == 'Gulshan' else 0,
-            'Area_Hazaribagh': 1 if data.get('Area') == 'Hazaribagh' else 0,
-            'Area_Jatrabari': 1 if data.get('Area') == 'Jatrabari' else 0,
-            'Area_Kadamtali': 1 if data.get('Area') == 'Kadamtali' else 0,
-            'Area_Kafrul': 1 if data.get('Area') == 'Kafrul' else 0,
-            'Area_Kalabagan': 1 if data.get('Area') == 'Kalabagan' else 0,
-            'Area_Kamrangirchar': 1 if data.get('Area') == 'Kamrangirchar' else 0,
-            'Area_Keraniganj': 1 if data.get('Area') == 'Keraniganj' else 0,
-            'Area_Khilgaon': 1 if data.get('Area') == 'Khilgaon' else 0,
-            'Area_Khilkhet': 1 if data.get('Area') == 'Khilkhet' else 0,
-            'Area_Lalbagh': 1 if data.get('Area') == 'Lalbagh' else 0,
-            'Area_Mirpur': 1 if data.get('Area') == 'Mirpur' else 0,
-            'Area_Mohammadpur': 1 if data.get('Area') == 'Mohammadpur' else 0,
-            'Area_Motijheel': 1 if data.get('Area') == 'Motijheel' else 0,
-            'Area_New Market': 1 if data.get('Area') == 'New Market' else 0,
-            'Area_Pallabi': 1 if data.get('Area') == 'Pallabi' else 0,
-            'Area_Paltan': 1 if data.get('Area') == 'Paltan' else 0,
-            'Area_Ramna': 1 if data.get('Area') == 'Ramna' else 0,
-            'Area_Rampura': 1 if data.get('Area') == 'Rampura' else 0,
-            'Area_Sabujbagh': 1 if data.get('Area') == 'Sabujbagh' else 0,
-            'Area_Shahbagh': 1 if data.get('Area') == 'Shahbagh' else 0,
-            'Area_Sher-e-Bangla Nagar': 1 if data.get('Area') == 'Sher-e-Bangla Nagar' else 0,
-            'Area_Shyampur': 1 if data.get('Area') == 'Shyampur' else 0,
-            'Area_Sutrapur': 1 if data.get('Area') == 'Sutrapur' else 0,
-            'Area_Tejgaon': 1 if data.get('Area') == 'Tejgaon' else 0,
-            # One-hot encode AreaType
-            'AreaType_Developed': 1 if data.get('AreaType') == 'Developed' else 0,
-            'AreaType_Undeveloped': 1 if data.get('AreaType') == 'Undeveloped' else 0,
-            # One-hot encode District
-            'District_Dhaka': 1 if data.get('District') == 'Dhaka' else 0,
-            # One-hot encode HouseType
-            'HouseType_Building': 1 if data.get('HouseType') == 'Building' else 0,
-            'HouseType_Other': 1 if data.get('HouseType') == 'Other' else 0,
-            'HouseType_Tinshed': 1 if data.get('HouseType') == 'Tinshed' else 0,
-        }
-        
-        # Create DataFrame in the exact order the model expects
-        feature_df = pd.DataFrame([feature_data])
-        
-        # Ensure columns are in the correct order (matching model.feature_names_in_)
-        expected_columns = [
-            'Gender', 'Age', 'NS1', 'IgG', 'IgM',
-            'Area_Adabor', 'Area_Badda', 'Area_Banasree', 'Area_Bangshal',
-            'Area_Biman Bandar', 'Area_Bosila', 'Area_Cantonment', 'Area_Chawkbazar',
-            'Area_Demra', 'Area_Dhanmondi', 'Area_Gendaria', 'Area_Gulshan',
-            'Area_Hazaribagh', 'Area_Jatrabari', 'Area_Kadamtali', 'Area_Kafrul',
-            'Area_Kalabagan', 'Area_Kamrangirchar', 'Area_Keraniganj',
-            'Area_Khilgaon', 'Area_Khilkhet', 'Area_Lalbagh', 'Area_Mirpur',
-            'Area_Mohammadpur', 'Area_Motijheel', 'Area_New Market', 'Area_Pallabi',
-            'Area_Paltan', 'Area_Ramna', 'Area_Rampura', 'Area_Sabujbagh',
-            'Area_Shahbagh', 'Area_Sher-e-Bangla Nagar', 'Area_Shyampur',
-            'Area_Sutrapur', 'Area_Tejgaon',
-            'AreaType_Developed', 'AreaType_Undeveloped',
-            'District_Dhaka',
-            'HouseType_Building', 'HouseType_Other', 'HouseType_Tinshed'
-        ]
-        
-        feature_df = feature_df[expected_columns]
-        
-        return feature_df
+        # Encode straight into the column layout of model.feature_names_in_
+        feature_row = feature_encoder.encode(data)
+        return feature_encoder.to_frame(feature_row)
         
     except Exception as e:
         print(f"Error in preprocessing: {e}")
@@ -46,6 +46,7 @@ def build_executable():
     # Check required files
     required_files = [
         'app.py',
+        'feature_encoder.py',
         'index.html',
         'logistic_regression_model.joblib'
     ]
@@ -78,6 +79,7 @@ def build_executable():
         '--hidden-import=sklearn',
         '--hidden-import=sklearn.linear_model',
         '--hidden-import=sklearn.linear_model._logistic',
+        '--hidden-import=feature_encoder',
         '--hidden-import=google.generativeai',
         '--hidden-import=dotenv',
         '--hidden-import=webbrowser',
@@ -3,7 +3,7 @@ from PyInstaller.utils.hooks import collect_all
 
 datas = [('F:\\gihtub\\Dengue_Prefict\\dengue_predictor\\frontend', 'frontend'), ('F:\\gihtub\\Dengue_Prefict\\dengue_predictor\\core\\models', 'core/models'), ('F:\\gihtub\\Dengue_Prefict\\dengue_predictor\\datasets', 'datasets')]
 binaries = []
-hiddenimports = ['uvicorn', 'uvicorn.loops', 'uvicorn.loops.auto', 'uvicorn.protocols', 'uvicorn.protocols.http', 'uvicorn.protocols.http.auto', 'uvicorn.protocols.websockets', 'uvicorn.protocols.websockets.auto', 'uvicorn.lifespan', 'uvicorn.lifespan.on', 'fastapi', 'pydantic', 'google.generativeai', 'pinecone', 'joblib', 'sklearn', 'sklearn.linear_model', 'sklearn.linear_model._logistic', 'numpy', 'pandas', 'pydantic.fields', 'pydantic.main', 'api', 'api.BaseAPI', 'db', 'db.PineconeDB', 'agents', 'agents.AI_Agent', 'core']
+hiddenimports = ['uvicorn', 'uvicorn.loops', 'uvicorn.loops.auto', 'uvicorn.protocols', 'uvicorn.protocols.http', 'uvicorn.protocols.http.auto', 'uvicorn.protocols.websockets', 'uvicorn.protocols.websockets.auto', 'uvicorn.lifespan', 'uvicorn.lifespan.on', 'fastapi', 'pydantic', 'google.generativeai', 'pinecone', 'joblib', 'sklearn', 'sklearn.linear_model', 'sklearn.linear_model._logistic', 'numpy', 'pandas', 'pydantic.fields', 'pydantic.main', 'api', 'api.BaseAPI', 'api.serve', 'db', 'db.PineconeDB', 'db.write_behind', 'db.case_records', 'db.bulk_loader', 'db.embeddings', 'db.LocalVectorDB', 'db.vector_store', 'db.area_aggregates', 'agents', 'agents.AI_Agent', 'agents.location_stats', 'agents.response_cache', 'agents.llm_executor', 'agents.prompt_builder', 'agents.session_store', 'core', 'core.feature_encoder', 'core.fast_scorer', 'core.model_registry', 'utils', 'utils.lazy', 'utils.metrics', 'utils.profiling']
 tmp_ret = collect_all('uvicorn')
 datas += tmp_ret[0]; binaries += tmp_ret[1]; hiddenimports += tmp_ret[2]
 tmp_ret = collect_all('fastapi')
@@ -1,8 +1,7 @@
-import google.generativeai as genai  
-import joblib
 import json
 import os
 import sys
+import time
 import pandas as pd
 from collections import Counter
 
@@ -28,27 +27,44 @@ def setup_import_paths():
 # Setup paths
 db_path = setup_import_paths()
 
-# Import from PineconeDB
+# Import from the configured vector DB backend. The package import comes
+# first so the API process shares one backend module (and one index)
 try:
-    from PineconeDB import search_similar_cases, get_area_statistics, add_case_to_vector_db
+    from db.vector_store import search_similar_cases, get_area_statistics, add_case_to_vector_db
 except ImportError:
     try:
-        # Try relative import
-        from db.PineconeDB import search_similar_cases, get_area_statistics, add_case_to_vector_db
+        # Try the db directory on sys.path
+        from vector_store import search_similar_cases, get_area_statistics, add_case_to_vector_db
     except ImportError:
         # Try absolute import with path
         import importlib.util
-        spec = importlib.util.spec_from_file_location("PineconeDB", os.path.join(db_path, "PineconeDB.py"))
-        pinecone_db = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(pinecone_db)
-        search_similar_cases = pinecone_db.search_similar_cases
-        get_area_statistics = pinecone_db.get_area_statistics
-        add_case_to_vector_db = pinecone_db.add_case_to_vector_db
-
-# Initialize
-api_key = os.getenv("GOOGLE_API_KEY")
-if not api_key:
-    raise ValueError("GOOGLE_API_KEY environment variable not set")
+        spec = importlib.util.spec_from_file_location("vector_store", os.path.join(db_path, "vector_store.py"))
+        vector_store = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(vector_store)
+        search_similar_cases = vector_store.search_similar_cases
+        get_area_statistics = vector_store.get_area_statistics
+        add_case_to_vector_db = vector_store.add_case_to_vector_db
+
+try:
+    from agents.location_stats import DEFAULT_SAMPLES, LocationStatsCube, compute_location_stats
+    from agents.response_cache import CachedLLM, ResponseCache, make_cache_key
+    from agents.llm_executor import LLMExecutor, LLMTimeoutError
+    from agents.prompt_builder import PromptBuilder, estimate_tokens
+except ImportError:
+    # Loaded from its file path, import the sibling modules directly
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from location_stats import DEFAULT_SAMPLES, LocationStatsCube, compute_location_stats
+    from response_cache import CachedLLM, ResponseCache, make_cache_key
+    from llm_executor import LLMExecutor, LLMTimeoutError
+    from prompt_builder import PromptBuilder, estimate_tokens
+
+try:
+    from utils.lazy import DependencyUnavailable, LazyResource
+    from utils.metrics import stage_duration, stage_timer
+except ImportError:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+    from utils.lazy import DependencyUnavailable, LazyResource
+    from utils.metrics import stage_duration, stage_timer
 
 # Load model from the correct path (handles both development and executable)
 def get_model_path():
@@ -72,84 +88,75 @@ def get_dataset_path():
         return os.path.join(os.path.dirname(__file__), '..', 'datasets', 'dataset.csv')
 
 model_path = get_model_path()
-model = joblib.load(model_path)
 
-# Load dataset for statistical analysis (but not for sending to Gemini)
-dataset_path = get_dataset_path()
-dataset_df = None
-try:
-    if os.path.exists(dataset_path):
-        # Load only once and keep in memory
-        dataset_df = pd.read_csv(dataset_path)
-        print(f"Loaded dataset with {len(dataset_df)} records for statistical analysis")
-except Exception as e:
-    print(f"Could not load dataset for analysis: {e}")
-
-# Initialize Gemini Flash model with correct model name
-genai.configure(api_key=api_key)
-llm = genai.GenerativeModel('models/gemini-2.0-flash')
-
-def get_location_based_stats(area, district, n_samples=50):
+# Nothing below is loaded at import time: each dependency is created on first
+# use, or by the API's background warm-up once the server is up. Predictions
+# are made by the API, which loads the model itself, so the agent does not.
+
+def _load_dataset():
+    """Dataset for statistical analysis (but not for sending to Gemini) and its location summaries"""
+    dataset_path = get_dataset_path()
+    if not os.path.exists(dataset_path):
+        print(f"Could not load dataset for analysis: {dataset_path} not found")
+        return None, None
+    # Load only once and keep in memory
+    dataset_df = pd.read_csv(dataset_path)
+    # Summarise every location up front so chat requests only do a lookup
+    location_stats = LocationStatsCube.from_frame(dataset_df)
+    print(f"Loaded dataset with {len(dataset_df)} records for statistical analysis "
+          f"({len(location_stats.areas)} areas precomputed)")
+    return dataset_df, location_stats
+
+dataset = LazyResource("dataset", _load_dataset)
+
+def _load_gemini():
+    """Gemini Flash model with correct model name"""
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        raise ValueError("GOOGLE_API_KEY environment variable not set")
+    import google.generativeai as genai
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel('models/gemini-2.0-flash')
+
+gemini = LazyResource("gemini", _load_gemini)
+
+# Repeated questions under the same risk bucket and location skip Gemini
+response_cache = ResponseCache.from_env()
+cached_llm = CachedLLM(gemini.proxy(), response_cache)
+
+# Blocking Gemini calls run here, off the API's event loop
+llm_executor = LLMExecutor.from_env()
+
+# Prompts carry recent history and location context within a token budget
+prompt_builder = PromptBuilder.from_env()
+
+def get_response_cache_stats():
+    """Hit/miss counters and size of the LLM response cache"""
+    return response_cache.stats()
+
+def get_llm_executor_stats():
+    """Concurrency, queueing and timeout counters of the LLM thread pool"""
+    return llm_executor.stats()
+
+def get_prompt_stats():
+    """Token budget and running prompt size counters"""
+    return prompt_builder.stats()
+
+def get_location_based_stats(area, district, n_samples=DEFAULT_SAMPLES):
     """
     Get location-based statistics without sending large amounts of data to Gemini.
-    Returns a summarized view of the data for the specific location.
+    Returns a summarized view of the data for the specific location, looked up
+    from the statistics precomputed at load time.
     """
-    if dataset_df is None:
-        return "No historical dataset available for analysis."
-    
-    # Filter data for the specific area and district
-    location_data = dataset_df[
-        (dataset_df['Area'] == area) & 
-        (dataset_df['District'] == district)
-    ]
-    
-    if len(location_data) == 0:
-        # If no exact match, try just the district
-        location_data = dataset_df[dataset_df['District'] == district]
-        if len(location_data) == 0:
-            return "No historical data available for this location."
-    
-    # If we have too much data, sample it
-    if len(location_data) > n_samples:
-        location_data = location_data.sample(n=n_samples, random_state=42)
-    
-    # Calculate key statistics
-    total_cases = len(location_data)
-    positive_cases = location_data['Outcome'].sum()
-    positive_rate = positive_cases / total_cases if total_cases > 0 else 0
-    
-    # Age distribution
-    avg_age = location_data['Age'].mean()
-    age_groups = pd.cut(location_data['Age'], bins=[0, 18, 35, 50, 100], labels=['Child', 'Young Adult', 'Adult', 'Senior'])
-    age_distribution = pd.Series(age_groups).value_counts().to_dict()
-    
-    # Gender distribution
-    gender_distribution = pd.Series(location_data['Gender']).value_counts().to_dict()
-    
-    # Test result patterns
-    ns1_positive = location_data[location_data['NS1'] == 1].shape[0]
-    igg_positive = location_data[location_data['IgG'] == 1].shape[0]
-    igm_positive = location_data[location_data['IgM'] == 1].shape[0]
-    
-    # Area type distribution
-    area_type_distribution = pd.Series(location_data['AreaType']).value_counts().to_dict()
-    
-    # Create a concise summary
-    summary = {
-        "total_cases_analyzed": total_cases,
-        "dengue_positive_rate": round(positive_rate * 100, 2),
-        "average_age": round(avg_age, 1),
-        "age_distribution": {str(k): int(v) for k, v in age_distribution.items()},
-        "gender_distribution": {str(k): int(v) for k, v in gender_distribution.items()},
-        "test_patterns": {
-            "ns1_positive_rate": round(ns1_positive/total_cases * 100, 2) if total_cases > 0 else 0,
-            "igg_positive_rate": round(igg_positive/total_cases * 100, 2) if total_cases > 0 else 0,
-            "igm_positive_rate": round(igm_positive/total_cases * 100, 2) if total_cases > 0 else 0
-        },
-        "area_characteristics": {str(k): int(v) for k, v in area_type_distribution.items()}
-    }
-    
-    return summary
+    try:
+        dataset_df, location_stats = dataset.get()
+    except DependencyUnavailable:
+        dataset_df, location_stats = None, None
+    if location_stats is not None and n_samples == location_stats.n_samples:
+        return location_stats.lookup(area, district)
+
+    # Non-default sample sizes are computed from the dataset on demand
+    return compute_location_stats(dataset_df, area, district, n_samples)
 
 def create_location_context(area, district):
     """
@@ -169,28 +176,12 @@ LOCATION ANALYSIS FOR {area}, {district}:
 - Gender Distribution: {stats['gender_distribution']}
 - Common Test Patterns: NS1 {stats['test_patterns']['ns1_positive_rate']}%, IgG {stats['test_patterns']['igg_positive_rate']}%, IgM {stats['test_patterns']['igm_positive_rate']}%
 - Area Type: {stats['area_characteristics']}
-
-This summary is based on statistical analysis of historical data and provides key insights 
-without sending raw patient data to the AI model, significantly reducing token usage.
 """
     
     return context
 
-def chat_with_dengue_agent(user_message, conversation_history=None):
-    """
-    Main chat interface with the AI agent
-    """
-    if conversation_history is None:
-        conversation_history = []
-    
-    # Add user message
-    conversation_history.append({
-        "role": "user",
-        "content": user_message
-    })
-    
-    # Enhanced system prompt that lets Gemini generate responses based on data
-    system_prompt = """You are a Dengue Intelligence Assistant helping health officials and medical staff 
+# Enhanced system prompt that lets Gemini generate responses based on data
+SYSTEM_PROMPT = """You are a Dengue Intelligence Assistant helping health officials and medical staff 
     assess dengue risk and make data-driven decisions.
 
     You have access to:
@@ -231,17 +222,67 @@ def chat_with_dengue_agent(user_message, conversation_history=None):
     For simple questions like "should I drink coconut water?", provide a direct, concise answer
     while still considering the context if available.
     """
-    
-    full_prompt = system_prompt + "\nUser query: " + user_message
-    
-    # Call Gemini Flash
+
+def build_agent_prompt(user_message, conversation_history=None, location=None, history_summary=None):
+    """
+    Prompt sent to Gemini for one user message, as a BuiltPrompt: the system
+    prompt, the location context for ``location`` (area, district), the
+    summary of turns before ``conversation_history`` and the history itself,
+    fitted to the token budget.
+    """
+    location_context = create_location_context(*location) if location else None
+    return prompt_builder.build(SYSTEM_PROMPT, user_message, conversation_history, location_context,
+                                earlier_summary=history_summary)
+
+def _prepare_turn(user_message, conversation_history, cache_context, location, usage, history_summary):
+    """Prompt and response-cache key for a turn; records prompt usage"""
+    with stage_timer("prompt_build"):
+        prompt = build_agent_prompt(user_message, conversation_history, location, history_summary)
+    if usage is not None:
+        usage.update(prompt.usage())
+    print(f"Prompt: {prompt.token_count} tokens ({prompt.history_turns} history turns, "
+          f"dropped {prompt.dropped or 'nothing'})")
+
+    # Answers that depend on earlier turns are not reusable across chats
+    if prompt.history_turns or prompt.sections["summary"]:
+        cache_key = None
+    else:
+        cache_key = make_cache_key(**cache_context) if cache_context else make_cache_key(user_message)
+    return prompt, cache_key
+
+def chat_with_dengue_agent(user_message, conversation_history=None, cache_context=None,
+                           location=None, usage=None, history_summary=None):
+    """
+    Main chat interface with the AI agent.
+    ``cache_context`` (question, risk_level, location, variant) keys the
+    response cache; without it the normalized message itself is the key.
+    ``location`` is an (area, district) pair whose statistics go into the
+    prompt, ``history_summary`` summarizes turns older than the history
+    (a chat session's rolling summary) and ``usage``, if given, is filled
+    with the token counts.
+    """
+    if conversation_history is None:
+        conversation_history = []
+
+    prompt, cache_key = _prepare_turn(user_message, conversation_history, cache_context, location, usage,
+                                      history_summary)
+
+    # Add user message
+    conversation_history.append({
+        "role": "user",
+        "content": user_message
+    })
+
+    # Call Gemini Flash, or answer from the response cache
     try:
-        response = llm.generate_content(full_prompt)
-        final_response = response.text
+        with stage_timer("llm_call"):
+            final_response = cached_llm.generate(prompt.text, cache_key=cache_key)
         print(f"Gemini response: {final_response}")  # Debug logging
     except Exception as e:
         print(f"Gemini API error: {str(e)}")  # Debug logging
         final_response = f"Error generating response: {str(e)}"
+    if usage is not None:
+        usage["response_tokens"] = estimate_tokens(final_response)
     
     # Add to history
     conversation_history.append({
@@ -251,6 +292,68 @@ def chat_with_dengue_agent(user_message, conversation_history=None):
     
     return final_response, conversation_history
 
+def stream_dengue_agent(user_message, conversation_history=None, cache_context=None,
+                        location=None, usage=None, history_summary=None):
+    """
+    Streaming variant of chat_with_dengue_agent: yields the response text
+    in chunks as Gemini produces them. The full answer is appended to
+    ``conversation_history`` once the stream is complete.
+    """
+    if conversation_history is None:
+        conversation_history = []
+
+    prompt, cache_key = _prepare_turn(user_message, conversation_history, cache_context, location, usage,
+                                      history_summary)
+
+    conversation_history.append({
+        "role": "user",
+        "content": user_message
+    })
+
+    chunks = []
+    start = time.perf_counter()
+    try:
+        for chunk in cached_llm.stream(prompt.text, cache_key=cache_key):
+            chunks.append(chunk)
+            yield chunk
+    except Exception as e:
+        print(f"Gemini API error: {str(e)}")  # Debug logging
+        error = f"Error generating response: {str(e)}"
+        chunks.append(error)
+        yield error
+    # The whole stream, from the request to Gemini to its last chunk
+    stage_duration.observe(time.perf_counter() - start, "llm_call")
+
+    answer = "".join(chunks)
+    if usage is not None:
+        usage["response_tokens"] = estimate_tokens(answer)
+    conversation_history.append({
+        "role": "assistant",
+        "content": answer
+    })
+
+async def achat_with_dengue_agent(user_message, conversation_history=None, cache_context=None,
+                                  location=None, usage=None, history_summary=None, timeout=None):
+    """
+    Async chat_with_dengue_agent for the API: runs on the bounded LLM thread
+    pool and raises LLMTimeoutError after ``timeout`` (default LLM_TIMEOUT).
+    """
+    return await llm_executor.run(
+        chat_with_dengue_agent, user_message, conversation_history, cache_context, location, usage,
+        history_summary, timeout=timeout
+    )
+
+def astream_dengue_agent(user_message, conversation_history=None, cache_context=None,
+                         location=None, usage=None, history_summary=None, timeout=None):
+    """
+    Async iterator version of stream_dengue_agent, advanced on the LLM
+    thread pool; ``timeout`` bounds the wait for each chunk.
+    """
+    return llm_executor.iterate(
+        stream_dengue_agent, user_message, conversation_history, cache_context, location, usage,
+        history_summary, timeout=timeout
+    )
+
 # Example usage
 if __name__ == "__main__":
     print("🦟 Dengue Intelligence Agent Started\n")
@@ -0,0 +1,158 @@
+"""
+Bounded thread pool for blocking LLM calls
+
+The Gemini client is synchronous, so calling it from an ``async`` FastAPI
+handler blocks the event loop and every concurrent /predict with it.
+``LLMExecutor`` runs those calls on a dedicated thread pool instead, with at
+most ``max_concurrency`` calls in flight (later ones wait for a slot) and a
+per-call timeout that covers the wait for a slot as well as the call.
+
+A timed-out call raises ``LLMTimeoutError`` to the caller. The worker thread
+cannot be interrupted and finishes in the background, still holding its pool
+thread, which is what keeps the number of outstanding Gemini requests
+bounded.
+
+Configured with LLM_MAX_CONCURRENCY and LLM_TIMEOUT (seconds).
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Dict, Iterator, Optional
+
+_END = object()
+
+
+class LLMTimeoutError(TimeoutError):
+    """An LLM call did not finish within its timeout"""
+
+
+class LLMExecutor:
+    """Runs blocking LLM calls off the event loop with a concurrency limit"""
+
+    def __init__(self, max_concurrency: int = 8, timeout: float = 60.0):
+        if max_concurrency < 1 or timeout <= 0:
+            raise ValueError("max_concurrency and timeout must be positive")
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        # Both created on first use, so the semaphore binds to the server's event loop
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+
+        self.in_flight = 0
+        self.waiting = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+
+    @classmethod
+    def from_env(cls) -> "LLMExecutor":
+        return cls(
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+            timeout=float(os.getenv("LLM_TIMEOUT", "60"))
+        )
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="llm")
+            return self._pool
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        return self._slots
+
+    def _count(self, field: str, delta: int = 1):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + delta)
+
+    async def _acquire(self, deadline: float):
+        loop = asyncio.get_running_loop()
+        self._count("waiting")
+        try:
+            await asyncio.wait_for(self._semaphore().acquire(), max(deadline - loop.time(), 0))
+        except asyncio.TimeoutError:
+            self._count("timeouts")
+            raise LLMTimeoutError("Timed out waiting for a free LLM slot")
+        finally:
+            self._count("waiting", -1)
+        self._count("in_flight")
+
+    def _release(self):
+        self._count("in_flight", -1)
+        self._semaphore().release()
+
+    async def run(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs):
+        """Await ``fn(*args, **kwargs)`` run on the LLM thread pool"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (timeout or self.timeout)
+        await self._acquire(deadline)
+        try:
+            future = loop.run_in_executor(self._executor(), lambda: fn(*args, **kwargs))
+            result = await asyncio.wait_for(future, max(deadline - loop.time(), 0))
+        except asyncio.TimeoutError:
+            self._count("timeouts")
+            raise LLMTimeoutError(f"LLM call timed out after {timeout or self.timeout:.0f}s")
+        except Exception:
+            self._count("failed")
+            raise
+        finally:
+            self._release()
+        self._count("completed")
+        return result
+
+    async def iterate(self, gen_fn: Callable[..., Iterator], *args,
+                      timeout: Optional[float] = None, **kwargs) -> AsyncIterator:
+        """
+        Async iterator over a blocking generator, advanced on the LLM thread
+        pool. The slot is held for the whole stream and ``timeout`` bounds
+        the wait for each item.
+        """
+        loop = asyncio.get_running_loop()
+        per_item = timeout or self.timeout
+        await self._acquire(loop.time() + per_item)
+        iterator = None
+        try:
+            iterator = await loop.run_in_executor(self._executor(), lambda: iter(gen_fn(*args, **kwargs)))
+            while True:
+                future = loop.run_in_executor(self._executor(), next, iterator, _END)
+                try:
+                    item = await asyncio.wait_for(future, per_item)
+                except asyncio.TimeoutError:
+                    self._count("timeouts")
+                    raise LLMTimeoutError(f"LLM stream stalled for {per_item:.0f}s")
+                if item is _END:
+                    break
+                yield item
+        except LLMTimeoutError:
+            raise
+        except Exception:
+            self._count("failed")
+            raise
+        else:
+            self._count("completed")
+        finally:
+            self._release()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "max_concurrency": self.max_concurrency,
+                "timeout_seconds": self.timeout,
+                "in_flight": self.in_flight,
+                "waiting": self.waiting,
+                "completed": self.completed,
+                "failed": self.failed,
+                "timeouts": self.timeouts
+            }
+
+    def shutdown(self):
+        """Stop the pool; a later call starts a fresh one (e.g. on app restart)"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+            self._slots = None
+        if pool is not None:
+            pool.shutdown(wait=False)
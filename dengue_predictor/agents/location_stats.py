@@ -0,0 +1,124 @@
+"""
+Precomputed location statistics for the AI agent
+
+``get_location_based_stats`` used to filter the whole dataset with boolean
+masks, sample it, bucket ages with ``pd.cut`` and run several
+``value_counts`` on every chat request. ``LocationStatsCube`` computes the
+same summary once per (district, area) and once per district (the fallback
+for unknown areas) when the dataset is loaded, so a lookup is a dict access.
+
+The summaries are built with ``summarize_location``, the exact code the
+per-request path ran, over the same ``n_samples`` sample, so a cube lookup
+returns the same dict the pandas path would.
+"""
+
+from typing import Dict, Optional, Tuple, Union
+
+import pandas as pd
+
+AGE_BINS = [0, 18, 35, 50, 100]
+AGE_LABELS = ['Child', 'Young Adult', 'Adult', 'Senior']
+
+# Rows summarised per location, larger locations are sampled down to this
+DEFAULT_SAMPLES = 50
+SAMPLE_SEED = 42
+
+NO_DATASET = "No historical dataset available for analysis."
+NO_LOCATION_DATA = "No historical data available for this location."
+
+
+def summarize_location(location_data: pd.DataFrame) -> Dict:
+    """Concise statistics for the rows of one location"""
+    # Calculate key statistics
+    total_cases = len(location_data)
+    positive_cases = location_data['Outcome'].sum()
+    positive_rate = positive_cases / total_cases if total_cases > 0 else 0
+
+    # Age distribution
+    avg_age = location_data['Age'].mean()
+    age_groups = pd.cut(location_data['Age'], bins=AGE_BINS, labels=AGE_LABELS)
+    age_distribution = pd.Series(age_groups).value_counts().to_dict()
+
+    # Gender distribution
+    gender_distribution = pd.Series(location_data['Gender']).value_counts().to_dict()
+
+    # Test result patterns
+    ns1_positive = location_data[location_data['NS1'] == 1].shape[0]
+    igg_positive = location_data[location_data['IgG'] == 1].shape[0]
+    igm_positive = location_data[location_data['IgM'] == 1].shape[0]
+
+    # Area type distribution
+    area_type_distribution = pd.Series(location_data['AreaType']).value_counts().to_dict()
+
+    return {
+        "total_cases_analyzed": total_cases,
+        "dengue_positive_rate": round(positive_rate * 100, 2),
+        "average_age": round(avg_age, 1),
+        "age_distribution": {str(k): int(v) for k, v in age_distribution.items()},
+        "gender_distribution": {str(k): int(v) for k, v in gender_distribution.items()},
+        "test_patterns": {
+            "ns1_positive_rate": round(ns1_positive/total_cases * 100, 2) if total_cases > 0 else 0,
+            "igg_positive_rate": round(igg_positive/total_cases * 100, 2) if total_cases > 0 else 0,
+            "igm_positive_rate": round(igm_positive/total_cases * 100, 2) if total_cases > 0 else 0
+        },
+        "area_characteristics": {str(k): int(v) for k, v in area_type_distribution.items()}
+    }
+
+
+def _sampled(location_data: pd.DataFrame, n_samples: int) -> pd.DataFrame:
+    # If we have too much data, sample it
+    if len(location_data) > n_samples:
+        return location_data.sample(n=n_samples, random_state=SAMPLE_SEED)
+    return location_data
+
+
+def compute_location_stats(df: Optional[pd.DataFrame], area: str, district: str,
+                           n_samples: int = DEFAULT_SAMPLES) -> Union[Dict, str]:
+    """Per-request pandas path: filter, sample and summarise ``df``"""
+    if df is None:
+        return NO_DATASET
+
+    # Filter data for the specific area and district
+    location_data = df[(df['Area'] == area) & (df['District'] == district)]
+
+    if len(location_data) == 0:
+        # If no exact match, try just the district
+        location_data = df[df['District'] == district]
+        if len(location_data) == 0:
+            return NO_LOCATION_DATA
+
+    return summarize_location(_sampled(location_data, n_samples))
+
+
+class LocationStatsCube:
+    """Location summaries keyed by (district, area), with district fallbacks"""
+
+    def __init__(self, areas: Dict[Tuple[str, str], Dict], districts: Dict[str, Dict], n_samples: int):
+        self.areas = areas
+        self.districts = districts
+        self.n_samples = n_samples
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, n_samples: int = DEFAULT_SAMPLES) -> "LocationStatsCube":
+        """Summarise every area and district of ``df`` once"""
+        areas = {
+            (district, area): summarize_location(_sampled(group, n_samples))
+            for (district, area), group in df.groupby(['District', 'Area'], sort=False)
+        }
+        districts = {
+            district: summarize_location(_sampled(group, n_samples))
+            for district, group in df.groupby('District', sort=False)
+        }
+        return cls(areas, districts, n_samples)
+
+    def lookup(self, area: str, district: str) -> Union[Dict, str]:
+        """
+        Summary for an area, its district's summary if the area is unknown.
+        The dict is shared between calls, so treat it as read-only.
+        """
+        stats = self.areas.get((district, area))
+        if stats is None:
+            stats = self.districts.get(district)
+            if stats is None:
+                return NO_LOCATION_DATA
+        return stats
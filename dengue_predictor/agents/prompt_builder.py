@@ -0,0 +1,215 @@
+"""
+Token-budgeted prompt assembly for the AI agent
+
+The agent used to send the whole system prompt plus the latest message on
+every turn: the conversation history it was given never reached Gemini and
+the location summary was computed but not included. ``PromptBuilder`` puts
+the prompt together from sections in priority order:
+
+    system prompt, user message     always kept
+    latest exchange                 kept while the budget allows
+    location context
+    older recent turns
+    summary of earlier turns        dropped first
+
+The last ``recent_turns`` messages are included verbatim and older ones are
+folded into a short extractive summary (no extra LLM call). When the total
+goes over ``budget_tokens``, the sections lowest in that list are dropped or
+trimmed first, and the result reports the token count of every section so
+cost and latency can be tracked per chat.
+
+Tokens are estimated at ~4 characters each, which is close to Gemini's
+tokenizer for English text and costs nothing per request.
+
+Configured with PROMPT_TOKEN_BUDGET, PROMPT_RECENT_TURNS and
+PROMPT_SUMMARY_TOKENS.
+"""
+
+import os
+import re
+import threading
+from typing import Dict, List, Optional
+
+CHARS_PER_TOKEN = 4
+
+# Longest excerpt of one turn kept in the summary of earlier turns
+_SUMMARY_EXCERPT_CHARS = 160
+_MARKDOWN = re.compile(r'[*_#`>|]+')
+_WHITESPACE = re.compile(r'\s+')
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s')
+
+_ROLE_LABELS = {"user": "User", "assistant": "Assistant"}
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of ``text``"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN if text else 0
+
+
+def _excerpt(text: str, max_chars: int) -> str:
+    """First sentence of ``text`` without markdown, cut at ``max_chars``"""
+    text = _WHITESPACE.sub(' ', _MARKDOWN.sub('', text)).strip()
+    text = _SENTENCE_END.split(text, 1)[0]
+    if len(text) > max_chars:
+        text = text[:max_chars - 3].rsplit(' ', 1)[0] + "..."
+    return text
+
+
+def format_turn(turn: Dict) -> str:
+    role = _ROLE_LABELS.get(turn.get("role"), str(turn.get("role", "")).title())
+    return f"{role}: {turn.get('content', '')}"
+
+
+def summarize_turns(turns: List[Dict], max_tokens: int) -> str:
+    """
+    Extractive summary of ``turns``: one line per turn with the first
+    sentence of each message, keeping the most recent lines that fit in
+    ``max_tokens``.
+    """
+    lines = []
+    used = 0
+    for turn in reversed(turns):
+        excerpt = _excerpt(str(turn.get("content", "")), _SUMMARY_EXCERPT_CHARS)
+        if not excerpt:
+            continue
+        line = "- " + format_turn({"role": turn.get("role"), "content": excerpt})
+        cost = estimate_tokens(line) + 1
+        if used + cost > max_tokens:
+            break
+        lines.append(line)
+        used += cost
+    return "\n".join(reversed(lines))
+
+
+class BuiltPrompt:
+    """Assembled prompt text with its per-section token counts"""
+
+    def __init__(self, text: str, sections: Dict[str, int], budget_tokens: int,
+                 history_turns: int, summarized_turns: int, dropped: List[str]):
+        self.text = text
+        self.sections = sections
+        self.budget_tokens = budget_tokens
+        self.history_turns = history_turns
+        self.summarized_turns = summarized_turns
+        self.dropped = dropped
+
+    @property
+    def token_count(self) -> int:
+        return estimate_tokens(self.text)
+
+    def usage(self) -> Dict:
+        return {
+            "prompt_tokens": self.token_count,
+            "budget_tokens": self.budget_tokens,
+            "sections": dict(self.sections),
+            "history_turns": self.history_turns,
+            "summarized_turns": self.summarized_turns,
+            "dropped": list(self.dropped)
+        }
+
+
+class PromptBuilder:
+    """Assembles agent prompts within a token budget"""
+
+    def __init__(self, budget_tokens: int = 3000, recent_turns: int = 6, summary_tokens: int = 200):
+        if budget_tokens <= 0 or recent_turns < 0 or summary_tokens < 0:
+            raise ValueError("budget_tokens must be positive, recent_turns and summary_tokens non-negative")
+        self.budget_tokens = budget_tokens
+        self.recent_turns = recent_turns
+        self.summary_tokens = summary_tokens
+        self._lock = threading.Lock()
+
+        self.requests = 0
+        self.total_prompt_tokens = 0
+        self.over_budget = 0
+
+    @classmethod
+    def from_env(cls) -> "PromptBuilder":
+        return cls(
+            budget_tokens=int(os.getenv("PROMPT_TOKEN_BUDGET", "3000")),
+            recent_turns=int(os.getenv("PROMPT_RECENT_TURNS", "6")),
+            summary_tokens=int(os.getenv("PROMPT_SUMMARY_TOKENS", "200"))
+        )
+
+    def build(self, system_prompt: str, user_message: str, history: Optional[List[Dict]] = None,
+              location_context: Optional[str] = None, earlier_summary: Optional[str] = None) -> BuiltPrompt:
+        """
+        Prompt for ``user_message`` given the earlier ``history`` turns
+        (not including this message), an optional location summary and an
+        optional summary of turns before ``history`` (a session's rolling
+        summary).
+        """
+        history = [turn for turn in (history or []) if turn.get("content")]
+        split = max(len(history) - self.recent_turns, 0)
+        older, recent = history[:split], history[split:]
+
+        summary = summarize_turns(older, self.summary_tokens) if older and self.summary_tokens else ""
+        if earlier_summary:
+            summary = earlier_summary.strip() + ("\n" + summary if summary else "")
+        location_context = (location_context or "").strip()
+        turns = [format_turn(turn) for turn in recent]
+
+        fixed = estimate_tokens(system_prompt) + estimate_tokens(user_message)
+        dropped = []
+
+        def total():
+            return (fixed + estimate_tokens(summary) + estimate_tokens(location_context)
+                    + sum(estimate_tokens(turn) for turn in turns))
+
+        # Least relevant first: earlier-turn summary, older recent turns
+        # (keeping the latest exchange), location context, then the rest
+        if total() > self.budget_tokens and summary:
+            summary = ""
+            dropped.append("summary")
+        while total() > self.budget_tokens and len(turns) > 2:
+            turns.pop(0)
+            dropped.append("turn")
+        if total() > self.budget_tokens and location_context:
+            location_context = ""
+            dropped.append("location_context")
+        while total() > self.budget_tokens and turns:
+            turns.pop(0)
+            dropped.append("turn")
+
+        parts = [system_prompt.rstrip()]
+        if location_context:
+            parts.append(location_context)
+        if summary:
+            parts.append("Earlier conversation (summary):\n" + summary)
+        if turns:
+            parts.append("Recent conversation:\n" + "\n".join(turns))
+        parts.append("User query: " + user_message)
+        text = "\n\n".join(parts)
+
+        built = BuiltPrompt(
+            text,
+            sections={
+                "system": estimate_tokens(system_prompt),
+                "location_context": estimate_tokens(location_context),
+                "summary": estimate_tokens(summary),
+                "history": sum(estimate_tokens(turn) for turn in turns),
+                "user_message": estimate_tokens(user_message)
+            },
+            budget_tokens=self.budget_tokens,
+            history_turns=len(turns),
+            summarized_turns=len(older) if summary else 0,
+            dropped=dropped
+        )
+        with self._lock:
+            self.requests += 1
+            self.total_prompt_tokens += built.token_count
+            if built.token_count > self.budget_tokens:
+                self.over_budget += 1
+        return built
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "budget_tokens": self.budget_tokens,
+                "recent_turns": self.recent_turns,
+                "summary_tokens": self.summary_tokens,
+                "requests": self.requests,
+                "total_prompt_tokens": self.total_prompt_tokens,
+                "avg_prompt_tokens": round(self.total_prompt_tokens / self.requests, 1) if self.requests else 0.0,
+                "over_budget": self.over_budget
+            }
@@ -0,0 +1,197 @@
+"""
+Response cache for the AI agent's LLM calls
+
+Clinic users often ask near-identical questions ("should I drink coconut
+water?") for patients in the same risk bucket and location, and every one of
+them used to cost a full Gemini round trip. ``ResponseCache`` is an LRU map
+with a time-to-live, keyed on the normalized question, the risk level and
+the location, optionally persisted to a JSON file so answers survive a
+restart. ``CachedLLM`` wraps any client with a ``generate_content(prompt)``
+method returning an object with ``.text`` (and, for streaming, accepting
+``stream=True`` and returning an iterable of such chunks), which keeps the
+cache testable with a fake client.
+
+Configured with LLM_CACHE_SIZE (0 disables caching), LLM_CACHE_TTL in
+seconds and LLM_CACHE_PATH.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterator, Optional
+
+_NON_WORD = re.compile(r'[^a-z0-9]+')
+
+
+def normalize_message(message: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    return _NON_WORD.sub(' ', message.lower()).strip()
+
+
+def make_cache_key(question: str, risk_level: Optional[str] = None, location: Optional[str] = None,
+                   variant: Optional[str] = None) -> str:
+    """Cache key for a question asked under a risk bucket and location"""
+    parts = (
+        normalize_message(question),
+        (risk_level or "none").lower(),
+        normalize_message(location) if location else "none",
+        variant or "default",
+    )
+    return "|".join(parts)
+
+
+class ResponseCache:
+    """Thread-safe LRU cache of LLM responses with per-entry expiry"""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 3600.0, path: Optional[str] = None):
+        if max_entries < 0 or ttl_seconds <= 0:
+            raise ValueError("max_entries must be >= 0 and ttl_seconds positive")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        if path and os.path.exists(path):
+            self.load()
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        return cls(
+            max_entries=int(os.getenv("LLM_CACHE_SIZE", "256")),
+            ttl_seconds=float(os.getenv("LLM_CACHE_TTL", "3600")),
+            path=os.getenv("LLM_CACHE_PATH") or None
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached response for ``key``, or None on a miss or expired entry"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, response: str):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (time.time(), response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        self.save()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        self.save()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "persistent": bool(self.path)
+            }
+
+    def save(self):
+        """Write unexpired entries to ``path``, least recently used first"""
+        if not self.path:
+            return
+        with self._lock:
+            entries = [[key, created, response] for key, (created, response) in self._entries.items()]
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"entries": entries}, f)
+        os.replace(tmp_path, self.path)
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                entries = json.load(f).get("entries", [])
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not load LLM response cache from {self.path}: {e}")
+            return
+        now = time.time()
+        with self._lock:
+            self._entries.clear()
+            for key, created, response in entries:
+                if now - created <= self.ttl_seconds:
+                    self._entries[key] = (created, response)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class CachedLLM:
+    """LLM client wrapper that answers repeated questions from a ResponseCache"""
+
+    def __init__(self, client, cache: ResponseCache):
+        self.client = client
+        self.cache = cache
+
+    def generate(self, prompt: str, cache_key: Optional[str] = None) -> str:
+        """
+        Response text for ``prompt``. With a ``cache_key`` a cached answer is
+        returned without calling the client; errors are never cached.
+        """
+        if cache_key is None or not self.cache.enabled:
+            return self.client.generate_content(prompt).text
+
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        text = self.client.generate_content(prompt).text
+        self.cache.put(cache_key, text)
+        return text
+
+    def stream(self, prompt: str, cache_key: Optional[str] = None) -> Iterator[str]:
+        """
+        Yield the response text chunk by chunk as the client produces it.
+        A cached answer is yielded whole; a stream is cached only once it
+        has completed without error.
+        """
+        use_cache = cache_key is not None and self.cache.enabled
+        if use_cache:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+
+        parts = []
+        for chunk in self.client.generate_content(prompt, stream=True):
+            text = chunk.text
+            if text:
+                parts.append(text)
+                yield text
+        if use_cache:
+            self.cache.put(cache_key, "".join(parts))
@@ -0,0 +1,263 @@
+"""
+Server-side chat sessions
+
+Clients used to resend the whole conversation history on every /chat call
+and get it back in every response, so both payloads grew with the length of
+the conversation. A ``ChatSession`` keeps the last ``max_turns`` messages
+verbatim and folds older ones into a rolling extractive summary bounded by
+``summary_tokens``, so a client only sends its session id and the new
+message, and a session's size stays constant however long the chat runs.
+
+``SessionStore`` is an LRU map of sessions with an idle time-to-live; the
+least recently used session is evicted once ``max_sessions`` is reached.
+
+Configured with CHAT_SESSION_MAX, CHAT_SESSION_TURNS, CHAT_SESSION_TTL (in
+seconds) and PROMPT_SUMMARY_TOKENS.
+
+``SessionStore`` lives in one process's memory. With several API workers a
+follow-up message can reach a worker that never saw the session, so
+CHAT_SESSION_DB names a SQLite file and ``SqliteSessionStore`` keeps the
+sessions there instead, shared by every worker on the machine.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+try:
+    from agents.prompt_builder import estimate_tokens, summarize_turns
+except ImportError:
+    from prompt_builder import estimate_tokens, summarize_turns
+
+
+def fold_summary(summary: str, turns: List[Dict], max_tokens: int) -> str:
+    """Append ``turns`` to a rolling summary, dropping its oldest lines to fit ``max_tokens``"""
+    lines = summary.splitlines() if summary else []
+    added = summarize_turns(turns, max_tokens)
+    if added:
+        lines.extend(added.splitlines())
+    kept = []
+    used = 0
+    for line in reversed(lines):
+        cost = estimate_tokens(line) + 1
+        if used + cost > max_tokens:
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(reversed(kept))
+
+
+class ChatSession:
+    """Rolling summary, recent turns and risk assessment of one conversation"""
+
+    def __init__(self, session_id: str, max_turns: int, summary_tokens: int):
+        self.session_id = session_id
+        self.max_turns = max_turns
+        self.summary_tokens = summary_tokens
+        self.summary = ""
+        self.turns: List[Dict] = []
+        self.total_turns = 0
+        self.risk_assessment: Optional[Dict] = None
+        self.updated_at = time.time()
+
+    def history(self) -> List[Dict]:
+        """Copy of the recent turns, safe to hand to the agent"""
+        return [dict(turn) for turn in self.turns]
+
+    def add_turns(self, turns: List[Dict]):
+        self.turns.extend({"role": turn["role"], "content": turn["content"]} for turn in turns)
+        self.total_turns += len(turns)
+        overflow = len(self.turns) - self.max_turns
+        if overflow > 0:
+            self.summary = fold_summary(self.summary, self.turns[:overflow], self.summary_tokens)
+            del self.turns[:overflow]
+        self.updated_at = time.time()
+
+    def to_dict(self) -> Dict:
+        return {"summary": self.summary, "turns": self.turns, "total_turns": self.total_turns,
+                "risk_assessment": self.risk_assessment, "updated_at": self.updated_at}
+
+    @classmethod
+    def from_dict(cls, session_id: str, data: Dict, max_turns: int, summary_tokens: int) -> "ChatSession":
+        session = cls(session_id, max_turns, summary_tokens)
+        session.summary = data["summary"]
+        session.turns = data["turns"]
+        session.total_turns = data["total_turns"]
+        session.risk_assessment = data["risk_assessment"]
+        session.updated_at = data["updated_at"]
+        return session
+
+
+class SessionStore:
+    """Thread-safe LRU store of chat sessions with an idle timeout"""
+
+    def __init__(self, max_sessions: int = 1000, max_turns: int = 6, summary_tokens: int = 200,
+                 ttl_seconds: float = 86400.0):
+        if max_sessions < 1 or max_turns < 0 or ttl_seconds <= 0:
+            raise ValueError("max_sessions and ttl_seconds must be positive, max_turns non-negative")
+        self.max_sessions = max_sessions
+        self.max_turns = max_turns
+        self.summary_tokens = summary_tokens
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, ChatSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.created = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    # Whether every worker process sees the same sessions
+    shared = False
+
+    @classmethod
+    def from_env(cls) -> "SessionStore":
+        """The in-memory store, or the SQLite one when CHAT_SESSION_DB is set"""
+        settings = dict(
+            max_sessions=int(os.getenv("CHAT_SESSION_MAX", "1000")),
+            max_turns=int(os.getenv("CHAT_SESSION_TURNS", "6")),
+            summary_tokens=int(os.getenv("PROMPT_SUMMARY_TOKENS", "200")),
+            ttl_seconds=float(os.getenv("CHAT_SESSION_TTL", "86400"))
+        )
+        path = os.getenv("CHAT_SESSION_DB")
+        if path:
+            return SqliteSessionStore(path, **settings)
+        return SessionStore(**settings)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: str) -> Optional[ChatSession]:
+        """Session for ``session_id``, or None if it is unknown or has expired"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None and time.time() - session.updated_at > self.ttl_seconds:
+                del self._sessions[session_id]
+                self.expirations += 1
+                session = None
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def get_or_create(self, session_id: Optional[str] = None) -> ChatSession:
+        """Existing session for ``session_id``, otherwise a new one with a fresh id"""
+        session = self.get(session_id) if session_id else None
+        if session is not None:
+            return session
+        session = ChatSession(uuid.uuid4().hex, self.max_turns, self.summary_tokens)
+        with self._lock:
+            self._sessions[session.session_id] = session
+            self.created += 1
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evictions += 1
+        return session
+
+    def append(self, session: ChatSession, turns: List[Dict]):
+        """Record the turns of a completed exchange"""
+        with self._lock:
+            session.add_turns(turns)
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "max_turns": self.max_turns,
+                "ttl_seconds": self.ttl_seconds,
+                "created": self.created,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
+
+
+class SqliteSessionStore(SessionStore):
+    """
+    Sessions in a SQLite file, so every worker process finds every session.
+    A session is read on each lookup and written back with each exchange;
+    the least recently used ones beyond ``max_sessions`` are deleted.
+    """
+
+    shared = True
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self._conn = None
+        self._conn_pid = None
+
+    def _connection(self) -> sqlite3.Connection:
+        # Opened lazily and again after a fork: a connection must not cross processes
+        if self._conn is None or self._conn_pid != os.getpid():
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS sessions (session_id TEXT PRIMARY KEY, "
+                         "data TEXT NOT NULL, updated_at REAL NOT NULL, accessed_at REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_accessed ON sessions (accessed_at)")
+            self._conn, self._conn_pid = conn, os.getpid()
+        return self._conn
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def get(self, session_id: str) -> Optional[ChatSession]:
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT data, updated_at FROM sessions WHERE session_id = ?",
+                               (session_id,)).fetchone()
+            if row is None:
+                return None
+            if time.time() - row[1] > self.ttl_seconds:
+                conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+                self.expirations += 1
+                return None
+            conn.execute("UPDATE sessions SET accessed_at = ? WHERE session_id = ?", (time.time(), session_id))
+        return ChatSession.from_dict(session_id, json.loads(row[0]), self.max_turns, self.summary_tokens)
+
+    def get_or_create(self, session_id: Optional[str] = None) -> ChatSession:
+        session = self.get(session_id) if session_id else None
+        if session is not None:
+            return session
+        session = ChatSession(uuid.uuid4().hex, self.max_turns, self.summary_tokens)
+        with self._lock:
+            conn = self._connection()
+            self._save_locked(conn, session)
+            self.created += 1
+            excess = conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0] - self.max_sessions
+            if excess > 0:
+                conn.execute("DELETE FROM sessions WHERE session_id IN "
+                             "(SELECT session_id FROM sessions ORDER BY accessed_at LIMIT ?)", (excess,))
+                self.evictions += excess
+        return session
+
+    def _save_locked(self, conn: sqlite3.Connection, session: ChatSession):
+        conn.execute("INSERT OR REPLACE INTO sessions (session_id, data, updated_at, accessed_at) "
+                     "VALUES (?, ?, ?, ?)",
+                     (session.session_id, json.dumps(session.to_dict()), session.updated_at, time.time()))
+
+    def append(self, session: ChatSession, turns: List[Dict]):
+        with self._lock:
+            session.add_turns(turns)
+            self._save_locked(self._connection(), session)
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            cursor = self._connection().execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            return cursor.rowcount > 0
+
+    def stats(self) -> Dict:
+        stats = super().stats()
+        stats["sessions"] = len(self)
+        stats["path"] = self.path
+        return stats
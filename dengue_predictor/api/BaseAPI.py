@@ -1,11 +1,14 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-import joblib
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, ValidationError
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 import sys
 import os
+import json
+import time
 
 # Setup paths for imports (works in both development and executable mode)
 def setup_import_paths():
@@ -30,69 +33,96 @@ def setup_import_paths():
 # Setup paths first
 setup_import_paths()
 
-# Import from PineconeDB - try multiple import strategies
-add_case_to_vector_db = None
+# Import from the configured vector DB backend - try multiple import strategies
+add_cases_to_vector_db = None
+close_vector_db = None
 try:
     # Try 1: Direct import (when in sys.path)
-    from db.PineconeDB import add_case_to_vector_db
+    from db.vector_store import add_cases_to_vector_db, close_vector_db
 except ImportError:
     try:
         # Try 2: Absolute import from package
-        from db import PineconeDB
-        add_case_to_vector_db = PineconeDB.add_case_to_vector_db
+        from db import vector_store
+        add_cases_to_vector_db = vector_store.add_cases_to_vector_db
+        close_vector_db = vector_store.close_vector_db
     except ImportError:
         try:
             # Try 3: Direct module import
-            import db.PineconeDB as PineconeDB
-            add_case_to_vector_db = PineconeDB.add_case_to_vector_db
+            import db.vector_store as vector_store
+            add_cases_to_vector_db = vector_store.add_cases_to_vector_db
+            close_vector_db = vector_store.close_vector_db
         except ImportError:
             # Try 4: Import from file path
             import importlib.util
             if getattr(sys, 'frozen', False):
-                db_file = os.path.join(sys._MEIPASS, 'db', 'PineconeDB.py')
+                db_file = os.path.join(sys._MEIPASS, 'db', 'vector_store.py')
             else:
-                db_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'db', 'PineconeDB.py')
+                db_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'db', 'vector_store.py')
             if os.path.exists(db_file):
-                spec = importlib.util.spec_from_file_location("PineconeDB", db_file)
-                pinecone_db = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(pinecone_db)
-                add_case_to_vector_db = pinecone_db.add_case_to_vector_db
+                spec = importlib.util.spec_from_file_location("vector_store", db_file)
+                vector_store_module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(vector_store_module)
+                add_cases_to_vector_db = vector_store_module.add_cases_to_vector_db
+                close_vector_db = vector_store_module.close_vector_db
 
-if add_case_to_vector_db is None:
-    raise ImportError("Could not import add_case_to_vector_db from PineconeDB")
+if add_cases_to_vector_db is None:
+    raise ImportError("Could not import add_cases_to_vector_db from vector_store")
 
-# Import from AI_Agent - try multiple import strategies
-chat_with_dengue_agent = None
+# Import AI_Agent - try multiple import strategies
+AI_Agent = None
 try:
-    # Try 1: Direct import (when in sys.path)
-    from agents.AI_Agent import chat_with_dengue_agent
+    # Try 1: Absolute import from package (when in sys.path)
+    from agents import AI_Agent
 except ImportError:
     try:
-        # Try 2: Absolute import from package
-        from agents import AI_Agent
-        chat_with_dengue_agent = AI_Agent.chat_with_dengue_agent
+        # Try 2: Direct module import
+        import agents.AI_Agent as AI_Agent
     except ImportError:
-        try:
-            # Try 3: Direct module import
-            import agents.AI_Agent as AI_Agent
-            chat_with_dengue_agent = AI_Agent.chat_with_dengue_agent
-        except ImportError:
-            # Try 4: Import from file path
-            import importlib.util
-            if getattr(sys, 'frozen', False):
-                agent_file = os.path.join(sys._MEIPASS, 'agents', 'AI_Agent.py')
-            else:
-                agent_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'agents', 'AI_Agent.py')
-            if os.path.exists(agent_file):
-                spec = importlib.util.spec_from_file_location("AI_Agent", agent_file)
-                ai_agent = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(ai_agent)
-                chat_with_dengue_agent = ai_agent.chat_with_dengue_agent
+        # Try 3: Import from file path
+        import importlib.util
+        if getattr(sys, 'frozen', False):
+            agent_file = os.path.join(sys._MEIPASS, 'agents', 'AI_Agent.py')
+        else:
+            agent_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'agents', 'AI_Agent.py')
+        if os.path.exists(agent_file):
+            spec = importlib.util.spec_from_file_location("AI_Agent", agent_file)
+            AI_Agent = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(AI_Agent)
+
+if AI_Agent is None:
+    raise ImportError("Could not import AI_Agent")
+
+# Async entry points run Gemini on the agent's bounded thread pool, so a slow
+# chat never blocks the event loop serving /predict
+achat_with_dengue_agent = AI_Agent.achat_with_dengue_agent
+astream_dengue_agent = AI_Agent.astream_dengue_agent
+LLMTimeoutError = AI_Agent.LLMTimeoutError
+get_response_cache_stats = AI_Agent.get_response_cache_stats
+get_llm_executor_stats = AI_Agent.get_llm_executor_stats
+get_prompt_stats = AI_Agent.get_prompt_stats
 
-if chat_with_dengue_agent is None:
-    raise ImportError("Could not import chat_with_dengue_agent from AI_Agent")
+try:
+    from agents.session_store import ChatSession, SessionStore
+except ImportError:
+    from session_store import ChatSession, SessionStore
+
+from core.feature_encoder import FeatureEncoder
+from core.fast_scorer import build_scorer
+from core.model_registry import get_model, registry as model_registry
+from db.write_behind import WriteBehindQueue
+from utils.lazy import dependency_status, warm_in_background
+from utils.metrics import MetricsMiddleware, registry as metrics_registry, stage_duration, stage_timer
+from utils.profiling import Profiler, ProfilingMiddleware
 
 app = FastAPI(title="Dengue Risk Prediction API")
+# Request counts, latency histograms and stage timings, served on /metrics
+if os.getenv("METRICS_ENABLED", "1") != "0":
+    app.add_middleware(MetricsMiddleware)
+# cProfile or sampled stacks of chosen requests on demand; without
+# PROFILING_ENABLED=1 there is no middleware and no /admin/profile at all
+profiler = Profiler.from_env() if os.getenv("PROFILING_ENABLED", "0") == "1" else None
+if profiler is not None:
+    app.add_middleware(ProfilingMiddleware, profiler=profiler)
 
 # Load your trained model from the correct path
 # Handle both development and PyInstaller executable paths
@@ -107,7 +137,62 @@ def get_model_path():
         return os.path.join(os.path.dirname(__file__), '..', 'core', 'models', 'logistic_regression_model.joblib')
 
 model_path = get_model_path()
-model = joblib.load(model_path)
+# One shared, read-only instance per process (also used by the embedder)
+model = get_model(model_path)
+
+# Precompiled once from model.feature_names_in_ and shared by every request
+feature_encoder = FeatureEncoder.from_model(model)
+# Closed-form logistic scorer, falls back to predict_proba for other estimators
+scorer = build_scorer(model, feature_encoder)
+
+def write_cases(cases):
+    # Timed per bulk upsert; a request only pays for putting its case on the queue
+    with stage_timer("vector_db_write"):
+        return add_cases_to_vector_db(cases)
+
+# Cases are written to the vector DB in the background, in bulk upserts,
+# so /predict returns as soon as scoring is done
+case_writer = WriteBehindQueue(
+    write_cases,
+    max_batch_size=int(os.getenv("VECTOR_DB_BATCH_SIZE", "100")),
+    flush_interval=float(os.getenv("VECTOR_DB_FLUSH_INTERVAL", "2.0")),
+    max_pending=int(os.getenv("VECTOR_DB_QUEUE_SIZE", "10000")),
+    policy=os.getenv("VECTOR_DB_QUEUE_POLICY", "drop")
+)
+
+async def queue_cases(records) -> int:
+    """Put (case, probability) records on the write queue without stalling the event loop"""
+    if case_writer.may_block:
+        # The block policy waits for space, which must happen off the loop
+        return await run_in_threadpool(case_writer.put_many, records)
+    return case_writer.put_many(records)
+
+# Conversations of session clients: rolling summary plus the last few turns
+session_store = SessionStore.from_env()
+
+@app.on_event("startup")
+async def start_case_writer():
+    case_writer.start()
+
+@app.on_event("startup")
+async def start_warmup():
+    # The vector DB, dataset and Gemini are created lazily; unless disabled,
+    # create them now on a background thread while /predict is already served
+    if os.getenv("WARMUP_ON_STARTUP", "1") != "0":
+        warm_in_background()
+
+@app.on_event("shutdown")
+async def stop_case_writer():
+    # Write everything still buffered before the process exits, then let the
+    # backend persist its own state; atexit handlers do not run in api.serve
+    # workers, which leave with os._exit. Both wait on disk or the network,
+    # so they run off the event loop while other requests are still draining
+    await run_in_threadpool(case_writer.close)
+    await run_in_threadpool(close_vector_db)
+
+@app.on_event("shutdown")
+async def stop_llm_executor():
+    AI_Agent.llm_executor.shutdown()
 
 class PatientData(BaseModel):
     Age: int
@@ -127,8 +212,31 @@ class PredictionResponse(BaseModel):
     recommendation: str
     key_factors: Dict[str, str]
 
+class BatchPredictionRequest(BaseModel):
+    # Raw records so one malformed entry does not reject the whole batch
+    records: List[Dict[str, Any]]
+
+class BatchPredictionItem(BaseModel):
+    index: int
+    probability: Optional[float] = None
+    risk_level: Optional[str] = None
+    confidence: Optional[str] = None
+    key_factors: Dict[str, str] = {}
+    error: Optional[str] = None
+
+class BatchPredictionResponse(BaseModel):
+    total: int
+    succeeded: int
+    failed: int
+    results: List[BatchPredictionItem]
+
+# Upper bound on records accepted by /predict/batch
+BATCH_MAX_RECORDS = int(os.getenv("BATCH_MAX_RECORDS", "1000"))
+
 class ChatMessage(BaseModel):
     message: str
+    # Set (empty for a new chat) to keep the history on the server instead
+    session_id: Optional[str] = None
     conversation_history: List[Dict] = []
     risk_assessment: Optional[Dict] = None
     include_full_recommendations: bool = False
@@ -140,6 +248,25 @@ def get_risk_level(prob: float) -> str:
         return "Medium"
     return "Low"
 
+def get_confidence(prob: float) -> str:
+    return "High" if abs(prob - 0.5) > 0.3 else "Medium"
+
+def get_key_factors(data: PatientData, prob: float) -> Dict[str, str]:
+    key_factors = {}
+    if data.NS1 == 1:
+        key_factors["NS1_Status"] = "Positive (strong indicator)"
+    if data.IgM == 1:
+        key_factors["IgM_Status"] = "Positive (recent infection)"
+    if prob >= 0.7:
+        key_factors["Area_Risk"] = f"{data.Area} in {data.District} shows elevated risk"
+    return key_factors
+
+def format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}"
+        for err in error.errors()
+    )
+
 def get_recommendation(prob: float, area: str) -> str:
     if prob >= 0.7:
         return f"""HIGH RISK ({prob*100:.1f}%)
@@ -215,92 +342,22 @@ def get_recommendation(prob: float, area: str) -> str:
 @app.post("/predict", response_model=PredictionResponse)
 async def predict_dengue(data: PatientData):
     try:
-        # Create a dataframe with all the required features
-        # Based on the feature names we discovered
-        feature_data = {
-            'Gender': [data.Gender],
-            'Age': [data.Age],
-            'NS1': [data.NS1],
-            'IgG': [data.IgG],
-            'IgM': [data.IgM],
-            'Area_Adabor': [1 if data.Area == 'Adabor' else 0],
-            'Area_Badda': [1 if data.Area == 'Badda' else 0],
-            'Area_Banasree': [1 if data.Area == 'Banasree' else 0],
-            'Area_Bangshal': [1 if data.Area == 'Bangshal' else 0],
-            'Area_Biman Bandar': [1 if data.Area == 'Biman Bandar' else 0],
-            'Area_Bosila': [1 if data.Area == 'Bosila' else 0],
-            'Area_Cantonment': [1 if data.Area == 'Cantonment' else 0],
-            'Area_Chawkbazar': [1 if data.Area == 'Chawkbazar' else 0],
-            'Area_Demra': [1 if data.Area == 'Demra' else 0],
-            'Area_Dhanmondi': [1 if data.Area == 'Dhanmondi' else 0],
-            'Area_Gendaria': [1 if data.Area == 'Gendaria' else 0],
-            'Area_Gulshan': [1 if data.Area == 'Gulshan' else 0],
-            'Area_Hazaribagh': [1 if data.Area == 'Hazaribagh' else 0],
-            'Area_Jatrabari': [1 if data.Area == 'Jatrabari' else 0],
-            'Area_Kadamtali': [1 if data.Area == 'Kadamtali' else 0],
-            'Area_Kafrul': [1 if data.Area == 'Kafrul' else 0],
-            'Area_Kalabagan': [1 if data.Area == 'Kalabagan' else 0],
-            'Area_Kamrangirchar': [1 if data.Area == 'Kamrangirchar' else 0],
-            'Area_Keraniganj': [1 if data.Area == 'Keraniganj' else 0],
-            'Area_Khilgaon': [1 if data.Area == 'Khilgaon' else 0],
-            'Area_Khilkhet': [1 if data.Area == 'Khilkhet' else 0],
-            'Area_Lalbagh': [1 if data.Area == 'Lalbagh' else 0],
-            'Area_Mirpur': [1 if data.Area == 'Mirpur' else 0],
-            'Area_Mohammadpur': [1 if data.Area == 'Mohammadpur' else 0],
-            'Area_Motijheel': [1 if data.Area == 'Motijheel' else 0],
-            'Area_New Market': [1 if data.Area == 'New Market' else 0],
-            'Area_Pallabi': [1 if data.Area == 'Pallabi' else 0],
-            'Area_Paltan': [1 if data.Area == 'Paltan' else 0],
-            'Area_Ramna': [1 if data.Area == 'Ramna' else 0],
-            'Area_Rampura': [1 if data.Area == 'Rampura' else 0],
-            'Area_Sabujbagh': [1 if data.Area == 'Sabujbagh' else 0],
-            'Area_Shahbagh': [1 if data.Area == 'Shahbagh' else 0],
-            'Area_Sher-e-Bangla Nagar': [1 if data.Area == 'Sher-e-Bangla Nagar' else 0],
-            'Area_Shyampur': [1 if data.Area == 'Shyampur' else 0],
-            'Area_Sutrapur': [1 if data.Area == 'Sutrapur' else 0],
-            'Area_Tejgaon': [1 if data.Area == 'Tejgaon' else 0],
-            'AreaType_Developed': [1 if data.AreaType == 'Developed' else 0],
-            'AreaType_Undeveloped': [1 if data.AreaType == 'Undeveloped' else 0],
-            'District_Dhaka': [1 if data.District == 'Dhaka' else 0],
-            'HouseType_Building': [1 if data.HouseType == 'Building' else 0],
-            'HouseType_Other': [1 if data.HouseType == 'Other' else 0],
-            'HouseType_Tinshed': [1 if data.HouseType == 'Tinshed' else 0]
-        }
-        
-        # Create DataFrame
-        feature_df = pd.DataFrame(feature_data)
-        
-        # Get probability
-        prob = float(model.predict_proba(feature_df)[0][1])
+        # Get probability straight from the encoded patient
+        patient = data.model_dump()
+        start = time.perf_counter()
+        encoded = scorer.encode(patient)
+        encoded_at = time.perf_counter()
+        prob = scorer.score_encoded(encoded)
+        stage_duration.observe(encoded_at - start, "encode")
+        stage_duration.observe(time.perf_counter() - encoded_at, "score")
         risk_level = get_risk_level(prob)
         
         # Analyze key factors
-        key_factors = {}
-        if data.NS1 == 1:
-            key_factors["NS1_Status"] = "Positive (strong indicator)"
-        if data.IgM == 1:
-            key_factors["IgM_Status"] = "Positive (recent infection)"
-        if prob >= 0.7:
-            key_factors["Area_Risk"] = f"{data.Area} in {data.District} shows elevated risk"
+        key_factors = get_key_factors(data, prob)
         
-        # Store the case in Pinecone vector database
-        case_data = {
-            'Age': data.Age,
-            'Gender': data.Gender,
-            'NS1': data.NS1,
-            'IgG': data.IgG,
-            'IgM': data.IgM,
-            'Area': data.Area,
-            'AreaType': data.AreaType,
-            'HouseType': data.HouseType,
-            'District': data.District
-        }
-        
-        try:
-            add_case_to_vector_db(case_data, prob)
-        except Exception as e:
-            # Log the error but don't fail the prediction
-            print(f"Warning: Could not store case in vector DB: {e}")
+        # Queue the case for the Pinecone vector database, it is written in the background
+        if not await queue_cases([(patient, prob)]):
+            print("Warning: Vector DB write queue is full, case not stored")
         
         # Return minimal recommendation - AI agent will provide detailed recommendations
         recommendation = f"Risk Level: {risk_level} ({prob*100:.1f}% probability). For detailed recommendations, please consult with the AI assistant."
@@ -308,7 +365,7 @@ async def predict_dengue(data: PatientData):
         return PredictionResponse(
             probability=round(prob, 3),
             risk_level=risk_level,
-            confidence="High" if abs(prob - 0.5) > 0.3 else "Medium",
+            confidence=get_confidence(prob),
             recommendation=recommendation,
             key_factors=key_factors
         )
@@ -316,47 +373,136 @@ async def predict_dengue(data: PatientData):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/chat")
-async def chat_with_agent(chat_data: ChatMessage):
-    """Chat endpoint that connects to the Gemini AI agent with risk assessment context"""
+@app.post("/predict/batch", response_model=BatchPredictionResponse)
+async def predict_dengue_batch(batch: BatchPredictionRequest):
+    """Score many patients with one vectorized call, reporting errors per record"""
+    if len(batch.records) > BATCH_MAX_RECORDS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {len(batch.records)} records exceeds the limit of {BATCH_MAX_RECORDS}"
+        )
     try:
-        # If risk assessment data is provided, include it in the message context
+        results = [BatchPredictionItem(index=i) for i in range(len(batch.records))]
+        valid_indices = []
+        valid_patients = []
+        for i, record in enumerate(batch.records):
+            try:
+                valid_patients.append(PatientData.model_validate(record))
+                valid_indices.append(i)
+            except ValidationError as e:
+                results[i].error = format_validation_error(e)
+
+        if valid_patients:
+            # Encode every valid record into one matrix and score it in one call
+            with stage_timer("encode"):
+                matrix = feature_encoder.encode_many(patient.model_dump() for patient in valid_patients)
+            with stage_timer("score"):
+                probabilities = scorer.score_matrix(matrix)
+
+            cases = []
+            for i, patient, prob in zip(valid_indices, valid_patients, probabilities):
+                prob = float(prob)
+                item = results[i]
+                item.probability = round(prob, 3)
+                item.risk_level = get_risk_level(prob)
+                item.confidence = get_confidence(prob)
+                item.key_factors = get_key_factors(patient, prob)
+                cases.append((patient.model_dump(), prob))
+
+            # One queue operation for the whole batch
+            queued = await queue_cases(cases)
+            if queued < len(cases):
+                print(f"Warning: Vector DB write queue is full, {len(cases) - queued} cases not stored")
+
+        return BatchPredictionResponse(
+            total=len(results),
+            succeeded=len(valid_patients),
+            failed=len(results) - len(valid_patients),
+            results=results
+        )
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def resolve_chat_session(chat_data: ChatMessage) -> Optional[ChatSession]:
+    """
+    Session named by the request's session_id, a new one if the id is empty,
+    unknown or expired, and None for clients that send their own history
+    """
+    if chat_data.session_id is None:
+        return None
+    session = session_store.get_or_create(chat_data.session_id)
+    if chat_data.risk_assessment:
+        session.risk_assessment = chat_data.risk_assessment
+    return session
+
+def record_session_turn(session: ChatSession, question: str, answer: str):
+    # The raw question is stored, the risk context is added again on each turn
+    session_store.append(session, [
+        {"role": "user", "content": question},
+        {"role": "assistant", "content": answer}
+    ])
+
+def build_chat_request(chat_data: ChatMessage, session: Optional[ChatSession] = None):
+    """
+    Agent message, normalized history, response-cache context and
+    (area, district) for a chat request, with the risk assessment folded
+    into the message. With a ``session`` the history and the last risk
+    assessment come from the session instead of the request.
+    """
+    if session is not None:
+        history = session.history()
+        risk_assessment = chat_data.risk_assessment or session.risk_assessment
+    else:
         history = chat_data.conversation_history or []
-        normalized_history = []
-        for message in history:
-            if isinstance(message, dict) and 'role' in message and 'content' in message:
-                normalized_history.append({
-                    "role": message['role'],
-                    "content": message['content']
-                })
-
-        enhanced_message = chat_data.message
-        if chat_data.risk_assessment:
-            context_summary = f"""
-Risk Level: {chat_data.risk_assessment.get('risk_level', 'Unknown')}
-Probability: {chat_data.risk_assessment.get('probability', 'Unknown')}%
-Patient: {chat_data.risk_assessment.get('age', 'Unknown')} years old, {chat_data.risk_assessment.get('gender', 'Unknown')}
-Lab Results: NS1 {chat_data.risk_assessment.get('ns1', 'Unknown')}, IgG {chat_data.risk_assessment.get('igg', 'Unknown')}, IgM {chat_data.risk_assessment.get('igm', 'Unknown')}
-Location: {chat_data.risk_assessment.get('area', 'Unknown')}, {chat_data.risk_assessment.get('district', 'Unknown')}
+        risk_assessment = chat_data.risk_assessment
+
+    # If risk assessment data is provided, include it in the message context
+    normalized_history = []
+    for message in history:
+        if isinstance(message, dict) and 'role' in message and 'content' in message:
+            normalized_history.append({
+                "role": message['role'],
+                "content": message['content']
+            })
+
+    enhanced_message = chat_data.message
+    # Answers are cached per question, risk bucket, location and prompt variant
+    cache_context = {"question": chat_data.message}
+    location = None
+    if risk_assessment:
+        context_summary = f"""
+Risk Level: {risk_assessment.get('risk_level', 'Unknown')}
+Probability: {risk_assessment.get('probability', 'Unknown')}%
+Patient: {risk_assessment.get('age', 'Unknown')} years old, {risk_assessment.get('gender', 'Unknown')}
+Lab Results: NS1 {risk_assessment.get('ns1', 'Unknown')}, IgG {risk_assessment.get('igg', 'Unknown')}, IgM {risk_assessment.get('igm', 'Unknown')}
+Location: {risk_assessment.get('area', 'Unknown')}, {risk_assessment.get('district', 'Unknown')}
 """
 
-            include_full = chat_data.include_full_recommendations or len(normalized_history) == 0
-            if include_full:
-                enhanced_message = f"""
+        include_full = chat_data.include_full_recommendations or len(normalized_history) == 0
+        cache_context.update(
+            risk_level=risk_assessment.get('risk_level'),
+            location=f"{risk_assessment.get('area', '')} {risk_assessment.get('district', '')}",
+            variant="full" if include_full else "concise"
+        )
+        if risk_assessment.get('area') and risk_assessment.get('district'):
+            location = (risk_assessment['area'], risk_assessment['district'])
+        if include_full:
+            enhanced_message = f"""
 Risk Assessment Context:
-- Risk Level: {chat_data.risk_assessment.get('risk_level', 'Unknown')}
-- Probability: {chat_data.risk_assessment.get('probability', 'Unknown')}%
-- Patient Age: {chat_data.risk_assessment.get('age', 'Unknown')}
-- Patient Gender: {chat_data.risk_assessment.get('gender', 'Unknown')}
-- Test Results: NS1 {chat_data.risk_assessment.get('ns1', 'Unknown')}, IgG {chat_data.risk_assessment.get('igg', 'Unknown')}, IgM {chat_data.risk_assessment.get('igm', 'Unknown')}
-- Location: {chat_data.risk_assessment.get('area', 'Unknown')}, {chat_data.risk_assessment.get('district', 'Unknown')}
+- Risk Level: {risk_assessment.get('risk_level', 'Unknown')}
+- Probability: {risk_assessment.get('probability', 'Unknown')}%
+- Patient Age: {risk_assessment.get('age', 'Unknown')}
+- Patient Gender: {risk_assessment.get('gender', 'Unknown')}
+- Test Results: NS1 {risk_assessment.get('ns1', 'Unknown')}, IgG {risk_assessment.get('igg', 'Unknown')}, IgM {risk_assessment.get('igm', 'Unknown')}
+- Location: {risk_assessment.get('area', 'Unknown')}, {risk_assessment.get('district', 'Unknown')}
 
 User Question: {chat_data.message}
 
 Please provide detailed, personalized advice based on this risk assessment context.
 """
-            else:
-                enhanced_message = f"""
+        else:
+            enhanced_message = f"""
 Patient Context:
 {context_summary}
 
@@ -364,21 +510,164 @@ User Question: {chat_data.message}
 
 Please answer concisely while considering the patient's current risk assessment.
 """
-        
-        response, updated_history = chat_with_dengue_agent(
+
+    return enhanced_message, normalized_history, cache_context, location
+
+@app.post("/chat")
+async def chat_with_agent(chat_data: ChatMessage):
+    """Chat endpoint that connects to the Gemini AI agent with risk assessment context"""
+    try:
+        session = resolve_chat_session(chat_data)
+        enhanced_message, normalized_history, cache_context, location = build_chat_request(chat_data, session)
+
+        usage = {}
+        response, updated_history = await achat_with_dengue_agent(
             enhanced_message,
-            normalized_history
+            normalized_history,
+            cache_context=cache_context,
+            location=location,
+            usage=usage,
+            history_summary=session.summary if session else None
         )
+        if session is not None:
+            # Session clients send and receive only the new message
+            record_session_turn(session, chat_data.message, response)
+            return {
+                "response": response,
+                "session_id": session.session_id,
+                "usage": usage
+            }
         return {
             "response": response,
-            "conversation_history": updated_history
+            "conversation_history": updated_history,
+            "usage": usage
         }
+    except LLMTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def sse_event(event: str, data: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/chat/stream")
+async def chat_stream(chat_data: ChatMessage):
+    """
+    Server-sent events version of /chat. Emits a ``token`` event per chunk
+    as Gemini produces it, then ``done`` with the conversation history (or
+    the session id), the time to first token and the token usage, or
+    ``error``.
+    """
+    session = resolve_chat_session(chat_data)
+    enhanced_message, normalized_history, cache_context, location = build_chat_request(chat_data, session)
+    usage = {}
+
+    async def events():
+        start = time.perf_counter()
+        ttft_ms = None
+        try:
+            async for chunk in astream_dengue_agent(enhanced_message, normalized_history, cache_context=cache_context,
+                                                  location=location, usage=usage,
+                                                  history_summary=session.summary if session else None):
+                if ttft_ms is None:
+                    ttft_ms = (time.perf_counter() - start) * 1000
+                yield sse_event("token", {"text": chunk})
+        except Exception as e:
+            yield sse_event("error", {"detail": str(e)})
+            return
+        total_ms = (time.perf_counter() - start) * 1000
+        if ttft_ms is None:
+            ttft_ms = total_ms
+        print(f"Chat stream: first token {ttft_ms:.0f} ms, complete {total_ms:.0f} ms")
+        done = {
+            "ttft_ms": round(ttft_ms, 1),
+            "total_ms": round(total_ms, 1),
+            "usage": usage
+        }
+        if session is not None:
+            record_session_turn(session, chat_data.message, normalized_history[-1]["content"])
+            done["session_id"] = session.session_id
+        else:
+            done["conversation_history"] = normalized_history
+        yield sse_event("done", done)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.delete("/chat/session/{session_id}")
+async def end_chat_session(session_id: str):
+    """Forget a chat session's history"""
+    if not session_store.delete(session_id):
+        raise HTTPException(status_code=404, detail="Unknown chat session")
+    return {"deleted": session_id}
+
+@app.get("/chat/cache")
+async def chat_cache_stats():
+    """Hit/miss counters of the LLM response cache"""
+    return get_response_cache_stats()
+
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "model_loaded": model is not None}
+    return {
+        "status": "healthy",
+        "model_loaded": model is not None,
+        "vector_db_queue": case_writer.stats(),
+        "llm_executor": get_llm_executor_stats(),
+        "prompt": get_prompt_stats(),
+        "chat_sessions": session_store.stats(),
+        "dependencies": dependency_status()
+    }
+
+@app.get("/ready")
+async def readiness_check():
+    """200 once every lazily created dependency is ready, 503 with their states until then"""
+    dependencies = dependency_status()
+    ready = all(status["state"] == "ready" for status in dependencies.values())
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, "dependencies": dependencies}
+    )
+
+@app.get("/metrics")
+async def metrics():
+    """Request counters, latency histograms with p50/p95/p99 and stage timings, Prometheus text format"""
+    return Response(content=metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+class ProfileRequest(BaseModel):
+    # Next N requests, a sampled fraction of them, or a fraction up to N
+    requests: Optional[int] = None
+    sample_rate: Optional[float] = None
+    format: str = "pstats"  # or "collapsed"
+    # Only requests to this path, e.g. /predict
+    endpoint: Optional[str] = None
+
+if profiler is not None:
+    def check_profiling_token(token: Optional[str]):
+        if not profiler.authorized(token):
+            raise HTTPException(status_code=403, detail="Invalid or missing X-Profile-Token")
+
+    @app.post("/admin/profile")
+    async def arm_profiler(profile: ProfileRequest, x_profile_token: Optional[str] = Header(None)):
+        """Profile the next requests; each one writes a file to PROFILE_DIR"""
+        check_profiling_token(x_profile_token)
+        try:
+            return profiler.arm(profile.requests, profile.sample_rate, profile.format, profile.endpoint)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    @app.get("/admin/profile")
+    async def profiler_status(x_profile_token: Optional[str] = Header(None)):
+        """Whether the profiler is armed and the files it wrote last"""
+        check_profiling_token(x_profile_token)
+        return profiler.status()
+
+    @app.delete("/admin/profile")
+    async def disarm_profiler(x_profile_token: Optional[str] = Header(None)):
+        check_profiling_token(x_profile_token)
+        return profiler.disarm()
 
 @app.get("/stats")
 async def get_stats():
@@ -386,7 +675,9 @@ async def get_stats():
     return {
         "model_type": "Logistic Regression",
         "features": model.n_features_in_,
-        "version": "1.0"
+        "scorer": scorer.kind,
+        "version": "1.0",
+        "loaded_models": model_registry.stats()
     }
 
 # Run with: uvicorn BaseAPI:app --reload
\ No newline at end of file
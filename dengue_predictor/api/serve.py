@@ -0,0 +1,230 @@
+"""
+Production launcher for the backend API
+
+``uvicorn BaseAPI:app`` runs one process, so /predict throughput is capped at
+one core. This launcher runs N uvicorn workers on one listening socket:
+
+- The parent imports the app once, which loads the model, and then forks
+  the workers, so they share its memory copy-on-write instead of each
+  loading the model again.
+- The parent supervises the workers and restarts any worker that exits
+  unexpectedly. A worker that keeps dying right after it starts is
+  restarted with an increasing delay, up to 30 s.
+- On SIGTERM or SIGINT the parent stops restarting workers and forwards the
+  signal. Each worker stops accepting connections and finishes its
+  in-flight requests, flushing the vector DB write queue in its shutdown
+  hook. Workers still running after ``--graceful-timeout`` are killed.
+
+Platforms without ``fork`` (Windows) fall back to uvicorn's own multi-worker
+mode, which starts each worker as a fresh process.
+
+Several workers are not started (``multi_worker_blockers``) while state the
+workers cannot share is in use: chat sessions in a worker's memory (set
+CHAT_SESSION_DB to keep them in a SQLite file every worker reads), or the
+local vector DB, whose index files only one process may write. The area
+aggregate file is merged under a file lock, which needs fcntl. The LLM
+response cache stays per worker, which only costs hit rate. /metrics
+counts per worker too: a scrape reaches one worker and reports its share.
+With any of these the launcher warns and runs a single worker.
+
+Run with: python -m api.serve --workers 4 --port 8001
+(API_WORKERS, also read from .env, sets the default worker count, otherwise 1)
+"""
+
+import argparse
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, List
+
+from dotenv import load_dotenv
+
+# Restart delays for workers that crash shortly after starting
+MIN_UPTIME = 5.0
+MAX_RESTART_DELAY = 30.0
+
+
+def default_workers() -> int:
+    # More workers are opt-in: they need CHAT_SESSION_DB (see multi_worker_blockers)
+    return int(os.getenv("API_WORKERS", "0")) or 1
+
+
+def allowed_workers(requested: int) -> int:
+    """``requested``, or 1 with a warning when the settings cannot be shared across workers"""
+    blockers = multi_worker_blockers() if requested > 1 else []
+    if blockers:
+        print(f"Warning: running 1 worker instead of {requested}: " + "; ".join(blockers))
+        return 1
+    return requested
+
+
+def multi_worker_blockers() -> List[str]:
+    """Reasons the API must run as a single process with the current settings"""
+    try:
+        from db.area_aggregates import CROSS_PROCESS_LOCKING
+    except ImportError:
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+        from db.area_aggregates import CROSS_PROCESS_LOCKING
+
+    blockers = []
+    if not os.getenv("CHAT_SESSION_DB"):
+        blockers.append("chat sessions live in each worker's memory, so follow-up messages reaching "
+                        "another worker would lose their conversation (set CHAT_SESSION_DB to share them)")
+    if os.getenv("VECTOR_DB_BACKEND", "pinecone").lower() == "local":
+        blockers.append("the local vector DB index files can only be written by one process")
+    if not CROSS_PROCESS_LOCKING:
+        blockers.append("the area aggregate file cannot be locked across processes on this platform")
+    # Not a blocker: /metrics is per worker, each scrape reports one worker's counts
+    return blockers
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class Supervisor:
+    """Forks uvicorn workers sharing one socket and keeps N of them running"""
+
+    def __init__(self, app, sock: socket.socket, workers: int, graceful_timeout: float, log_level: str):
+        self.app = app
+        self.sock = sock
+        self.workers = workers
+        self.graceful_timeout = graceful_timeout
+        self.log_level = log_level
+        self.children: Dict[int, float] = {}   # pid -> start time
+        self.restart_delay = 0.0
+        self.stopping = False
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            self._run_worker()
+        self.children[pid] = time.time()
+
+    def _run_worker(self):
+        # Child process: uvicorn installs its own SIGTERM/SIGINT handlers
+        # for a graceful shutdown, so drop the supervisor's
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        import uvicorn
+
+        exit_code = 0
+        try:
+            config = uvicorn.Config(
+                self.app,
+                log_level=self.log_level,
+                timeout_graceful_shutdown=self.graceful_timeout
+            )
+            uvicorn.Server(config).run(sockets=[self.sock])
+        except BaseException as e:
+            print(f"Worker {os.getpid()} failed: {e}")
+            exit_code = 1
+        finally:
+            sys.stdout.flush()
+            os._exit(exit_code)
+
+    def _handle_stop(self, signum, frame):
+        self.stopping = True
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        for _ in range(self.workers):
+            self.spawn()
+        print(f"Supervisor {os.getpid()}: {self.workers} workers on "
+              f"{self.sock.getsockname()[0]}:{self.sock.getsockname()[1]}")
+
+        while not self.stopping:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                pid = 0
+            if pid == 0:
+                time.sleep(0.2)
+                continue
+            started = self.children.pop(pid, None)
+            if started is None or self.stopping:
+                continue
+            uptime = time.time() - started
+            print(f"Worker {pid} exited with status {os.waitstatus_to_exitcode(status)} "
+                  f"after {uptime:.1f}s, restarting")
+            # Back off while workers crash on startup, reset once one stays up
+            if uptime < MIN_UPTIME:
+                self.restart_delay = min(max(self.restart_delay * 2, 0.5), MAX_RESTART_DELAY)
+                time.sleep(self.restart_delay)
+            else:
+                self.restart_delay = 0.0
+            if not self.stopping:
+                self.spawn()
+
+        self.drain()
+
+    def drain(self):
+        """Ask every worker to finish its requests and exit, then kill stragglers"""
+        print(f"Supervisor: draining {len(self.children)} workers")
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                self.children.pop(pid, None)
+
+        deadline = time.time() + self.graceful_timeout + 5
+        while self.children and time.time() < deadline:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid:
+                self.children.pop(pid, None)
+            else:
+                time.sleep(0.1)
+
+        for pid in list(self.children):
+            print(f"Supervisor: worker {pid} did not stop in time, killing it")
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+        self.sock.close()
+        print("Supervisor: all workers stopped")
+
+
+def main():
+    # API_HOST/API_PORT/API_WORKERS and the settings multi_worker_blockers
+    # checks may all come from the .env file
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Run the backend API with N supervised workers")
+    parser.add_argument('--host', default=os.getenv("API_HOST", "127.0.0.1"))
+    parser.add_argument('--port', type=int, default=int(os.getenv("API_PORT", "8001")))
+    parser.add_argument('--workers', type=int, default=default_workers())
+    parser.add_argument('--graceful-timeout', type=float, default=float(os.getenv("API_GRACEFUL_TIMEOUT", "30")),
+                        help="seconds a worker may take to finish in-flight requests on shutdown")
+    parser.add_argument('--log-level', default='info')
+    args = parser.parse_args()
+    args.workers = allowed_workers(args.workers)
+
+    if not hasattr(os, 'fork'):
+        import uvicorn
+        uvicorn.run("api.BaseAPI:app", host=args.host, port=args.port, workers=args.workers,
+                    log_level=args.log_level, timeout_graceful_shutdown=args.graceful_timeout)
+        return
+
+    # Preload in the parent: the model is loaded once and inherited by every worker
+    start = time.perf_counter()
+    from api.BaseAPI import app
+    print(f"Loaded the API in {(time.perf_counter() - start) * 1000:.0f} ms, forking {args.workers} workers")
+
+    sock = bind_socket(args.host, args.port)
+    Supervisor(app, sock, args.workers, args.graceful_timeout, args.log_level).run()
+
+
+if __name__ == "__main__":
+    main()
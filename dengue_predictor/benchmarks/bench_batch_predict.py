@@ -0,0 +1,73 @@
+"""
+Benchmark: /predict/batch versus looping over /predict
+
+Sends the same patients to a running backend once as individual /predict
+requests and once as a single /predict/batch request, and reports records
+per second for both.
+
+Start the backend first (uvicorn BaseAPI:app --port 8001), then run:
+    python -m benchmarks.bench_batch_predict --records 500
+"""
+
+import argparse
+import json
+import os
+import time
+import urllib.request
+
+import pandas as pd
+
+DATASET_PATH = os.path.join(os.path.dirname(__file__), '..', 'datasets', 'dataset.csv')
+
+
+def load_records(n_records):
+    """Patients drawn from datasets/dataset.csv in the API's input format"""
+    df = pd.read_csv(DATASET_PATH)
+    df = df.sample(n=n_records, replace=n_records > len(df), random_state=0)
+    df['Gender'] = (df['Gender'] == 'Male').astype(int)
+    columns = ['Age', 'Gender', 'NS1', 'IgG', 'IgM', 'Area', 'AreaType', 'HouseType', 'District']
+    return [
+        {key: (value.item() if hasattr(value, 'item') else value) for key, value in row.items()}
+        for row in df[columns].to_dict('records')
+    ]
+
+
+def post_json(url, payload):
+    req = urllib.request.Request(
+        url,
+        data=json.dumps(payload).encode('utf-8'),
+        headers={'Content-Type': 'application/json'}
+    )
+    with urllib.request.urlopen(req) as response:
+        return json.loads(response.read())
+
+
+def run_benchmark(base_url, n_records):
+    records = load_records(n_records)
+
+    start = time.perf_counter()
+    for record in records:
+        post_json(f"{base_url}/predict", record)
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = post_json(f"{base_url}/predict/batch", {'records': records})
+    batch_seconds = time.perf_counter() - start
+
+    loop_rate = n_records / loop_seconds
+    batch_rate = n_records / batch_seconds
+    print(f"Records: {n_records} (batch succeeded: {batch['succeeded']}, failed: {batch['failed']})")
+    print("=" * 60)
+    print(f"{'Loop over /predict':<30} {loop_seconds:8.3f} s  {loop_rate:10.1f} records/s")
+    print(f"{'/predict/batch':<30} {batch_seconds:8.3f} s  {batch_rate:10.1f} records/s")
+    print("=" * 60)
+    print(f"Speedup: {batch_rate / loop_rate:.1f}x")
+    return {'loop_records_per_second': loop_rate, 'batch_records_per_second': batch_rate}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', default='http://localhost:8001')
+    parser.add_argument('--records', type=int, default=500)
+    args = parser.parse_args()
+    run_benchmark(args.url.rstrip('/'), args.records)
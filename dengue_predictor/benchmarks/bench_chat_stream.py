@@ -0,0 +1,84 @@
+"""
+Benchmark: time to first token of /chat/stream versus /chat
+
+Sends the same questions to the buffered /chat endpoint and to the
+server-sent events /chat/stream endpoint and reports, per endpoint, the time
+until the first answer text reaches the client and until the answer is
+complete. Each question gets a unique suffix so the response cache does not
+answer it.
+
+Start the backend first (uvicorn BaseAPI:app --port 8001), or the frontend
+proxy on port 8000 to include it in the measurement, then run:
+    python -m benchmarks.bench_chat_stream --url http://localhost:8000 --requests 5
+"""
+
+import argparse
+import json
+import statistics
+import time
+import urllib.request
+import uuid
+
+RISK_ASSESSMENT = {
+    'risk_level': 'High', 'probability': 82, 'age': 35, 'gender': 'Male',
+    'ns1': 'Positive', 'igg': 'Positive', 'igm': 'Negative', 'area': 'Mirpur', 'district': 'Dhaka'
+}
+
+
+def _payload(nonce):
+    return json.dumps({
+        'message': f"Please provide detailed recommendations for this assessment (run {nonce})",
+        'conversation_history': [],
+        'risk_assessment': RISK_ASSESSMENT,
+        'include_full_recommendations': True
+    }).encode('utf-8')
+
+
+def time_buffered(base_url):
+    """(first text, complete) seconds for /chat, which are the same"""
+    req = urllib.request.Request(f"{base_url}/chat", data=_payload(uuid.uuid4().hex),
+                                 headers={'Content-Type': 'application/json'})
+    start = time.perf_counter()
+    with urllib.request.urlopen(req) as response:
+        json.loads(response.read())
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed
+
+
+def time_streaming(base_url):
+    """(first token, complete) seconds for /chat/stream as seen by the client"""
+    req = urllib.request.Request(f"{base_url}/chat/stream", data=_payload(uuid.uuid4().hex),
+                                 headers={'Content-Type': 'application/json', 'Accept': 'text/event-stream'})
+    start = time.perf_counter()
+    first_token = None
+    with urllib.request.urlopen(req) as response:
+        for line in response:
+            if first_token is None and line.startswith(b'event: token'):
+                first_token = time.perf_counter() - start
+    complete = time.perf_counter() - start
+    return first_token if first_token is not None else complete, complete
+
+
+def run_benchmark(base_url, n_requests):
+    results = {}
+    for label, func in (("/chat (buffered)", time_buffered), ("/chat/stream (SSE)", time_streaming)):
+        samples = [func(base_url) for _ in range(n_requests)]
+        results[label] = {
+            'first_text_ms': statistics.median(s[0] for s in samples) * 1000,
+            'complete_ms': statistics.median(s[1] for s in samples) * 1000
+        }
+
+    print(f"Chat latency over {n_requests} requests (median)")
+    print("=" * 64)
+    print(f"{'endpoint':<24} {'first text':>16} {'complete':>16}")
+    for label, result in results.items():
+        print(f"{label:<24} {result['first_text_ms']:>13.0f} ms {result['complete_ms']:>13.0f} ms")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', default='http://localhost:8001')
+    parser.add_argument('--requests', type=int, default=5)
+    args = parser.parse_args()
+    run_benchmark(args.url.rstrip('/'), args.requests)
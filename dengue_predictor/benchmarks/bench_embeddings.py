@@ -0,0 +1,74 @@
+"""
+Benchmark: embeddings per second
+
+Compares the original MD5 + zero-padding loop of PineconeDB._generate_embedding
+with the batched StructuredFeatureEmbedder and HashingTextEmbedder.
+
+Run with: python -m benchmarks.bench_embeddings
+"""
+
+import hashlib
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from db.case_records import cases_from_frame, describe_case
+from db.embeddings import HashingTextEmbedder, load_embedder
+
+DATASET_PATH = os.path.join(os.path.dirname(__file__), '..', 'datasets', 'dataset.csv')
+
+
+def legacy_embedding(text):
+    """The original hash-based embedding, padded to 1536 dimensions"""
+    hex_dig = hashlib.md5(text.encode()).hexdigest()
+    embedding = []
+    for i in range(0, len(hex_dig), 4):
+        embedding.append(int(hex_dig[i:i+4], 16) / 65535.0)
+    while len(embedding) < 1536:
+        embedding.append(0.0)
+    return embedding[:1536]
+
+
+def _rate(func, n_items, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return n_items / best
+
+
+def run_benchmark(n_cases=10000):
+    df = pd.read_csv(DATASET_PATH)
+    df = df.sample(n=n_cases, replace=True, random_state=0)
+    cases = cases_from_frame(df)
+    risks = [0.5] * n_cases
+    descriptions = [describe_case(case, risk) for case, risk in zip(cases, risks)]
+
+    structured = load_embedder(backend="structured")
+    padded = load_embedder(dimension=1536, backend="structured")
+    hashing = HashingTextEmbedder(256)
+
+    cases_to_run = [
+        ("legacy md5 (1536-d, per text)", 1536, lambda: [legacy_embedding(d) for d in descriptions]),
+        (f"structured ({structured.dimension}-d, batch)", structured.dimension,
+         lambda: structured.embed_cases(cases, risks)),
+        ("structured (1536-d, batch)", 1536, lambda: padded.embed_cases(cases, risks)),
+        ("hashing text (256-d, batch)", 256, lambda: hashing.embed_cases(cases, risks, descriptions)),
+    ]
+
+    print(f"Embedding throughput for {n_cases} cases (best of 3)")
+    print("=" * 70)
+    results = {}
+    for label, dimension, func in cases_to_run:
+        results[label] = _rate(func, n_cases)
+        print(f"{label:<36} {results[label]:12.0f} embeddings/s  {dimension * 4:6d} bytes/vector")
+    return results
+
+
+if __name__ == "__main__":
+    run_benchmark()
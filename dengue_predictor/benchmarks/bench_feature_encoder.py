@@ -0,0 +1,72 @@
+"""
+Microbenchmark: per-request feature encoding cost
+
+Compares the original per-request 47-key dict + DataFrame construction in
+BaseAPI.predict_dengue with the precompiled FeatureEncoder.
+
+Run with: python -m benchmarks.bench_feature_encoder
+"""
+
+import os
+import sys
+import timeit
+
+import joblib
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from core.feature_encoder import FeatureEncoder
+
+MODEL_PATH = os.path.join(os.path.dirname(__file__), '..', 'core', 'models', 'logistic_regression_model.joblib')
+
+SAMPLE_PATIENT = {
+    'Age': 35, 'Gender': 1, 'NS1': 1, 'IgG': 1, 'IgM': 0,
+    'Area': 'Mirpur', 'AreaType': 'Undeveloped', 'HouseType': 'Building', 'District': 'Dhaka'
+}
+
+
+def legacy_encode(data, feature_names):
+    """The original encoding: one single-element list per feature, then a DataFrame"""
+    feature_data = {
+        'Gender': [data['Gender']],
+        'Age': [data['Age']],
+        'NS1': [data['NS1']],
+        'IgG': [data['IgG']],
+        'IgM': [data['IgM']],
+    }
+    for name in feature_names[5:]:
+        field, _, value = name.partition('_')
+        feature_data[name] = [1 if data[field] == value else 0]
+    return pd.DataFrame(feature_data)
+
+
+def run_benchmark(iterations=5000):
+    model = joblib.load(MODEL_PATH)
+    feature_names = list(model.feature_names_in_)
+    encoder = FeatureEncoder.from_model(model)
+
+    cases = {
+        "legacy dict + DataFrame": lambda: legacy_encode(SAMPLE_PATIENT, feature_names),
+        "FeatureEncoder.encode (NumPy row)": lambda: encoder.encode(SAMPLE_PATIENT),
+        "FeatureEncoder.encode + to_frame": lambda: encoder.to_frame(encoder.encode(SAMPLE_PATIENT)),
+    }
+
+    print(f"Per-request encoding cost ({iterations} iterations, best of 3)")
+    print("=" * 60)
+    results = {}
+    for label, func in cases.items():
+        best = min(timeit.repeat(func, number=iterations, repeat=3))
+        per_call_us = best / iterations * 1e6
+        results[label] = per_call_us
+        print(f"{label:<40} {per_call_us:10.2f} us/request")
+
+    baseline = results["legacy dict + DataFrame"]
+    print("=" * 60)
+    for label, per_call_us in results.items():
+        print(f"{label:<40} {baseline / per_call_us:10.1f}x vs legacy")
+    return results
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,140 @@
+"""
+Load test: frontend static files and /predict while slow chats are in flight
+
+Starts a fake backend whose /chat takes ``--chat-delay`` seconds (standing in
+for Gemini) and whose /predict answers at once, and the frontend server in
+front of it. It then opens ``--chats`` concurrent /chat requests through the
+frontend and, while they wait, times GET / (index.html) and POST /predict.
+It reports p50/p99/max for both, and how many chats were turned away with
+503 + Retry-After because they exceeded ``--max-chats``.
+``--single-threaded`` serves with the old plain HTTPServer for comparison.
+
+Run with: python -m benchmarks.bench_frontend_concurrency --chats 20 --chat-delay 3
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, HTTPServer, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'frontend'))
+
+PATIENT = {'Age': 35, 'Gender': 1, 'NS1': 1, 'IgG': 1, 'IgM': 0, 'Area': 'Mirpur',
+           'AreaType': 'Undeveloped', 'HouseType': 'Building', 'District': 'Dhaka'}
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_fake_backend(chat_delay):
+    class FakeBackend(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers['Content-Length']))
+            if self.path == '/chat':
+                time.sleep(chat_delay)
+                body = {'response': 'answer', 'session_id': 'x'}
+            else:
+                body = {'probability': 0.5, 'risk_level': 'Medium'}
+            payload = json.dumps(body).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            return
+
+    port = _free_port()
+    server = ThreadingHTTPServer(('127.0.0.1', port), FakeBackend)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{port}"
+
+
+def start_frontend(single_threaded, max_workers, max_chats):
+    import server as frontend
+
+    port = _free_port()
+    if single_threaded:
+        httpd = HTTPServer(('', port), frontend.DengueRequestHandler)
+    else:
+        httpd = frontend.create_server(port, max_workers=max_workers, max_chats=max_chats)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{port}"
+
+
+def _request(url, payload=None, timeout=120):
+    data = json.dumps(payload).encode('utf-8') if payload is not None else None
+    req = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def _timed(fn, n):
+    latencies = []
+    for _ in range(n):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return latencies
+
+
+def _summary(latencies):
+    return (f"p50 {latencies[len(latencies) // 2]:8.1f} ms   "
+            f"p99 {latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))]:8.1f} ms   "
+            f"max {latencies[-1]:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Frontend latency while slow chats are in flight")
+    parser.add_argument('--chats', type=int, default=20)
+    parser.add_argument('--chat-delay', type=float, default=3.0)
+    parser.add_argument('--requests', type=int, default=50, help="static and /predict requests to time")
+    parser.add_argument('--max-workers', type=int, default=64)
+    parser.add_argument('--max-chats', type=int, default=16)
+    parser.add_argument('--single-threaded', action='store_true', help="plain HTTPServer, as before")
+    args = parser.parse_args()
+
+    os.environ["BACKEND_URL"] = start_fake_backend(args.chat_delay)
+    url = start_frontend(args.single_threaded, args.max_workers, args.max_chats)
+
+    statuses = []
+    chats = [threading.Thread(target=lambda: statuses.append(_request(f"{url}/chat", {'message': 'hi'})))
+             for _ in range(args.chats)]
+    chat_start = time.perf_counter()
+    for chat in chats:
+        chat.start()
+    time.sleep(0.3)
+
+    static = _timed(lambda: _request(f"{url}/"), args.requests)
+    predict = _timed(lambda: _request(f"{url}/predict", PATIENT), args.requests)
+    for chat in chats:
+        chat.join()
+    chat_s = time.perf_counter() - chat_start
+
+    mode = "single-threaded HTTPServer" if args.single_threaded else \
+        f"threaded, {args.max_workers} workers, {args.max_chats} chats"
+    print(f"{mode}: {args.chats} chats of {args.chat_delay:.1f}s in flight")
+    print(f"  GET /          {_summary(static)}")
+    print(f"  POST /predict  {_summary(predict)}")
+    print(f"  chats: {statuses.count(200)} answered, {statuses.count(503)} got 503 + Retry-After, "
+          f"all done after {chat_s:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Benchmark: per-request overhead of the frontend's /predict proxy
+
+Starts a fake HTTP/1.1 backend whose /predict answers at once with a
+response the size of the real one, then times ``--requests`` sequential
+/predict calls three ways:
+
+- direct: straight to the backend over one keep-alive connection, the floor
+- no reuse: through the frontend speaking HTTP/1.0 to the client with
+  FRONTEND_POOL_SIZE=0, so every request opens a client connection and a
+  backend connection, as the frontend did before pooling
+- pooled: through the frontend over one keep-alive client connection, with
+  the backend connection taken from the pool
+
+and reports p50/p99 for each and the overhead of the proxy over direct.
+
+Run with: python -m benchmarks.bench_frontend_proxy --requests 2000
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'frontend'))
+
+PATIENT = {'Age': 35, 'Gender': 1, 'NS1': 1, 'IgG': 1, 'IgM': 0, 'Area': 'Mirpur',
+           'AreaType': 'Undeveloped', 'HouseType': 'Building', 'District': 'Dhaka'}
+
+PREDICTION = {'probability': 0.73, 'risk_level': 'High', 'recommendations': ['Seek medical care'] * 6,
+              'similar_cases': [dict(PATIENT, probability=0.7)] * 5}
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _serve(server):
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.server_address[1]
+
+
+def start_fake_backend():
+    payload = json.dumps(PREDICTION).encode('utf-8')
+
+    class FakeBackend(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True   # as uvicorn does
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers['Content-Length']))
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            return
+
+    return _serve(ThreadingHTTPServer(('127.0.0.1', _free_port()), FakeBackend))
+
+
+def start_frontend(backend_port, pooled):
+    import server as frontend
+
+    httpd = frontend.create_server(_free_port(), backend_url=f"http://127.0.0.1:{backend_port}",
+                                   pool_size=frontend.POOL_SIZE if pooled else 0)
+    if not pooled:
+        class Http10Handler(frontend.DengueRequestHandler):
+            protocol_version = 'HTTP/1.0'
+        httpd.RequestHandlerClass = Http10Handler
+    return _serve(httpd), httpd.backend
+
+
+def time_requests(port, n, keep_alive):
+    body = json.dumps(PATIENT)
+    headers = {'Content-Type': 'application/json'}
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    latencies = []
+    for _ in range(n):
+        start = time.perf_counter()
+        conn.request('POST', '/predict', body, headers)
+        response = conn.getresponse()
+        response.read()
+        if not keep_alive:
+            conn.close()
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert response.status == 200, response.status
+    conn.close()
+    latencies.sort()
+    return latencies
+
+
+def _percentile(latencies, q):
+    return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-request overhead of the frontend's /predict proxy")
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    backend_port = start_fake_backend()
+    plain_port, _ = start_frontend(backend_port, pooled=False)
+    pooled_port, pool = start_frontend(backend_port, pooled=True)
+
+    runs = [
+        ('direct', backend_port, True),
+        ('no reuse', plain_port, False),
+        ('pooled', pooled_port, True),
+    ]
+    for _, port, keep_alive in runs:
+        time_requests(port, min(args.requests, 200), keep_alive)   # warm up
+
+    print(f"{args.requests} sequential /predict requests")
+    print(f"{'path':<12}{'p50 ms':>10}{'p99 ms':>10}{'overhead p50':>15}")
+    direct_p50 = None
+    for name, port, keep_alive in runs:
+        latencies = time_requests(port, args.requests, keep_alive)
+        p50 = _percentile(latencies, 0.5)
+        direct_p50 = direct_p50 if direct_p50 is not None else p50
+        overhead = f"{(p50 - direct_p50) * 1000:>12.0f} us" if name != 'direct' else f"{'-':>15}"
+        print(f"{name:<12}{p50:>10.3f}{_percentile(latencies, 0.99):>10.3f}{overhead}")
+    print(f"backend pool: {pool.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark: bytes and latency of a page load from the frontend server
+
+Starts the frontend server and loads the page (index.html plus the
+style.css and script.js it links to) ``--loads`` times over one keep-alive
+connection, as three kinds of client:
+
+- identity: no Accept-Encoding and no cache, every byte on every load (what
+  the server sent to everyone before the asset cache)
+- first visit: Accept-Encoding gzip/br, nothing cached yet
+- repeat visit: index.html revalidated with If-None-Match; the versioned
+  style.css?v=... and script.js?v=... are still fresh in the browser cache,
+  so they are not requested at all
+
+and reports bytes received per page load and the p50/p99 latency of a
+single request.
+
+Run with: python -m benchmarks.bench_frontend_static --loads 500
+"""
+
+import argparse
+import gzip
+import http.client
+import os
+import re
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'frontend'))
+
+ASSET_LINK = re.compile(rb'(?:href|src)="((?:style\.css|script\.js)[^"]*)"')
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_frontend():
+    import server as frontend
+
+    httpd = frontend.create_server(_free_port())
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+class Client:
+    def __init__(self, port):
+        self.conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        self.latencies = []
+        self.bytes = 0
+
+    def get(self, path, headers):
+        start = time.perf_counter()
+        self.conn.request('GET', path, headers=headers)
+        response = self.conn.getresponse()
+        body = response.read()
+        self.latencies.append((time.perf_counter() - start) * 1000)
+        # Status line and headers count towards the bytes on the wire too
+        self.bytes += len(body) + sum(len(k) + len(v) + 4 for k, v in response.getheaders()) + 17
+        return response, body
+
+
+def _decode(response, body):
+    encoding = response.getheader('Content-Encoding')
+    if encoding == 'gzip':
+        return gzip.decompress(body)
+    if encoding == 'br':
+        import brotli
+        return brotli.decompress(body)
+    return body
+
+
+def load_page(client, mode, etag=None):
+    """Load index.html and the assets it links to; returns the page's ETag"""
+    headers = {} if mode == 'identity' else {'Accept-Encoding': 'gzip, deflate, br'}
+    if mode == 'repeat':
+        response, _ = client.get('/', dict(headers, **{'If-None-Match': etag}))
+        assert response.status == 304, response.status
+        return etag
+    response, body = client.get('/', headers)
+    for path in ASSET_LINK.findall(_decode(response, body)):
+        # The page links had no ?v= before the asset cache
+        path = path.decode() if mode != 'identity' else path.decode().split('?')[0]
+        client.get('/' + path, headers)
+    return response.getheader('ETag')
+
+
+def _percentile(latencies, q):
+    latencies = sorted(latencies)
+    return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes and latency of a frontend page load")
+    parser.add_argument('--loads', type=int, default=500)
+    args = parser.parse_args()
+
+    httpd = start_frontend()
+    port = httpd.server_address[1]
+    etag = load_page(Client(port), 'first')
+
+    print(f"{args.loads} page loads (index.html, style.css, script.js)")
+    print(f"{'client':<14}{'bytes/load':>12}{'requests':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for mode in ('identity', 'first', 'repeat'):
+        client = Client(port)
+        for _ in range(args.loads):
+            load_page(client, mode, etag)
+        name = {'identity': 'identity', 'first': 'first visit', 'repeat': 'repeat visit'}[mode]
+        print(f"{name:<14}{client.bytes / args.loads:>12.0f}{len(client.latencies) / args.loads:>10.0f}"
+              f"{_percentile(client.latencies, 0.5):>10.3f}{_percentile(client.latencies, 0.99):>10.3f}")
+    print(f"files read from disk: {httpd.assets.loads}")
+
+
+if __name__ == "__main__":
+    main()
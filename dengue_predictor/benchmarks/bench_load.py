@@ -0,0 +1,353 @@
+"""
+Load test: throughput and latency of /predict, /predict/batch and /chat
+
+Drives the API with synthetic patients drawn from the distribution of
+datasets/dataset.csv (see benchmarks/synthetic.py) from ``--concurrency``
+concurrent clients, one scenario after the other, and reports requests per
+second and p50/p90/p95/p99 latency for each. Three ways to reach the API:
+
+- asgi: the app is called in-process through httpx's ASGI transport, no
+  sockets involved, so the numbers are the API's own cost
+- http: the app is served by uvicorn on a free port in this process and
+  driven over keep-alive HTTP connections
+- http with ``--url``: an already running backend or frontend proxy; the
+  fakes below cannot be installed there, so it talks to its real services
+
+In the first two, Gemini is replaced by a FakeLLM answering after
+``--llm-delay`` seconds and the vector DB by a FakeVectorDB taking
+``--vector-db-delay`` seconds per bulk upsert, and the LLM response cache
+is off, so every chat waits on the fake LLM. Each chat message carries a
+unique suffix so a running server's cache does not answer it either.
+
+``--output`` writes the results as JSON together with the git commit and
+the settings they were measured with; ``--compare`` prints the change of
+every number against such a file, so a regression between two commits
+shows up as a diff of two runs with the same arguments.
+
+Run with: python -m benchmarks.bench_load --mode asgi --concurrency 16 --requests 500 --output load.json
+"""
+
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from benchmarks.synthetic import PatientSampler
+
+SCENARIOS = ('predict', 'batch', 'chat')
+PERCENTILES = (0.50, 0.90, 0.95, 0.99)
+
+QUESTIONS = [
+    "What should I do next?",
+    "What should I eat and drink while I recover?",
+    "Which warning signs mean I should go to the hospital?",
+    "How can I protect my family from mosquitoes?",
+    "Is dengue common in my area?",
+]
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _risk_assessment(patient):
+    # Roughly what the frontend sends after a prediction
+    positives = patient['NS1'] + patient['IgM']
+    risk_level, probability = [('Low', 20), ('Medium', 55), ('High', 85)][positives]
+    return {
+        'risk_level': risk_level, 'probability': probability, 'age': patient['Age'],
+        'gender': 'Male' if patient['Gender'] else 'Female',
+        'ns1': 'Positive' if patient['NS1'] else 'Negative',
+        'igg': 'Positive' if patient['IgG'] else 'Negative',
+        'igm': 'Positive' if patient['IgM'] else 'Negative',
+        'area': patient['Area'], 'district': patient['District']
+    }
+
+
+def build_requests(scenario, sampler, n, batch_size=50):
+    """(path, JSON payload, records) for ``n`` requests of one scenario"""
+    if scenario == 'predict':
+        return [('/predict', patient, 1) for patient in sampler.sample(n)]
+    if scenario == 'batch':
+        return [('/predict/batch', {'records': sampler.sample(batch_size)}, batch_size) for _ in range(n)]
+    if scenario == 'chat':
+        requests = []
+        for i, patient in enumerate(sampler.sample(n)):
+            question = QUESTIONS[i % len(QUESTIONS)]
+            requests.append(('/chat', {
+                'message': f"{question} (load test {os.getpid()}-{time.time_ns()}-{i})",
+                'conversation_history': [],
+                'risk_assessment': _risk_assessment(patient)
+            }, 1))
+        return requests
+    raise ValueError(f"Unknown scenario '{scenario}', expected one of {', '.join(SCENARIOS)}")
+
+
+def percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summarize(latencies, statuses, seconds, records):
+    """Throughput and latency percentiles (ms) of one scenario"""
+    ordered = sorted(latencies)
+    errors = sum(1 for status in statuses if status != 200)
+    summary = {
+        'requests': len(latencies),
+        'errors': errors,
+        'seconds': round(seconds, 3),
+        'requests_per_second': round(len(latencies) / seconds, 2) if seconds else 0.0,
+        'records_per_second': round(records / seconds, 2) if seconds else 0.0,
+        'latency_ms': {}
+    }
+    if ordered:
+        for q in PERCENTILES:
+            summary['latency_ms'][f"p{int(q * 100)}"] = round(percentile(ordered, q), 3)
+        summary['latency_ms']['max'] = round(ordered[-1], 3)
+        summary['latency_ms']['mean'] = round(sum(ordered) / len(ordered), 3)
+    return summary
+
+
+async def _drive_asgi(app, requests, concurrency):
+    import httpx
+
+    latencies, statuses = [], []
+    pending = iter(requests)
+
+    async def worker(client):
+        for path, payload, _ in pending:
+            start = time.perf_counter()
+            response = await client.post(path, json=payload)
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses.append(response.status_code)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://loadtest', timeout=300) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        seconds = time.perf_counter() - start
+    return latencies, statuses, seconds
+
+
+def _drive_http(base_url, requests, concurrency):
+    url = urllib.parse.urlsplit(base_url)
+    latencies, statuses = [], []
+    pending = iter(requests)
+    lock = threading.Lock()
+
+    def worker():
+        # One keep-alive connection per client, as a browser tab would have
+        conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=300)
+        headers = {'Content-Type': 'application/json'}
+        while True:
+            with lock:
+                item = next(pending, None)
+            if item is None:
+                break
+            path, payload, _ = item
+            start = time.perf_counter()
+            try:
+                conn.request('POST', url.path.rstrip('/') + path, json.dumps(payload), headers)
+                response = conn.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                status = 0
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses.append(status)
+        conn.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, statuses, time.perf_counter() - start
+
+
+def install_fakes(llm_delay, vector_db_delay):
+    """Import the API with Gemini and the vector DB replaced by fakes"""
+    os.environ.setdefault("GOOGLE_API_KEY", "benchmark-fake-key")
+    os.environ.setdefault("WARMUP_ON_STARTUP", "0")
+    os.environ["LLM_CACHE_SIZE"] = "0"
+    from api import BaseAPI
+    from benchmarks.fakes import FakeLLM, FakeVectorDB
+    from db import vector_store
+
+    llm = FakeLLM(delay=llm_delay)
+    vector_db = FakeVectorDB(write_delay=vector_db_delay)
+    BaseAPI.AI_Agent.gemini.set(llm)
+    vector_store.vector_db.set(vector_db)
+    return BaseAPI.app, llm, vector_db
+
+
+def start_server(app):
+    import uvicorn
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=port, log_level='warning'))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, f"http://127.0.0.1:{port}"
+
+
+def _git_commit():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True,
+                               text=True, cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout
+        return commit or None, bool(dirty.strip())
+    except (OSError, subprocess.SubprocessError):
+        return None, None
+
+
+def run_load_test(mode='asgi', url=None, scenarios=SCENARIOS, requests=200, concurrency=8, batch_size=50,
+                  llm_delay=0.5, vector_db_delay=0.05, warmup=20, seed=0):
+    """Run every scenario and return the results document written by ``--output``"""
+    sampler = PatientSampler.from_csv(seed=seed)
+    fakes = url is None
+    llm = vector_db = server = None
+    if fakes:
+        app, llm, vector_db = install_fakes(llm_delay, vector_db_delay)
+
+    async def drive_in_process(batches):
+        # The app's startup and shutdown hooks start and drain the vector DB writer
+        async with app.router.lifespan_context(app):
+            return [await _drive_asgi(app, batch, concurrency) for batch in batches]
+
+    results = {}
+    batches = []
+    for scenario in scenarios:
+        # Chats are slow by design; a handful is enough to warm up their path
+        n_warmup = min(warmup, concurrency) if scenario == 'chat' else warmup
+        batches.append(build_requests(scenario, sampler, n_warmup, batch_size))
+        batches.append(build_requests(scenario, sampler, requests, batch_size))
+
+    if mode == 'asgi':
+        if not fakes:
+            raise ValueError("--url needs --mode http")
+        runs = asyncio.run(drive_in_process(batches))
+    else:
+        if fakes:
+            server, url = start_server(app)
+        runs = [_drive_http(url, batch, concurrency) for batch in batches]
+        if server is not None:
+            server.should_exit = True
+
+    for i, scenario in enumerate(scenarios):
+        measured = batches[2 * i + 1]
+        latencies, statuses, seconds = runs[2 * i + 1]
+        results[scenario] = summarize(latencies, statuses, seconds, sum(records for _, _, records in measured))
+
+    commit, dirty = _git_commit()
+    return {
+        'benchmark': 'bench_load',
+        'commit': commit,
+        'dirty': dirty,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'settings': {
+            'mode': mode, 'url': url if not fakes else None, 'requests': requests, 'concurrency': concurrency,
+            'batch_size': batch_size, 'llm_delay': llm_delay if fakes else None,
+            'vector_db_delay': vector_db_delay if fakes else None, 'warmup': warmup, 'seed': seed
+        },
+        'scenarios': results,
+        'fakes': {'llm_calls': llm.calls, 'vector_db_upserts': vector_db.upserts,
+                  'vector_db_cases': vector_db.cases} if fakes else None
+    }
+
+
+def print_results(document):
+    settings = document['settings']
+    print(f"Load test, {settings['mode']} mode, {settings['requests']} requests per scenario "
+          f"at concurrency {settings['concurrency']} (commit {(document['commit'] or 'unknown')[:10]})")
+    print("=" * 86)
+    print(f"{'scenario':<10}{'req/s':>10}{'records/s':>12}{'p50 ms':>10}{'p90 ms':>10}"
+          f"{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'errors':>8}")
+    for scenario, summary in document['scenarios'].items():
+        latency = summary['latency_ms']
+        print(f"{scenario:<10}{summary['requests_per_second']:>10.1f}{summary['records_per_second']:>12.1f}"
+              + "".join(f"{latency.get(key, 0.0):>10.2f}" for key in ('p50', 'p90', 'p95', 'p99', 'max'))
+              + f"{summary['errors']:>8}")
+    print("=" * 86)
+    if document['fakes']:
+        fakes = document['fakes']
+        print(f"Fake LLM calls: {fakes['llm_calls']}; fake vector DB: {fakes['vector_db_cases']} cases "
+              f"in {fakes['vector_db_upserts']} upserts")
+
+
+def compare_results(baseline, current):
+    """Relative change of throughput and latency per scenario, as printable lines"""
+    lines = [f"Change against {(baseline.get('commit') or 'baseline')[:10]}"
+             f" (positive req/s and negative latency are improvements)"]
+    if baseline.get('settings') != current.get('settings'):
+        lines.append("Warning: the runs used different settings, the numbers are not comparable")
+    for scenario, summary in current['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(scenario)
+        if before is None:
+            lines.append(f"{scenario:<10} not in the baseline")
+            continue
+        changes = [('req/s', before['requests_per_second'], summary['requests_per_second'])]
+        changes += [(key, before['latency_ms'].get(key), summary['latency_ms'].get(key))
+                    for key in ('p50', 'p95', 'p99')]
+        parts = []
+        for name, old, new in changes:
+            if old:
+                parts.append(f"{name} {old:.2f} -> {new:.2f} ({(new - old) / old * 100:+.1f}%)")
+        lines.append(f"{scenario:<10}" + "  ".join(parts))
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput and latency of /predict, /predict/batch and /chat")
+    parser.add_argument('--mode', choices=('asgi', 'http'), default='asgi')
+    parser.add_argument('--url', help="load test a running server (http mode) instead of one started here")
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help=f"comma separated, from {', '.join(SCENARIOS)}")
+    parser.add_argument('--requests', type=int, default=200, help="measured requests per scenario")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--batch-size', type=int, default=50, help="records per /predict/batch request")
+    parser.add_argument('--llm-delay', type=float, default=0.5, help="seconds the fake LLM takes per answer")
+    parser.add_argument('--vector-db-delay', type=float, default=0.05,
+                        help="seconds the fake vector DB takes per bulk upsert")
+    parser.add_argument('--warmup', type=int, default=20, help="unmeasured requests before each scenario")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="write the results to this JSON file")
+    parser.add_argument('--compare', help="JSON results of an earlier run to compare against")
+    args = parser.parse_args()
+    if args.url:
+        args.mode = 'http'
+
+    document = run_load_test(args.mode, args.url, [s.strip() for s in args.scenarios.split(',') if s.strip()],
+                             args.requests, args.concurrency, args.batch_size, args.llm_delay,
+                             args.vector_db_delay, args.warmup, args.seed)
+    print_results(document)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        print("\n".join(compare_results(baseline, document)))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(document, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark: local vector index query latency, brute force versus IVF
+
+Fills an in-memory LocalVectorIndex with synthetic cases resampled from
+datasets/dataset.csv (embedded with the structured embedder) and reports
+per-query latency for exact search and for the IVF index, plus the IVF
+recall@k against the exact results.
+
+Run with: python -m benchmarks.bench_local_vector_db --sizes 10000,100000,1000000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from db.case_records import cases_from_frame
+from db.embeddings import load_embedder
+from db.LocalVectorDB import LocalVectorIndex
+
+DATASET_PATH = os.path.join(os.path.dirname(__file__), '..', 'datasets', 'dataset.csv')
+
+QUERIES = [
+    "High risk case in Mirpur with NS1 positive",
+    "35 year old male in Gulshan, IgM positive, building",
+    "Low risk tinshed house in Jatrabari",
+    "Positive NS1 and IgG in an undeveloped area of Dhaka",
+]
+
+
+def build_index(embedder, n_cases, chunk_size=50000):
+    df = pd.read_csv(DATASET_PATH)
+    base_cases = cases_from_frame(df)
+    rng = np.random.RandomState(0)
+    index = LocalVectorIndex(embedder.dimension, capacity=n_cases)
+    for start in range(0, n_cases, chunk_size):
+        count = min(chunk_size, n_cases - start)
+        cases = [base_cases[i] for i in rng.randint(len(base_cases), size=count)]
+        risks = rng.uniform(0, 1, size=count)
+        vectors = embedder.embed_cases(cases, risks)
+        index.upsert([
+            (f"case_{start + i}", vectors[i],
+             {"district": case['District'], "area": case['Area'], "risk_score": float(risks[i])})
+            for i, case in enumerate(cases)
+        ])
+    return index
+
+
+def _latency_us(index, queries, repeat, **kwargs):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in queries:
+            index.query(query, top_k=10, include_metadata=False, **kwargs)
+    return (time.perf_counter() - start) / (repeat * len(queries)) * 1e6
+
+
+def _recall(index, queries, nprobe):
+    """
+    Share of IVF results scoring at least the exact k-th best score. Many
+    resampled cases share a vector, so ids alone would undercount ties.
+    """
+    hits = 0
+    for query in queries:
+        exact = index.query(query, top_k=10, include_metadata=False, nprobe=len(index.centroids))['matches']
+        approx = index.query(query, top_k=10, include_metadata=False, nprobe=nprobe)['matches']
+        threshold = exact[-1]['score'] - 1e-6
+        hits += sum(match['score'] >= threshold for match in approx)
+    return hits / (10 * len(queries))
+
+
+def run_benchmark(sizes, nprobe=8, repeat=5):
+    embedder = load_embedder(backend="structured")
+    queries = [embedder.embed_query(text) for text in QUERIES]
+
+    print(f"Query latency, top_k=10, {embedder.dimension}-d vectors, nprobe={nprobe}")
+    print("=" * 78)
+    print(f"{'cases':>10} {'brute force':>14} {'IVF build':>12} {'IVF query':>14} {'speedup':>9} {'recall@10':>10}")
+    results = {}
+    for n_cases in sizes:
+        index = build_index(embedder, n_cases)
+        brute = _latency_us(index, queries, repeat)
+        start = time.perf_counter()
+        index.build_ivf()
+        build_seconds = time.perf_counter() - start
+        ivf = _latency_us(index, queries, repeat, nprobe=nprobe)
+        recall = _recall(index, queries, nprobe)
+        results[n_cases] = {'brute_force_us': brute, 'ivf_us': ivf, 'ivf_build_s': build_seconds, 'recall': recall}
+        print(f"{n_cases:>10} {brute:>11.0f} µs {build_seconds:>10.2f} s {ivf:>11.0f} µs "
+              f"{brute / ivf:>8.1f}x {recall:>10.2f}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='10000,100000')
+    parser.add_argument('--nprobe', type=int, default=8)
+    args = parser.parse_args()
+    run_benchmark([int(size) for size in args.sizes.split(',')], nprobe=args.nprobe)
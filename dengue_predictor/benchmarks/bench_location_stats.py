@@ -0,0 +1,56 @@
+"""
+Benchmark: location statistics lookup versus per-request pandas summary
+
+Compares the original get_location_based_stats path (boolean masks, sample,
+pd.cut and value_counts on every call) with a LocationStatsCube lookup, and
+reports the one-off cost of building the cube.
+
+Run with: python -m benchmarks.bench_location_stats
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from agents.location_stats import LocationStatsCube, compute_location_stats
+
+DATASET_PATH = os.path.join(os.path.dirname(__file__), '..', 'datasets', 'dataset.csv')
+
+
+def _per_call_us(func, locations, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for area, district in locations:
+            func(area, district)
+    return (time.perf_counter() - start) / (repeat * len(locations)) * 1e6
+
+
+def run_benchmark(repeat=20):
+    df = pd.read_csv(DATASET_PATH)
+    locations = [(area, district) for district, area in
+                 df[['District', 'Area']].drop_duplicates().itertuples(index=False)]
+    locations.append(("Unknown Area", "Dhaka"))  # district fallback
+
+    start = time.perf_counter()
+    cube = LocationStatsCube.from_frame(df)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    pandas_us = _per_call_us(lambda area, district: compute_location_stats(df, area, district), locations, repeat)
+    cube_us = _per_call_us(cube.lookup, locations, repeat * 1000)
+
+    print(f"Location statistics for {len(locations)} locations ({len(df)} dataset rows)")
+    print("=" * 60)
+    print(f"{'pandas per request':<30} {pandas_us:12.2f} µs/call")
+    print(f"{'precomputed cube lookup':<30} {cube_us:12.3f} µs/call")
+    print(f"{'cube build (once at load)':<30} {build_ms:12.2f} ms")
+    print("=" * 60)
+    print(f"Speedup: {pandas_us / cube_us:.0f}x")
+    return {'pandas_us': pandas_us, 'cube_us': cube_us, 'build_ms': build_ms}
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,98 @@
+"""
+Microbenchmark: cost of recording request metrics
+
+Times the primitives a request goes through (Counter.inc,
+Histogram.observe, a stage_timer block) and the per-request overhead of
+MetricsMiddleware, measured by driving a minimal ASGI app directly with
+and without the middleware, so no server or network is involved. Also
+reports how long rendering /metrics takes with every series populated.
+
+Run with: python -m benchmarks.bench_metrics [--iterations 200000]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from utils.metrics import Counter, Histogram, MetricsMiddleware, MetricsRegistry, stage_timer
+
+
+class _Route:
+    path = "/predict"
+
+
+async def plain_app(scope, receive, send):
+    # What the router does once a route matched, then a minimal response
+    scope["route"] = _Route
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message):
+    pass
+
+
+def time_asgi(app, n):
+    async def run():
+        start = time.perf_counter()
+        for _ in range(n):
+            await app({"type": "http", "method": "POST", "path": "/predict"}, _receive, _send)
+        return time.perf_counter() - start
+
+    return min(asyncio.run(run()) for _ in range(3)) / n
+
+
+def _per_call_us(fn, n):
+    return min(timeit.repeat(fn, number=n, repeat=3)) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cost of recording request metrics")
+    parser.add_argument('--iterations', type=int, default=200000)
+    args = parser.parse_args()
+    n = args.iterations
+
+    counter = Counter("bench_requests_total", "bench", ("endpoint", "method", "status"))
+    histogram = Histogram("bench_duration_seconds", "bench", ("endpoint",))
+
+    def timed_block():
+        with stage_timer("score"):
+            pass
+
+    baseline = _per_call_us(lambda: None, n)
+    print(f"Per call, {n} iterations, best of 3 (empty call: {baseline:.3f} us, subtracted)")
+    print(f"  Counter.inc               {_per_call_us(lambda: counter.inc('/predict', 'POST', '200'), n) - baseline:6.3f} us")
+    print(f"  Histogram.observe         {_per_call_us(lambda: histogram.observe(0.0012, '/predict'), n) - baseline:6.3f} us")
+    print(f"  stage_timer block         {_per_call_us(timed_block, n) - baseline:6.3f} us")
+
+    bare = time_asgi(plain_app, n // 4)
+    instrumented = time_asgi(MetricsMiddleware(plain_app), n // 4)
+    print(f"\nASGI request, minimal app:  {bare * 1e6:.3f} us bare, {instrumented * 1e6:.3f} us with "
+          f"MetricsMiddleware -> {(instrumented - bare) * 1e6:.3f} us overhead per request")
+
+    registry = MetricsRegistry()
+    requests = registry.register(Counter("r_total", "r", ("endpoint", "method", "status")))
+    durations = registry.register(Histogram("d_seconds", "d", ("endpoint",)))
+    stages = registry.register(Histogram("s_seconds", "s", ("stage",)))
+    for endpoint in ("/predict", "/predict/batch", "/chat", "/chat/stream", "/health", "/metrics"):
+        for i in range(1000):
+            requests.inc(endpoint, "POST", "200")
+            durations.observe(i / 1e5, endpoint)
+    for stage in ("encode", "score", "vector_db_write", "prompt_build", "llm_call"):
+        for i in range(1000):
+            stages.observe(i / 1e5, stage)
+    render_ms = min(timeit.repeat(registry.render, number=100, repeat=3)) / 100 * 1000
+    print(f"Rendering /metrics ({len(registry.render().splitlines())} lines): {render_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Load test: /predict latency while chats are waiting on a slow LLM
+
+Runs the API in-process on the local vector DB backend with Gemini replaced
+by a delayed FakeLLM, measures /predict latency on an idle server, then
+again while ``--chats`` concurrent /chat requests are in flight, and prints
+p50/p95/p99 for both. ``--blocking`` calls the synchronous agent directly
+from the async handler, as /chat did before, for comparison.
+
+Run with: python -m benchmarks.bench_predict_under_chat_load --chats 20 --llm-delay 3
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# Self-contained run: in-memory local vector DB, no response cache, no real Gemini
+os.environ.setdefault("VECTOR_DB_BACKEND", "local")
+os.environ.setdefault("LOCAL_VECTOR_DB_PATH", "")
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark-fake-key")
+os.environ["LLM_CACHE_SIZE"] = "0"
+
+PATIENT = {'Age': 35, 'Gender': 1, 'NS1': 1, 'IgG': 1, 'IgM': 0, 'Area': 'Mirpur',
+           'AreaType': 'Undeveloped', 'HouseType': 'Building', 'District': 'Dhaka'}
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _post(url, payload, timeout=120):
+    req = urllib.request.Request(url, data=json.dumps(payload).encode('utf-8'),
+                                 headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(req, timeout=timeout) as response:
+        return response.status, response.read()
+
+
+def _percentiles(samples_ms):
+    ordered = sorted(samples_ms)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {'p50': pick(0.50), 'p95': pick(0.95), 'p99': pick(0.99), 'max': ordered[-1]}
+
+
+def _measure_predicts(base_url, n_requests):
+    latencies = []
+    for _ in range(n_requests):
+        start = time.perf_counter()
+        _post(f"{base_url}/predict", PATIENT)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def start_server(llm_delay, llm_concurrency, blocking):
+    os.environ["LLM_MAX_CONCURRENCY"] = str(llm_concurrency)
+    import uvicorn
+    from api import BaseAPI
+    from benchmarks.fakes import FakeLLM
+
+    BaseAPI.AI_Agent.cached_llm.client = FakeLLM(delay=llm_delay)
+    if blocking:
+        async def blocking_chat(message, history, cache_context=None, **kwargs):
+            return BaseAPI.AI_Agent.chat_with_dengue_agent(message, history, cache_context, **kwargs)
+        BaseAPI.achat_with_dengue_agent = blocking_chat
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(BaseAPI.app, host='127.0.0.1', port=port, log_level='warning'))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, f"http://127.0.0.1:{port}"
+
+
+def run_benchmark(n_chats=20, llm_delay=3.0, n_predicts=200, llm_concurrency=20, blocking=False):
+    server, base_url = start_server(llm_delay, llm_concurrency, blocking)
+    _measure_predicts(base_url, 20)  # warm up
+
+    idle = _measure_predicts(base_url, n_predicts)
+
+    chat_results = []
+
+    def chat(i):
+        start = time.perf_counter()
+        status, _ = _post(f"{base_url}/chat", {'message': f"What should I eat? ({i})"})
+        chat_results.append((status, time.perf_counter() - start))
+
+    chats = [threading.Thread(target=chat, args=(i,)) for i in range(n_chats)]
+    for thread in chats:
+        thread.start()
+    time.sleep(min(0.5, llm_delay / 4))  # let the chats reach the LLM
+    loaded_start = time.perf_counter()
+    loaded = _measure_predicts(base_url, n_predicts)
+    loaded_seconds = time.perf_counter() - loaded_start
+    for thread in chats:
+        thread.join()
+    server.should_exit = True
+
+    idle_p, loaded_p = _percentiles(idle), _percentiles(loaded)
+    mode = "blocking agent call" if blocking else "async agent (LLM thread pool)"
+    print(f"/predict latency, {n_predicts} requests, {n_chats} chats on a {llm_delay:.1f}s fake LLM, {mode}")
+    print("=" * 72)
+    print(f"{'':<22} {'p50':>10} {'p95':>10} {'p99':>10} {'max':>10}")
+    for label, p in (("idle", idle_p), ("during chats", loaded_p)):
+        print(f"{label:<22} {p['p50']:>7.2f} ms {p['p95']:>7.2f} ms {p['p99']:>7.2f} ms {p['max']:>7.1f} ms")
+    print("=" * 72)
+    ok = sum(1 for status, _ in chat_results if status == 200)
+    print(f"Chats: {ok}/{n_chats} succeeded, slowest {max(s for _, s in chat_results):.2f} s; "
+          f"predicts under load took {loaded_seconds:.2f} s")
+    return {'idle': idle_p, 'during_chats': loaded_p}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--chats', type=int, default=20)
+    parser.add_argument('--llm-delay', type=float, default=3.0)
+    parser.add_argument('--predicts', type=int, default=200)
+    parser.add_argument('--llm-concurrency', type=int, default=20)
+    parser.add_argument('--blocking', action='store_true')
+    args = parser.parse_args()
+    run_benchmark(args.chats, args.llm_delay, args.predicts, args.llm_concurrency, args.blocking)
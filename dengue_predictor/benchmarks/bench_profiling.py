@@ -0,0 +1,76 @@
+"""
+Microbenchmark: cost of the profiling hook
+
+Drives a minimal ASGI app directly, with no server or network, and reports
+the per-request time:
+
+- without ProfilingMiddleware, which is what PROFILING_ENABLED unset gives
+- with the middleware installed but not armed, the cost of checking the
+  request for an X-Profile header
+- for a request that is profiled with cProfile, including writing its
+  pstats file
+
+Run with: python -m benchmarks.bench_profiling [--iterations 50000]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from utils.profiling import Profiler, ProfilingMiddleware
+
+HEADERS = [(b"host", b"localhost"), (b"content-type", b"application/json"), (b"content-length", b"160"),
+           (b"user-agent", b"python-requests"), (b"accept", b"*/*")]
+
+
+async def plain_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message):
+    pass
+
+
+def time_asgi(app, n, headers=HEADERS):
+    async def run():
+        scope = {"type": "http", "method": "POST", "path": "/predict", "headers": headers}
+        start = time.perf_counter()
+        for _ in range(n):
+            await app(dict(scope), _receive, _send)
+        return time.perf_counter() - start
+
+    return min(asyncio.run(run()) for _ in range(3)) / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cost of the profiling hook")
+    parser.add_argument('--iterations', type=int, default=50000)
+    args = parser.parse_args()
+    n = args.iterations
+
+    with tempfile.TemporaryDirectory() as directory:
+        profiler = Profiler(directory)
+        bare = time_asgi(plain_app, n)
+        idle = time_asgi(ProfilingMiddleware(plain_app, profiler), n)
+        profiled = time_asgi(ProfilingMiddleware(plain_app, profiler), 200,
+                             HEADERS + [(b"x-profile", b"pstats")])
+        files = len(os.listdir(directory))
+
+    print(f"ASGI request, minimal app, {n} iterations, best of 3")
+    print(f"  disabled (no middleware)     {bare * 1e6:8.3f} us")
+    print(f"  installed, not armed         {idle * 1e6:8.3f} us  (+{(idle - bare) * 1e6:.3f} us)")
+    print(f"  profiled, pstats written     {profiled * 1e6:8.3f} us  ({files} files)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Microbenchmark: per-request scoring cost
+
+Compares sklearn predict_proba on a one-row DataFrame with the closed-form
+LogisticScorer (sparse dot product + sigmoid).
+
+Run with: python -m benchmarks.bench_scorer
+"""
+
+import os
+import sys
+import timeit
+
+import joblib
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from core.feature_encoder import FeatureEncoder
+from core.fast_scorer import EstimatorScorer, build_scorer
+from benchmarks.bench_feature_encoder import MODEL_PATH, SAMPLE_PATIENT
+
+
+def run_benchmark(iterations=5000):
+    model = joblib.load(MODEL_PATH)
+    encoder = FeatureEncoder.from_model(model)
+    fast = build_scorer(model, encoder, fast=True)
+    fallback = EstimatorScorer(model, encoder)
+
+    print(f"Per-request scoring cost ({iterations} iterations, best of 3)")
+    print("=" * 60)
+    results = {}
+    for label, scorer in (("predict_proba (fallback)", fallback), (f"{fast.kind} scorer", fast)):
+        best = min(timeit.repeat(lambda: scorer.score(SAMPLE_PATIENT), number=iterations, repeat=3))
+        results[label] = best / iterations * 1e6
+        print(f"{label:<40} {results[label]:10.2f} us/request")
+
+    print(f"Difference: {abs(fast.score(SAMPLE_PATIENT) - fallback.score(SAMPLE_PATIENT)):.2e}")
+    return results
+
+
+if __name__ == "__main__":
+    run_benchmark(iterations=2000)
@@ -0,0 +1,103 @@
+"""
+Benchmark: API import time, broken down per module
+
+Imports api.BaseAPI in a fresh interpreter (the cold start of the server)
+and reports the wall time, then repeats the import under ``-X importtime``
+and breaks its cost down into the exclusive time of each third-party
+package and of each of this project's modules. With --warm it also creates
+every lazily initialised dependency (vector DB, dataset, Gemini) the way
+the background warm-up does and reports how long each one took.
+
+Run with: python -m benchmarks.bench_startup [--runs 5] [--top 15] [--warm]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+BASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+PROJECT_PACKAGES = {'api', 'agents', 'core', 'db', 'utils'}
+
+_TIMED_IMPORT = """
+import json, time
+start = time.perf_counter()
+import api.BaseAPI
+import_ms = (time.perf_counter() - start) * 1000
+warm = {}
+if %(warm)r:
+    from utils.lazy import dependency_status, warm_in_background
+    warm_in_background().join()
+    warm = dependency_status()
+print(json.dumps({"import_ms": import_ms, "dependencies": warm}))
+"""
+
+
+def _run(code, extra_args=()):
+    result = subprocess.run(
+        [sys.executable, *extra_args, '-c', code],
+        cwd=BASE_DIR, capture_output=True, text=True, env=os.environ.copy()
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing the API failed:\n{result.stderr[-2000:]}")
+    return result
+
+
+def time_import(warm=False):
+    result = _run(_TIMED_IMPORT % {"warm": warm})
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def import_breakdown():
+    """(exclusive ms per third-party package, exclusive ms per project module)"""
+    result = _run("import api.BaseAPI", ('-X', 'importtime'))
+    packages = defaultdict(float)
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, _cumulative_us, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        root = name.split(".")[0]
+        self_ms = int(self_us) / 1000
+        if root in PROJECT_PACKAGES:
+            modules[name] = self_ms
+        else:
+            packages[root] += self_ms
+    return packages, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Break down the API's import time per module")
+    parser.add_argument('--runs', type=int, default=5, help="cold imports to time")
+    parser.add_argument('--top', type=int, default=15, help="third-party packages to list")
+    parser.add_argument('--warm', action='store_true', help="also create every lazy dependency")
+    args = parser.parse_args()
+
+    timings = [time_import()["import_ms"] for _ in range(args.runs)]
+    print(f"import api.BaseAPI: median {statistics.median(timings):.0f} ms, "
+          f"min {min(timings):.0f} ms over {args.runs} cold starts")
+
+    packages, modules = import_breakdown()
+    total = sum(packages.values()) + sum(modules.values())
+    print(f"\nExclusive import time under -X importtime ({total:.0f} ms total)")
+    print(f"{'third-party package':<32}{'ms':>10}{'share':>9}")
+    for name, ms in sorted(packages.items(), key=lambda kv: -kv[1])[:args.top]:
+        print(f"{name:<32}{ms:>10.1f}{ms / total:>9.1%}")
+    print(f"\n{'project module':<32}{'ms':>10}{'share':>9}")
+    for name, ms in sorted(modules.items(), key=lambda kv: -kv[1]):
+        print(f"{name:<32}{ms:>10.1f}{ms / total:>9.1%}")
+
+    if args.warm:
+        result = time_import(warm=True)
+        print("\nLazy dependencies, created after import")
+        for name, status in result["dependencies"].items():
+            load_ms = f"{status['load_ms']:.0f} ms" if status['load_ms'] is not None else "-"
+            print(f"{name:<16}{status['state']:<10}{load_ms:>10}  {status['error'] or ''}")
+
+
+if __name__ == "__main__":
+    main()
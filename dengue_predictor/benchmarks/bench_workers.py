@@ -0,0 +1,125 @@
+"""
+Benchmark: /predict requests per second by number of API workers
+
+For each worker count, starts ``python -m api.serve --workers N`` on a free
+port (local vector DB, in memory, no warm-up), waits for /health, then runs
+``--clients`` client processes that each send /predict requests over one
+keep-alive connection for ``--duration`` seconds, and reports the total
+requests per second and the per-request p50/p99. Client processes are used
+so the load generator is not limited by one interpreter's GIL; on a machine
+with fewer cores than workers plus clients the numbers stop scaling.
+
+Run with: python -m benchmarks.bench_workers --workers 1 2 4 --clients 8 --duration 10
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+BASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+PATIENT = {'Age': 35, 'Gender': 1, 'NS1': 1, 'IgG': 1, 'IgM': 0, 'Area': 'Mirpur',
+           'AreaType': 'Undeveloped', 'HouseType': 'Building', 'District': 'Dhaka'}
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_api(workers, port):
+    env = dict(os.environ, VECTOR_DB_BACKEND="local", LOCAL_VECTOR_DB_PATH="",
+               AREA_AGGREGATES_PATH="", WARMUP_ON_STARTUP="0")
+    process = subprocess.Popen(
+        [sys.executable, '-W', 'ignore', '-m', 'api.serve', '--workers', str(workers),
+         '--port', str(port), '--log-level', 'warning'],
+        cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1).read()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"API with {workers} workers did not start")
+
+
+def stop_api(process):
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=60)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def _client(port, duration, results):
+    body = json.dumps(PATIENT)
+    headers = {'Content-Type': 'application/json'}
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    latencies = []
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        start = time.perf_counter()
+        conn.request('POST', '/predict', body, headers)
+        response = conn.getresponse()
+        response.read()
+        if response.status == 200:
+            latencies.append((time.perf_counter() - start) * 1000)
+    conn.close()
+    results.put(latencies)
+
+
+def run_load(port, clients, duration):
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=_client, args=(port, duration, results)) for _ in range(clients)]
+    for process in processes:
+        process.start()
+    latencies = []
+    for _ in processes:
+        latencies.extend(results.get())
+    for process in processes:
+        process.join()
+    latencies.sort()
+    return {
+        'rps': len(latencies) / duration,
+        'p50': latencies[len(latencies) // 2],
+        'p99': latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/predict throughput by API worker count")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10.0)
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs, {args.clients} client processes, {args.duration:.0f}s per run")
+    print(f"{'workers':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    baseline = None
+    for workers in args.workers:
+        port = _free_port()
+        process = start_api(workers, port)
+        try:
+            run_load(port, args.clients, min(args.duration, 2.0))  # warm up
+            result = run_load(port, args.clients, args.duration)
+        finally:
+            stop_api(process)
+        baseline = baseline or result['rps']
+        print(f"{workers:>8}{result['rps']:>10.0f}{result['p50']:>10.2f}{result['p99']:>10.2f}"
+              f"   x{result['rps'] / baseline:.2f}")
+
+
+if __name__ == "__main__":
+    main()
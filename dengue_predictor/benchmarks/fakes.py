@@ -0,0 +1,72 @@
+"""
+Fake external services for benchmarks
+
+``FakeLLM`` stands in for ``genai.GenerativeModel``: it sleeps for a
+configurable delay instead of calling Gemini, and supports the
+``stream=True`` form by yielding ``chunks`` pieces spread over the delay.
+``FakeVectorDB`` stands in for the vector DB backend module: upserts sleep
+for a configurable delay per call and only count the cases, searches
+return nothing.
+"""
+
+import threading
+import time
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeLLM:
+    """Delayed, deterministic replacement for the Gemini client"""
+
+    def __init__(self, delay: float = 2.0, chunks: int = 20):
+        self.delay = delay
+        self.chunks = chunks
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _answer(self):
+        return [f"**Section {i + 1}** recommendation text. " for i in range(self.chunks)]
+
+    def generate_content(self, prompt, stream=False):
+        with self._lock:
+            self.calls += 1
+        if stream:
+            return self._stream()
+        time.sleep(self.delay)
+        return FakeResponse("".join(self._answer()))
+
+    def _stream(self):
+        for part in self._answer():
+            time.sleep(self.delay / self.chunks)
+            yield FakeResponse(part)
+
+
+class FakeVectorDB:
+    """Vector DB backend with the functions of db/vector_store.py and a fixed write latency"""
+
+    def __init__(self, write_delay: float = 0.05):
+        self.write_delay = write_delay
+        self.upserts = 0
+        self.cases = 0
+        self._lock = threading.Lock()
+
+    def add_cases_to_vector_db(self, cases):
+        time.sleep(self.write_delay)
+        with self._lock:
+            self.upserts += 1
+            self.cases += len(cases)
+
+    def add_case_to_vector_db(self, case_data, prediction):
+        self.add_cases_to_vector_db([(case_data, prediction)])
+
+    def search_similar_cases(self, query, n_results=5):
+        return []
+
+    def get_area_statistics(self, district, area):
+        return None
+
+    def get_high_risk_areas(self, threshold=0.7):
+        return []
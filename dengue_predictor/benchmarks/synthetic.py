@@ -0,0 +1,77 @@
+"""
+Synthetic patients drawn from the distribution of datasets/dataset.csv
+
+Benchmarks that send the same patient over and over hit one cache line,
+one area and one risk level. ``PatientSampler`` instead draws patients the
+way they occur in the dataset:
+
+- the location as an (Area, AreaType, District) combination that exists in
+  the data, weighted by how often it does, so every patient names a real
+  area with its location stats
+- NS1/IgG/IgM together, since the test results are correlated
+- gender and house type from their frequencies, and the age of a random
+  record moved by up to ``age_jitter`` years within the observed range
+
+Records come out in the form /predict takes (Gender 0=Female, 1=Male), and
+the same seed gives the same patients.
+"""
+
+import os
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+DATASET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'datasets', 'dataset.csv')
+
+LOCATION_COLUMNS = ['Area', 'AreaType', 'District']
+TEST_COLUMNS = ['NS1', 'IgG', 'IgM']
+
+
+def _frequencies(df: pd.DataFrame, columns: List[str]):
+    counts = df.groupby(columns, sort=True).size()
+    return list(counts.index), (counts / counts.sum()).to_numpy()
+
+
+class PatientSampler:
+    """Draws /predict payloads with the dataset's frequencies"""
+
+    def __init__(self, df: pd.DataFrame, seed: int = 0, age_jitter: int = 3):
+        self.rng = np.random.default_rng(seed)
+        self.age_jitter = age_jitter
+        self.locations, self.location_p = _frequencies(df, LOCATION_COLUMNS)
+        self.tests, self.tests_p = _frequencies(df, TEST_COLUMNS)
+        self.genders, self.gender_p = _frequencies(df, ['Gender'])
+        self.house_types, self.house_type_p = _frequencies(df, ['HouseType'])
+        self.ages = df['Age'].to_numpy()
+        self.min_age, self.max_age = int(self.ages.min()), int(self.ages.max())
+
+    @classmethod
+    def from_csv(cls, path: str = DATASET_PATH, **kwargs) -> "PatientSampler":
+        return cls(pd.read_csv(path), **kwargs)
+
+    def sample(self, n: int) -> List[Dict]:
+        rng = self.rng
+        locations = rng.choice(len(self.locations), size=n, p=self.location_p)
+        tests = rng.choice(len(self.tests), size=n, p=self.tests_p)
+        genders = rng.choice(len(self.genders), size=n, p=self.gender_p)
+        house_types = rng.choice(len(self.house_types), size=n, p=self.house_type_p)
+        ages = rng.choice(self.ages, size=n) + rng.integers(-self.age_jitter, self.age_jitter + 1, size=n)
+        ages = np.clip(ages, self.min_age, self.max_age)
+
+        patients = []
+        for i in range(n):
+            area, area_type, district = self.locations[locations[i]]
+            ns1, igg, igm = self.tests[tests[i]]
+            patients.append({
+                'Age': int(ages[i]),
+                'Gender': 1 if self.genders[genders[i]] == 'Male' else 0,
+                'NS1': int(ns1),
+                'IgG': int(igg),
+                'IgM': int(igm),
+                'Area': area,
+                'AreaType': area_type,
+                'HouseType': self.house_types[house_types[i]],
+                'District': district
+            })
+        return patients
@@ -0,0 +1,162 @@
+"""
+Closed-form scoring for the Dengue Risk Prediction model
+
+``predict_proba`` on a one-row DataFrame runs sklearn's input validation and
+feature-name checks on every request. For a binary logistic regression the
+probability is just ``sigmoid(intercept + coef . x)``, and an encoded patient
+only has 5 numeric columns plus at most 4 one-hot columns set, so the dot
+product is a handful of multiply-adds.
+
+``build_scorer`` returns a ``LogisticScorer`` when the estimator supports it
+and falls back to ``EstimatorScorer`` (plain ``predict_proba``) otherwise.
+"""
+
+import math
+import os
+from typing import Iterable, Mapping
+
+import numpy as np
+
+try:
+    from core.feature_encoder import FeatureEncoder
+except ImportError:
+    from feature_encoder import FeatureEncoder
+
+# Maximum difference from sklearn accepted by the self-check in build_scorer
+SCORER_TOLERANCE = 1e-12
+
+
+def _sigmoid(z: float) -> float:
+    # Numerically stable for large |z|
+    if z >= 0:
+        return 1.0 / (1.0 + math.exp(-z))
+    exp_z = math.exp(z)
+    return exp_z / (1.0 + exp_z)
+
+
+def _sigmoid_array(z: np.ndarray) -> np.ndarray:
+    out = np.empty_like(z, dtype=np.float64)
+    positive = z >= 0
+    out[positive] = 1.0 / (1.0 + np.exp(-z[positive]))
+    exp_z = np.exp(z[~positive])
+    out[~positive] = exp_z / (1.0 + exp_z)
+    return out
+
+
+class LogisticScorer:
+    """Sparse closed-form scorer for a fitted binary logistic regression"""
+
+    kind = "closed_form"
+
+    def __init__(self, coef: np.ndarray, intercept: float, encoder: FeatureEncoder):
+        self.coef = np.asarray(coef, dtype=np.float64).ravel()
+        self.intercept = float(intercept)
+        self.encoder = encoder
+        if self.coef.shape[0] != encoder.n_features:
+            raise ValueError(
+                f"Coefficient count {self.coef.shape[0]} does not match "
+                f"{encoder.n_features} encoded features"
+            )
+        # Coefficients of the numeric features in NUMERIC_FEATURES order
+        self.numeric_coef = self.coef[encoder.numeric_positions]
+
+    @classmethod
+    def from_model(cls, model, encoder: FeatureEncoder = None) -> "LogisticScorer":
+        """Pull ``coef_``, ``intercept_`` and feature order out of a fitted model"""
+        coef = getattr(model, 'coef_', None)
+        intercept = getattr(model, 'intercept_', None)
+        classes = getattr(model, 'classes_', None)
+        if coef is None or intercept is None or classes is None:
+            raise ValueError(f"{type(model).__name__} is not a fitted linear classifier")
+        if np.shape(coef)[0] != 1 or len(classes) != 2:
+            raise ValueError("Closed-form scoring only supports binary logistic regression")
+        if encoder is None:
+            encoder = FeatureEncoder.from_model(model)
+        return cls(coef, np.ravel(intercept)[0], encoder)
+
+    def encode(self, record: Mapping):
+        """The record's numeric values and active one-hot columns, for ``score_encoded``"""
+        return self.encoder.active_columns(record)
+
+    def score_encoded(self, encoded) -> float:
+        values, indices = encoded
+        z = self.intercept + float(self.numeric_coef @ values)
+        for position in indices:
+            z += self.coef[position]
+        return _sigmoid(z)
+
+    def score(self, record: Mapping) -> float:
+        """Probability of the positive class for a single patient record"""
+        return self.score_encoded(self.encode(record))
+
+    def score_matrix(self, matrix: np.ndarray) -> np.ndarray:
+        """Positive-class probabilities for an encoded ``(n, n_features)`` matrix"""
+        return _sigmoid_array(np.asarray(matrix, dtype=np.float64) @ self.coef + self.intercept)
+
+    def score_many(self, records: Iterable[Mapping]) -> np.ndarray:
+        return self.score_matrix(self.encoder.encode_many(records))
+
+
+class EstimatorScorer:
+    """Fallback that delegates to the estimator's own ``predict_proba``"""
+
+    kind = "predict_proba"
+
+    def __init__(self, model, encoder: FeatureEncoder):
+        self.model = model
+        self.encoder = encoder
+
+    def encode(self, record: Mapping):
+        return self.encoder.to_frame(self.encoder.encode(record))
+
+    def score_encoded(self, encoded) -> float:
+        return float(self.model.predict_proba(encoded)[0][1])
+
+    def score(self, record: Mapping) -> float:
+        return self.score_encoded(self.encode(record))
+
+    def score_matrix(self, matrix: np.ndarray) -> np.ndarray:
+        return self.model.predict_proba(self.encoder.to_frame(matrix))[:, 1]
+
+    def score_many(self, records: Iterable[Mapping]) -> np.ndarray:
+        return self.score_matrix(self.encoder.encode_many(records))
+
+
+def build_scorer(model, encoder: FeatureEncoder = None, fast: bool = None):
+    """
+    Return the fastest scorer that reproduces ``model.predict_proba``.
+
+    The closed-form scorer is only used when it agrees with sklearn within
+    SCORER_TOLERANCE on a set of probe rows; anything else (other estimator
+    types, multinomial quirks) falls back to ``predict_proba``. Set
+    ``DENGUE_FAST_SCORER=0`` to force the fallback.
+    """
+    if encoder is None:
+        encoder = FeatureEncoder.from_model(model)
+    if fast is None:
+        fast = os.getenv("DENGUE_FAST_SCORER", "1").lower() not in ("0", "false", "no")
+    if not fast:
+        return EstimatorScorer(model, encoder)
+
+    try:
+        scorer = LogisticScorer.from_model(model, encoder)
+    except ValueError as e:
+        print(f"Fast scorer unavailable, using predict_proba: {e}")
+        return EstimatorScorer(model, encoder)
+
+    probes = _probe_matrix(encoder)
+    expected = model.predict_proba(encoder.to_frame(probes))[:, 1]
+    if np.max(np.abs(scorer.score_matrix(probes) - expected)) > SCORER_TOLERANCE:
+        print("Fast scorer disagrees with predict_proba, using predict_proba")
+        return EstimatorScorer(model, encoder)
+    return scorer
+
+
+def _probe_matrix(encoder: FeatureEncoder) -> np.ndarray:
+    """A few deterministic rows covering every column of the model"""
+    rng = np.random.RandomState(0)
+    probes = np.zeros((4, encoder.n_features))
+    probes[1] = 1.0
+    probes[2:] = rng.randint(0, 2, size=(2, encoder.n_features))
+    probes[:, encoder.numeric_positions[1]] = [0, 35, 80, 12]  # Age
+    return probes
@@ -0,0 +1,169 @@
+"""
+Feature encoding for the Dengue Risk Prediction model
+
+The logistic regression model was trained on five numeric columns followed by
+one-hot encoded categorical columns (``Area_Mirpur``, ``HouseType_Building``,
+...). Instead of rebuilding a 47-key dict of single-element lists for every
+request, ``FeatureEncoder`` reads ``model.feature_names_in_`` once, maps every
+categorical value to its column index and writes patients straight into a
+preallocated NumPy row.
+"""
+
+import threading
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+# Columns that are fed to the model as-is
+NUMERIC_FEATURES = ('Gender', 'Age', 'NS1', 'IgG', 'IgM')
+
+# Categorical inputs that were one-hot encoded during training
+CATEGORICAL_FEATURES = ('Area', 'AreaType', 'District', 'HouseType')
+
+# The dataset stores gender as text, the API sends 0=Female, 1=Male
+GENDER_CODES = {'Female': 0, 'Male': 1}
+
+
+class FeatureEncoder:
+    """Encode patient records into the column layout the model expects"""
+
+    def __init__(self, feature_names: Sequence[str]):
+        self.feature_names = [str(name) for name in feature_names]
+        self.n_features = len(self.feature_names)
+
+        self.numeric_index: Dict[str, int] = {}
+        self.category_index: Dict[str, Dict[str, int]] = {
+            field: {} for field in CATEGORICAL_FEATURES
+        }
+
+        for position, name in enumerate(self.feature_names):
+            if name in NUMERIC_FEATURES:
+                self.numeric_index[name] = position
+                continue
+            field, _, value = name.partition('_')
+            if field in self.category_index and value:
+                self.category_index[field][value] = position
+
+        missing = [name for name in NUMERIC_FEATURES if name not in self.numeric_index]
+        if missing:
+            raise ValueError(f"Model is missing numeric features: {missing}")
+
+        # Column positions of the numeric features, in NUMERIC_FEATURES order
+        self.numeric_positions = np.array(
+            [self.numeric_index[name] for name in NUMERIC_FEATURES], dtype=np.intp
+        )
+        self._local = threading.local()
+        self._columns = None
+
+    @classmethod
+    def from_model(cls, model) -> "FeatureEncoder":
+        """Build an encoder from a fitted estimator's ``feature_names_in_``"""
+        if not hasattr(model, 'feature_names_in_'):
+            raise ValueError("Model was not fitted with feature names")
+        return cls(model.feature_names_in_)
+
+    @property
+    def categories(self) -> Dict[str, List[str]]:
+        """Known values for each categorical field, in column order"""
+        return {field: list(values) for field, values in self.category_index.items()}
+
+    def _row_buffer(self) -> np.ndarray:
+        # One buffer per thread so concurrent requests never share a row
+        row = getattr(self._local, 'row', None)
+        if row is None:
+            row = np.zeros(self.n_features, dtype=np.float64)
+            self._local.row = row
+        return row
+
+    def active_columns(self, record: Mapping) -> Tuple[np.ndarray, List[int]]:
+        """
+        Return the numeric values (in NUMERIC_FEATURES order) and the column
+        indices of the one-hot features that are set for this record.
+        Unknown categorical values simply set no column, matching the
+        behaviour of the original hand-written encoding.
+        """
+        values = np.array(
+            [_numeric_value(name, record.get(name, 0)) for name in NUMERIC_FEATURES],
+            dtype=np.float64
+        )
+        indices = []
+        for field, lookup in self.category_index.items():
+            position = lookup.get(record.get(field))
+            if position is not None:
+                indices.append(position)
+        return values, indices
+
+    def encode_into(self, record: Mapping, out: np.ndarray) -> np.ndarray:
+        """Write a single record into ``out`` (length ``n_features``)"""
+        values, indices = self.active_columns(record)
+        out.fill(0.0)
+        out[self.numeric_positions] = values
+        if indices:
+            out[indices] = 1.0
+        return out
+
+    def encode(self, record: Mapping) -> np.ndarray:
+        """
+        Encode a single record into this thread's preallocated row.
+        The returned array is reused by the next call on the same thread,
+        copy it if it has to outlive the request.
+        """
+        return self.encode_into(record, self._row_buffer())
+
+    def encode_many(self, records: Iterable[Mapping]) -> np.ndarray:
+        """Encode several records into one ``(n, n_features)`` matrix"""
+        records = list(records)
+        matrix = np.zeros((len(records), self.n_features), dtype=np.float64)
+        for row, record in zip(matrix, records):
+            self.encode_into(record, row)
+        return matrix
+
+    def encode_frame(self, df) -> np.ndarray:
+        """
+        Vectorized encoding of a raw dataset DataFrame (columns as in
+        ``datasets/dataset.csv``) into a feature matrix.
+        """
+        n_rows = len(df)
+        matrix = np.zeros((n_rows, self.n_features), dtype=np.float64)
+        if n_rows == 0:
+            return matrix
+
+        for name, position in zip(NUMERIC_FEATURES, self.numeric_positions):
+            if name not in df.columns:
+                continue
+            column = df[name]
+            if name == 'Gender' and column.dtype.kind not in 'biuf':
+                column = column.map(lambda value: _numeric_value('Gender', value))
+            matrix[:, position] = column.to_numpy(dtype=np.float64)
+
+        rows = np.arange(n_rows)
+        for field, lookup in self.category_index.items():
+            if field not in df.columns or not lookup:
+                continue
+            positions = df[field].map(lookup).to_numpy(dtype=np.float64, na_value=-1)
+            known = positions >= 0
+            matrix[rows[known], positions[known].astype(np.intp)] = 1.0
+        return matrix
+
+    def to_frame(self, matrix: np.ndarray):
+        """
+        Wrap encoded rows in a DataFrame with the training column names,
+        for estimators that validate ``feature_names_in_``.
+        """
+        import pandas as pd
+
+        if self._columns is None:
+            self._columns = pd.Index(self.feature_names)
+        matrix = np.asarray(matrix, dtype=np.float64)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        return pd.DataFrame(matrix, columns=self._columns, copy=False)
+
+
+def _numeric_value(name: str, value) -> float:
+    """Convert a raw numeric input, accepting the dataset's text genders"""
+    if name == 'Gender' and isinstance(value, str):
+        return float(GENDER_CODES.get(value, 0))
+    if value is None:
+        return 0.0
+    return float(value)
@@ -4,7 +4,12 @@
 
 # 1️⃣ Import necessary libraries
 import joblib
-import pandas as pd
+
+try:
+    from core.feature_encoder import FeatureEncoder
+except ImportError:
+    # Running this script directly from the core directory
+    from feature_encoder import FeatureEncoder
 
 # 2️⃣ Load the trained Logistic Regression model
 model_path = "models\logistic_regression_model.joblib"  # <-- change path if needed
@@ -22,38 +27,29 @@ print(f"📊 Feature columns loaded ({len(feature_columns)} total).")
 #    from Mirpur (Undeveloped Area, Building HouseType, District Dhaka)
 
 new_data_raw = {
-    'Gender': [1],   # Male = 1, Female = 0
-    'Age': [35],
-    'NS1': [1],      # NS1 positive
-    'IgG': [1],      # IgG positive
-    'IgM': [0]       # IgM negative
+    'Gender': 1,     # Male = 1, Female = 0
+    'Age': 35,
+    'NS1': 1,        # NS1 positive
+    'IgG': 1,        # IgG positive
+    'IgM': 0,        # IgM negative
+    'Area': 'Mirpur',
+    'AreaType': 'Undeveloped',
+    'District': 'Dhaka',
+    'HouseType': 'Building'
 }
 
-# Convert to DataFrame
-new_df = pd.DataFrame(new_data_raw)
-
-# 5️⃣ Initialize all one-hot encoded columns (from training set) to 0
-for col in feature_columns:
-    if col not in new_df.columns:
-        new_df[col] = 0
-
-# 6️⃣ Set the one-hot encoded columns for the selected attributes
-new_df.loc[0, 'Area_Mirpur'] = 1
-new_df.loc[0, 'AreaType_Undeveloped'] = 1
-new_df.loc[0, 'District_Dhaka'] = 1
-new_df.loc[0, 'HouseType_Building'] = 1
-
-# 7️⃣ Ensure the correct column order
-new_data_for_prediction = new_df[feature_columns]
+# 5️⃣ Encode the one-hot columns in the exact training order
+encoder = FeatureEncoder.from_model(loaded_model)
+new_data_for_prediction = encoder.to_frame(encoder.encode(new_data_raw))
 
 print("\n🧾 Prepared Input Data for Prediction:")
 print(new_data_for_prediction.head())
 
-# 8️⃣ Make the prediction
+# 6️⃣ Make the prediction
 prediction = loaded_model.predict(new_data_for_prediction)
 probability = loaded_model.predict_proba(new_data_for_prediction)[0][1]
 
-# 9️⃣ Output the result
+# 7️⃣ Output the result
 print("\n🎯 Predicted Outcome:")
 print(f"Class: {prediction[0]}  (0 = Not Affected, 1 = Dengue Affected)")
 print(f"Predicted Probability of Dengue: {probability:.2%}")
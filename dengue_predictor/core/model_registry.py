@@ -0,0 +1,141 @@
+"""
+Process-wide registry of trained model artifacts
+
+The API and the structured embedder each called ``joblib.load`` on the same
+model file, doubling load time and memory per worker and leaving two copies
+that could disagree if the file changed in between. ``ModelRegistry`` loads
+each artifact once per process and hands every caller the same instance,
+with its NumPy arrays marked read-only so no caller can change the model
+under the others.
+
+With ``mmap=True`` (MODEL_MMAP=1) arrays are memory-mapped from the joblib
+file instead of copied into the process, so every worker on a machine
+shares one copy of the coefficients through the page cache. This needs an
+uncompressed joblib file; compressed ones are loaded into memory as usual.
+
+Each entry records its load time, file size, array bytes and the file's
+modification time, and reports itself stale once the file on disk changes.
+"""
+
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+DEFAULT_MODEL_FILE = 'logistic_regression_model.joblib'
+
+
+def default_model_path() -> str:
+    """Path of the trained model, works for both development and executable"""
+    if getattr(sys, 'frozen', False):
+        base_path = sys._MEIPASS
+    else:
+        base_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+    return os.path.join(base_path, 'core', 'models', DEFAULT_MODEL_FILE)
+
+
+def _freeze_arrays(model) -> int:
+    """Mark the model's array attributes read-only and return their size in bytes"""
+    total = 0
+    for value in vars(model).values():
+        if isinstance(value, np.ndarray):
+            if value.flags.writeable:
+                value.flags.writeable = False
+            total += value.nbytes
+    return total
+
+
+class LoadedModel:
+    """A model shared through the registry, with how it was loaded"""
+
+    def __init__(self, model, path: str, load_ms: float, file_bytes: int, array_bytes: int,
+                 mtime: float, mmap: bool):
+        self.model = model
+        self.path = path
+        self.load_ms = load_ms
+        self.file_bytes = file_bytes
+        self.array_bytes = array_bytes
+        self.mtime = mtime
+        self.mmap = mmap
+
+    @property
+    def stale(self) -> bool:
+        """Whether the file has changed since it was loaded"""
+        try:
+            return os.path.getmtime(self.path) != self.mtime
+        except OSError:
+            return True
+
+    def info(self) -> Dict:
+        return {
+            "path": self.path,
+            "type": type(self.model).__name__,
+            "load_ms": round(self.load_ms, 2),
+            "file_bytes": self.file_bytes,
+            "array_bytes": self.array_bytes,
+            "memory_mapped": self.mmap,
+            "stale": self.stale
+        }
+
+
+class ModelRegistry:
+    """Loads each model file once per process and shares the instance"""
+
+    def __init__(self, mmap: bool = False):
+        self.mmap = mmap
+        self._models: Dict[str, LoadedModel] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ModelRegistry":
+        return cls(mmap=os.getenv("MODEL_MMAP", "0") == "1")
+
+    def load(self, path: Optional[str] = None) -> LoadedModel:
+        """Registry entry for ``path`` (default: the trained model), loading it on first use"""
+        key = os.path.realpath(path or default_model_path())
+        entry = self._models.get(key)
+        if entry is not None:
+            return entry
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is None:
+                entry = self._load(key)
+                self._models[key] = entry
+            return entry
+
+    def get(self, path: Optional[str] = None):
+        """Shared, read-only model for ``path``"""
+        return self.load(path).model
+
+    def reload(self, path: Optional[str] = None) -> LoadedModel:
+        """Load ``path`` again, e.g. after the file was replaced; later calls get the new model"""
+        key = os.path.realpath(path or default_model_path())
+        with self._lock:
+            self._models[key] = self._load(key)
+            return self._models[key]
+
+    def _load(self, path: str) -> LoadedModel:
+        import joblib
+
+        mtime = os.path.getmtime(path)
+        start = time.perf_counter()
+        model = joblib.load(path, mmap_mode='r' if self.mmap else None)
+        load_ms = (time.perf_counter() - start) * 1000
+        array_bytes = _freeze_arrays(model)
+        return LoadedModel(model, path, load_ms, os.path.getsize(path), array_bytes, mtime, self.mmap)
+
+    def stats(self) -> List[Dict]:
+        with self._lock:
+            entries = list(self._models.values())
+        return [entry.info() for entry in entries]
+
+
+registry = ModelRegistry.from_env()
+
+
+def get_model(path: Optional[str] = None):
+    """The process-wide shared model loaded from ``path`` (default: the trained model)"""
+    return registry.get(path)
@@ -3,6 +3,12 @@ from chromadb.config import Settings
 import pandas as pd
 from datetime import datetime
 
+try:
+    from db.area_aggregates import AreaAggregateStore, default_store_path, totals_from_metadata
+except ImportError:
+    # Imported with the db directory itself on sys.path
+    from area_aggregates import AreaAggregateStore, default_store_path, totals_from_metadata
+
 # Initialize ChromaDB
 client = chromadb.Client(Settings(
     persist_directory="./dengue_vector_db",
@@ -15,10 +21,28 @@ collection = client.get_or_create_collection(
     metadata={"description": "Historical dengue case data with predictions"}
 )
 
+# Running per-area totals, updated with every case added below
+area_aggregates = AreaAggregateStore(default_store_path("chroma"))
+
+def _collection_metadata():
+    return collection.get(include=["metadatas"])["metadatas"]
+
+# A collection that already holds cases is counted into the store once
+if not area_aggregates.seeded:
+    try:
+        area_aggregates.seed_from(_collection_metadata)
+    except Exception as e:
+        print(f"Warning: Could not seed area aggregates from the collection: {e}")
+
 def add_case_to_vector_db(case_data: dict, prediction: float):
     """
     Store a dengue case with its context in vector DB
     """
+    _add_case(case_data, prediction)
+    area_aggregates.save()
+
+def _add_case(case_data: dict, prediction: float):
+    """Add one case to the collection and the in-memory aggregates, without saving them"""
     # Create semantic description
     description = f"""
     Location: {case_data['District']} - {case_data['Area']} ({case_data['AreaType']})
@@ -31,21 +55,23 @@ def add_case_to_vector_db(case_data: dict, prediction: float):
     Outcome: {'Dengue' if case_data.get('Outcome', 0)==1 else 'No Dengue'}
     """
     
+    metadata = {
+        "district": case_data['District'],
+        "area": case_data['Area'],
+        "risk_score": prediction,
+        "outcome": case_data.get('Outcome', 0),
+        "timestamp": datetime.now().isoformat(),
+        "age": case_data['Age'],
+        "ns1": case_data['NS1'],
+        "igm": case_data['IgM']
+    }
     # Store with metadata
     collection.add(
         documents=[description],
-        metadatas=[{
-            "district": case_data['District'],
-            "area": case_data['Area'],
-            "risk_score": prediction,
-            "outcome": case_data.get('Outcome', 0),
-            "timestamp": datetime.now().isoformat(),
-            "age": case_data['Age'],
-            "ns1": case_data['NS1'],
-            "igm": case_data['IgM']
-        }],
+        metadatas=[metadata],
         ids=[f"case_{datetime.now().timestamp()}"]
     )
+    area_aggregates.record_metadata([metadata])
 
 def search_similar_cases(query: str, n_results: int = 5):
     """
@@ -59,33 +85,27 @@ def search_similar_cases(query: str, n_results: int = 5):
 
 def get_area_risk_history(district: str, area: str):
     """
-    Get historical risk for specific area
+    Get historical risk for specific area from the aggregate store, or from
+    the collection while the store has not been seeded
     """
-    results = collection.query(
-        query_texts=[f"{district} {area} dengue risk"],
-        where={
-            "$and": [
-                {"district": district},
-                {"area": area}
-            ]
-        },
-        n_results=50
+    if area_aggregates.seeded:
+        return area_aggregates.area_statistics(district, area)
+    results = collection.get(
+        where={"$and": [{"district": district}, {"area": area}]},
+        include=["metadatas"]
     )
-    
-    if not results['metadatas'][0]:
+    rows = totals_from_metadata(results["metadatas"])
+    if (district, area) not in rows:
         return None
-    
-    # Calculate statistics
-    risk_scores = [m['risk_score'] for m in results['metadatas'][0]]
-    outcomes = [m['outcome'] for m in results['metadatas'][0]]
-    
+    count, risk_sum, positive, _, _ = rows[(district, area)]
     return {
         "area": area,
         "district": district,
-        "total_cases": len(risk_scores),
-        "avg_risk_score": sum(risk_scores) / len(risk_scores),
-        "positive_cases": sum(outcomes),
-        "positive_rate": sum(outcomes) / len(outcomes) if outcomes else 0
+        "total_cases": int(count),
+        "avg_risk_score": risk_sum / count,
+        "positive_cases": int(positive),
+        "positive_rate": positive / count,
+        "truncated": False
     }
 
 def batch_load_dataset(df: pd.DataFrame, model):
@@ -112,11 +132,13 @@ def batch_load_dataset(df: pd.DataFrame, model):
             'Outcome': row.get('Outcome', 0)
         }
         
-        add_case_to_vector_db(case_data, prediction)
+        _add_case(case_data, prediction)
         
         if (idx + 1) % 100 == 0:
             print(f"Processed {idx + 1} cases...")
     
+    # One write of the aggregate file for the whole batch
+    area_aggregates.save()
     print("✅ Vector database populated successfully!")
 
 # Example usage
@@ -0,0 +1,605 @@
+"""
+Local in-process vector index, a drop-in for PineconeDB
+
+Cases are kept in a NumPy float32 matrix with their metadata held in
+parallel column arrays, so the API runs without network access or a
+PINECONE_API_KEY. Search is brute-force cosine similarity, or IVF (inverted
+file over k-means centroids) once ``build_ivf`` has been called.
+
+With a ``path`` every column is a memory-mapped file that grows in place, and
+the string fields (ids, descriptions) are appended to a JSON-lines log, so
+writes land on disk without rewriting the whole index. The header (size,
+dictionaries, centroids) is rewritten every ``flush_interval`` seconds and
+on ``close``, not on every upsert; rows written after the last header
+flush are dropped if the process dies.
+
+Select this backend with VECTOR_DB_BACKEND=local; LOCAL_VECTOR_DB_PATH sets
+the storage directory (empty for an in-memory index). LOCAL_VECTOR_DB_IVF_LISTS
+builds an IVF index with that many lists once the index holds enough cases,
+or run ``python -m db.LocalVectorDB build-ivf --lists N``.
+"""
+
+import argparse
+import atexit
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from db.case_records import build_case_vectors
+    from db.bulk_loader import bulk_load_cases
+    from db.embeddings import check_index_layout, is_empty, load_embedder
+    from db.area_aggregates import AreaAggregateStore, default_store_path
+except ImportError:
+    # Imported with the db directory itself on sys.path
+    from case_records import build_case_vectors
+    from bulk_loader import bulk_load_cases
+    from embeddings import check_index_layout, is_empty, load_embedder
+    from area_aggregates import AreaAggregateStore, default_store_path
+
+# Numeric metadata columns and their storage types
+METADATA_COLUMNS = {
+    "risk_score": np.float32,
+    "outcome": np.int8,
+    "timestamp": np.float64,
+    "age": np.int16,
+    "ns1": np.int8,
+    "igm": np.int8,
+    "district": np.int32,  # code into the district dictionary
+    "area": np.int32,      # code into the area dictionary
+    "ivf_list": np.int32,  # IVF list of the row, -1 before build_ivf
+}
+
+HEADER_FILE = "index.json"
+RECORDS_FILE = "records.jsonl"
+
+
+class LocalVectorIndex:
+    """Float32 vector matrix with column metadata and cosine search"""
+
+    def __init__(self, dimension: int, path: Optional[str] = None, capacity: int = 1024,
+                 flush_interval: float = 5.0):
+        self.dimension = int(dimension)
+        self.path = path
+        self.flush_interval = flush_interval
+        # Embedding layout of the stored vectors, recorded by the module API
+        self.layout: Optional[str] = None
+        self.size = 0
+        self.capacity = 0
+        self.ids: List[str] = []
+        self.descriptions: List[str] = []
+        self._row_of: Dict[str, int] = {}
+        self._records_end: Optional[int] = None
+        self.dictionaries: Dict[str, List[str]] = {"district": [], "area": []}
+        self._codes: Dict[str, Dict[str, int]] = {"district": {}, "area": {}}
+        self._columns: Dict[str, np.ndarray] = {}
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._flusher = None
+        self._closed = threading.Event()
+
+        self.centroids: Optional[np.ndarray] = None
+        self._ivf_rows: List[List[int]] = []
+        # Row numbers of every (district code, area code) pair
+        self._area_rows: Dict[Tuple[int, int], List[int]] = {}
+
+        if path and os.path.exists(os.path.join(path, HEADER_FILE)):
+            self._open(path)
+        else:
+            if path:
+                os.makedirs(path, exist_ok=True)
+                open(os.path.join(path, RECORDS_FILE), 'w').close()
+            self._allocate(max(capacity, 1))
+            self._write_header()
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+    def _column_specs(self):
+        yield "vectors", np.float32, (self.dimension,)
+        for name, dtype in METADATA_COLUMNS.items():
+            yield name, dtype, ()
+
+    def _column_file(self, name: str) -> str:
+        return os.path.join(self.path, f"{name}.bin")
+
+    def _allocate(self, capacity: int):
+        """Create or grow every column to ``capacity`` rows"""
+        for name, dtype, suffix in self._column_specs():
+            shape = (capacity,) + suffix
+            if self.path:
+                filename = self._column_file(name)
+                nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+                old = self._columns.pop(name, None)
+                if old is not None:
+                    old.flush()
+                    del old
+                with open(filename, 'ab') as f:
+                    f.truncate(nbytes)
+                self._columns[name] = np.memmap(filename, dtype=dtype, mode='r+', shape=shape)
+            else:
+                column = np.zeros(shape, dtype=dtype)
+                if name in self._columns:
+                    column[:self.size] = self._columns[name][:self.size]
+                self._columns[name] = column
+            if name == "ivf_list" and capacity > self.capacity:
+                self._columns[name][self.capacity:] = -1
+        self.capacity = capacity
+
+    def _open(self, path: str):
+        with open(os.path.join(path, HEADER_FILE)) as f:
+            header = json.load(f)
+        self.dimension = header["dimension"]
+        self.layout = header.get("embedding")
+        self.dictionaries = header["dictionaries"]
+        self._codes = {key: {value: i for i, value in enumerate(values)}
+                       for key, values in self.dictionaries.items()}
+        with open(os.path.join(path, RECORDS_FILE), 'rb') as f:
+            valid = 0
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                record = json.loads(line)
+                row = record.get("row")
+                if row is not None:
+                    # A later version of a row's record
+                    self.descriptions[row] = record["description"]
+                elif len(self.ids) < header["size"]:
+                    self._row_of[record["id"]] = len(self.ids)
+                    self.ids.append(record["id"])
+                    self.descriptions.append(record["description"])
+                else:
+                    break
+                valid += len(line)
+        # Records of rows the header never counted are cut off before the
+        # next append, so new rows line up with their records again
+        self._records_end = valid
+        self.size = len(self.ids)
+        self.capacity = header["capacity"]
+        for name, dtype, suffix in self._column_specs():
+            self._columns[name] = np.memmap(
+                self._column_file(name), dtype=dtype, mode='r+', shape=(self.capacity,) + suffix
+            )
+        if header.get("centroids"):
+            self.centroids = np.asarray(header["centroids"], dtype=np.float32)
+            self._rebuild_ivf_lists()
+        self._rebuild_area_rows()
+
+    def _write_header(self):
+        if not self.path:
+            return
+        header = {
+            "dimension": self.dimension,
+            "embedding": self.layout,
+            "size": self.size,
+            "capacity": self.capacity,
+            "dictionaries": self.dictionaries,
+            "centroids": self.centroids.tolist() if self.centroids is not None else None,
+        }
+        tmp_path = os.path.join(self.path, HEADER_FILE + ".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(header, f)
+        os.replace(tmp_path, os.path.join(self.path, HEADER_FILE))
+
+    def flush(self):
+        """Persist memory-mapped columns and the header to disk"""
+        with self._lock:
+            self._dirty = False
+            if not self.path:
+                return
+            for column in self._columns.values():
+                column.flush()
+            self._write_header()
+
+    def close(self):
+        """Stop the flush timer and write everything to disk"""
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.flush()
+
+    def _mark_dirty(self):
+        self._dirty = True
+        if not self.path:
+            return
+        if self.flush_interval <= 0:
+            self.flush()
+        elif self._flusher is None and not self._closed.is_set():
+            self._flusher = threading.Thread(target=self._flush_periodically, name="local-vector-db-flush",
+                                             daemon=True)
+            self._flusher.start()
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval):
+            if self._dirty:
+                self.flush()
+
+    def _code(self, field: str, value) -> int:
+        value = str(value)
+        codes = self._codes[field]
+        if value not in codes:
+            codes[value] = len(self.dictionaries[field])
+            self.dictionaries[field].append(value)
+        return codes[value]
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    def upsert(self, vectors: List[Tuple[str, List[float], dict]]):
+        """
+        Write (id, values, metadata) tuples, Pinecone style: an id already
+        in the index is overwritten in place, new ids are appended
+        """
+        if not vectors:
+            return
+        with self._lock:
+            # The last vector of an id repeated within the batch wins
+            vectors = list({vector[0]: vector for vector in vectors}.values())
+            existing = [vector for vector in vectors if vector[0] in self._row_of]
+            new = [vector for vector in vectors if vector[0] not in self._row_of]
+            needed = self.size + len(new)
+            if needed > self.capacity:
+                capacity = self.capacity
+                while capacity < needed:
+                    capacity *= 2
+                self._allocate(capacity)
+
+            overwritten = [self._row_of[vector[0]] for vector in existing]
+            for row in overwritten:
+                self._detach(row)
+            rows = np.asarray(overwritten + list(range(self.size, needed)), dtype=np.intp)
+            vectors = existing + new
+
+            values = np.asarray([vector[1] for vector in vectors], dtype=np.float32)
+            norms = np.linalg.norm(values, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            self._columns["vectors"][rows] = values / norms
+
+            metadatas = [vector[2] for vector in vectors]
+            columns = self._columns
+            columns["risk_score"][rows] = [m.get("risk_score", 0.0) for m in metadatas]
+            columns["outcome"][rows] = [m.get("outcome", 0) or 0 for m in metadatas]
+            columns["timestamp"][rows] = [_to_epoch(m.get("timestamp")) for m in metadatas]
+            columns["age"][rows] = [m.get("age", 0) for m in metadatas]
+            columns["ns1"][rows] = [m.get("ns1", 0) for m in metadatas]
+            columns["igm"][rows] = [m.get("igm", 0) for m in metadatas]
+            columns["district"][rows] = [self._code("district", m.get("district")) for m in metadatas]
+            columns["area"][rows] = [self._code("area", m.get("area")) for m in metadatas]
+
+            if self.centroids is not None:
+                lists = np.argmax(columns["vectors"][rows] @ self.centroids.T, axis=1)
+                columns["ivf_list"][rows] = lists
+                for row, list_id in zip(rows, lists):
+                    self._ivf_rows[list_id].append(int(row))
+
+            for row in rows:
+                key = (int(columns["district"][row]), int(columns["area"][row]))
+                self._area_rows.setdefault(key, []).append(int(row))
+
+            records = []
+            for row, vector in zip(overwritten, existing):
+                self.descriptions[row] = vector[2].get("description", "")
+                records.append({"id": vector[0], "description": self.descriptions[row], "row": row})
+            for vector in new:
+                self._row_of[vector[0]] = len(self.ids)
+                self.ids.append(vector[0])
+                self.descriptions.append(vector[2].get("description", ""))
+                records.append({"id": vector[0], "description": self.descriptions[-1]})
+            if self.path:
+                with open(os.path.join(self.path, RECORDS_FILE), 'a') as f:
+                    if self._records_end is not None:
+                        f.truncate(self._records_end)
+                        self._records_end = None
+                    f.write("".join(json.dumps(record) + "\n" for record in records))
+            self.size = needed
+            self._mark_dirty()
+
+    def _detach(self, row: int):
+        """Remove a row from the area and IVF lists before it is overwritten"""
+        columns = self._columns
+        self._area_rows[(int(columns["district"][row]), int(columns["area"][row]))].remove(row)
+        if self.centroids is not None:
+            self._ivf_rows[int(columns["ivf_list"][row])].remove(row)
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+    def build_ivf(self, n_lists: int = None, iterations: int = 10, sample_size: int = 50000, seed: int = 0):
+        """
+        Cluster the stored vectors with spherical k-means and assign every
+        row to its nearest centroid. Queries then only scan ``nprobe`` lists.
+        """
+        with self._lock:
+            if self.size == 0:
+                raise ValueError("Cannot build an IVF index over an empty index")
+            if n_lists is None:
+                n_lists = max(1, int(np.sqrt(self.size)))
+            n_lists = min(n_lists, self.size)
+            vectors = self._columns["vectors"][:self.size]
+            rng = np.random.RandomState(seed)
+            sample = vectors[rng.choice(self.size, size=min(sample_size, self.size), replace=False)]
+
+            centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+            for _ in range(iterations):
+                assignment = np.argmax(sample @ centroids.T, axis=1)
+                for list_id in range(n_lists):
+                    members = sample[assignment == list_id]
+                    if len(members):
+                        centroid = members.sum(axis=0)
+                        norm = np.linalg.norm(centroid)
+                        centroids[list_id] = centroid / norm if norm else centroid
+
+            self.centroids = centroids.astype(np.float32)
+            assignment = np.empty(self.size, dtype=np.int32)
+            for start in range(0, self.size, 65536):
+                block = vectors[start:start + 65536]
+                assignment[start:start + len(block)] = np.argmax(block @ self.centroids.T, axis=1)
+            self._columns["ivf_list"][:self.size] = assignment
+            self._rebuild_ivf_lists()
+            self.flush()
+
+    def _rebuild_ivf_lists(self):
+        assignment = np.asarray(self._columns["ivf_list"][:self.size])
+        order = np.argsort(assignment, kind="stable")
+        bounds = np.searchsorted(assignment[order], np.arange(len(self.centroids) + 1))
+        self._ivf_rows = [order[bounds[i]:bounds[i + 1]].tolist() for i in range(len(self.centroids))]
+
+    def _rebuild_area_rows(self):
+        keys = (np.asarray(self._columns["district"][:self.size], dtype=np.int64) << 32) \
+            | np.asarray(self._columns["area"][:self.size], dtype=np.int64)
+        order = np.argsort(keys, kind="stable")
+        unique, starts = np.unique(keys[order], return_index=True)
+        bounds = list(starts) + [self.size]
+        self._area_rows = {
+            (int(key >> 32), int(key & 0xFFFFFFFF)): order[bounds[i]:bounds[i + 1]].tolist()
+            for i, key in enumerate(unique)
+        }
+
+    def area_rows(self, district: str, area: str) -> np.ndarray:
+        """Row numbers of every case stored for a district and area"""
+        with self._lock:
+            key = (self._codes["district"].get(district, -1), self._codes["area"].get(area, -1))
+            return np.asarray(self._area_rows.get(key, ()), dtype=np.intp)
+
+    def _filter_mask(self, rows: Optional[np.ndarray], filter: Optional[dict]) -> Optional[np.ndarray]:
+        """Boolean mask over ``rows`` (or all rows) for a Pinecone-style $eq filter"""
+        if not filter:
+            return None
+        mask = None
+        for field, condition in filter.items():
+            value = condition.get("$eq") if isinstance(condition, dict) else condition
+            if field in ("district", "area"):
+                code = self._codes[field].get(str(value), -1)
+                column = self._columns[field]
+                values = column[:self.size] if rows is None else column[rows]
+                field_mask = values == code
+            elif field in METADATA_COLUMNS:
+                column = self._columns[field]
+                values = column[:self.size] if rows is None else column[rows]
+                field_mask = values == value
+            else:
+                raise ValueError(f"Unsupported filter field '{field}'")
+            mask = field_mask if mask is None else mask & field_mask
+        return mask
+
+    def query(self, vector, top_k: int = 5, include_metadata: bool = True,
+              filter: Optional[dict] = None, nprobe: int = 8, **kwargs) -> Dict:
+        """Cosine top-k search, returning Pinecone-shaped matches"""
+        with self._lock:
+            if self.size == 0:
+                return {"matches": []}
+            query = np.asarray(vector, dtype=np.float32)
+            norm = np.linalg.norm(query)
+            if norm:
+                query = query / norm
+
+            if self.centroids is not None:
+                probe = np.argsort(-(self.centroids @ query))[:nprobe]
+                rows = np.fromiter(
+                    (row for list_id in probe for row in self._ivf_rows[list_id]), dtype=np.intp
+                )
+                scores = self._columns["vectors"][rows] @ query
+            else:
+                rows = None
+                scores = self._columns["vectors"][:self.size] @ query
+
+            mask = self._filter_mask(rows, filter)
+            if mask is not None:
+                rows = np.flatnonzero(mask) if rows is None else rows[mask]
+                scores = scores[mask]
+
+            k = min(top_k, len(scores))
+            if k == 0:
+                return {"matches": []}
+            best = np.argpartition(-scores, k - 1)[:k]
+            best = best[np.argsort(-scores[best])]
+            row_ids = best if rows is None else rows[best]
+            return {
+                "matches": [
+                    {
+                        "id": self.ids[row],
+                        "score": float(scores[i]),
+                        "metadata": self.metadata(row) if include_metadata else {}
+                    }
+                    for i, row in zip(best, row_ids)
+                ]
+            }
+
+    def metadata(self, row: int) -> Dict:
+        columns = self._columns
+        return {
+            "district": self.dictionaries["district"][columns["district"][row]],
+            "area": self.dictionaries["area"][columns["area"][row]],
+            "risk_score": float(columns["risk_score"][row]),
+            "outcome": int(columns["outcome"][row]),
+            "timestamp": datetime.fromtimestamp(float(columns["timestamp"][row])).isoformat(),
+            "age": int(columns["age"][row]),
+            "ns1": int(columns["ns1"][row]),
+            "igm": int(columns["igm"][row]),
+            "description": self.descriptions[row]
+        }
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only view of a metadata column over the stored rows"""
+        return self._columns[name][:self.size]
+
+
+def _to_epoch(timestamp) -> float:
+    if timestamp is None:
+        return datetime.now().timestamp()
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    return datetime.fromisoformat(timestamp).timestamp()
+
+
+# ----------------------------------------------------------------------
+# Module-level API, the same functions PineconeDB exposes
+# ----------------------------------------------------------------------
+embedder = load_embedder()
+
+_default_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'local_vector_db')
+index_path = os.getenv("LOCAL_VECTOR_DB_PATH", _default_path) or None
+index = LocalVectorIndex(embedder.dimension, path=index_path,
+                         flush_interval=float(os.getenv("LOCAL_VECTOR_DB_FLUSH_INTERVAL", "5")))
+# Write the header still pending when the process exits
+atexit.register(index.close)
+if index.dimension != embedder.dimension:
+    embedder = load_embedder(dimension=index.dimension)
+check_index_layout(index.layout, index.size, embedder, where=f"local vector index at {index_path}")
+if index.layout != embedder.layout:
+    index.layout = embedder.layout
+    index.flush()
+
+area_aggregates = AreaAggregateStore(default_store_path("local") if index_path else None)
+
+# IVF lists to build once the index holds at least that many cases (0: brute force)
+IVF_LISTS = int(os.getenv("LOCAL_VECTOR_DB_IVF_LISTS", "0"))
+# IVF lists scanned per query
+IVF_NPROBE = int(os.getenv("LOCAL_VECTOR_DB_NPROBE", "8"))
+
+def _build_ivf_if_configured():
+    if IVF_LISTS > 0 and index.centroids is None and index.size >= IVF_LISTS:
+        index.build_ivf(n_lists=IVF_LISTS)
+
+_build_ivf_if_configured()
+
+def _rebuild_area_aggregates():
+    """Recompute the aggregate store from the rows held by the index"""
+    area_aggregates.clear()
+    with index._lock:
+        risk_scores = index.column("risk_score")
+        outcomes = index.column("outcome")
+        timestamps = index.column("timestamp")
+        for (district, area), rows in index._area_rows.items():
+            area_aggregates.add_totals(
+                index.dictionaries["district"][district],
+                index.dictionaries["area"][area],
+                len(rows),
+                float(risk_scores[rows].astype(np.float64).sum()),
+                int(outcomes[rows].sum()),
+                float(timestamps[rows].min()),
+                float(timestamps[rows].max())
+            )
+    area_aggregates.save()
+
+# The store is derived data, so resync it if it no longer matches the index
+if not area_aggregates.seeded or area_aggregates.total_cases != index.size:
+    _rebuild_area_aggregates()
+
+def _embed_cases(cases: List[dict], predictions: List[float], descriptions: List[str]):
+    """
+    Embed a batch of cases in one vectorized call
+    """
+    return embedder.embed_cases(cases, predictions, descriptions)
+
+def add_case_to_vector_db(case_data: dict, prediction: float):
+    """
+    Store a dengue case with its context in the local vector index
+    """
+    index.upsert(build_case_vectors([case_data], [prediction], _embed_cases))
+    area_aggregates.record(case_data, prediction)
+    area_aggregates.save()
+
+def add_cases_to_vector_db(cases: List[Tuple[dict, float]]):
+    """
+    Store several (case_data, prediction) pairs in one append
+    """
+    if not cases:
+        return
+    case_list = [case_data for case_data, _ in cases]
+    predictions = [prediction for _, prediction in cases]
+    index.upsert(build_case_vectors(case_list, predictions, _embed_cases))
+    area_aggregates.record_many(cases)
+    area_aggregates.save()
+
+def search_similar_cases(query: str, n_results: int = 5):
+    """
+    Find similar historical cases in the local vector index
+    """
+    query_embedding = embedder.embed_query(query)
+    if is_empty(query_embedding):
+        # Nothing in the query to compare cases by
+        return {"matches": []}
+    return index.query(vector=query_embedding, top_k=n_results, include_metadata=True, nprobe=IVF_NPROBE)
+
+def get_area_statistics(district: str, area: str):
+    """
+    Get historical risk for specific area over every stored case
+    """
+    return area_aggregates.area_statistics(district, area)
+
+def get_high_risk_areas(threshold: float = 0.7):
+    """
+    Get areas whose average risk score is above threshold
+    """
+    return area_aggregates.high_risk_areas(threshold)
+
+def batch_load_dataset(df: pd.DataFrame, model, chunk_size: int = 1000, max_concurrency: int = 1):
+    """
+    Load entire dataset into the local vector index with predictions
+    """
+    stats = bulk_load_cases(
+        df,
+        model,
+        index,
+        _embed_cases,
+        chunk_size=chunk_size,
+        max_concurrency=max_concurrency,
+        # Only chunks whose upsert succeeded count towards the area totals
+        on_upserted=lambda vectors: area_aggregates.record_metadata([m for _, _, m in vectors])
+    )
+    area_aggregates.save()
+    _build_ivf_if_configured()
+    index.flush()
+    return stats
+
+def close():
+    """Write the index header and the area totals, e.g. on API shutdown"""
+    index.close()
+    area_aggregates.save()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the local vector index at LOCAL_VECTOR_DB_PATH")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build-ivf", help="Cluster the stored vectors so queries scan only a few lists")
+    build.add_argument("--lists", type=int, default=IVF_LISTS or None,
+                       help="Number of IVF lists (default: LOCAL_VECTOR_DB_IVF_LISTS or sqrt of the case count)")
+    build.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+
+    if index_path is None:
+        parser.error("LOCAL_VECTOR_DB_PATH is empty, an in-memory index cannot be rebuilt")
+    if args.command == "build-ivf":
+        index.build_ivf(n_lists=args.lists, iterations=args.iterations)
+        index.close()
+        print(f"Built {len(index.centroids)} IVF lists over {index.size} cases in {index_path}")
+
+
+if __name__ == "__main__":
+    main()
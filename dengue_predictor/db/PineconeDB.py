@@ -1,11 +1,23 @@
 from pinecone import Pinecone, ServerlessSpec
 import pandas as pd
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import os
-import hashlib
+import threading
 from dotenv import load_dotenv
 
+try:
+    from db.case_records import build_case_vectors
+    from db.bulk_loader import bulk_load_cases
+    from db.embeddings import check_index_layout, is_empty, load_embedder
+    from db.area_aggregates import AreaAggregateStore, default_store_path, totals_from_metadata
+except ImportError:
+    # Imported with the db directory itself on sys.path
+    from case_records import build_case_vectors
+    from bulk_loader import bulk_load_cases
+    from embeddings import check_index_layout, is_empty, load_embedder
+    from area_aggregates import AreaAggregateStore, default_store_path, totals_from_metadata
+
 # Load environment variables
 load_dotenv()
 
@@ -16,93 +28,115 @@ if not api_key:
 
 # Use the correct initialization method with a free plan supported region
 pc = Pinecone(api_key=api_key)
-index_name = "dengue-cases"
+index_name = os.getenv("PINECONE_INDEX_NAME", "dengue-cases")
+
+# Index tag recording the embedding layout of the stored vectors
+LAYOUT_TAG = "embedding"
 
-# Create or connect to index
+# Create or connect to index. An existing index keeps its dimension and the
+# embedder is sized to match it; a new one uses EMBEDDING_DIMENSION or the
+# embedder's compact natural size.
 if index_name not in pc.list_indexes().names():
+    embedder = load_embedder()
     pc.create_index(
         name=index_name,
-        dimension=1536,  # Standard dimension for text embeddings
+        dimension=embedder.dimension,
         metric="cosine",
         spec=ServerlessSpec(
             cloud="aws",
             region="us-east-1"  # Free plan supported region
-        )
+        ),
+        tags={LAYOUT_TAG: embedder.layout}
     )
+    index = pc.Index(index_name)
+else:
+    description = pc.describe_index(index_name)
+    embedder = load_embedder(dimension=description.dimension)
+    index = pc.Index(index_name)
+    # Vectors of another layout (e.g. the old 1536-d hash embeddings) would be
+    # compared with the new ones as if they meant the same thing
+    stored_layout = (getattr(description, "tags", None) or {}).get(LAYOUT_TAG)
+    if stored_layout != embedder.layout:
+        vector_count = index.describe_index_stats().total_vector_count
+        check_index_layout(stored_layout, vector_count, embedder, where=f"Pinecone index '{index_name}'")
+        pc.configure_index(index_name, tags={LAYOUT_TAG: embedder.layout})
+
+# Pinecone returns at most 1000 matches with metadata per query
+AREA_STATS_MAX_CASES = 1000
+
+# Filtered queries still need a vector; any non-zero one selects the same set
+_filter_probe = [1.0] + [0.0] * (embedder.dimension - 1)
+
+# Running per-area totals, updated with every write so statistics need no query
+area_aggregates = AreaAggregateStore(default_store_path("pinecone"))
 
-index = pc.Index(index_name)
+# Seconds get_high_risk_areas waits for the aggregate store to be seeded
+# before answering from a capped query instead
+AREA_SEED_WAIT = float(os.getenv("AREA_SEED_WAIT", "1"))
 
-def _generate_embedding(text: str) -> List[float]:
+def _index_metadata():
+    """Metadata of every vector in the index, listed and fetched page by page"""
+    for ids in index.list():
+        fetched = index.fetch(ids=list(ids))
+        for vector in fetched.vectors.values():
+            yield vector.metadata or {}
+
+def seed_area_aggregates():
+    """Count the cases already in the index into the aggregate store, once"""
+    try:
+        area_aggregates.seed_from(_index_metadata)
+    except Exception as e:
+        print(f"Warning: Could not seed area aggregates from the index, statistics keep querying it: {e}")
+
+# An index that already holds cases is counted in the background; until then
+# area statistics are answered by filtered queries
+_seeder = None
+if not area_aggregates.seeded:
+    _seeder = threading.Thread(target=seed_area_aggregates, name="area-aggregates-seed", daemon=True)
+    _seeder.start()
+
+def _embed_cases(cases: List[dict], predictions: List[float], descriptions: List[str]):
     """
-    Generate embedding for text using a simple hash-based approach
-    In production, you would use a proper embedding model
+    Embed a batch of cases in one vectorized call
     """
-    # Simple hash-based embedding for demonstration
-    hash_object = hashlib.md5(text.encode())
-    hex_dig = hash_object.hexdigest()
-    
-    # Convert hash to float values between 0 and 1
-    embedding = []
-    for i in range(0, len(hex_dig), 4):
-        chunk = hex_dig[i:i+4]
-        # Convert hexadecimal to integer and normalize
-        val = int(chunk, 16) / 65535.0
-        embedding.append(val)
-        if len(embedding) >= 1536:
-            break
-    
-    # Pad or truncate to exact dimension
-    while len(embedding) < 1536:
-        embedding.append(0.0)
-    
-    return embedding[:1536]
+    return embedder.embed_cases(cases, predictions, descriptions)
 
 def add_case_to_vector_db(case_data: dict, prediction: float):
     """
     Store a dengue case with its context in Pinecone vector DB
     """
-    # Create semantic description
-    description = f"""
-    Location: {case_data['District']} - {case_data['Area']} ({case_data.get('AreaType', 'Unknown')})
-    Patient: Age {case_data['Age']}, Gender {'Male' if case_data['Gender']==1 else 'Female'}
-    Lab Results: NS1={'Positive' if case_data['NS1']==1 else 'Negative'}, 
-                 IgG={'Positive' if case_data['IgG']==1 else 'Negative'}, 
-                 IgM={'Positive' if case_data['IgM']==1 else 'Negative'}
-    Housing: {case_data.get('HouseType', 'Unknown')}
-    Risk Score: {prediction:.2%}
-    Outcome: {'Dengue' if case_data.get('Outcome', 0)==1 else 'No Dengue'}
+    vectors = build_case_vectors([case_data], [prediction], _embed_cases)
+    index.upsert(vectors)
+    area_aggregates.record_metadata([metadata for _, _, metadata in vectors])
+    area_aggregates.save()
+
+def add_cases_to_vector_db(cases: List[Tuple[dict, float]]):
     """
-    
-    # Generate embedding
-    embedding = _generate_embedding(description)
-    
-    # Create metadata
-    metadata = {
-        "district": case_data['District'],
-        "area": case_data['Area'],
-        "risk_score": prediction,
-        "outcome": case_data.get('Outcome', 0),
-        "timestamp": datetime.now().isoformat(),
-        "age": case_data['Age'],
-        "ns1": case_data['NS1'],
-        "igm": case_data['IgM'],
-        "description": description
-    }
-    
-    # Store in Pinecone
-    vector_id = f"case_{datetime.now().timestamp()}"
-    index.upsert([(vector_id, embedding, metadata)])
+    Store several (case_data, prediction) pairs with a single bulk upsert
+    """
+    if not cases:
+        return
+    case_list = [case_data for case_data, _ in cases]
+    predictions = [prediction for _, prediction in cases]
+    vectors = build_case_vectors(case_list, predictions, _embed_cases)
+    index.upsert(vectors)
+    # Recorded with the timestamp stored in the index, which seeding compares against
+    area_aggregates.record_metadata([metadata for _, _, metadata in vectors])
+    area_aggregates.save()
 
 def search_similar_cases(query: str, n_results: int = 5):
     """
     Find similar historical cases using Pinecone
     """
     # Generate embedding for query
-    query_embedding = _generate_embedding(query)
+    query_embedding = embedder.embed_query(query)
+    if is_empty(query_embedding):
+        # Cosine similarity is undefined for a zero vector, which Pinecone rejects
+        return {"matches": []}
     
     # Search in Pinecone
     results = index.query(
-        vector=query_embedding,
+        vector=query_embedding.tolist(),
         top_k=n_results,
         include_metadata=True
     )
@@ -111,120 +145,86 @@ def search_similar_cases(query: str, n_results: int = 5):
 
 def get_area_statistics(district: str, area: str):
     """
-    Get historical risk for specific area
+    Get historical risk for specific area from the aggregate store, falling
+    back to a filtered Pinecone query until the store has been seeded from
+    the index
     """
-    # Fetch vectors with specific district and area
-    # Note: Pinecone doesn't support direct filtering, so we'll fetch and filter
-    # This is a simplified approach - in production, you might want a separate database for stats
-    
-    # For now, we'll search for cases in this area and calculate stats
-    query_text = f"{district} {area} dengue risk"
-    results = search_similar_cases(query_text, n_results=50)
-    
-    if not results['matches']:
-        return None
-    
-    # Filter results by district and area
-    filtered_matches = [
-        match for match in results['matches']
-        if match['metadata'].get('district') == district and 
-           match['metadata'].get('area') == area
-    ]
-    
-    if not filtered_matches:
+    if not area_aggregates.seeded:
+        return _query_area_statistics(district, area)
+    return area_aggregates.area_statistics(district, area)
+
+def _query_area_statistics(district: str, area: str):
+    """
+    Statistics over the cases Pinecone returns for a district/area filter.
+    The filter is evaluated by Pinecone, so the query vector does not
+    affect which cases are returned. A query returns at most
+    AREA_STATS_MAX_CASES matches and cannot be paged, so when it is full
+    the statistics are flagged ``truncated``; once the aggregate store is
+    seeded it answers with exact totals instead.
+    """
+    results = index.query(
+        vector=_filter_probe,
+        top_k=AREA_STATS_MAX_CASES,
+        include_metadata=True,
+        filter={"district": {"$eq": district}, "area": {"$eq": area}}
+    )
+    matches = results['matches']
+    if not matches:
         return None
-    
-    # Calculate statistics
-    risk_scores = [match['metadata']['risk_score'] for match in filtered_matches]
-    outcomes = [match['metadata']['outcome'] for match in filtered_matches]
-    
+
+    risk_scores = [match['metadata']['risk_score'] for match in matches]
+    outcomes = [match['metadata'].get('outcome', 0) or 0 for match in matches]
+
     return {
         "area": area,
         "district": district,
         "total_cases": len(risk_scores),
         "avg_risk_score": sum(risk_scores) / len(risk_scores),
-        "positive_cases": sum(outcomes),
-        "positive_rate": sum(outcomes) / len(outcomes) if outcomes else 0
+        "positive_cases": int(sum(outcomes)),
+        "positive_rate": sum(outcomes) / len(outcomes),
+        "truncated": len(matches) >= AREA_STATS_MAX_CASES
     }
 
 def get_high_risk_areas(threshold: float = 0.7):
     """
-    Get areas with risk scores above threshold
+    Get areas with risk scores above threshold, a sorted scan of the
+    aggregate store. While the store is being seeded this waits up to
+    AREA_SEED_WAIT seconds, then falls back to a capped Pinecone query.
     """
-    # This is a simplified implementation
-    # In practice, you might want to store aggregated statistics separately
-    query_text = "high risk dengue areas"
-    results = search_similar_cases(query_text, n_results=100)
-    
-    # Group by area and calculate average risk
-    area_stats = {}
-    for match in results['matches']:
-        district = match['metadata'].get('district')
-        area = match['metadata'].get('area')
-        risk_score = match['metadata'].get('risk_score', 0)
-        
-        key = f"{district}-{area}"
-        if key not in area_stats:
-            area_stats[key] = {
-                'district': district,
-                'area': area,
-                'risks': []
-            }
-        area_stats[key]['risks'].append(risk_score)
-    
-    # Calculate averages and filter by threshold
-    high_risk_areas = []
-    for key, stats in area_stats.items():
-        avg_risk = sum(stats['risks']) / len(stats['risks'])
-        if avg_risk >= threshold:
-            high_risk_areas.append({
-                'district': stats['district'],
-                'area': stats['area'],
-                'avg_risk_score': avg_risk,
-                'case_count': len(stats['risks'])
-            })
-    
-    # Sort by risk score
-    high_risk_areas.sort(key=lambda x: x['avg_risk_score'], reverse=True)
-    return high_risk_areas
+    if not area_aggregates.seeded and _seeder is not None:
+        _seeder.join(timeout=AREA_SEED_WAIT)
+    if not area_aggregates.seeded:
+        return _query_high_risk_areas(threshold)
+    return area_aggregates.high_risk_areas(threshold)
 
-def batch_load_dataset(df: pd.DataFrame, model):
+def _query_high_risk_areas(threshold: float):
     """
-    Load entire dataset into vector DB with predictions
+    High-risk areas over the cases one query returns. Past
+    AREA_STATS_MAX_CASES cases these are a sample of the index, so every
+    area is flagged ``truncated``.
     """
-    print(f"Loading {len(df)} cases into vector database...")
-    
-    for idx, row in df.iterrows():
-        # Prepare features for prediction
-        try:
-            features = [[
-                row['Age'],
-                row['Gender'],
-                row['NS1'],
-                row['IgG'],
-                row['IgM']
-            ]]
-            prediction = model.predict_proba(features)[0][1]
-        except Exception as e:
-            print(f"Error predicting for row {idx}: {e}")
-            continue
-        
-        case_data = {
-            'Age': row['Age'],
-            'Gender': row['Gender'],
-            'NS1': row['NS1'],
-            'IgG': row['IgG'],
-            'IgM': row['IgM'],
-            'Area': row.get('Area', 'Unknown'),
-            'District': row.get('District', 'Unknown'),
-            'AreaType': row.get('AreaType', 'Unknown'),
-            'HouseType': row.get('HouseType', 'Unknown'),
-            'Outcome': row.get('Outcome', 0)
-        }
-        
-        add_case_to_vector_db(case_data, prediction)
-        
-        if (idx + 1) % 100 == 0:
-            print(f"Processed {idx + 1} cases...")
-    
-    print("✅ Vector database populated successfully!")
\ No newline at end of file
+    matches = index.query(vector=_filter_probe, top_k=AREA_STATS_MAX_CASES, include_metadata=True)['matches']
+    truncated = len(matches) >= AREA_STATS_MAX_CASES
+    sampled = AreaAggregateStore()
+    for (district, area), row in totals_from_metadata(match['metadata'] for match in matches).items():
+        sampled.add_totals(district, area, *row)
+    return [dict(entry, truncated=truncated) for entry in sampled.high_risk_areas(threshold)]
+
+def batch_load_dataset(df: pd.DataFrame, model, chunk_size: int = 100, max_concurrency: int = 4):
+    """
+    Load entire dataset into vector DB with predictions.
+    The whole DataFrame is scored in one vectorized call and upserted in
+    chunks, up to ``max_concurrency`` chunks in flight at once.
+    """
+    stats = bulk_load_cases(
+        df,
+        model,
+        index,
+        _embed_cases,
+        chunk_size=chunk_size,
+        max_concurrency=max_concurrency,
+        # Only chunks whose upsert succeeded count towards the area totals
+        on_upserted=lambda vectors: area_aggregates.record_metadata([m for _, _, m in vectors])
+    )
+    area_aggregates.save()
+    return stats
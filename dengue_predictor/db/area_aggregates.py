@@ -0,0 +1,411 @@
+"""
+Per-area risk aggregates maintained alongside the vector databases
+
+Area statistics used to be recomputed from a similarity search on every
+call. ``AreaAggregateStore`` instead keeps one row per (district, area) with
+the running case count, sum of risk scores, positive count and the first and
+last time a case was recorded. Recording a case is an O(1) update, area
+statistics are a dictionary lookup and high-risk areas are a sorted scan over
+a few dozen rows.
+
+The rows are saved as JSON (atomically, via a temporary file) and can be
+rebuilt from the dataset at any time:
+    python -m db.area_aggregates --rebuild [--path area_aggregates/pinecone.json]
+
+A store that starts without a seeded file (a deployment whose index
+already holds cases) does not know those cases yet. The backend counts them
+once with ``seed_from``, reading every case's metadata from the index; until
+then ``seeded`` is False, the backend answers from index queries and the
+store writes nothing. Cases the store records meanwhile are kept aside and
+added afterwards if they are newer than the snapshot. Only one process
+seeds, the others pick the result up from the file.
+
+Several API workers share the file. Each one remembers the cases it
+recorded since its last save, and ``save`` merges just those into the rows
+on disk under an exclusive lock on ``<path>.lock``, so no worker overwrites
+another's cases. Queries reload the file when another process changed it.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: no cross-process lock, only one process may write the store
+    fcntl = None
+
+AGGREGATE_FIELDS = ("count", "risk_sum", "positive", "first_seen", "last_seen")
+
+_DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'area_aggregates')
+
+
+def default_store_path(backend: str) -> str:
+    """AREA_AGGREGATES_PATH, or one file per backend under area_aggregates/"""
+    return os.getenv("AREA_AGGREGATES_PATH") or os.path.join(_DEFAULT_DIR, f"{backend}.json")
+
+
+def _to_epoch(timestamp) -> float:
+    if timestamp is None:
+        return time.time()
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    return datetime.fromisoformat(timestamp).timestamp()
+
+
+def _isoformat(epoch: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(epoch).isoformat() if epoch is not None else None
+
+
+# Whether several processes can safely write the same store file
+CROSS_PROCESS_LOCKING = fcntl is not None
+
+
+@contextmanager
+def _try_file_lock(path: str):
+    """Yields whether this process got the exclusive lock on ``path`` without waiting"""
+    if fcntl is None:
+        yield True
+        return
+    with open(path, 'a') as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+@contextmanager
+def _file_lock(path: str):
+    """Exclusive lock on ``path`` across processes (a no-op without fcntl)"""
+    if fcntl is None:
+        yield
+        return
+    with open(path, 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _merge(rows: Dict[Tuple[str, str], List[float]], key: Tuple[str, str], count: int, risk_sum: float,
+           positive: int, first_seen: float, last_seen: float):
+    row = rows.get(key)
+    if row is None:
+        rows[key] = [count, risk_sum, positive, first_seen, last_seen]
+        return
+    row[0] += count
+    row[1] += risk_sum
+    row[2] += positive
+    row[3] = min(row[3], first_seen)
+    row[4] = max(row[4], last_seen)
+
+
+def totals_from_metadata(metadatas: Iterable[Dict], before: Optional[float] = None
+                         ) -> Dict[Tuple[str, str], List[float]]:
+    """Per-area totals of case metadata as stored in the vector DBs, optionally only cases older than ``before``"""
+    rows: Dict[Tuple[str, str], List[float]] = {}
+    for metadata in metadatas:
+        if not metadata or 'district' not in metadata or 'area' not in metadata:
+            continue
+        # Cases written before timestamps were stored count as old
+        seen = _to_epoch(metadata['timestamp']) if metadata.get('timestamp') else 0.0
+        if before is not None and seen >= before:
+            continue
+        positive = 1 if (metadata.get('outcome') or 0) == 1 else 0
+        _merge(rows, (str(metadata['district']), str(metadata['area'])),
+               1, float(metadata.get('risk_score', 0.0)), positive, seen, seen)
+    return rows
+
+
+class AreaAggregateStore:
+    """Running count, risk sum, positives and time range per (district, area)"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._rows: Dict[Tuple[str, str], List[float]] = {}
+        # Totals recorded here since the last save, merged into the file by save()
+        self._pending: Dict[Tuple[str, str], List[float]] = {}
+        # After clear() the next save replaces the file instead of merging
+        self._replace = False
+        # When the file's rows were counted from the whole index; an
+        # in-memory store has nothing to count
+        self.seeded_at: Optional[float] = None if path else 0.0
+        # Totals recorded before the store was seeded, (key, row) pairs
+        self._unseeded: List[Tuple[Tuple[str, str], List[float]]] = []
+        self._file_mtime = None
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def seeded(self) -> bool:
+        """Whether the rows cover every case in the index"""
+        return self.seeded_at is not None
+
+    @property
+    def total_cases(self) -> int:
+        with self._lock:
+            return int(sum(row[0] for row in self._rows.values()))
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+    def add_totals(self, district: str, area: str, count: int, risk_sum: float, positive: int,
+                   first_seen: float, last_seen: float):
+        """Merge pre-aggregated totals for one area"""
+        with self._lock:
+            self._add_locked(district, area, count, risk_sum, positive, first_seen, last_seen)
+
+    def _add_locked(self, district: str, area: str, count: int, risk_sum: float, positive: int,
+                    first_seen: float, last_seen: float):
+        _merge(self._rows, (district, area), count, risk_sum, positive, first_seen, last_seen)
+        if not self.path:
+            return
+        if self.seeded_at is None:
+            self._unseeded.append(((district, area), [count, risk_sum, positive, first_seen, last_seen]))
+        else:
+            _merge(self._pending, (district, area), count, risk_sum, positive, first_seen, last_seen)
+
+    def record(self, case_data: dict, prediction: float, timestamp=None):
+        """Add one case to its area's running totals"""
+        self.record_many([(case_data, prediction)], timestamp)
+
+    def record_many(self, cases: Iterable[Tuple[dict, float]], timestamp=None):
+        """Add several (case_data, prediction) pairs under one lock"""
+        seen = _to_epoch(timestamp)
+        with self._lock:
+            for case_data, prediction in cases:
+                positive = 1 if case_data.get('Outcome', 0) == 1 else 0
+                self._add_locked(str(case_data['District']), str(case_data['Area']),
+                                 1, float(prediction), positive, seen, seen)
+
+    def record_frame(self, df, predictions, timestamp=None):
+        """Add a whole dataset DataFrame with one groupby"""
+        frame = df[['District', 'Area']].astype(str).copy()
+        frame['risk'] = [float(p) for p in predictions]
+        frame['positive'] = (df['Outcome'] == 1).astype(int) if 'Outcome' in df.columns else 0
+        grouped = frame.groupby(['District', 'Area']).agg(
+            case_count=('risk', 'size'), risk_sum=('risk', 'sum'), positive=('positive', 'sum')
+        )
+        seen = _to_epoch(timestamp)
+        with self._lock:
+            for (district, area), row in grouped.iterrows():
+                self._add_locked(district, area, int(row['case_count']), float(row['risk_sum']),
+                                 int(row['positive']), seen, seen)
+
+    def record_metadata(self, metadatas: Iterable[Dict]):
+        """Add the cases of stored vectors, by the metadata they were written with"""
+        rows = totals_from_metadata(metadatas)
+        with self._lock:
+            for (district, area), row in rows.items():
+                self._add_locked(district, area, *row)
+
+    def clear(self):
+        """Start a full rebuild: the store counts as seeded with what is added next"""
+        with self._lock:
+            self._rows = {}
+            self._pending = {}
+            self._unseeded = []
+            self._replace = True
+            self.seeded_at = time.time()
+
+    def seed_from(self, read_metadata: Callable[[], Iterable[Dict]]) -> bool:
+        """
+        Count every case ``read_metadata()`` yields (the metadata of every
+        vector in the index) into the store, unless it is seeded already or
+        another process is seeding it. Returns whether this call seeded it.
+        """
+        if self.seeded or not self.path:
+            return False
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with _try_file_lock(self.path + ".seed.lock") as acquired:
+            if not acquired:
+                return False
+            self._reload_if_changed()
+            if self.seeded:
+                return False
+            seeded_at = time.time()
+            rows = totals_from_metadata(read_metadata(), before=seeded_at)
+            with self._lock, _file_lock(self.path + ".lock"):
+                data = self._read_file()
+                if data is not None and data[1] is not None:
+                    # Seeded by a process that did not hold the seed lock (a rebuild)
+                    self._adopt_seed(data[1])
+                    rows = data[0]
+                else:
+                    self._adopt_seed(seeded_at)
+                for key, row in self._pending.items():
+                    _merge(rows, key, *row)
+                self._write_locked(rows)
+        print(f"Area aggregates seeded from the index: {len(rows)} areas")
+        return True
+
+    def _adopt_seed(self, seeded_at: float):
+        # Recorded cases newer than the index snapshot still need adding, older ones are in it
+        self.seeded_at = seeded_at
+        for key, row in self._unseeded:
+            if row[3] >= seeded_at:
+                _merge(self._pending, key, *row)
+        self._unseeded = []
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def area_statistics(self, district: str, area: str) -> Optional[Dict]:
+        """Exact statistics over every recorded case in an area"""
+        self._reload_if_changed()
+        with self._lock:
+            row = self._rows.get((district, area))
+            if row is None:
+                return None
+            count, risk_sum, positive, first_seen, last_seen = row
+        return {
+            "area": area,
+            "district": district,
+            "total_cases": int(count),
+            "avg_risk_score": risk_sum / count,
+            "positive_cases": int(positive),
+            "positive_rate": positive / count,
+            "first_case_at": _isoformat(first_seen),
+            "last_case_at": _isoformat(last_seen),
+            "truncated": False
+        }
+
+    def high_risk_areas(self, threshold: float = 0.7) -> List[Dict]:
+        """Areas whose average risk score is at least ``threshold``, highest first"""
+        self._reload_if_changed()
+        with self._lock:
+            rows = [(key, row[1] / row[0], int(row[0])) for key, row in self._rows.items() if row[0]]
+        areas = [
+            {'district': district, 'area': area, 'avg_risk_score': avg_risk, 'case_count': count, 'truncated': False}
+            for (district, area), avg_risk, count in rows
+            if avg_risk >= threshold
+        ]
+        areas.sort(key=lambda x: x['avg_risk_score'], reverse=True)
+        return areas
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def save(self):
+        """Merge the cases recorded since the last save into ``path`` (no-op for an in-memory store)"""
+        if not self.path:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with self._lock, _file_lock(self.path + ".lock"):
+            if self._replace:
+                rows = self._rows
+            else:
+                data = self._read_file()
+                if data is not None and data[1] is not None and self.seeded_at is None:
+                    self._adopt_seed(data[1])
+                if self.seeded_at is None:
+                    # Nothing is written until the index has been counted
+                    return
+                rows = data[0] if data is not None else {}
+                for key, row in self._pending.items():
+                    _merge(rows, key, *row)
+            self._write_locked(rows)
+
+    def _write_locked(self, rows: Dict[Tuple[str, str], List[float]]):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"seeded_at": self.seeded_at, "areas": [
+                dict(zip(("district", "area") + AGGREGATE_FIELDS, key + tuple(row)))
+                for key, row in rows.items()
+            ]}, f)
+        os.replace(tmp_path, self.path)
+        self._rows = rows
+        self._pending = {}
+        self._replace = False
+        self._file_mtime = os.stat(self.path).st_mtime_ns
+
+    def _read_file(self) -> Optional[Tuple[Dict[Tuple[str, str], List[float]], Optional[float]]]:
+        """(rows, seeded_at) of the file, None if there is none"""
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path) as f:
+            data = json.load(f)
+        rows = {
+            (row["district"], row["area"]): [row[field] for field in AGGREGATE_FIELDS]
+            for row in data.get("areas", [])
+        }
+        return rows, data.get("seeded_at")
+
+    def load(self):
+        """Rows from ``path`` plus the cases recorded here and not saved yet"""
+        with self._lock, _file_lock(self.path + ".lock"):
+            data = self._read_file()
+            if data is None:
+                return
+            mtime = os.stat(self.path).st_mtime_ns
+            rows, seeded_at = data
+            if seeded_at is not None and self.seeded_at is None:
+                self._adopt_seed(seeded_at)
+            for key, row in self._pending.items():
+                _merge(rows, key, *row)
+            for key, row in self._unseeded:
+                _merge(rows, key, *row)
+            self._rows = rows
+            self._file_mtime = mtime
+
+    def _reload_if_changed(self):
+        # Another worker saved its cases; a stat per query keeps this process current
+        if not self.path or self._replace:
+            return
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return
+        if mtime != self._file_mtime:
+            self.load()
+
+    def rebuild_from_dataset(self, df, model):
+        """Replace every row with aggregates of ``df`` scored by ``model``"""
+        try:
+            from db.bulk_loader import score_frame
+        except ImportError:
+            from bulk_loader import score_frame
+
+        predictions = score_frame(df, model)
+        self.clear()
+        self.record_frame(df, predictions)
+        self.save()
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    import pandas as pd
+
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+    from core.model_registry import get_model
+    base_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+    parser = argparse.ArgumentParser(description="Rebuild the per-area aggregate store from the dataset")
+    parser.add_argument('--rebuild', action='store_true', required=True)
+    parser.add_argument('--path', default=None, help="store file (default: the configured backend's)")
+    parser.add_argument('--dataset', default=os.path.join(base_dir, 'datasets', 'dataset.csv'))
+    args = parser.parse_args()
+
+    backend = os.getenv("VECTOR_DB_BACKEND", "pinecone").lower()
+    store = AreaAggregateStore(args.path or default_store_path(backend))
+    model = get_model(os.path.join(base_dir, 'core', 'models', 'logistic_regression_model.joblib'))
+    store.rebuild_from_dataset(pd.read_csv(args.dataset), model)
+    print(f"✅ Rebuilt {len(store)} areas ({store.total_cases} cases) into {store.path}")
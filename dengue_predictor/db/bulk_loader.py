@@ -0,0 +1,99 @@
+"""
+Bulk loading of the dengue dataset into a vector index
+
+The whole DataFrame is encoded and scored with one vectorized call, then
+split into chunks. Each chunk gets its descriptions and embeddings built in
+one go and is sent with a single ``index.upsert``; up to ``max_concurrency``
+chunks are in flight at once. Any object with an ``upsert(vectors=...)``
+method works as the index, which keeps the loader testable against a local
+in-memory stand-in.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Optional
+
+try:
+    from db.case_records import build_case_vectors, cases_from_frame
+except ImportError:
+    from case_records import build_case_vectors, cases_from_frame
+
+
+def score_frame(df, model):
+    """Positive-class probabilities for every row of a raw dataset DataFrame"""
+    # Imported here so the db package does not require core at import time
+    from core.feature_encoder import FeatureEncoder
+    from core.fast_scorer import build_scorer
+
+    encoder = FeatureEncoder.from_model(model)
+    scorer = build_scorer(model, encoder)
+    return scorer.score_matrix(encoder.encode_frame(df))
+
+
+def bulk_load_cases(df,
+                    model,
+                    index,
+                    embed_fn: Callable,
+                    chunk_size: int = 100,
+                    max_concurrency: int = 4,
+                    progress: Callable[[str], None] = print,
+                    on_upserted: Optional[Callable[[list], None]] = None) -> Dict:
+    """
+    Score, embed and upsert every row of ``df`` into ``index``.
+    ``on_upserted`` is called with the vectors of each chunk once its upsert
+    succeeded, never for a failed one. Returns counts, elapsed time and
+    throughput.
+    """
+    if chunk_size < 1 or max_concurrency < 1:
+        raise ValueError("chunk_size and max_concurrency must be positive")
+
+    total = len(df)
+    progress(f"Loading {total} cases into vector database...")
+    start = time.perf_counter()
+
+    predictions = [float(p) for p in score_frame(df, model)]
+    cases = cases_from_frame(df)
+    scored = time.perf_counter()
+
+    def upsert_chunk(offset):
+        chunk_cases = cases[offset:offset + chunk_size]
+        chunk_predictions = predictions[offset:offset + chunk_size]
+        vectors = build_case_vectors(chunk_cases, chunk_predictions, embed_fn)
+        index.upsert(vectors=vectors)
+        return vectors
+
+    upserted = 0
+    failed = 0
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        futures = {
+            executor.submit(upsert_chunk, offset): offset
+            for offset in range(0, total, chunk_size)
+        }
+        for future in as_completed(futures):
+            offset = futures[future]
+            try:
+                vectors = future.result()
+            except Exception as e:
+                failed += min(chunk_size, total - offset)
+                progress(f"Error upserting cases {offset}-{offset + chunk_size - 1}: {e}")
+                continue
+            upserted += len(vectors)
+            if on_upserted is not None:
+                on_upserted(vectors)
+            elapsed = time.perf_counter() - start
+            progress(f"Processed {upserted}/{total} cases ({upserted / elapsed:.0f} cases/s)...")
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        "total_cases": total,
+        "upserted": upserted,
+        "failed": failed,
+        "scoring_seconds": round(scored - start, 4),
+        "elapsed_seconds": round(elapsed, 4),
+        "cases_per_second": round(upserted / elapsed, 1) if elapsed > 0 else 0.0
+    }
+    if failed:
+        progress(f"⚠️ Vector database partially populated: {upserted} stored, {failed} failed")
+    else:
+        progress(f"✅ Vector database populated successfully! ({stats['cases_per_second']} cases/s)")
+    return stats
@@ -0,0 +1,83 @@
+"""
+Shared construction of the case records stored in the vector databases
+
+Both the per-request writes and the bulk dataset loader describe a case the
+same way, so the description text, the metadata layout and the vector ids
+live here instead of being rebuilt in every backend.
+"""
+
+import uuid
+from datetime import datetime
+from typing import Dict, List, Sequence
+
+try:
+    from core.feature_encoder import GENDER_CODES
+except ImportError:
+    GENDER_CODES = {'Female': 0, 'Male': 1}
+
+# Columns of datasets/dataset.csv that make up a case
+CASE_FIELDS = ('Age', 'Gender', 'NS1', 'IgG', 'IgM', 'Area', 'District', 'AreaType', 'HouseType', 'Outcome')
+
+
+def describe_case(case_data: dict, prediction: float) -> str:
+    """Semantic description of a case, stored alongside its vector"""
+    return f"""
+    Location: {case_data['District']} - {case_data['Area']} ({case_data.get('AreaType', 'Unknown')})
+    Patient: Age {case_data['Age']}, Gender {'Male' if case_data['Gender']==1 else 'Female'}
+    Lab Results: NS1={'Positive' if case_data['NS1']==1 else 'Negative'}, 
+                 IgG={'Positive' if case_data['IgG']==1 else 'Negative'}, 
+                 IgM={'Positive' if case_data['IgM']==1 else 'Negative'}
+    Housing: {case_data.get('HouseType', 'Unknown')}
+    Risk Score: {prediction:.2%}
+    Outcome: {'Dengue' if case_data.get('Outcome', 0)==1 else 'No Dengue'}
+    """
+
+
+def case_metadata(case_data: dict, prediction: float, description: str, timestamp: str = None) -> Dict:
+    """Metadata stored with every case vector"""
+    return {
+        "district": case_data['District'],
+        "area": case_data['Area'],
+        "risk_score": float(prediction),
+        "outcome": case_data.get('Outcome', 0),
+        "timestamp": timestamp or datetime.now().isoformat(),
+        "age": case_data['Age'],
+        "ns1": case_data['NS1'],
+        "igm": case_data['IgM'],
+        "description": description
+    }
+
+
+def new_case_id() -> str:
+    # Timestamp plus a random suffix so cases written in one batch never collide
+    return f"case_{datetime.now().timestamp()}_{uuid.uuid4().hex[:8]}"
+
+
+def cases_from_frame(df) -> List[Dict]:
+    """
+    Convert dataset rows into case dicts with plain Python values and the
+    API's integer gender coding.
+    """
+    frame = df.copy()
+    for field in CASE_FIELDS:
+        if field not in frame.columns:
+            frame[field] = 0 if field == 'Outcome' else 'Unknown'
+    if frame['Gender'].dtype.kind not in 'biuf':
+        frame['Gender'] = frame['Gender'].map(GENDER_CODES).fillna(0).astype(int)
+    return frame[list(CASE_FIELDS)].to_dict('records')
+
+
+def build_case_vectors(cases: Sequence[dict], predictions: Sequence[float], embed_fn) -> List[tuple]:
+    """
+    Assemble (id, values, metadata) tuples for a bulk upsert. ``embed_fn``
+    receives the whole batch as (cases, predictions, descriptions) and
+    returns one embedding per case.
+    """
+    timestamp = datetime.now().isoformat()
+    descriptions = [describe_case(case_data, prediction) for case_data, prediction in zip(cases, predictions)]
+    embeddings = embed_fn(cases, predictions, descriptions)
+    vectors = []
+    for case_data, prediction, description, embedding in zip(cases, predictions, descriptions, embeddings):
+        values = embedding.tolist() if hasattr(embedding, 'tolist') else list(embedding)
+        vectors.append((new_case_id(), values, case_metadata(case_data, prediction, description, timestamp)))
+    return vectors
@@ -0,0 +1,270 @@
+"""
+Embedding generators for the dengue case vector databases
+
+The original ``_generate_embedding`` MD5-hashed the description text into 8
+floats and padded them with zeros to 1536 dimensions, so similarity search
+compared hash digests rather than cases. The embedders here share a small
+interface so backends can swap them:
+
+    embedder.dimension                      -> int
+    embedder.embed_cases(cases, risks, descriptions) -> float32 array (n, dimension)
+    embedder.embed_query(text)              -> float32 array (dimension,)
+
+``StructuredFeatureEmbedder`` (the default) encodes age, lab results, area,
+area type, district, house type and risk score as a compact dense vector,
+computed for whole batches with NumPy. ``HashingTextEmbedder`` embeds free
+text with signed feature hashing for backends that only have descriptions.
+All vectors are L2-normalised, so cosine and dot product agree.
+
+Vectors from different embedders, vocabularies or dimensions are not
+comparable, so each embedder names its ``layout`` and the backends record
+it with the index. ``check_index_layout`` refuses to search or extend an
+index whose vectors were written with another layout, such as the old
+1536-dimensional hash embeddings. A query that mentions no known field
+embeds to the zero vector, which cosine similarity cannot rank;
+``is_empty`` lets the backends answer it with no matches instead.
+"""
+
+import os
+import re
+import sys
+import zlib
+from typing import Dict, List, Mapping, Sequence
+
+import numpy as np
+
+# Dense columns at the start of every structured vector
+NUMERIC_SLOTS = ('Age', 'Gender', 'NS1', 'IgG', 'IgM', 'RiskScore')
+
+# Categorical fields, each gets one column per known value plus "other"
+CATEGORY_SLOTS = ('Area', 'AreaType', 'District', 'HouseType')
+
+# Relative weight of each block in the cosine similarity
+SLOT_WEIGHTS = {
+    'Age': 1.0, 'Gender': 0.5, 'NS1': 1.0, 'IgG': 1.0, 'IgM': 1.0, 'RiskScore': 1.0,
+    'Area': 1.0, 'AreaType': 0.5, 'District': 0.5, 'HouseType': 0.5
+}
+
+# Bumped whenever the meaning of a vector column changes
+LAYOUT_VERSION = 1
+
+# Typical probabilities used when a query only names a risk level
+RISK_KEYWORDS = (('high', 0.85), ('medium', 0.55), ('moderate', 0.55), ('low', 0.15))
+
+_LAB_AFTER = re.compile(r'\b(ns1|igg|igm)\b\s*[=:]?\s*(positive|negative|pos|neg|\+|-)')
+_LAB_BEFORE = re.compile(r'\b(positive|negative)\s+(ns1|igg|igm)\b')
+_AGE = re.compile(r'\b(\d{1,3})\s*-?\s*(?:years?|yrs?|y/o)\b|\bage\s*[=:]?\s*(\d{1,3})\b')
+
+
+def is_empty(vector) -> bool:
+    """True for a query vector with nothing to compare, e.g. all zeros"""
+    return not np.any(vector)
+
+
+def check_index_layout(stored_layout, vector_count: int, embedder, where: str = "index"):
+    """
+    Refuse an index whose vectors were not written with ``embedder``'s
+    layout. An empty index may take any layout.
+    """
+    if vector_count == 0 or stored_layout == embedder.layout:
+        return
+    written_with = f"layout '{stored_layout}'" if stored_layout else "an unrecorded (pre-versioning) layout"
+    raise ValueError(
+        f"The {where} holds {vector_count} vectors written with {written_with}, "
+        f"which cannot be mixed with the current embedding layout '{embedder.layout}'. "
+        "Use a new or emptied index and reload the dataset."
+    )
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return matrix
+
+
+class StructuredFeatureEmbedder:
+    """Deterministic dense embedding of a case's structured features"""
+
+    name = "structured"
+
+    def __init__(self, categories: Mapping[str, Sequence[str]], dimension: int = None):
+        # Column offset of every slot in the natural (unfolded) layout
+        self.vocabulary: Dict[str, Dict[str, int]] = {}
+        self.other_column: Dict[str, int] = {}
+        column = len(NUMERIC_SLOTS)
+        for field in CATEGORY_SLOTS:
+            values = list(categories.get(field, []))
+            self.vocabulary[field] = {value: column + i for i, value in enumerate(values)}
+            self.other_column[field] = column + len(values)
+            column += len(values) + 1
+        self.natural_dimension = column
+        self.dimension = int(dimension or self.natural_dimension)
+        if self.dimension < 1:
+            raise ValueError("Embedding dimension must be positive")
+
+        weights = np.ones(self.natural_dimension, dtype=np.float32)
+        for i, slot in enumerate(NUMERIC_SLOTS):
+            weights[i] = SLOT_WEIGHTS[slot]
+        for field in CATEGORY_SLOTS:
+            for position in list(self.vocabulary[field].values()) + [self.other_column[field]]:
+                weights[position] = SLOT_WEIGHTS[field]
+        self._weights = weights
+
+        # Query keyword patterns, longest values first so "New Market" wins over "Market"
+        self._query_terms = []
+        for field in CATEGORY_SLOTS:
+            for value, position in self.vocabulary[field].items():
+                pattern = re.compile(r'\b' + re.escape(value.lower()) + r'\b')
+                self._query_terms.append((len(value), pattern, position))
+        self._query_terms.sort(key=lambda term: -term[0])
+
+        # Column order depends on the vocabulary, so it is part of the layout
+        vocabulary = "|".join(f"{field}={','.join(self.vocabulary[field])}" for field in CATEGORY_SLOTS)
+        checksum = zlib.crc32(vocabulary.encode("utf-8"))
+        self.layout = f"{self.name}-v{LAYOUT_VERSION}-{checksum:08x}-{self.dimension}"
+
+    @classmethod
+    def from_encoder(cls, encoder, dimension: int = None) -> "StructuredFeatureEmbedder":
+        """Use the model's one-hot categories as the embedding vocabulary"""
+        return cls(encoder.categories, dimension)
+
+    def _project(self, natural: np.ndarray) -> np.ndarray:
+        """Weight and fit the natural layout into ``self.dimension`` columns"""
+        natural *= self._weights
+        n_rows = natural.shape[0]
+        if self.dimension == self.natural_dimension:
+            out = natural
+        elif self.dimension > self.natural_dimension:
+            # Pad with zeros to match a wider index
+            out = np.zeros((n_rows, self.dimension), dtype=np.float32)
+            out[:, :self.natural_dimension] = natural
+        else:
+            # Fold columns onto a narrower index
+            out = np.zeros((n_rows, self.dimension), dtype=np.float32)
+            folded = np.arange(self.natural_dimension) % self.dimension
+            np.add.at(out, (slice(None), folded), natural)
+        return _normalize_rows(out)
+
+    def embed_cases(self, cases: Sequence[Mapping], risk_scores: Sequence[float] = None,
+                    descriptions: Sequence[str] = None) -> np.ndarray:
+        """Embed a batch of case dicts (API or dataset format)"""
+        n_rows = len(cases)
+        natural = np.zeros((n_rows, self.natural_dimension), dtype=np.float32)
+        if n_rows == 0:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+
+        natural[:, 0] = np.clip(np.array([float(c.get('Age', 0) or 0) for c in cases]) / 100.0, 0.0, 1.2)
+        natural[:, 1] = [1.0 if c.get('Gender') in (1, 'Male') else 0.0 for c in cases]
+        for i, lab in enumerate(('NS1', 'IgG', 'IgM'), start=2):
+            natural[:, i] = [float(c.get(lab, 0) or 0) for c in cases]
+        if risk_scores is not None:
+            natural[:, 5] = np.asarray(risk_scores, dtype=np.float32)
+
+        rows = np.arange(n_rows)
+        for field in CATEGORY_SLOTS:
+            lookup = self.vocabulary[field]
+            other = self.other_column[field]
+            columns = np.fromiter(
+                (lookup.get(c.get(field), other) for c in cases), dtype=np.intp, count=n_rows
+            )
+            natural[rows, columns] = 1.0
+        return self._project(natural)
+
+    def embed_query(self, text: str) -> np.ndarray:
+        """
+        Embed a free-text query by picking out the structured facts it
+        mentions (areas, house types, lab results, age, gender, risk level).
+        """
+        text = text.lower()
+        natural = np.zeros((1, self.natural_dimension), dtype=np.float32)
+
+        age = _AGE.search(text)
+        if age:
+            natural[0, 0] = min(float(age.group(1) or age.group(2)) / 100.0, 1.2)
+        if re.search(r'\bmale\b', text) and not re.search(r'\bfemale\b', text):
+            natural[0, 1] = 1.0
+        for lab, result in _LAB_AFTER.findall(text):
+            natural[0, 2 + ('ns1', 'igg', 'igm').index(lab)] = 1.0 if result in ('positive', 'pos', '+') else 0.0
+        for result, lab in _LAB_BEFORE.findall(text):
+            natural[0, 2 + ('ns1', 'igg', 'igm').index(lab)] = 1.0 if result == 'positive' else 0.0
+        for keyword, risk in RISK_KEYWORDS:
+            if re.search(r'\b' + keyword + r'\s+risk\b', text):
+                natural[0, 5] = risk
+                break
+
+        matched = text
+        for _, pattern, position in self._query_terms:
+            if pattern.search(matched):
+                natural[0, position] = 1.0
+                matched = pattern.sub(' ', matched)
+        return self._project(natural)[0]
+
+
+class HashingTextEmbedder:
+    """Signed feature hashing of word unigrams and bigrams"""
+
+    name = "hashing"
+
+    def __init__(self, dimension: int = 256):
+        self.dimension = int(dimension)
+        if self.dimension < 1:
+            raise ValueError("Embedding dimension must be positive")
+        self.layout = f"{self.name}-v{LAYOUT_VERSION}-{self.dimension}"
+
+    def _embed_texts(self, texts: Sequence[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = re.findall(r'[a-z0-9]+', text.lower())
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            if not features:
+                continue
+            # crc32 is stable across processes, unlike hash()
+            hashes = np.fromiter((zlib.crc32(f.encode()) for f in features), dtype=np.uint32, count=len(features))
+            signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+            np.add.at(out[row], (hashes % self.dimension).astype(np.intp), signs)
+        return _normalize_rows(out)
+
+    def embed_cases(self, cases: Sequence[Mapping], risk_scores: Sequence[float] = None,
+                    descriptions: Sequence[str] = None) -> np.ndarray:
+        if descriptions is None:
+            descriptions = [" ".join(f"{key} {value}" for key, value in case.items()) for case in cases]
+        return self._embed_texts(descriptions)
+
+    def embed_query(self, text: str) -> np.ndarray:
+        return self._embed_texts([text])[0]
+
+
+def _model_path() -> str:
+    """Path of the trained model, works for both development and executable"""
+    if getattr(sys, 'frozen', False):
+        return os.path.join(sys._MEIPASS, 'core', 'models', 'logistic_regression_model.joblib')
+    return os.path.join(os.path.dirname(__file__), '..', 'core', 'models', 'logistic_regression_model.joblib')
+
+
+def load_embedder(dimension: int = None, backend: str = None):
+    """
+    Build the configured embedder. ``EMBEDDING_BACKEND`` selects
+    ``structured`` (default) or ``hashing``; ``dimension`` defaults to
+    ``EMBEDDING_DIMENSION`` or the embedder's natural size.
+    """
+    backend = (backend or os.getenv("EMBEDDING_BACKEND", "structured")).lower()
+    if dimension is None and os.getenv("EMBEDDING_DIMENSION"):
+        dimension = int(os.getenv("EMBEDDING_DIMENSION"))
+
+    if backend == "hashing":
+        return HashingTextEmbedder(dimension or 256)
+    if backend != "structured":
+        raise ValueError(f"Unknown embedding backend '{backend}'")
+
+    try:
+        from core.feature_encoder import FeatureEncoder
+        from core.model_registry import get_model
+    except ImportError:
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+        from core.feature_encoder import FeatureEncoder
+        from core.model_registry import get_model
+
+    # The API's model instance, not a second copy
+    encoder = FeatureEncoder.from_model(get_model(_model_path()))
+    return StructuredFeatureEmbedder.from_encoder(encoder, dimension)
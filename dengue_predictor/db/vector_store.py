@@ -0,0 +1,87 @@
+"""
+Vector database backend selection
+
+VECTOR_DB_BACKEND picks the module that stores and searches cases:
+    pinecone  - db/PineconeDB.py, the hosted Pinecone index (default)
+    local     - db/LocalVectorDB.py, an in-process NumPy index on disk
+
+Both expose the same functions, which are wrapped here so callers do not
+need to know which backend is configured. The backend module is imported on
+the first call (or by the API's background warm-up), because importing it
+connects to Pinecone.
+"""
+
+import os
+import sys
+from typing import List, Tuple
+
+from dotenv import load_dotenv
+
+try:
+    from utils.lazy import LazyResource
+except ImportError:
+    # Imported with the db directory itself on sys.path
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+    from utils.lazy import LazyResource
+
+# The backend choice may come from the .env file
+load_dotenv()
+
+VECTOR_DB_BACKEND = os.getenv("VECTOR_DB_BACKEND", "pinecone").lower()
+
+if VECTOR_DB_BACKEND not in ("pinecone", "local"):
+    raise ValueError(f"Unknown VECTOR_DB_BACKEND '{VECTOR_DB_BACKEND}', expected 'pinecone' or 'local'")
+
+
+def _load_backend():
+    if VECTOR_DB_BACKEND == "local":
+        try:
+            from db import LocalVectorDB as backend
+        except ModuleNotFoundError as e:
+            if e.name != 'db':
+                raise
+            # Imported with the db directory itself on sys.path
+            import LocalVectorDB as backend
+    else:
+        try:
+            from db import PineconeDB as backend
+        except ModuleNotFoundError as e:
+            if e.name != 'db':
+                raise
+            import PineconeDB as backend
+    return backend
+
+
+vector_db = LazyResource("vector_db", _load_backend)
+
+
+def add_case_to_vector_db(case_data: dict, prediction: float):
+    return vector_db.get().add_case_to_vector_db(case_data, prediction)
+
+
+def add_cases_to_vector_db(cases: List[Tuple[dict, float]]):
+    return vector_db.get().add_cases_to_vector_db(cases)
+
+
+def search_similar_cases(query: str, n_results: int = 5):
+    return vector_db.get().search_similar_cases(query, n_results)
+
+
+def get_area_statistics(district: str, area: str):
+    return vector_db.get().get_area_statistics(district, area)
+
+
+def get_high_risk_areas(threshold: float = 0.7):
+    return vector_db.get().get_high_risk_areas(threshold)
+
+
+def batch_load_dataset(df, model, **kwargs):
+    return vector_db.get().batch_load_dataset(df, model, **kwargs)
+
+
+def close_vector_db():
+    """Persist the backend's pending state, if it was loaded and keeps any"""
+    if vector_db.ready:
+        close = getattr(vector_db.get(), "close", None)
+        if close is not None:
+            close()
@@ -0,0 +1,209 @@
+"""
+Write-behind queue for vector database writes
+
+Storing a case in the vector DB is a network round trip that the caller of
+/predict does not need to wait for. ``WriteBehindQueue`` buffers case records
+in memory and a background thread flushes them in batches through a bulk
+write function, either when ``max_batch_size`` records are waiting or when
+``flush_interval`` seconds have passed since the oldest pending record.
+
+Memory is bounded by ``max_pending``. When the queue is full the ``drop``
+policy discards the new record immediately, while ``block`` waits up to
+``block_timeout`` seconds for space before dropping it.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Tuple
+
+POLICIES = ("drop", "block")
+
+
+class WriteBehindQueue:
+    """Bounded in-memory buffer flushed in batches by a daemon thread"""
+
+    def __init__(self,
+                 flush_fn: Callable[[List[Tuple[dict, float]]], None],
+                 max_batch_size: int = 100,
+                 flush_interval: float = 2.0,
+                 max_pending: int = 10000,
+                 policy: str = "drop",
+                 block_timeout: float = 1.0,
+                 name: str = "vector-db-writer"):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown queue policy '{policy}', expected one of {POLICIES}")
+        if max_batch_size < 1 or max_pending < 1:
+            raise ValueError("max_batch_size and max_pending must be positive")
+
+        self.flush_fn = flush_fn
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.name = name
+
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._idle = threading.Condition(self._lock)
+        self._in_flight = 0
+        self._flush_requested = False
+        self._closed = False
+        self._thread = None
+
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+
+    def start(self):
+        """Start the background flush thread (idempotent)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._closed = False
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def put(self, case_data: dict, prediction: float) -> bool:
+        """
+        Queue a case for writing. Returns False if it was dropped because
+        the queue is full or closed.
+        """
+        return self.put_many([(case_data, prediction)]) == 1
+
+    def put_many(self, records: Iterable[Tuple[dict, float]]) -> int:
+        """
+        Queue several (case, prediction) records under one lock acquisition.
+        With the ``block`` policy all of them share one ``block_timeout``.
+        Returns how many were queued; the rest were dropped.
+        """
+        records = list(records)
+        with self._lock:
+            if self._closed:
+                self.dropped += len(records)
+                return 0
+            deadline = time.monotonic() + self.block_timeout
+            queued = 0
+            for case_data, prediction in records:
+                if len(self._pending) >= self.max_pending and self.policy == "block":
+                    # Let the worker drain what this call already queued
+                    self._not_empty.notify()
+                    while len(self._pending) >= self.max_pending and not self._closed:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._not_full.wait(remaining)
+                if len(self._pending) >= self.max_pending or self._closed:
+                    break
+                self._pending.append((time.monotonic(), case_data, prediction))
+                queued += 1
+                # Wake the worker to start the interval timer or write a full batch
+                if len(self._pending) == 1 or len(self._pending) >= self.max_batch_size:
+                    self._not_empty.notify()
+
+            self.enqueued += queued
+            self.dropped += len(records) - queued
+            return queued
+
+    @property
+    def may_block(self) -> bool:
+        """Whether ``put`` can wait for space, so async callers must not call it inline"""
+        return self.policy == "block"
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Ask the background thread to write everything pending and wait until
+        it is done. Without a running thread the batches are written inline.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            while self._write_next_batch():
+                pass
+            return True
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            self._flush_requested = True
+            self._not_empty.notify()
+            try:
+                while self._pending or self._in_flight:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._idle.wait(remaining)
+            finally:
+                # A timed-out flush must not leave every later record due at once
+                self._flush_requested = False
+        return True
+
+    def close(self, timeout: float = 10.0) -> bool:
+        """Flush pending records and stop the background thread"""
+        flushed = self.flush(timeout)
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return flushed
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "pending": len(self._pending),
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "flushes": self.flushes,
+            }
+
+    def _batch_due(self) -> bool:
+        if not self._pending:
+            return False
+        if self._flush_requested or len(self._pending) >= self.max_batch_size:
+            return True
+        return time.monotonic() - self._pending[0][0] >= self.flush_interval
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._closed and not self._batch_due():
+                    if self._pending:
+                        timeout = self.flush_interval - (time.monotonic() - self._pending[0][0])
+                        self._not_empty.wait(max(timeout, 0.001))
+                    else:
+                        self._not_empty.wait()
+                if self._closed and not self._pending:
+                    return
+            self._write_next_batch()
+
+    def _write_next_batch(self) -> bool:
+        with self._lock:
+            if not self._pending:
+                return False
+            count = min(len(self._pending), self.max_batch_size)
+            batch = [self._pending.popleft()[1:] for _ in range(count)]
+            self._in_flight += len(batch)
+            self._not_full.notify_all()
+
+        try:
+            self.flush_fn(batch)
+            written, failed = len(batch), 0
+        except Exception as e:
+            # Log the error but keep the queue running
+            print(f"Warning: Could not write {len(batch)} cases to vector DB: {e}")
+            written, failed = 0, len(batch)
+
+        with self._lock:
+            self._in_flight -= len(batch)
+            self.written += written
+            self.failed += failed
+            self.flushes += 1
+            if not self._pending and not self._in_flight:
+                self._idle.notify_all()
+        return True
@@ -7,8 +7,8 @@ const sendBtn = document.getElementById('send-btn');
 const districtSelect = document.getElementById('district');
 const areaSelect = document.getElementById('area');
 
-// Conversation history for chat
-let conversationHistory = [];
+// Chat session id, the API keeps the conversation history under it
+let chatSessionId = "";
 let currentRiskAssessment = null;
 let riskChart = null;
 let chartDependenciesRegistered = false;
@@ -183,8 +183,8 @@ predictionForm.addEventListener('submit', async function(e) {
             district: data.District
         };
 
-        // Reset conversation history for the new assessment
-        conversationHistory = [];
+        // Start a new chat session for the new assessment
+        chatSessionId = "";
         
         // Display results with minimal information, let AI agent provide detailed recommendations
         displayResults(result);
@@ -230,31 +230,14 @@ async function requestDetailedRecommendations() {
         // Send request to AI agent for detailed recommendations
         const chatPayload = {
             message: "Please provide detailed recommendations for this dengue risk assessment including diet, lifestyle, prevention measures, and when to seek medical help.",
-            conversation_history: conversationHistory,
+            session_id: chatSessionId,
             risk_assessment: currentRiskAssessment,
             include_full_recommendations: true
         };
         
-        const response = await fetch('/chat', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-            body: JSON.stringify(chatPayload)
-        });
-        
-        // Remove typing indicator
-        typingIndicator.remove();
-        
-        if (!response.ok) {
-            throw new Error(`Chat error: ${response.status} ${response.statusText}`);
-        }
-        
-        const data = await response.json();
-        conversationHistory = data.conversation_history || [];
-        
-        // Add bot response to chat
-        addBotMessage(data.response);
+        // Stream the answer into the chat as it is generated
+        const data = await streamChat(chatPayload, typingIndicator);
+        chatSessionId = data.session_id || "";
         
     } catch (error) {
         // Remove typing indicator
@@ -300,33 +283,16 @@ async function sendMessage() {
             // Send message to backend chat endpoint with risk assessment context
             const chatPayload = {
                 message: message,
-                conversation_history: conversationHistory,
+                session_id: chatSessionId,
             };
             
             if (currentRiskAssessment) {
                 chatPayload.risk_assessment = currentRiskAssessment;
             }
             
-            const response = await fetch('/chat', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify(chatPayload)
-            });
-            
-            // Remove typing indicator
-            typingIndicator.remove();
-            
-            if (!response.ok) {
-                throw new Error(`Chat error: ${response.status} ${response.statusText}`);
-            }
-            
-            const data = await response.json();
-            conversationHistory = data.conversation_history || [];
-            
-            // Add bot response to chat
-            addBotMessage(data.response);
+            // Stream the answer into the chat as it is generated
+            const data = await streamChat(chatPayload, typingIndicator);
+            chatSessionId = data.session_id || "";
             
         } catch (error) {
             // Remove typing indicator
@@ -338,6 +304,94 @@ async function sendMessage() {
     }
 }
 
+// Send a chat request to /chat/stream and render the server-sent events as
+// they arrive. Falls back to the buffered /chat endpoint when the browser
+// cannot read response streams. Resolves with the final `done` payload.
+async function streamChat(chatPayload, typingIndicator) {
+    if (!window.ReadableStream || !window.TextDecoder) {
+        const fallback = await fetch('/chat', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify(chatPayload)
+        });
+        typingIndicator.remove();
+        if (!fallback.ok) {
+            throw new Error(`Chat error: ${fallback.status} ${fallback.statusText}`);
+        }
+        const data = await fallback.json();
+        addBotMessage(data.response);
+        return data;
+    }
+    
+    const requestStart = performance.now();
+    const response = await fetch('/chat/stream', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'Accept': 'text/event-stream',
+        },
+        body: JSON.stringify(chatPayload)
+    });
+    
+    if (!response.ok) {
+        typingIndicator.remove();
+        throw new Error(`Chat error: ${response.status} ${response.statusText}`);
+    }
+    
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let text = '';
+    let messageElement = null;
+    let done = null;
+    
+    while (true) {
+        const { value, done: streamEnded } = await reader.read();
+        if (streamEnded) break;
+        buffer += decoder.decode(value, { stream: true });
+        
+        // Events are separated by a blank line
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const rawEvent = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            
+            let eventName = 'message';
+            let dataLines = [];
+            for (const line of rawEvent.split('\n')) {
+                if (line.startsWith('event:')) eventName = line.slice(6).trim();
+                else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+            }
+            const payload = dataLines.length ? JSON.parse(dataLines.join('\n')) : {};
+            
+            if (eventName === 'token') {
+                if (!messageElement) {
+                    // First token: swap the typing indicator for the message
+                    typingIndicator.remove();
+                    messageElement = addBotMessage('');
+                    console.info(`Chat time to first token: ${Math.round(performance.now() - requestStart)} ms`);
+                }
+                text += payload.text;
+                renderBotMessage(messageElement, text);
+            } else if (eventName === 'done') {
+                done = payload;
+                console.info(`Chat server time to first token: ${payload.ttft_ms} ms, total: ${payload.total_ms} ms`);
+            } else if (eventName === 'error') {
+                typingIndicator.remove();
+                throw new Error(payload.detail || 'Chat stream error');
+            }
+        }
+    }
+    
+    typingIndicator.remove();
+    if (!done) {
+        throw new Error('Chat stream ended unexpectedly');
+    }
+    return done;
+}
+
 // Helper Functions
 function addUserMessage(message) {
     const messageElement = document.createElement('div');
@@ -354,25 +408,34 @@ function addUserMessage(message) {
     chatMessages.scrollTop = chatMessages.scrollHeight;
 }
 
-function addBotMessage(message) {
-    const messageElement = document.createElement('div');
-    messageElement.className = 'message bot-message';
-    
+function formatBotMessage(message) {
     // Convert markdown bold syntax to HTML bold tags
-    const formattedMessage = message
+    return message
         .replace(/\*\*(.*?)\*\*/g, '<strong>$1</strong>')  // Convert **text** to <strong>text</strong>
         .replace(/\n/g, '<br>');  // Convert newlines to <br> tags
+}
+
+function addBotMessage(message) {
+    const messageElement = document.createElement('div');
+    messageElement.className = 'message bot-message';
     
     messageElement.innerHTML = `
         <div class="avatar">
             <i class="fas fa-robot"></i>
         </div>
         <div class="message-content">
-            <p>${formattedMessage}</p>
+            <p>${formatBotMessage(message)}</p>
         </div>
     `;
     chatMessages.appendChild(messageElement);
     chatMessages.scrollTop = chatMessages.scrollHeight;
+    return messageElement;
+}
+
+// Re-render a bot message with the text streamed so far
+function renderBotMessage(messageElement, message) {
+    messageElement.querySelector('.message-content p').innerHTML = formatBotMessage(message);
+    chatMessages.scrollTop = chatMessages.scrollHeight;
 }
 
 function ensureChartRegistration() {
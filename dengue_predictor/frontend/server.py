@@ -1,10 +1,23 @@
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from collections import deque
+from email.utils import formatdate
+import gzip
+import hashlib
+import http.client
+import mimetypes
 import os
+import re
+import select
 import sys
 import json
+import threading
+import time
 import urllib.parse
-import urllib.request
-import urllib.error
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 def get_frontend_dir():
     """Get the frontend directory path, works for both development and executable"""
@@ -23,150 +36,600 @@ def get_frontend_dir():
 
 FRONTEND_DIR = get_frontend_dir()
 
+BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8001")
+
+# Requests handled at once; further requests get a 503 with Retry-After
+MAX_WORKERS = int(os.getenv("FRONTEND_MAX_WORKERS", "64"))
+# Open browser connections, idle keep-alive ones included; each has a thread
+# but only takes one of the MAX_WORKERS while a request on it is handled
+MAX_CONNECTIONS = int(os.getenv("FRONTEND_MAX_CONNECTIONS", str(MAX_WORKERS * 4)))
+# Chat proxies wait on Gemini for seconds, so they get at most this many of
+# the workers and static files and /predict always have the rest
+MAX_CHATS = int(os.getenv("FRONTEND_MAX_CHATS", str(max(MAX_WORKERS // 2, 1))))
+RETRY_AFTER = int(os.getenv("FRONTEND_RETRY_AFTER", "2"))
+
+# Idle connections kept open to the backend (0: a new connection per request)
+POOL_SIZE = int(os.getenv("FRONTEND_POOL_SIZE", "16"))
+CONNECT_TIMEOUT = float(os.getenv("FRONTEND_CONNECT_TIMEOUT", "5"))
+# Chats wait on Gemini, so reads from the backend get much longer
+READ_TIMEOUT = float(os.getenv("FRONTEND_READ_TIMEOUT", "120"))
+# Pooled connections idle longer than this are dropped; uvicorn closes
+# its side after 5 s, so this stays below that
+POOL_MAX_IDLE = float(os.getenv("FRONTEND_POOL_MAX_IDLE", "4"))
+# Seconds a browser's keep-alive connection may sit idle; each open
+# connection holds one of the MAX_CONNECTIONS threads
+KEEPALIVE_TIMEOUT = float(os.getenv("FRONTEND_KEEPALIVE_TIMEOUT", "5"))
+
+# Methods safe to send again when the backend dropped the connection
+# after the request went out
+IDEMPOTENT_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'))
+
+class BackendPool:
+    """
+    Keep-alive HTTP connections to the backend API, reused across requests.
+    At most ``size`` idle connections are kept; requests beyond that open
+    extra connections that are closed afterwards instead of waiting.
+
+    A request that could not be sent on a reused connection the backend
+    has meanwhile closed is sent again on a fresh one. Once it has been
+    sent only idempotent methods are retried: a POST /predict the backend
+    may already have received would otherwise be queued twice.
+    """
+
+    def __init__(self, base_url, size=POOL_SIZE, connect_timeout=CONNECT_TIMEOUT,
+                 read_timeout=READ_TIMEOUT, max_idle=POOL_MAX_IDLE):
+        url = urllib.parse.urlsplit(base_url)
+        self.connection_class = http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+        self.host = url.hostname
+        self.port = url.port
+        self.size = size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_idle = max_idle
+        self._idle = deque()   # (connection, time it was returned)
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.retried = 0
+
+    def _connect(self):
+        conn = self.connection_class(self.host, self.port, timeout=self.connect_timeout)
+        conn.connect()
+        conn.sock.settimeout(self.read_timeout)
+        with self._lock:
+            self.created += 1
+        return conn
+
+    def _acquire(self):
+        """(connection, whether it was reused from the pool)"""
+        now = time.monotonic()
+        with self._lock:
+            while self._idle:
+                conn, returned = self._idle.pop()
+                if now - returned <= self.max_idle and not self._closed_by_peer(conn):
+                    self.reused += 1
+                    return conn, True
+                conn.close()
+        return self._connect(), False
+
+    @staticmethod
+    def _closed_by_peer(conn):
+        # An idle connection has nothing to read unless the backend closed it
+        try:
+            return bool(select.select([conn.sock], [], [], 0)[0])
+        except (OSError, ValueError):
+            return True
+
+    def request(self, method, path, body=None, headers=None):
+        """
+        Send a request and return (connection, response) with the body
+        unread; pass both to ``release`` once the body has been read.
+        """
+        while True:
+            conn, reused = self._acquire()
+            sent = False
+            try:
+                conn.request(method, path, body=body, headers=headers or {})
+                sent = True
+                return conn, conn.getresponse()
+            except (ConnectionResetError, BrokenPipeError, http.client.RemoteDisconnected):
+                conn.close()
+                if not reused or (sent and method not in IDEMPOTENT_METHODS):
+                    raise
+                with self._lock:
+                    self.retried += 1
+            except BaseException:
+                conn.close()
+                raise
+
+    def release(self, conn, response):
+        """Return the connection to the pool if its response was read to the end"""
+        if response.will_close or not response.isclosed():
+            conn.close()
+            return
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    def fetch(self, method, path, body=None, headers=None):
+        """(status, body) of a request whose response is read in full"""
+        conn, response = self.request(method, path, body, headers)
+        try:
+            payload = response.read()
+        except BaseException:
+            conn.close()
+            raise
+        self.release(conn, response)
+        return response.status, payload
+
+    def stats(self):
+        with self._lock:
+            return {'size': self.size, 'idle': len(self._idle), 'created': self.created,
+                    'reused': self.reused, 'retried': self.retried}
+
+    def close(self):
+        with self._lock:
+            while self._idle:
+                self._idle.pop()[0].close()
+
+_default_pool = None
+_default_assets = None
+
+def default_backend():
+    """Pool for servers not created by ``create_server``"""
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = BackendPool(BACKEND_URL)
+    return _default_pool
+
+def default_assets():
+    """Asset cache for servers not created by ``create_server``"""
+    global _default_assets
+    if _default_assets is None:
+        _default_assets = StaticAssets(FRONTEND_DIR)
+    return _default_assets
+
+def busy_payload(retry_after=RETRY_AFTER):
+    return {
+        'error': 'Server busy',
+        'message': f'Too many requests in progress, retry in {retry_after} seconds.'
+    }
+
+def busy_response(retry_after=RETRY_AFTER):
+    """Raw HTTP 503 sent from the accept loop when every connection is taken"""
+    body = json.dumps(busy_payload(retry_after)).encode('utf-8')
+    head = (
+        "HTTP/1.0 503 Service Unavailable\r\n"
+        f"Retry-After: {retry_after}\r\n"
+        "Content-Type: application/json\r\n"
+        "Access-Control-Allow-Origin: *\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Connection: close\r\n\r\n"
+    )
+    return head.encode('ascii') + body
+
+class BoundedThreadingHTTPServer(ThreadingHTTPServer):
+    """
+    ThreadingHTTPServer with at most ``max_workers`` requests in flight.
+    A request beyond that is answered with 503 and Retry-After instead of
+    queueing behind slow requests. Worker slots are taken per request by
+    the handler, so idle keep-alive connections do not hold one; the
+    connections themselves are capped at ``max_connections`` and further
+    ones are answered with 503 from the accept loop.
+    """
+    daemon_threads = True
+
+    def __init__(self, server_address, handler_class, max_workers=MAX_WORKERS, max_chats=MAX_CHATS,
+                 retry_after=RETRY_AFTER, max_connections=None):
+        super().__init__(server_address, handler_class)
+        self.max_workers = max_workers
+        self.max_connections = max_connections or max(MAX_CONNECTIONS, max_workers)
+        self.retry_after = retry_after
+        self.worker_slots = threading.BoundedSemaphore(max_workers)
+        self.chat_slots = threading.BoundedSemaphore(max_chats)
+        self.connection_slots = threading.BoundedSemaphore(self.max_connections)
+        self.rejected = 0
+
+    def process_request(self, request, client_address):
+        if not self.connection_slots.acquire(blocking=False):
+            self.rejected += 1
+            self.reject_request(request)
+            return
+        try:
+            super().process_request(request, client_address)
+        except Exception:
+            self.connection_slots.release()
+            raise
+
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            self.connection_slots.release()
+
+    def reject_request(self, request):
+        try:
+            # Take in what the client has sent so closing does not reset the connection
+            request.settimeout(0.2)
+            request.recv(65536)
+        except OSError:
+            pass
+        try:
+            request.sendall(busy_response(self.retry_after))
+        except OSError:
+            pass
+        self.shutdown_request(request)
+
+# Assets requested with ?v=<version> never change under that URL
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Everything else is revalidated with its ETag on every use
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+CONTENT_TYPES = {
+    '.html': 'text/html; charset=utf-8',
+    '.css': 'text/css; charset=utf-8',
+    '.js': 'application/javascript; charset=utf-8',
+}
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 256
+# Local stylesheets and scripts referenced by an HTML page, e.g. href="style.css"
+ASSET_REFERENCE = re.compile(r'(\b(?:href|src)=")([\w./-]+\.(?:css|js))(")')
+
+def accepted_encodings(header):
+    """Content codings an Accept-Encoding header allows, e.g. {'gzip', 'br'}"""
+    encodings = set()
+    for part in (header or '').split(','):
+        name, _, params = part.strip().partition(';')
+        q = params.strip()
+        if q.startswith('q='):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if name:
+            encodings.add(name.strip().lower())
+    return encodings
+
+def etag_matches(if_none_match, etag):
+    """Whether an If-None-Match header names ``etag``"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+class StaticAsset:
+    """A file held in memory with its compressed variants and ETags"""
+
+    def __init__(self, path, content, mtime, size, content_type, versions=None):
+        self.path = path
+        self.mtime = mtime
+        self.size = size
+        self.content_type = content_type
+        # Versions of the assets an HTML page links to; a new version of any
+        # of them means the page must be rebuilt
+        self.versions = versions or {}
+        self.version = hashlib.sha256(content).hexdigest()[:16]
+        self.last_modified = formatdate(mtime, usegmt=True)
+        # encoding -> (body, strong ETag); each encoding is its own representation
+        self.variants = {'identity': (content, f'"{self.version}"')}
+        if content_type.startswith(COMPRESSIBLE_TYPES) and len(content) >= MIN_COMPRESS_BYTES:
+            compressed = gzip.compress(content, compresslevel=9, mtime=0)
+            if len(compressed) < len(content):
+                self.variants['gzip'] = (compressed, f'"{self.version}-gz"')
+            if brotli is not None:
+                compressed = brotli.compress(content, quality=11)
+                if len(compressed) < len(content):
+                    self.variants['br'] = (compressed, f'"{self.version}-br"')
+
+    def select(self, accept_encoding):
+        """(encoding, body, etag) of the smallest variant the client accepts"""
+        accepted = accepted_encodings(accept_encoding)
+        best = 'identity'
+        for encoding in ('br', 'gzip'):
+            if encoding in self.variants and encoding in accepted:
+                if len(self.variants[encoding][0]) < len(self.variants[best][0]):
+                    best = encoding
+        body, etag = self.variants[best]
+        return best, body, etag
+
+class StaticAssets:
+    """
+    In-memory cache of the files under ``root``. Each file is read and
+    compressed once; a request only stats it and reloads it when its
+    mtime or size changed. HTML pages get ``?v=<version>`` appended to
+    their local CSS and JS links, so those can be cached for a year and a
+    changed file is fetched under its new URL.
+    """
+
+    def __init__(self, root):
+        self.root = os.path.realpath(root)
+        self._assets = {}
+        # Loading a page loads the assets it links to under the same lock
+        self._lock = threading.RLock()
+        self.loads = 0
+
+    def resolve(self, url_path):
+        """File under the root for a URL path, or None if it is missing or outside"""
+        filepath = os.path.realpath(os.path.join(self.root, url_path.lstrip('/')))
+        if not filepath.startswith(self.root + os.sep) or not os.path.isfile(filepath):
+            return None
+        return filepath
+
+    def get(self, filepath):
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return None
+        asset = self._assets.get(filepath)
+        if asset is not None and asset.mtime == stat.st_mtime and asset.size == stat.st_size \
+                and not self._links_changed(asset):
+            return asset
+        with self._lock:
+            asset = self._load(filepath, stat)
+            self._assets[filepath] = asset
+            self.loads += 1
+        return asset
+
+    def _links_changed(self, asset):
+        for filepath, version in asset.versions.items():
+            linked = self.get(filepath)
+            if linked is None or linked.version != version:
+                return True
+        return False
+
+    def _load(self, filepath, stat):
+        with open(filepath, 'rb') as f:
+            content = f.read()
+        ext = os.path.splitext(filepath)[1].lower()
+        content_type = CONTENT_TYPES.get(ext) or mimetypes.guess_type(filepath)[0] or 'application/octet-stream'
+        versions = {}
+        if ext == '.html':
+            content = self._version_links(filepath, content, versions)
+        return StaticAsset(filepath, content, stat.st_mtime, stat.st_size, content_type, versions)
+
+    def _version_links(self, filepath, content, versions):
+        base = os.path.dirname(filepath)
+
+        def add_version(match):
+            linked_path = os.path.realpath(os.path.join(base, match.group(2)))
+            linked = self.get(linked_path) if linked_path.startswith(self.root + os.sep) else None
+            if linked is None:
+                return match.group(0)
+            versions[linked_path] = linked.version
+            return f'{match.group(1)}{match.group(2)}?v={linked.version}{match.group(3)}'
+
+        return ASSET_REFERENCE.sub(add_version, content.decode('utf-8')).encode('utf-8')
+
 class DengueRequestHandler(BaseHTTPRequestHandler):
+    # Persistent connections: a browser loads the page, its assets and the
+    # API calls over the same few connections
+    protocol_version = 'HTTP/1.1'
+    timeout = KEEPALIVE_TIMEOUT
+    # Headers and body go out in separate writes; with Nagle's algorithm the
+    # body would wait for the client's delayed ACK on a kept-alive connection
+    disable_nagle_algorithm = True
+    # Worker slot held while the current request is handled
+    _worker_slot = None
+
+    def handle_one_request(self):
+        try:
+            super().handle_one_request()
+        finally:
+            if self._worker_slot is not None:
+                self._worker_slot.release()
+                self._worker_slot = None
+
+    def parse_request(self):
+        # Called once the request line has arrived, so waiting on an idle
+        # keep-alive connection does not count against the workers
+        if not super().parse_request():
+            return False
+        worker_slots = getattr(self.server, 'worker_slots', None)
+        if worker_slots is None:
+            return True
+        if not worker_slots.acquire(blocking=False):
+            self.server.rejected += 1
+            self._reject_busy()
+            return False
+        self._worker_slot = worker_slots
+        return True
+
+    def _reject_busy(self):
+        # Take in a small body so closing does not reset the connection
+        length = int(self.headers.get('Content-Length') or 0)
+        if 0 < length <= 65536:
+            try:
+                self.rfile.read(length)
+            except OSError:
+                pass
+        self.close_connection = True
+        retry_after = getattr(self.server, 'retry_after', RETRY_AFTER)
+        self._send_json(503, busy_payload(retry_after),
+                        headers={'Retry-After': str(retry_after), 'Connection': 'close'})
+
     def do_GET(self):
-        # Determine the file to serve
-        if self.path == '/':
-            filepath = os.path.join(FRONTEND_DIR, 'index.html')
-        elif self.path == '/style.css':
-            filepath = os.path.join(FRONTEND_DIR, 'style.css')
-        elif self.path == '/script.js':
-            filepath = os.path.join(FRONTEND_DIR, 'script.js')
-        else:
-            filepath = os.path.join(FRONTEND_DIR, self.path.lstrip('/'))
+        if urllib.parse.urlsplit(self.path).path == '/health':
+            # Liveness of the frontend itself, for start_full_system.py
+            self._send_json(200, {'status': 'healthy', 'backend_pool': self._backend().stats()})
+            return
+        self._serve_static(send_body=True)
+
+    def do_HEAD(self):
+        self._serve_static(send_body=False)
+
+    def _serve_static(self, send_body):
+        url = urllib.parse.urlsplit(self.path)
+        assets = getattr(self.server, 'assets', None) or default_assets()
+        # Serve index.html for / and for any other unknown path (SPA routing)
+        filepath = assets.resolve(url.path) if url.path != '/' else None
+        filepath = filepath or assets.resolve('index.html')
+        asset = assets.get(filepath) if filepath else None
+        if asset is None:
+            self.send_error(404, "File not found")
+            return
+
+        versioned = 'v=' + asset.version in url.query.split('&')
+        cache_control = IMMUTABLE_CACHE_CONTROL if versioned else REVALIDATE_CACHE_CONTROL
+        encoding, body, etag = asset.select(self.headers.get('Accept-Encoding'))
+        if etag_matches(self.headers.get('If-None-Match'), etag):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', cache_control)
+            self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-type', asset.content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if encoding != 'identity':
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', asset.last_modified)
+        self.send_header('Cache-Control', cache_control)
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+    
+    def _send_json(self, status_code, payload, headers=None):
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode('utf-8')
+        self.send_response(status_code)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _backend_unavailable(self, service):
+        # Backend not available, return error
+        self._send_json(503, {
+            'error': 'Backend service unavailable',
+            'message': f'The {service} service is not running. Please start the backend API server on port 8001.'
+        })
+
+    def _backend(self):
+        return getattr(self.server, 'backend', None) or default_backend()
+
+    def _backend_timeout(self):
+        self._send_json(504, {
+            'error': 'Backend timeout',
+            'message': 'The backend API did not answer in time. Please try again.'
+        })
+
+    def _proxy_json(self, backend_path, service):
+        """Forward the request body to the backend and relay its JSON response"""
+        content_length = int(self.headers['Content-Length'])
+        post_data = self.rfile.read(content_length)
+        
+        try:
+            # Forward request to backend API over a pooled connection
+            status_code, backend_response = self._backend().fetch(
+                'POST', backend_path, post_data, {'Content-Type': 'application/json'}
+            )
+        except TimeoutError:
+            self._backend_timeout()
+            return
+        except (OSError, http.client.HTTPException):
+            self._backend_unavailable(service)
+            return
+        except Exception as e:
+            # Other error
+            self._send_json(500, {'error': str(e)})
+            return
+        
+        # Relay the backend's response, errors (e.g. 504 when Gemini times out) included
+        self._send_json(status_code, backend_response)
+
+    def _write_chunk(self, data):
+        self.wfile.write(b'%x\r\n%b\r\n' % (len(data), data))
+        self.wfile.flush()
+
+    def _proxy_stream(self, backend_path):
+        """Relay the backend's server-sent events chunk by chunk, unbuffered"""
+        content_length = int(self.headers['Content-Length'])
+        post_data = self.rfile.read(content_length)
+        
+        pool = self._backend()
+        try:
+            conn, response = pool.request(
+                'POST', backend_path, post_data,
+                {'Content-Type': 'application/json', 'Accept': 'text/event-stream'}
+            )
+        except TimeoutError:
+            self._backend_timeout()
+            return
+        except (OSError, http.client.HTTPException):
+            self._backend_unavailable('chat')
+            return
         
-        # Check if file exists
-        if os.path.exists(filepath) and os.path.isfile(filepath):
-            # Determine content type
-            if filepath.endswith('.html'):
-                content_type = 'text/html'
-            elif filepath.endswith('.css'):
-                content_type = 'text/css'
-            elif filepath.endswith('.js'):
-                content_type = 'application/javascript'
-            else:
-                content_type = 'text/plain'
+        try:
+            if response.status != 200:
+                self._send_json(response.status, response.read())
+                return
+            # Chunked, so the connection stays open once the stream ends
+            self.send_response(200)
+            self.send_header('Content-type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
             
-            # Read and serve the file
-            try:
-                with open(filepath, 'rb') as f:
-                    content = f.read()
-                
-                self.send_response(200)
-                self.send_header('Content-type', content_type)
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                self.wfile.write(content)
-            except Exception as e:
-                self.send_error(500, f"Error reading file: {e}")
-        else:
-            # Serve index.html for any other path (SPA routing)
-            index_path = os.path.join(FRONTEND_DIR, 'index.html')
-            if os.path.exists(index_path):
-                with open(index_path, 'rb') as f:
-                    content = f.read()
-                
-                self.send_response(200)
-                self.send_header('Content-type', 'text/html')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                self.wfile.write(content)
-            else:
-                self.send_error(404, "File not found")
-    
+            # read1 returns whatever has arrived instead of waiting for a full buffer
+            while True:
+                chunk = response.read1(8192)
+                if not chunk:
+                    break
+                self._write_chunk(chunk)
+            self._write_chunk(b'')
+        except (OSError, http.client.HTTPException):
+            # Browser went away or the backend failed mid-stream; the
+            # response cannot be completed, so drop the connection
+            self.close_connection = True
+        finally:
+            pool.release(conn, response)
+
     def do_POST(self):
         if self.path == '/predict':
             # Handle prediction request by forwarding to backend API on port 8001
-            content_length = int(self.headers['Content-Length'])
-            post_data = self.rfile.read(content_length)
-            
-            try:
-                # Forward request to backend API
-                backend_url = 'http://localhost:8001/predict'
-                req = urllib.request.Request(
-                    backend_url,
-                    data=post_data,
-                    headers={'Content-Type': 'application/json'}
-                )
-                
-                with urllib.request.urlopen(req) as response:
-                    backend_response = response.read()
-                    status_code = response.getcode()
-                
-                # Send response back to frontend
-                self.send_response(status_code)
-                self.send_header('Content-type', 'application/json')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                self.wfile.write(backend_response)
-                
-            except urllib.error.URLError as e:
-                # Backend not available, return error
-                self.send_response(503)
-                self.send_header('Content-type', 'application/json')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                error_response = {
-                    'error': 'Backend service unavailable',
-                    'message': 'The prediction service is not running. Please start the backend API server on port 8001.'
-                }
-                self.wfile.write(json.dumps(error_response).encode('utf-8'))
-            except Exception as e:
-                # Other error
-                self.send_response(500)
-                self.send_header('Content-type', 'application/json')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                error_response = {'error': str(e)}
-                self.wfile.write(json.dumps(error_response).encode('utf-8'))
-                
-        elif self.path == '/chat':
-            # Handle chat request by forwarding to backend API on port 8001
-            content_length = int(self.headers['Content-Length'])
-            post_data = self.rfile.read(content_length)
-            
+            self._proxy_json('/predict', 'prediction')
+        elif self.path in ('/chat', '/chat/stream'):
+            # Chats hold a worker for as long as Gemini takes, so they are capped
+            chat_slots = getattr(self.server, 'chat_slots', None)
+            if chat_slots is not None and not chat_slots.acquire(blocking=False):
+                self.close_connection = True
+                retry_after = getattr(self.server, 'retry_after', RETRY_AFTER)
+                self._send_json(503, {
+                    'error': 'Server busy',
+                    'message': f'Too many chats in progress, retry in {retry_after} seconds.'
+                }, headers={'Retry-After': str(retry_after), 'Connection': 'close'})
+                return
             try:
-                # Forward request to backend API chat endpoint
-                backend_url = 'http://localhost:8001/chat'
-                req = urllib.request.Request(
-                    backend_url,
-                    data=post_data,
-                    headers={'Content-Type': 'application/json'}
-                )
-                
-                with urllib.request.urlopen(req) as response:
-                    backend_response = response.read()
-                    status_code = response.getcode()
-                
-                # Send response back to frontend
-                self.send_response(status_code)
-                self.send_header('Content-type', 'application/json')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                self.wfile.write(backend_response)
-                
-            except urllib.error.URLError as e:
-                # Backend not available, return error
-                self.send_response(503)
-                self.send_header('Content-type', 'application/json')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                error_response = {
-                    'error': 'Backend service unavailable',
-                    'message': 'The chat service is not running. Please start the backend API server on port 8001.'
-                }
-                self.wfile.write(json.dumps(error_response).encode('utf-8'))
-            except Exception as e:
-                # Other error
-                self.send_response(500)
-                self.send_header('Content-type', 'application/json')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                error_response = {'error': str(e)}
-                self.wfile.write(json.dumps(error_response).encode('utf-8'))
+                if self.path == '/chat':
+                    self._proxy_json('/chat', 'chat')
+                else:
+                    self._proxy_stream('/chat/stream')
+            finally:
+                if chat_slots is not None:
+                    chat_slots.release()
         else:
-            # For other POST requests, send 404
+            # For other POST requests, send 404; the body is left unread, so close
             self.send_response(404)
+            self.send_header('Content-Length', '9')
+            self.send_header('Connection', 'close')
             self.end_headers()
             self.wfile.write(b'Not Found')
     
@@ -176,23 +639,34 @@ class DengueRequestHandler(BaseHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Content-Length', '0')
         self.end_headers()
     
     def log_message(self, format, *args):
         # Override to suppress log messages
         return
 
-def run_server():
+def create_server(port=8000, max_workers=MAX_WORKERS, max_chats=MAX_CHATS, retry_after=RETRY_AFTER,
+                  backend_url=None, pool_size=POOL_SIZE, max_connections=None):
+    """Frontend server handling up to ``max_workers`` requests concurrently"""
+    httpd = BoundedThreadingHTTPServer(('', port), DengueRequestHandler, max_workers=max_workers,
+                                       max_chats=max_chats, retry_after=retry_after,
+                                       max_connections=max_connections)
+    httpd.backend = BackendPool(backend_url or BACKEND_URL, size=pool_size)
+    httpd.assets = StaticAssets(FRONTEND_DIR)
+    return httpd
+
+def run_server(port=None):
     # Change to the frontend directory
     os.chdir(FRONTEND_DIR)
     
     # Start the server
-    server_address = ('', 8000)
-    httpd = HTTPServer(server_address, DengueRequestHandler)
+    port = port or int(os.getenv("FRONTEND_PORT", "8000"))
+    httpd = create_server(port)
     print("Dengue Risk Predictor Frontend Server")
     print(f"Serving from: {FRONTEND_DIR}")
-    print("Serving at http://localhost:8000")
-    print("Forwarding API requests to backend at http://localhost:8001")
+    print(f"Serving at http://localhost:{port} ({MAX_WORKERS} workers, {MAX_CHATS} for chats)")
+    print(f"Forwarding API requests to backend at {BACKEND_URL} ({POOL_SIZE} pooled connections)")
     print("Press Ctrl+C to stop the server")
     
     try:
@@ -200,6 +674,7 @@ def run_server():
     except KeyboardInterrupt:
         print("\nServer stopped.")
         httpd.server_close()
+        httpd.backend.close()
 
 if __name__ == "__main__":
     run_server()
\ No newline at end of file
@@ -2,138 +2,259 @@
 """
 Startup script for the complete Dengue Risk Prediction System
 This script will start both the backend API (port 8001) and frontend server (port 8000)
+
+Each server runs as a supervised child process:
+- Its stdout and stderr go straight to a log file (logs/backend.log,
+  logs/frontend.log), so a chatty server never blocks on a full pipe.
+- It counts as ready once its /health endpoint answers, polled with
+  exponential backoff, and the time it took is reported. The frontend is
+  started after the backend is ready and the browser is opened after both.
+- A server that exits unexpectedly is restarted, with an increasing delay
+  while it keeps crashing right after it starts.
+
+Run with: python start_full_system.py [--no-browser] [--no-restart]
 """
 
+import argparse
 import os
+import signal
 import sys
 import subprocess
 import time
-import threading
+import urllib.error
+import urllib.request
 import webbrowser
 
-def start_backend():
-    """Start the backend API server on port 8001"""
-    try:
-        # Change to the api directory
-        api_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'api')
-        print(f"Starting backend API server in: {api_dir}")
-        
-        # Start the backend server
-        backend_process = subprocess.Popen([
-            sys.executable, '-m', 'uvicorn', 'BaseAPI:app', '--host', 'localhost', '--port', '8001'
-        ], cwd=api_dir, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        
-        return backend_process
-    except Exception as e:
-        print(f"Error starting backend server: {e}")
-        return None
+from dotenv import load_dotenv
+
+from api.serve import multi_worker_blockers
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+BACKEND_PORT = 8001
+FRONTEND_PORT = 8000
+
+# Health polling: first retry after 50 ms, doubling up to 1 s between polls
+POLL_INITIAL_DELAY = 0.05
+POLL_MAX_DELAY = 1.0
+# Restart delays for servers that crash shortly after starting
+MIN_UPTIME = 10.0
+MAX_RESTART_DELAY = 30.0
+
+
+class ServiceNotReady(Exception):
+    """A server exited or did not answer its health check in time"""
+
+
+class ManagedService:
+    """A server child process with a log file, a health check and restarts"""
+
+    def __init__(self, name, command, cwd, health_url, log_path, env=None, stop_timeout=10.0):
+        self.name = name
+        self.command = command
+        self.cwd = cwd
+        self.health_url = health_url
+        self.log_path = log_path
+        self.env = env
+        self.stop_timeout = stop_timeout
+        self.process = None
+        self.started_at = None
+        self.ready_seconds = None
+        self.restarts = 0
+        self.restart_delay = 0.0
+
+    def start(self):
+        os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+        with open(self.log_path, 'ab') as log:
+            log.write(f"\n=== {time.strftime('%Y-%m-%d %H:%M:%S')} starting {self.name}: "
+                      f"{' '.join(self.command)}\n".encode('utf-8'))
+            log.flush()
+            # The child writes to its own copy of the file descriptor
+            self.process = subprocess.Popen(self.command, cwd=self.cwd, env=self.env,
+                                            stdout=log, stderr=subprocess.STDOUT)
+        self.started_at = time.perf_counter()
+        self.ready_seconds = None
+        return self.process
+
+    def is_healthy(self):
+        try:
+            with urllib.request.urlopen(self.health_url, timeout=2) as response:
+                return response.status == 200
+        except (urllib.error.URLError, OSError):
+            return False
+
+    def wait_ready(self, timeout):
+        """Poll the health check until it answers; returns seconds since start"""
+        delay = POLL_INITIAL_DELAY
+        deadline = self.started_at + timeout
+        polls = 0
+        while True:
+            polls += 1
+            if self.is_healthy():
+                self.ready_seconds = time.perf_counter() - self.started_at
+                print(f"{self.name} ready in {self.ready_seconds:.2f}s ({polls} health checks)")
+                return self.ready_seconds
+            if self.process.poll() is not None:
+                raise ServiceNotReady(f"{self.name} exited with status {self.process.returncode} "
+                                      f"before it was ready, see {self.log_path}")
+            if time.perf_counter() + delay > deadline:
+                raise ServiceNotReady(f"{self.name} not ready after {timeout:.0f}s, see {self.log_path}")
+            time.sleep(delay)
+            delay = min(delay * 2, POLL_MAX_DELAY)
+
+    def exited(self):
+        return self.process is not None and self.process.poll() is not None
+
+    def restart(self, timeout):
+        uptime = time.perf_counter() - self.started_at
+        print(f"{self.name} exited with status {self.process.returncode} after {uptime:.1f}s, "
+              f"restarting (see {self.log_path})")
+        # Back off while it crashes on startup, reset once it stays up
+        if uptime < MIN_UPTIME:
+            self.restart_delay = min(max(self.restart_delay * 2, 1.0), MAX_RESTART_DELAY)
+            time.sleep(self.restart_delay)
+        else:
+            self.restart_delay = 0.0
+        self.restarts += 1
+        self.start()
+        try:
+            self.wait_ready(timeout)
+        except ServiceNotReady as e:
+            # Left for the next round of the supervision loop
+            print(e)
+
+    def stop(self):
+        if self.process is None or self.process.poll() is not None:
+            return
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=self.stop_timeout)
+            print(f"{self.name} stopped.")
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+            print(f"{self.name} force killed.")
+
+
+def backend_service(log_dir):
+    """The backend API; with API_WORKERS set, the supervised multi-worker launcher"""
+    log_path = os.path.join(log_dir, 'backend.log')
+    health_url = f"http://localhost:{BACKEND_PORT}/health"
+    env = dict(os.environ, PYTHONUNBUFFERED='1')
+    workers = int(os.getenv("API_WORKERS") or "0")
+    blockers = multi_worker_blockers() if workers > 1 else []
+    if blockers:
+        # api.serve would fall back to one worker too; one process keeps chats and the index consistent
+        print(f"Backend API: running 1 worker instead of {workers}: " + "; ".join(blockers))
+        workers = 0
+    if workers:
+        print(f"Backend API: {workers} workers")
+        # Workers get API_GRACEFUL_TIMEOUT to drain on SIGTERM
+        stop_timeout = float(os.getenv("API_GRACEFUL_TIMEOUT", "30")) + 5
+        return ManagedService('Backend API', [
+            sys.executable, '-m', 'api.serve', '--host', 'localhost', '--port', str(BACKEND_PORT)
+        ], BASE_DIR, health_url, log_path, env=env, stop_timeout=stop_timeout)
+    return ManagedService('Backend API', [
+        sys.executable, '-m', 'uvicorn', 'BaseAPI:app', '--host', 'localhost', '--port', str(BACKEND_PORT)
+    ], os.path.join(BASE_DIR, 'api'), health_url, log_path, env=env)
+
+
+def frontend_service(log_dir):
+    env = dict(os.environ, FRONTEND_PORT=str(FRONTEND_PORT),
+               BACKEND_URL=f"http://localhost:{BACKEND_PORT}", PYTHONUNBUFFERED='1')
+    return ManagedService('Frontend server', [sys.executable, 'server.py'],
+                          os.path.join(BASE_DIR, 'frontend'), f"http://localhost:{FRONTEND_PORT}/health",
+                          os.path.join(log_dir, 'frontend.log'), env=env)
 
-def start_frontend():
-    """Start the frontend server on port 8000"""
-    try:
-        # Change to the frontend directory
-        frontend_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'frontend')
-        print(f"Starting frontend server in: {frontend_dir}")
-        
-        # Start the frontend server
-        frontend_process = subprocess.Popen([
-            sys.executable, 'server.py'
-        ], cwd=frontend_dir, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        
-        return frontend_process
-    except Exception as e:
-        print(f"Error starting frontend server: {e}")
-        return None
 
 def open_browser():
-    """Open the browser after a short delay"""
-    # Wait for servers to start
-    time.sleep(5)
-    
-    # Open browser
+    """Open the browser once both servers are ready"""
     try:
-        webbrowser.open('http://localhost:8000')
-        print("Opening browser at http://localhost:8000")
+        webbrowser.open(f'http://localhost:{FRONTEND_PORT}')
+        print(f"Opening browser at http://localhost:{FRONTEND_PORT}")
     except Exception as e:
         print(f"Could not open browser automatically: {e}")
-        print("Please manually navigate to http://localhost:8000")
+        print(f"Please manually navigate to http://localhost:{FRONTEND_PORT}")
+
+
+def supervise(services, restart, startup_timeout):
+    """Watch the servers until Ctrl+C; restart any that exits, or stop if restarts are off"""
+    while True:
+        for service in services:
+            if service.exited():
+                if not restart:
+                    print(f"{service.name} has stopped (status {service.process.returncode})")
+                    return
+                service.restart(startup_timeout)
+        time.sleep(1)
+
+
+def _handle_sigterm(signum, frame):
+    # Stop the servers the same way as on Ctrl+C instead of leaving them running
+    raise KeyboardInterrupt
+
 
 def main():
     """Main function to start everything"""
+    parser = argparse.ArgumentParser(description="Start the backend API and the frontend server")
+    parser.add_argument('--log-dir', default=os.getenv("LOG_DIR", os.path.join(BASE_DIR, 'logs')))
+    parser.add_argument('--startup-timeout', type=float, default=float(os.getenv("STARTUP_TIMEOUT", "120")),
+                        help="seconds each server gets to answer its health check")
+    parser.add_argument('--no-restart', action='store_true', help="stop everything when a server exits")
+    parser.add_argument('--no-browser', action='store_true')
+    args = parser.parse_args()
+    # API_WORKERS and the settings it depends on may come from the .env file
+    load_dotenv(os.path.join(BASE_DIR, '.env'))
+
     print("=" * 60)
     print("DENGUE RISK PREDICTOR - COMPLETE SYSTEM STARTUP")
     print("=" * 60)
     print("Ports configuration:")
-    print("  - Frontend server: http://localhost:8000")
-    print("  - Backend API: http://localhost:8001")
+    print(f"  - Frontend server: http://localhost:{FRONTEND_PORT}")
+    print(f"  - Backend API: http://localhost:{BACKEND_PORT}")
+    print(f"Logs: {args.log_dir}")
     print("=" * 60)
-    
-    backend_process = None
-    frontend_process = None
-    
+
+    signal.signal(signal.SIGTERM, _handle_sigterm)
+    backend = backend_service(args.log_dir)
+    frontend = frontend_service(args.log_dir)
+    services = []
+    start = time.perf_counter()
+
     try:
-        # Start the backend server
-        print("Starting backend API server...")
-        backend_process = start_backend()
-        if not backend_process:
-            print("Failed to start backend server")
-            return
-            
-        # Start the frontend server
-        print("Starting frontend server...")
-        frontend_process = start_frontend()
-        if not frontend_process:
-            print("Failed to start frontend server")
-            if backend_process:
-                backend_process.terminate()
-            return
-            
-        # Open browser in a separate thread
-        browser_thread = threading.Thread(target=open_browser)
-        browser_thread.daemon = True
-        browser_thread.start()
-        
+        # The frontend proxies to the backend, so it starts once the backend answers
+        for service in (backend, frontend):
+            print(f"Starting {service.name}...")
+            service.start()
+            services.append(service)
+            service.wait_ready(args.startup_timeout)
+        total = time.perf_counter() - start
+
+        if not args.no_browser:
+            open_browser()
+
         print("\n" + "=" * 60)
-        print("SYSTEM IS NOW RUNNING!")
+        print(f"SYSTEM IS NOW RUNNING! (ready in {total:.2f}s: backend {backend.ready_seconds:.2f}s, "
+              f"frontend {frontend.ready_seconds:.2f}s)")
         print("=" * 60)
-        print("Frontend URL: http://localhost:8000")
-        print("Backend API URL: http://localhost:8001")
+        print(f"Frontend URL: http://localhost:{FRONTEND_PORT}")
+        print(f"Backend API URL: http://localhost:{BACKEND_PORT}")
         print("Press Ctrl+C to stop both servers")
         print("=" * 60)
-        
-        # Wait for both processes
-        while True:
-            if backend_process.poll() is not None:
-                print("Backend server has stopped")
-                break
-            if frontend_process.poll() is not None:
-                print("Frontend server has stopped")
-                break
-            time.sleep(1)
-            
+
+        supervise(services, not args.no_restart, args.startup_timeout)
+
+    except ServiceNotReady as e:
+        print(f"Startup failed: {e}")
     except KeyboardInterrupt:
         print("\nShutting down servers...")
     except Exception as e:
         print(f"Error: {e}")
     finally:
-        # Clean shutdown
-        if backend_process:
-            try:
-                backend_process.terminate()
-                backend_process.wait(timeout=5)
-                print("Backend server stopped.")
-            except subprocess.TimeoutExpired:
-                backend_process.kill()
-                print("Backend server force killed.")
-                
-        if frontend_process:
-            try:
-                frontend_process.terminate()
-                frontend_process.wait(timeout=5)
-                print("Frontend server stopped.")
-            except subprocess.TimeoutExpired:
-                frontend_process.kill()
-                print("Frontend server force killed.")
+        # Clean shutdown, frontend first so it stops sending requests to the backend
+        for service in reversed(services):
+            service.stop()
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
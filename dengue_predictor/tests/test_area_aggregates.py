@@ -0,0 +1,159 @@
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import joblib
+import pandas as pd
+
+# Add the parent directory to the path to import from other modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from db.area_aggregates import AreaAggregateStore, totals_from_metadata
+from db.bulk_loader import score_frame
+
+MODEL_PATH = os.path.join(os.path.dirname(__file__), '..', 'core', 'models', 'logistic_regression_model.joblib')
+DATASET_PATH = os.path.join(os.path.dirname(__file__), '..', 'datasets', 'dataset.csv')
+
+CASE = {'Age': 35, 'Gender': 1, 'NS1': 1, 'IgG': 1, 'IgM': 0, 'Area': 'Mirpur',
+        'AreaType': 'Undeveloped', 'HouseType': 'Building', 'District': 'Dhaka'}
+
+
+def test_running_totals():
+    """Recorded cases update count, mean risk, positives and time range"""
+    store = AreaAggregateStore()
+    store.record(dict(CASE, Outcome=1), 0.9, timestamp=100.0)
+    store.record_many([(dict(CASE, Outcome=0), 0.5), (dict(CASE, Area='Gulshan'), 0.2)], timestamp=200.0)
+
+    stats = store.area_statistics('Dhaka', 'Mirpur')
+    assert stats['total_cases'] == 2
+    assert abs(stats['avg_risk_score'] - 0.7) < 1e-12
+    assert stats['positive_cases'] == 1 and stats['positive_rate'] == 0.5
+    assert stats['first_case_at'] < stats['last_case_at']
+    assert stats['truncated'] is False
+    assert store.area_statistics('Dhaka', 'Unknown') is None
+
+    areas = store.high_risk_areas(threshold=0.5)
+    assert [(a['area'], a['case_count']) for a in areas] == [('Mirpur', 2)]
+    assert all(a['truncated'] is False for a in areas)
+    assert [a['area'] for a in store.high_risk_areas(threshold=0.0)] == ['Mirpur', 'Gulshan']
+    print("OK running totals")
+
+
+def test_rebuild_matches_dataset_and_persists():
+    """A rebuilt store holds exact dataset statistics and survives a reload"""
+    model = joblib.load(MODEL_PATH)
+    df = pd.read_csv(DATASET_PATH)
+    risks = score_frame(df, model)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'aggregates.json')
+        AreaAggregateStore(path).rebuild_from_dataset(df, model)
+        store = AreaAggregateStore(path)
+
+        assert store.total_cases == len(df)
+        assert len(store) == df.groupby(['District', 'Area']).ngroups
+        mirpur = (df['District'] == 'Dhaka') & (df['Area'] == 'Mirpur')
+        stats = store.area_statistics('Dhaka', 'Mirpur')
+        assert stats['total_cases'] == int(mirpur.sum())
+        assert stats['positive_cases'] == int(df.loc[mirpur, 'Outcome'].sum())
+        assert abs(stats['avg_risk_score'] - risks[mirpur.values].mean()) < 1e-9
+
+        # Incremental updates continue from the persisted totals
+        store.record(CASE, 1.0)
+        store.save()
+        assert AreaAggregateStore(path).area_statistics('Dhaka', 'Mirpur')['total_cases'] == stats['total_cases'] + 1
+    print("OK rebuild and persistence")
+
+
+def test_workers_sharing_the_file_do_not_lose_cases():
+    """Two stores on one file stand in for two worker processes"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'aggregates.json')
+        assert AreaAggregateStore(path).seed_from(lambda: [])
+        first_worker, second_worker = AreaAggregateStore(path), AreaAggregateStore(path)
+        for _ in range(3):
+            first_worker.record(CASE, 0.8)
+            second_worker.record(CASE, 0.4)
+            second_worker.record(dict(CASE, Area='Gulshan'), 0.1)
+            first_worker.save()
+            second_worker.save()
+
+        stats = AreaAggregateStore(path).area_statistics('Dhaka', 'Mirpur')
+        assert stats['total_cases'] == 6
+        assert abs(stats['avg_risk_score'] - 0.6) < 1e-12
+        # Each worker sees the other's cases once they are saved
+        assert first_worker.area_statistics('Dhaka', 'Gulshan')['total_cases'] == 3
+        assert first_worker.area_statistics('Dhaka', 'Mirpur')['total_cases'] == 6
+    print("OK workers merge their cases into the shared file")
+
+
+def _metadata(area, risk, outcome, timestamp):
+    return {'district': 'Dhaka', 'area': area, 'risk_score': risk, 'outcome': outcome,
+            'timestamp': datetime.fromtimestamp(timestamp).isoformat()}
+
+
+def test_seeding_from_an_existing_index():
+    """Cases already in the index are counted once; until then nothing is written"""
+    index = [_metadata('Mirpur', 0.9, 1, 100.0), _metadata('Mirpur', 0.5, 0, 200.0),
+             _metadata('Gulshan', 0.2, 0, 300.0), {'district': 'Dhaka', 'area': 'Badda', 'risk_score': 0.4}]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'aggregates.json')
+        # A file from before seeding existed, with only the cases written since
+        with open(path, 'w') as f:
+            json.dump({"areas": [{"district": "Dhaka", "area": "Mirpur", "count": 1, "risk_sum": 0.5,
+                                  "positive": 0, "first_seen": 200.0, "last_seen": 200.0}]}, f)
+
+        store = AreaAggregateStore(path)
+        assert not store.seeded
+        # Written before seeding: this case is in the index snapshot too
+        store.record_metadata([_metadata('Mirpur', 0.9, 1, 100.0)])
+        store.save()
+        with open(path) as f:
+            assert json.load(f)['areas'][0]['count'] == 1
+
+        index.append(_metadata('Mirpur', 0.7, 0, time.time() + 60))   # arrives during the scan
+        assert store.seed_from(lambda: iter(index))
+        store.record_metadata([_metadata('Mirpur', 0.7, 0, time.time() + 60)])
+        store.save()
+        assert not AreaAggregateStore(path).seed_from(lambda: iter(index))
+
+        reloaded = AreaAggregateStore(path)
+        assert reloaded.seeded
+        stats = reloaded.area_statistics('Dhaka', 'Mirpur')
+        assert stats['total_cases'] == 3 and stats['positive_cases'] == 1
+        assert abs(stats['avg_risk_score'] - 0.7) < 1e-12
+        assert reloaded.area_statistics('Dhaka', 'Badda')['total_cases'] == 1
+        assert [a['area'] for a in reloaded.high_risk_areas(0.6)] == ['Mirpur']
+    print("OK an existing index is counted once into the store")
+
+
+def test_unseeded_worker_picks_up_the_seed():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'aggregates.json')
+        other_worker = AreaAggregateStore(path)
+        other_worker.record_metadata([_metadata('Mirpur', 0.4, 0, time.time() + 60)])
+        AreaAggregateStore(path).seed_from(lambda: [_metadata('Mirpur', 0.8, 0, 100.0)])
+
+        other_worker.save()
+        assert other_worker.seeded
+        assert AreaAggregateStore(path).area_statistics('Dhaka', 'Mirpur')['total_cases'] == 2
+    print("OK another worker's seed is adopted, with the cases recorded meanwhile")
+
+
+def test_totals_from_metadata_cutoff():
+    rows = totals_from_metadata([_metadata('Mirpur', 0.9, 1, 100.0), _metadata('Mirpur', 0.5, 0, 500.0)],
+                                before=300.0)
+    assert rows[('Dhaka', 'Mirpur')][:3] == [1, 0.9, 1]
+    print("OK cases newer than the snapshot are left out")
+
+
+if __name__ == "__main__":
+    test_running_totals()
+    test_rebuild_matches_dataset_and_persists()
+    test_workers_sharing_the_file_do_not_lose_cases()
+    test_seeding_from_an_existing_index()
+    test_unseeded_worker_picks_up_the_seed()
+    test_totals_from_metadata_cutoff()
@@ -0,0 +1,100 @@
+import os
+import sys
+
+# Add the parent directory to the path to import from other modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+os.environ.setdefault("WARMUP_ON_STARTUP", "0")
+
+from fastapi.testclient import TestClient
+
+from api import BaseAPI
+from benchmarks.fakes import FakeVectorDB
+from benchmarks.synthetic import PatientSampler
+from db import vector_store
+
+# Startup hooks are not run, so queued cases stay pending until flushed here
+vector_db = FakeVectorDB(write_delay=0)
+vector_store.vector_db.set(vector_db)
+client = TestClient(BaseAPI.app)
+
+
+def _written_cases():
+    BaseAPI.case_writer.flush()
+    return vector_db.cases
+
+
+def test_batch_matches_single_predictions():
+    """Every record of a batch is scored exactly as /predict scores it"""
+    patients = PatientSampler.from_csv(seed=11).sample(25)
+    written = _written_cases()
+
+    response = client.post("/predict/batch", json={"records": patients})
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["total"], body["succeeded"], body["failed"]) == (25, 25, 0)
+    assert _written_cases() == written + 25
+
+    for patient, item in zip(patients, body["results"]):
+        single = client.post("/predict", json=patient).json()
+        assert item["error"] is None
+        assert item["probability"] == single["probability"]
+        assert item["risk_level"] == single["risk_level"]
+        assert item["confidence"] == single["confidence"]
+        assert item["key_factors"] == single["key_factors"]
+    assert [item["index"] for item in body["results"]] == list(range(25))
+    print("OK batch probabilities match /predict")
+
+
+def test_invalid_records_get_errors_by_index():
+    """Malformed records are reported per index and the valid ones still scored"""
+    valid = PatientSampler.from_csv(seed=12).sample(3)
+    missing_area = dict(valid[0])
+    del missing_area["Area"]
+    bad_age = dict(valid[1], Age="thirty")
+    records = [valid[0], missing_area, valid[1], bad_age, valid[2]]
+    written = _written_cases()
+
+    body = client.post("/predict/batch", json={"records": records}).json()
+    assert (body["total"], body["succeeded"], body["failed"]) == (5, 3, 2)
+    results = body["results"]
+    for i in (0, 2, 4):
+        assert results[i]["error"] is None and results[i]["probability"] is not None
+    assert "Area" in results[1]["error"] and results[1]["probability"] is None
+    assert "Age" in results[3]["error"] and results[3]["probability"] is None
+    # Only the valid records are stored
+    assert _written_cases() == written + 3
+    print("OK invalid records get per-index errors, valid ones are scored")
+
+
+def test_empty_batch():
+    written = _written_cases()
+    response = client.post("/predict/batch", json={"records": []})
+    assert response.status_code == 200
+    assert response.json() == {"total": 0, "succeeded": 0, "failed": 0, "results": []}
+    assert _written_cases() == written
+    print("OK empty batch")
+
+
+def test_batch_size_limit():
+    """Batches over BATCH_MAX_RECORDS are refused with 413 before any scoring"""
+    limit = BaseAPI.BATCH_MAX_RECORDS
+    BaseAPI.BATCH_MAX_RECORDS = 4
+    try:
+        patients = PatientSampler.from_csv(seed=13).sample(5)
+        written = _written_cases()
+        response = client.post("/predict/batch", json={"records": patients})
+        assert response.status_code == 413
+        assert "limit of 4" in response.json()["detail"]
+        assert _written_cases() == written
+        assert client.post("/predict/batch", json={"records": patients[:4]}).status_code == 200
+    finally:
+        BaseAPI.BATCH_MAX_RECORDS = limit
+    print("OK batches over the limit get 413")
+
+
+if __name__ == "__main__":
+    test_batch_matches_single_predictions()
+    test_invalid_records_get_errors_by_index()
+    test_empty_batch()
+    test_batch_size_limit()
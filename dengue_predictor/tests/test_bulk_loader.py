@@ -0,0 +1,109 @@
+import os
+import sys
+import threading
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+# Add the parent directory to the path to import from other modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from db.bulk_loader import bulk_load_cases
+from db.case_records import cases_from_frame
+
+MODEL_PATH = os.path.join(os.path.dirname(__file__), '..', 'core', 'models', 'logistic_regression_model.joblib')
+DATASET_PATH = os.path.join(os.path.dirname(__file__), '..', 'datasets', 'dataset.csv')
+
+
+class InMemoryIndex:
+    """Local stand-in for a Pinecone index"""
+
+    def __init__(self, delay=0.0, fail_on_call=None):
+        self.vectors = {}
+        self.calls = 0
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self.delay = delay
+        self.fail_on_call = fail_on_call
+
+    def upsert(self, vectors):
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        try:
+            time.sleep(self.delay)
+            if call == self.fail_on_call:
+                raise RuntimeError("upsert failed")
+            with self._lock:
+                for vector_id, values, metadata in vectors:
+                    self.vectors[vector_id] = (values, metadata)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+
+def fake_embed(cases, predictions, descriptions):
+    return np.array([[case['Age'], prediction] for case, prediction in zip(cases, predictions)])
+
+
+def test_bulk_load_scores_once_and_chunks_upserts():
+    """1000 rows become 10 chunked upserts with sklearn-equal risk scores"""
+    model = joblib.load(MODEL_PATH)
+    df = pd.read_csv(DATASET_PATH)
+    index = InMemoryIndex(delay=0.02)
+    messages = []
+
+    stats = bulk_load_cases(df, model, index, fake_embed, chunk_size=100,
+                            max_concurrency=4, progress=messages.append)
+
+    assert stats['upserted'] == len(df) and stats['failed'] == 0
+    assert index.calls == 10
+    assert 1 < index.max_in_flight <= 4
+    assert len(index.vectors) == len(df)
+    assert any('cases/s' in message for message in messages)
+
+    metadata = [meta for _, meta in index.vectors.values()]
+    assert all(isinstance(meta['age'], int) for meta in metadata)
+    assert {meta['district'] for meta in metadata} == set(df['District'])
+
+    # Risk scores match the model's own probabilities
+    from core.feature_encoder import FeatureEncoder
+    encoder = FeatureEncoder.from_model(model)
+    expected = sorted(model.predict_proba(encoder.to_frame(encoder.encode_frame(df)))[:, 1])
+    stored = sorted(meta['risk_score'] for meta in metadata)
+    assert np.allclose(stored, expected, atol=1e-12)
+    print(f"OK loaded {stats['upserted']} cases at {stats['cases_per_second']} cases/s")
+
+
+def test_bulk_load_reports_failed_chunks():
+    """A failing chunk is reported without aborting the rest of the load"""
+    model = joblib.load(MODEL_PATH)
+    df = pd.read_csv(DATASET_PATH).head(250)
+    index = InMemoryIndex(fail_on_call=1)
+    written = []
+    stats = bulk_load_cases(df, model, index, fake_embed, chunk_size=100,
+                            max_concurrency=1, progress=lambda message: None,
+                            on_upserted=written.extend)
+    assert stats['failed'] == 100
+    assert stats['upserted'] == 150
+    # Only the vectors that reached the index are reported to the caller
+    assert sorted(vector_id for vector_id, _, _ in written) == sorted(index.vectors)
+    print("OK failed chunks are reported")
+
+
+def test_cases_from_frame_uses_api_gender_codes():
+    df = pd.read_csv(DATASET_PATH).head(5)
+    cases = cases_from_frame(df)
+    assert [case['Gender'] for case in cases] == [int(g == 'Male') for g in df['Gender']]
+    print("OK dataset rows are converted to API case dicts")
+
+
+if __name__ == "__main__":
+    test_bulk_load_scores_once_and_chunks_upserts()
+    test_bulk_load_reports_failed_chunks()
+    test_cases_from_frame_uses_api_gender_codes()
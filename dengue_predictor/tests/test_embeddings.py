@@ -0,0 +1,106 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add the parent directory to the path to import from other modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from db.case_records import cases_from_frame
+from db.embeddings import (HashingTextEmbedder, StructuredFeatureEmbedder, check_index_layout, is_empty,
+                           load_embedder)
+
+DATASET_PATH = os.path.join(os.path.dirname(__file__), '..', 'datasets', 'dataset.csv')
+
+CASE = {
+    'Age': 35, 'Gender': 1, 'NS1': 1, 'IgG': 1, 'IgM': 0,
+    'Area': 'Mirpur', 'AreaType': 'Undeveloped', 'HouseType': 'Building', 'District': 'Dhaka'
+}
+
+
+def test_structured_embeddings_are_compact_and_distinct():
+    """Different cases get different, dense, normalised vectors"""
+    embedder = load_embedder(backend="structured")
+    assert embedder.dimension == embedder.natural_dimension < 100
+
+    other = dict(CASE, Area='Badda', NS1=0)
+    vectors = embedder.embed_cases([CASE, CASE, other], [0.9, 0.9, 0.3])
+    assert vectors.dtype == np.float32 and vectors.shape == (3, embedder.dimension)
+    np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1.0, rtol=1e-6)
+    np.testing.assert_array_equal(vectors[0], vectors[1])
+    assert vectors[0] @ vectors[2] < 0.9
+
+    # Batch and single-case embeddings agree
+    np.testing.assert_allclose(embedder.embed_cases([other], [0.3])[0], vectors[2], rtol=1e-6)
+    print("OK structured embeddings are deterministic and distinct")
+
+
+def test_query_finds_matching_area():
+    """A text query about an area ranks that area's cases first"""
+    embedder = load_embedder(backend="structured")
+    df = pd.read_csv(DATASET_PATH)
+    vectors = embedder.embed_cases(cases_from_frame(df))
+    query = embedder.embed_query("Dhaka Mirpur dengue risk")
+    top = np.argsort(-(vectors @ query))[:20]
+    assert set(df.iloc[top]['Area']) == {'Mirpur'}
+
+    query = embedder.embed_query("45-year-old female in Gulshan with NS1 positive and IgM negative")
+    top = np.argsort(-(vectors @ query))[:5]
+    assert set(df.iloc[top]['Area']) == {'Gulshan'}
+    assert set(df.iloc[top]['NS1']) == {1}
+    print("OK structured queries match the right cases")
+
+
+def test_dimension_matches_index():
+    """Embeddings can be padded or folded to an index's fixed dimension"""
+    categories = {'Area': ['Mirpur', 'Badda'], 'AreaType': ['Developed'],
+                  'District': ['Dhaka'], 'HouseType': ['Building']}
+    for dimension in (1536, 8):
+        embedder = StructuredFeatureEmbedder(categories, dimension)
+        vector = embedder.embed_cases([CASE], [0.5])
+        assert vector.shape == (1, dimension)
+        assert np.isclose(np.linalg.norm(vector), 1.0)
+    print("OK embeddings fit the configured dimension")
+
+
+def test_hashing_text_embedder():
+    embedder = HashingTextEmbedder(dimension=64)
+    a = embedder.embed_query("high risk dengue case in Mirpur")
+    b = embedder.embed_query("high risk dengue case in Mirpur")
+    c = embedder.embed_query("low risk Gulshan")
+    np.testing.assert_array_equal(a, b)
+    assert a @ b > c @ a
+    print("OK hashing text embedder is deterministic")
+
+
+def test_layout_guards_mixed_indexes():
+    """Indexes written with another layout are refused, empty queries are detected"""
+    categories = {'Area': ['Mirpur', 'Badda'], 'AreaType': ['Developed'],
+                  'District': ['Dhaka'], 'HouseType': ['Building']}
+    embedder = StructuredFeatureEmbedder(categories)
+    assert embedder.layout == StructuredFeatureEmbedder(categories).layout
+    assert embedder.layout != StructuredFeatureEmbedder(dict(categories, Area=['Badda', 'Mirpur'])).layout
+    assert embedder.layout != StructuredFeatureEmbedder(categories, 1536).layout
+
+    check_index_layout(embedder.layout, 100, embedder)
+    check_index_layout(None, 0, embedder)
+    for stored in (None, HashingTextEmbedder(1536).layout):
+        try:
+            check_index_layout(stored, 100, embedder)
+        except ValueError as e:
+            assert "100 vectors" in str(e)
+            continue
+        raise AssertionError(f"an index with layout {stored} should be refused")
+
+    assert is_empty(embedder.embed_query("anything about dengue?"))
+    assert not is_empty(embedder.embed_query("cases in Mirpur"))
+    print("OK mixed layouts refused, empty queries detected")
+
+
+if __name__ == "__main__":
+    test_structured_embeddings_are_compact_and_distinct()
+    test_query_finds_matching_area()
+    test_dimension_matches_index()
+    test_hashing_text_embedder()
+    test_layout_guards_mixed_indexes()
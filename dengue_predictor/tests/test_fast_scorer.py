@@ -0,0 +1,59 @@
+import os
+import sys
+
+import joblib
+import numpy as np
+import pandas as pd
+
+# Add the parent directory to the path to import from other modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from core.feature_encoder import FeatureEncoder
+from core.fast_scorer import EstimatorScorer, LogisticScorer, build_scorer
+
+MODEL_PATH = os.path.join(os.path.dirname(__file__), '..', 'core', 'models', 'logistic_regression_model.joblib')
+DATASET_PATH = os.path.join(os.path.dirname(__file__), '..', 'datasets', 'dataset.csv')
+
+
+def test_closed_form_matches_predict_proba():
+    """The fast scorer reproduces sklearn's probabilities to 1e-12"""
+    model = joblib.load(MODEL_PATH)
+    encoder = FeatureEncoder.from_model(model)
+    scorer = build_scorer(model, encoder, fast=True)
+    assert isinstance(scorer, LogisticScorer)
+
+    df = pd.read_csv(DATASET_PATH)
+    expected = model.predict_proba(encoder.to_frame(encoder.encode_frame(df)))[:, 1]
+
+    batch = scorer.score_matrix(encoder.encode_frame(df))
+    assert np.max(np.abs(batch - expected)) <= 1e-12
+
+    records = df.to_dict('records')
+    single = np.array([scorer.score(record) for record in records])
+    assert np.max(np.abs(single - expected)) <= 1e-12
+    print(f"OK closed-form scorer matches predict_proba on {len(df)} rows")
+
+
+def test_fallback_for_other_estimators():
+    """Estimators without a binary coef_ fall back to predict_proba"""
+    from sklearn.tree import DecisionTreeClassifier
+
+    model = joblib.load(MODEL_PATH)
+    encoder = FeatureEncoder.from_model(model)
+    df = pd.read_csv(DATASET_PATH).head(300)
+    X = encoder.to_frame(encoder.encode_frame(df))
+    tree = DecisionTreeClassifier(max_depth=3, random_state=0).fit(X, df['Outcome'])
+
+    scorer = build_scorer(tree, encoder)
+    assert isinstance(scorer, EstimatorScorer)
+    record = df.to_dict('records')[0]
+    assert scorer.score(record) == float(tree.predict_proba(encoder.to_frame(encoder.encode(record)))[0][1])
+
+    forced = build_scorer(model, encoder, fast=False)
+    assert isinstance(forced, EstimatorScorer)
+    print("OK fallback scorer is used for other estimator types")
+
+
+if __name__ == "__main__":
+    test_closed_form_matches_predict_proba()
+    test_fallback_for_other_estimators()
@@ -0,0 +1,98 @@
+import os
+import sys
+
+import joblib
+import numpy as np
+import pandas as pd
+
+# Add the parent directory to the path to import from other modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from core.feature_encoder import FeatureEncoder
+
+MODEL_PATH = os.path.join(os.path.dirname(__file__), '..', 'core', 'models', 'logistic_regression_model.joblib')
+DATASET_PATH = os.path.join(os.path.dirname(__file__), '..', 'datasets', 'dataset.csv')
+
+PATIENT = {
+    'Age': 35, 'Gender': 1, 'NS1': 1, 'IgG': 1, 'IgM': 0,
+    'Area': 'Mirpur', 'AreaType': 'Undeveloped', 'HouseType': 'Building', 'District': 'Dhaka'
+}
+
+
+def _load():
+    model = joblib.load(MODEL_PATH)
+    return model, FeatureEncoder.from_model(model)
+
+
+def _reference_row(data, feature_names):
+    """Encoding as the original hand-written dict did it"""
+    row = []
+    for name in feature_names:
+        if name in ('Gender', 'Age', 'NS1', 'IgG', 'IgM'):
+            row.append(float(data[name]))
+        else:
+            field, _, value = name.partition('_')
+            row.append(1.0 if data.get(field) == value else 0.0)
+    return np.array(row)
+
+
+def test_encode_matches_reference():
+    """The encoder writes the same columns as the original dict encoding"""
+    model, encoder = _load()
+    row = encoder.encode(PATIENT)
+    assert row.shape == (model.n_features_in_,)
+    np.testing.assert_array_equal(row, _reference_row(PATIENT, list(model.feature_names_in_)))
+    print("OK encode matches the original encoding")
+
+
+def test_unknown_category_sets_no_column():
+    """Unknown areas (e.g. outside Dhaka) leave every one-hot column at zero"""
+    model, encoder = _load()
+    patient = dict(PATIENT, Area='Uttara', AreaType='Urban')
+    values, indices = encoder.active_columns(patient)
+    assert list(values) == [1.0, 35.0, 1.0, 1.0, 0.0]
+    assert len(indices) == 2  # District_Dhaka and HouseType_Building only
+    np.testing.assert_array_equal(encoder.encode(patient), _reference_row(patient, list(model.feature_names_in_)))
+    print("OK unknown categories are ignored")
+
+
+def test_encode_reuses_buffer_and_resets():
+    """The preallocated row is cleared between records"""
+    _, encoder = _load()
+    first = encoder.encode(PATIENT)
+    second = encoder.encode(dict(PATIENT, Area='Badda', HouseType='Tinshed'))
+    assert first is second
+    assert second.sum() == 1 + 35 + 1 + 1 + 0 + 4
+    print("OK row buffer is reused and reset")
+
+
+def test_encode_frame_matches_encode_many():
+    """Vectorized DataFrame encoding matches per-record encoding"""
+    model, encoder = _load()
+    df = pd.read_csv(DATASET_PATH).head(200)
+    records = df.to_dict('records')
+    np.testing.assert_array_equal(encoder.encode_frame(df), encoder.encode_many(records))
+
+    probabilities = model.predict_proba(encoder.to_frame(encoder.encode_frame(df)))[:, 1]
+    assert probabilities.shape == (200,)
+    print("OK encode_frame matches encode_many")
+
+
+def test_simplified_app_copy_is_in_sync():
+    """Dengue_Simplified ships its own copy of the encoder, which must not drift"""
+    simplified = os.path.join(os.path.dirname(__file__), '..', '..', 'Dengue_Simplified', 'feature_encoder.py')
+    original = os.path.join(os.path.dirname(__file__), '..', 'core', 'feature_encoder.py')
+    if not os.path.exists(simplified):
+        print("SKIP Dengue_Simplified is not checked out")
+        return
+    with open(simplified, 'rb') as f, open(original, 'rb') as g:
+        assert f.read() == g.read(), "Copy core/feature_encoder.py to Dengue_Simplified/feature_encoder.py"
+    print("OK Dengue_Simplified encoder matches core")
+
+
+if __name__ == "__main__":
+    test_encode_matches_reference()
+    test_unknown_category_sets_no_column()
+    test_encode_reuses_buffer_and_resets()
+    test_encode_frame_matches_encode_many()
+    test_simplified_app_copy_is_in_sync()
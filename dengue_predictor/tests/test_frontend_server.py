@@ -0,0 +1,300 @@
+import gzip
+import http.client
+import json
+import os
+import re
+import socket
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add the frontend directory to the path to import the server module
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'frontend'))
+
+import server as frontend
+
+
+class SlowBackend(BaseHTTPRequestHandler):
+    """Backend whose /chat takes a second and /predict answers at once"""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        if self.path == '/chat':
+            time.sleep(1.0)
+        payload = json.dumps({'ok': self.path}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        return
+
+
+class KeepAliveBackend(BaseHTTPRequestHandler):
+    """HTTP/1.1 backend that counts the connections it accepts"""
+    protocol_version = 'HTTP/1.1'
+    connections = 0
+
+    def setup(self):
+        super().setup()
+        KeepAliveBackend.connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        if self.path == '/chat/stream':
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for event in (b'data: one\n\n', b'data: two\n\n', b''):
+                self.wfile.write(b'%x\r\n%b\r\n' % (len(event), event))
+            return
+        payload = json.dumps({'ok': self.path}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        return
+
+
+def _serve(server):
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _post(url, payload):
+    req = urllib.request.Request(url, data=json.dumps(payload).encode('utf-8'),
+                                 headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(req, timeout=10) as response:
+            return response.status, dict(response.headers), response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, dict(e.headers), e.read()
+
+
+def _start(max_workers, max_chats):
+    backend = ThreadingHTTPServer(('127.0.0.1', 0), SlowBackend)
+    backend.daemon_threads = True
+    frontend.BACKEND_URL = _serve(backend)
+    return _serve(frontend.create_server(0, max_workers=max_workers, max_chats=max_chats, retry_after=3))
+
+
+def test_chats_do_not_block_other_requests():
+    url = _start(max_workers=8, max_chats=2)
+    results = []
+    chats = [threading.Thread(target=lambda: results.append(_post(url + '/chat', {'message': 'hi'})))
+             for _ in range(3)]
+    for chat in chats:
+        chat.start()
+    time.sleep(0.3)
+
+    start = time.perf_counter()
+    status, _, body = _post(url + '/predict', {})
+    assert status == 200 and b'/predict' in body
+    with urllib.request.urlopen(url + '/', timeout=10) as response:
+        assert b'<html' in response.read().lower()
+    assert time.perf_counter() - start < 0.5
+
+    for chat in chats:
+        chat.join()
+    statuses = sorted(status for status, _, _ in results)
+    assert statuses == [200, 200, 503]
+    busy = [headers for status, headers, _ in results if status == 503][0]
+    assert busy['Retry-After'] == '3'
+    print("OK /predict and static files are served while chats wait; extra chats get 503")
+
+
+def test_saturated_server_answers_503():
+    url = _start(max_workers=1, max_chats=1)
+    slow = threading.Thread(target=lambda: _post(url + '/chat', {'message': 'hi'}))
+    slow.start()
+    time.sleep(0.3)
+
+    status, headers, body = _post(url + '/predict', {})
+    assert status == 503 and headers['Retry-After'] == '3'
+    assert json.loads(body)['error'] == 'Server busy'
+    slow.join()
+    assert _post(url + '/predict', {})[0] == 200
+    print("OK connections beyond the worker limit get 503 + Retry-After")
+
+
+def test_idle_keepalive_connections_do_not_hold_workers():
+    url = _start(max_workers=1, max_chats=1)
+    port = int(url.rsplit(':', 1)[1])
+    idle = []
+    for _ in range(3):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+        conn.request('POST', '/predict', body=b'{}', headers={'Content-Type': 'application/json'})
+        response = conn.getresponse()
+        assert response.status == 200
+        response.read()
+        # Kept open, as a browser tab does between requests
+        idle.append(conn)
+    assert _post(url + '/predict', {})[0] == 200
+    for conn in idle:
+        conn.close()
+    print("OK idle keep-alive connections leave the single worker free")
+
+
+class DroppingBackend(BaseHTTPRequestHandler):
+    """Keep-alive backend that drops the connection instead of answering a second request"""
+    protocol_version = 'HTTP/1.1'
+    received = []
+
+    def handle(self):
+        self.answered = 0
+        super().handle()
+
+    def _respond(self):
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        DroppingBackend.received.append(self.command)
+        if self.answered:
+            self.close_connection = True
+            return
+        self.answered += 1
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'{}')
+
+    do_GET = do_POST = _respond
+
+    def log_message(self, format, *args):
+        return
+
+
+def test_sent_posts_are_not_retried():
+    backend = ThreadingHTTPServer(('127.0.0.1', 0), DroppingBackend)
+    backend.daemon_threads = True
+    pool = frontend.BackendPool(_serve(backend), size=1, max_idle=60)
+
+    for method, retried in (('GET', True), ('POST', False)):
+        DroppingBackend.received = []
+        assert pool.fetch(method, '/predict', b'{}')[0] == 200
+        try:
+            status = pool.fetch(method, '/predict', b'{}')[0]
+        except http.client.RemoteDisconnected:
+            status = None
+        if retried:
+            assert status == 200 and DroppingBackend.received == ['GET'] * 3
+        else:
+            # The backend got the POST once; sending it again could queue the case twice
+            assert status is None and DroppingBackend.received == ['POST'] * 2
+        pool.close()
+    backend.shutdown()
+    print("OK only idempotent requests are retried after they were sent")
+
+
+def test_backend_connections_are_pooled():
+    backend = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveBackend)
+    backend.daemon_threads = True
+    backend_url = _serve(backend)
+    frontend_server = frontend.create_server(0, backend_url=backend_url, pool_size=4)
+    url = _serve(frontend_server)
+    KeepAliveBackend.connections = 0
+
+    # One browser connection carries every request, the stream included
+    conn = http.client.HTTPConnection('127.0.0.1', frontend_server.server_address[1], timeout=10)
+    for _ in range(5):
+        conn.request('POST', '/predict', body=b'{}', headers={'Content-Type': 'application/json'})
+        response = conn.getresponse()
+        assert response.status == 200 and b'/predict' in response.read()
+    conn.request('POST', '/chat/stream', body=b'{}', headers={'Content-Type': 'application/json'})
+    response = conn.getresponse()
+    assert response.read() == b'data: one\n\ndata: two\n\n'
+    conn.request('GET', '/')
+    assert b'<html' in conn.getresponse().read().lower()
+    conn.close()
+
+    stats = frontend_server.backend.stats()
+    assert KeepAliveBackend.connections == 1 and stats['created'] == 1 and stats['reused'] == 5
+    print("OK one pooled backend connection and one browser connection for six requests")
+
+    # The backend drops idle connections; the next request sees that and opens a new one
+    created = frontend_server.backend.stats()['created']
+    backend.shutdown()
+    backend.server_close()
+    backend = ThreadingHTTPServer(('127.0.0.1', backend.server_address[1]), KeepAliveBackend)
+    backend.daemon_threads = True
+    _serve(backend)
+    for conn, _ in frontend_server.backend._idle:
+        conn.sock.shutdown(socket.SHUT_RDWR)
+    assert _post(url + '/predict', {})[0] == 200
+    stats = frontend_server.backend.stats()
+    assert stats['created'] == created + 1 and stats['retried'] == 0
+    print("OK a connection closed by the backend is not reused")
+
+
+def test_backend_down_answers_503():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    url = _serve(frontend.create_server(0, backend_url=f"http://127.0.0.1:{port}"))
+    status, _, body = _post(url + '/predict', {})
+    assert status == 503 and json.loads(body)['error'] == 'Backend service unavailable'
+    print("OK backend down -> 503")
+
+
+def test_static_assets_are_cached_and_revalidated():
+    root = tempfile.mkdtemp()
+    with open(os.path.join(root, 'index.html'), 'w') as f:
+        f.write('<html><link href="style.css"><script src="https://cdn.example/x.js"></script></html>')
+    with open(os.path.join(root, 'style.css'), 'w') as f:
+        f.write('body { color: red; }\n' * 50)
+    server = frontend.create_server(0)
+    server.assets = frontend.StaticAssets(root)
+    _serve(server)
+    conn = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=10)
+
+    def get(path, headers=None):
+        conn.request('GET', path, headers=headers or {})
+        response = conn.getresponse()
+        return response, response.read()
+
+    response, html = get('/')
+    assert response.getheader('Cache-Control') == 'no-cache'
+    css_url = re.search(r'href="(style.css\?v=\w+)"', html.decode()).group(1)
+    assert 'src="https://cdn.example/x.js"' in html.decode()
+
+    response, body = get('/' + css_url, {'Accept-Encoding': 'gzip, br;q=0'})
+    assert response.getheader('Content-Encoding') == 'gzip'
+    assert gzip.decompress(body) == b'body { color: red; }\n' * 50
+    assert 'immutable' in response.getheader('Cache-Control')
+    etag = response.getheader('ETag')
+
+    response, body = get('/' + css_url, {'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+    assert response.status == 304 and body == b''
+    response, body = get('/style.css', {'If-None-Match': etag})
+    assert response.status == 200 and response.getheader('Content-Encoding') is None
+    print("OK gzip variant, versioned URL cached for a year, 304 on a matching ETag")
+
+    # A changed file is reloaded, and the page links to its new version
+    with open(os.path.join(root, 'style.css'), 'w') as f:
+        f.write('body { color: blue; }\n')
+    os.utime(os.path.join(root, 'style.css'), (time.time() + 5, time.time() + 5))
+    response, body = get('/style.css', {'If-None-Match': etag})
+    assert response.status == 200 and body == b'body { color: blue; }\n'
+    _, html = get('/')
+    assert css_url not in html.decode() and 'style.css?v=' in html.decode()
+    loads = server.assets.loads
+    get('/')
+    assert server.assets.loads == loads
+    conn.close()
+    print("OK files are reloaded when their mtime changes")
+
+
+if __name__ == "__main__":
+    test_chats_do_not_block_other_requests()
+    test_saturated_server_answers_503()
+    test_idle_keepalive_connections_do_not_hold_workers()
+    test_sent_posts_are_not_retried()
+    test_backend_connections_are_pooled()
+    test_backend_down_answers_503()
+    test_static_assets_are_cached_and_revalidated()
@@ -0,0 +1,85 @@
+import os
+import sys
+import threading
+import time
+
+# Add the parent directory to the path to import from other modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.lazy import DependencyUnavailable, LazyResource, dependency_status, warm_in_background
+
+
+def test_factory_runs_once_on_first_use():
+    """Concurrent first uses share one slow initialisation"""
+    calls = []
+
+    def factory():
+        calls.append(1)
+        time.sleep(0.05)
+        return {"client": True}
+
+    resource = LazyResource("test_once", factory)
+    assert resource.state == "pending" and not calls
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(resource.get())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    status = dependency_status()["test_once"]
+    assert status["state"] == "ready" and status["load_ms"] >= 50
+    print("OK factory runs once, on first use")
+
+
+def test_failures_fail_fast_then_retry():
+    """A failed dependency raises immediately until retry_after has passed"""
+    attempts = []
+
+    def factory():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError("service unreachable")
+        return "connected"
+
+    resource = LazyResource("test_retry", factory, retry_after=0.1)
+    for _ in range(2):
+        try:
+            resource.get()
+            assert False, "expected DependencyUnavailable"
+        except DependencyUnavailable as e:
+            assert "service unreachable" in str(e)
+    assert len(attempts) == 1
+    assert dependency_status()["test_retry"]["state"] == "failed"
+
+    time.sleep(0.15)
+    assert resource.get() == "connected"
+    assert resource.error is None and len(attempts) == 2
+    print("OK failures fail fast and are retried later")
+
+
+def test_background_warmup_and_proxy():
+    class Client:
+        def generate_content(self, prompt):
+            return prompt.upper()
+
+    ok = LazyResource("test_warm_ok", Client)
+    broken = LazyResource("test_warm_broken", lambda: 1 / 0)
+    warm_in_background([ok, broken]).join(timeout=5)
+
+    assert ok.ready and broken.state == "failed"
+    assert ok.proxy().generate_content("hi") == "HI"
+
+    fake = LazyResource("test_set", lambda: 1 / 0)
+    fake.set(Client())
+    assert fake.proxy().generate_content("x") == "X"
+    print("OK background warm-up, proxy and set")
+
+
+if __name__ == "__main__":
+    test_factory_runs_once_on_first_use()
+    test_failures_fail_fast_then_retry()
+    test_background_warmup_and_proxy()
@@ -0,0 +1,109 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+
+# Add the parent directory to the path to import from other modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agents.llm_executor import LLMExecutor, LLMTimeoutError
+
+
+class SlowCall:
+    """Blocking call that records how many run at once"""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, value):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return value * 2
+
+
+def test_calls_run_off_the_event_loop_with_a_limit():
+    """Blocking calls do not stall the loop and never exceed max_concurrency"""
+    executor = LLMExecutor(max_concurrency=3, timeout=5)
+    call = SlowCall(0.1)
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        tick_task = asyncio.create_task(ticker())
+        results = await asyncio.gather(*(executor.run(call, i) for i in range(9)))
+        tick_task.cancel()
+        return results, ticks
+
+    results, ticks = asyncio.run(main())
+    assert results == [i * 2 for i in range(9)]
+    assert call.max_active == 3
+    assert ticks >= 15  # the loop kept running during ~0.3 s of blocking calls
+    assert executor.stats()["completed"] == 9
+    print("OK bounded, non-blocking calls")
+
+
+def test_timeouts_and_errors():
+    executor = LLMExecutor(max_concurrency=1, timeout=5)
+
+    def failing():
+        raise RuntimeError("LLM down")
+
+    async def main():
+        try:
+            await executor.run(SlowCall(0.5), 1, timeout=0.05)
+            assert False, "expected a timeout"
+        except LLMTimeoutError:
+            pass
+        try:
+            await executor.run(failing)
+            assert False, "expected the call's error"
+        except RuntimeError:
+            pass
+
+    asyncio.run(main())
+    stats = executor.stats()
+    assert (stats["timeouts"], stats["failed"], stats["in_flight"]) == (1, 1, 0)
+    print("OK timeouts and errors")
+
+
+def test_iterate_streams_items_and_times_out_stalls():
+    executor = LLMExecutor(max_concurrency=2, timeout=5)
+
+    def chunks(n, pause):
+        for i in range(n):
+            time.sleep(pause)
+            yield f"chunk{i}"
+
+    async def main():
+        items = [item async for item in executor.iterate(chunks, 3, 0.01)]
+        try:
+            async for _ in executor.iterate(chunks, 3, 0.5, timeout=0.05):
+                pass
+            assert False, "expected a timeout"
+        except LLMTimeoutError:
+            pass
+        return items
+
+    assert asyncio.run(main()) == ["chunk0", "chunk1", "chunk2"]
+    assert executor.stats()["in_flight"] == 0
+    print("OK async streaming")
+
+
+if __name__ == "__main__":
+    test_calls_run_off_the_event_loop_with_a_limit()
+    test_timeouts_and_errors()
+    test_iterate_streams_items_and_times_out_stalls()
@@ -0,0 +1,72 @@
+import os
+import sys
+
+# Add the parent directory to the path to import from other modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import pandas as pd
+
+from api.BaseAPI import PatientData
+from benchmarks.bench_load import build_requests, compare_results, summarize
+from benchmarks.synthetic import DATASET_PATH, PatientSampler
+
+
+def test_synthetic_patients_follow_the_dataset():
+    """Patients are valid /predict payloads with the dataset's locations and frequencies"""
+    df = pd.read_csv(DATASET_PATH)
+    patients = PatientSampler(df, seed=7).sample(5000)
+
+    locations = set(map(tuple, df[['Area', 'AreaType', 'District']].values))
+    for patient in patients[:200]:
+        PatientData(**patient)
+    assert all((p['Area'], p['AreaType'], p['District']) in locations for p in patients)
+    assert all(df['Age'].min() <= p['Age'] <= df['Age'].max() for p in patients)
+
+    sampled = pd.DataFrame(patients)
+    for column in ('NS1', 'IgG', 'IgM'):
+        assert abs(sampled[column].mean() - df[column].mean()) < 0.03, column
+    assert abs(sampled['Gender'].mean() - (df['Gender'] == 'Male').mean()) < 0.03
+    assert abs(sampled['Age'].mean() - df['Age'].mean()) < 1.5
+    print("OK synthetic patients match the dataset distribution")
+
+
+def test_same_seed_same_patients():
+    assert PatientSampler.from_csv(seed=3).sample(50) == PatientSampler.from_csv(seed=3).sample(50)
+    assert PatientSampler.from_csv(seed=3).sample(50) != PatientSampler.from_csv(seed=4).sample(50)
+    print("OK sampling is reproducible")
+
+
+def test_scenario_requests():
+    sampler = PatientSampler.from_csv(seed=0)
+    batch = build_requests('batch', sampler, 3, batch_size=10)
+    assert [(path, records) for path, _, records in batch] == [('/predict/batch', 10)] * 3
+    assert len(batch[0][1]['records']) == 10
+
+    chats = build_requests('chat', sampler, 5)
+    messages = [payload['message'] for _, payload, _ in chats]
+    # Unique messages so a response cache cannot answer them
+    assert len(set(messages)) == 5
+    assert all(payload['risk_assessment']['risk_level'] in ('Low', 'Medium', 'High') for _, payload, _ in chats)
+    print("OK predict, batch and chat requests")
+
+
+def test_summary_and_comparison():
+    summary = summarize([float(ms) for ms in range(1, 101)], [200] * 99 + [500], 2.0, 100)
+    assert summary['requests'] == 100 and summary['errors'] == 1
+    assert summary['requests_per_second'] == 50.0
+    assert summary['latency_ms']['p50'] == 51.0 and summary['latency_ms']['p99'] == 100.0
+
+    baseline = {'commit': 'abc', 'settings': {'requests': 100}, 'scenarios': {'predict': summary}}
+    slower = dict(summary, requests_per_second=25.0, latency_ms=dict(summary['latency_ms'], p50=102.0))
+    current = {'commit': 'def', 'settings': {'requests': 100}, 'scenarios': {'predict': slower, 'chat': summary}}
+    lines = compare_results(baseline, current)
+    assert 'req/s 50.00 -> 25.00 (-50.0%)' in lines[1] and 'p50 51.00 -> 102.00 (+100.0%)' in lines[1]
+    assert lines[2].startswith('chat') and 'not in the baseline' in lines[2]
+    print("OK throughput, percentiles and comparison against a baseline")
+
+
+if __name__ == "__main__":
+    test_synthetic_patients_follow_the_dataset()
+    test_same_seed_same_patients()
+    test_scenario_requests()
+    test_summary_and_comparison()
@@ -0,0 +1,179 @@
+import os
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+# Add the parent directory to the path to import from other modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+# Keep the module-level index of the local backend in memory
+os.environ["LOCAL_VECTOR_DB_PATH"] = ""
+
+from db import LocalVectorDB
+from db.LocalVectorDB import LocalVectorIndex
+
+MODEL_PATH = os.path.join(os.path.dirname(__file__), '..', 'core', 'models', 'logistic_regression_model.joblib')
+DATASET_PATH = os.path.join(os.path.dirname(__file__), '..', 'datasets', 'dataset.csv')
+
+
+def _random_vectors(n, dimension, seed=0):
+    rng = np.random.RandomState(seed)
+    return rng.randn(n, dimension).astype(np.float32)
+
+
+def _upsert(index, vectors, start=0):
+    index.upsert([
+        (f"case_{start + i}", vector, {"district": "Dhaka", "area": f"Area{(start + i) % 3}",
+                                       "risk_score": 0.5, "outcome": i % 2, "age": 30})
+        for i, vector in enumerate(vectors)
+    ])
+
+
+def test_brute_force_search_and_filters():
+    """Exact cosine search returns the query's own vector first"""
+    index = LocalVectorIndex(dimension=16, capacity=4)
+    vectors = _random_vectors(100, 16)
+    _upsert(index, vectors)
+    assert index.size == 100 and index.capacity >= 100
+
+    result = index.query(vectors[42], top_k=3)
+    assert result["matches"][0]["id"] == "case_42"
+    assert abs(result["matches"][0]["score"] - 1.0) < 1e-5
+    assert result["matches"][0]["metadata"]["area"] == "Area0"
+
+    filtered = index.query(vectors[42], top_k=50, filter={"area": {"$eq": "Area1"}})
+    assert len(filtered["matches"]) == 33
+    assert all(match["metadata"]["area"] == "Area1" for match in filtered["matches"])
+    print("OK brute-force search and metadata filters")
+
+
+def test_ivf_search_finds_nearest():
+    """IVF search with enough probes finds the exact nearest neighbours"""
+    index = LocalVectorIndex(dimension=16)
+    vectors = _random_vectors(2000, 16)
+    _upsert(index, vectors)
+    index.build_ivf(n_lists=20)
+
+    hits = sum(index.query(vectors[i], top_k=1, nprobe=5)["matches"][0]["id"] == f"case_{i}"
+               for i in range(0, 2000, 50))
+    assert hits == 40
+
+    # Rows added after training are assigned to a list and searchable
+    extra = _random_vectors(10, 16, seed=1)
+    _upsert(index, extra, start=2000)
+    assert index.query(extra[3], top_k=1, nprobe=20)["matches"][0]["id"] == "case_2003"
+    print("OK IVF search")
+
+
+def test_memory_mapped_persistence():
+    """A reopened index sees every row written before, then keeps growing"""
+    with tempfile.TemporaryDirectory() as path:
+        index = LocalVectorIndex(dimension=8, path=path, capacity=2)
+        vectors = _random_vectors(10, 8)
+        _upsert(index, vectors)
+        index.build_ivf(n_lists=2)
+        index.close()
+
+        reopened = LocalVectorIndex(dimension=8, path=path)
+        assert reopened.size == 10
+        assert isinstance(reopened.column("risk_score"), np.memmap)
+        assert reopened.query(vectors[7], top_k=1, nprobe=2)["matches"][0]["id"] == "case_7"
+        assert sorted(reopened.area_rows("Dhaka", "Area1")) == [1, 4, 7]
+        _upsert(reopened, _random_vectors(5, 8, seed=2), start=10)
+        assert sorted(reopened.area_rows("Dhaka", "Area1")) == [1, 4, 7, 10, 13]
+        reopened.layout = "structured-v1-test-8"
+        reopened.flush()
+        reopened = LocalVectorIndex(dimension=8, path=path)
+        assert reopened.size == 15 and reopened.layout == "structured-v1-test-8"
+    print("OK memory-mapped persistence")
+
+
+def test_upsert_overwrites_existing_ids():
+    """Upserting an id again replaces its row instead of adding a duplicate"""
+    index = LocalVectorIndex(dimension=8)
+    vectors = _random_vectors(6, 8)
+    _upsert(index, vectors)
+    index.build_ivf(n_lists=2)
+
+    moved = vectors[0]
+    index.upsert([("case_4", moved, {"district": "Dhaka", "area": "Area0", "risk_score": 0.9}),
+                  ("case_9", vectors[5], {"district": "Dhaka", "area": "Area2"}),
+                  ("case_9", vectors[3], {"district": "Dhaka", "area": "Area2"})])
+    assert index.size == 7
+    assert sorted(index.area_rows("Dhaka", "Area1")) == [1]
+    assert sorted(index.area_rows("Dhaka", "Area0")) == [0, 3, 4]
+    assert abs(index.metadata(4)["risk_score"] - 0.9) < 1e-6
+    matches = index.query(moved, top_k=2, nprobe=2)["matches"]
+    assert {match["id"] for match in matches} == {"case_0", "case_4"}
+    assert index.query(vectors[3], top_k=2, nprobe=2)["matches"][1]["id"] in ("case_3", "case_9")
+    print("OK upsert dedupes by id")
+
+
+def test_header_is_flushed_on_a_timer_and_on_close():
+    with tempfile.TemporaryDirectory() as path:
+        index = LocalVectorIndex(dimension=8, path=path, flush_interval=60)
+        _upsert(index, _random_vectors(4, 8))
+        # Not flushed yet: a reopened index only sees what the header counts
+        assert LocalVectorIndex(dimension=8, path=path).size == 0
+        index.close()
+        assert LocalVectorIndex(dimension=8, path=path).size == 4
+
+        index = LocalVectorIndex(dimension=8, path=path, flush_interval=0.05)
+        _upsert(index, _random_vectors(2, 8, seed=1), start=4)
+        index.upsert([("case_0", _random_vectors(1, 8, seed=2)[0],
+                       {"district": "Dhaka", "area": "Area0", "description": "updated"})])
+        time.sleep(0.3)
+        reopened = LocalVectorIndex(dimension=8, path=path)
+        assert reopened.size == 6 and reopened.ids[4] == "case_4"
+        assert reopened.descriptions[0] == "updated"
+        index.close()
+
+        # Rows written after the last flush of a process that died are dropped
+        crashed = LocalVectorIndex(dimension=8, path=path, flush_interval=60)
+        _upsert(crashed, _random_vectors(3, 8, seed=3), start=6)
+        recovered = LocalVectorIndex(dimension=8, path=path)
+        _upsert(recovered, _random_vectors(1, 8, seed=4), start=20)
+        recovered.close()
+        assert LocalVectorIndex(dimension=8, path=path).ids[5:] == ["case_5", "case_20"]
+    print("OK header flushed periodically and on close")
+
+
+def test_module_api_matches_pinecone_functions():
+    """The local backend exposes the PineconeDB functions"""
+    model = joblib.load(MODEL_PATH)
+    df = pd.read_csv(DATASET_PATH)
+    LocalVectorDB.batch_load_dataset(df, model)
+
+    results = LocalVectorDB.search_similar_cases("High risk case in Mirpur with NS1 positive", n_results=5)
+    assert len(results["matches"]) == 5
+    assert all(match["metadata"]["area"] == "Mirpur" for match in results["matches"])
+    # Nothing recognisable in the query: no matches rather than an undefined ranking
+    assert LocalVectorDB.search_similar_cases("any news?")["matches"] == []
+
+    stats = LocalVectorDB.get_area_statistics("Dhaka", "Mirpur")
+    mirpur = df[(df['District'] == 'Dhaka') & (df['Area'] == 'Mirpur')]
+    assert stats["total_cases"] == len(mirpur)
+    assert stats["positive_cases"] == int(mirpur['Outcome'].sum())
+
+    areas = LocalVectorDB.get_high_risk_areas(threshold=0.0)
+    assert sum(area['case_count'] for area in areas) == len(df)
+    assert areas == sorted(areas, key=lambda area: area['avg_risk_score'], reverse=True)
+
+    LocalVectorDB.add_case_to_vector_db(
+        {'Age': 35, 'Gender': 1, 'NS1': 1, 'IgG': 1, 'IgM': 0, 'Area': 'Mirpur',
+         'AreaType': 'Undeveloped', 'HouseType': 'Building', 'District': 'Dhaka'}, 0.9)
+    assert LocalVectorDB.get_area_statistics("Dhaka", "Mirpur")["total_cases"] == len(mirpur) + 1
+    print("OK local backend module API")
+
+
+if __name__ == "__main__":
+    test_brute_force_search_and_filters()
+    test_ivf_search_finds_nearest()
+    test_memory_mapped_persistence()
+    test_upsert_overwrites_existing_ids()
+    test_header_is_flushed_on_a_timer_and_on_close()
+    test_module_api_matches_pinecone_functions()
@@ -0,0 +1,45 @@
+import os
+import sys
+
+import pandas as pd
+
+# Add the parent directory to the path to import from other modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agents.location_stats import NO_DATASET, NO_LOCATION_DATA, LocationStatsCube, compute_location_stats
+
+DATASET_PATH = os.path.join(os.path.dirname(__file__), '..', 'datasets', 'dataset.csv')
+
+
+def test_cube_matches_pandas_path():
+    """Every precomputed area and district fallback equals the per-request summary"""
+    df = pd.read_csv(DATASET_PATH)
+    cube = LocationStatsCube.from_frame(df)
+
+    for district, area in df[['District', 'Area']].drop_duplicates().itertuples(index=False):
+        assert cube.lookup(area, district) == compute_location_stats(df, area, district)
+
+    # Unknown area falls back to the (sampled) district summary
+    fallback = cube.lookup("Nowhere", "Dhaka")
+    assert fallback == compute_location_stats(df, "Nowhere", "Dhaka")
+    assert fallback["total_cases_analyzed"] == 50
+
+    assert cube.lookup("Nowhere", "Atlantis") == NO_LOCATION_DATA
+    assert compute_location_stats(None, "Badda", "Dhaka") == NO_DATASET
+    print("OK cube matches pandas path")
+
+
+def test_summary_structure():
+    """Lookups return the summary layout create_location_context expects"""
+    cube = LocationStatsCube.from_frame(pd.read_csv(DATASET_PATH))
+    stats = cube.lookup("Badda", "Dhaka")
+    assert set(stats) == {"total_cases_analyzed", "dengue_positive_rate", "average_age", "age_distribution",
+                          "gender_distribution", "test_patterns", "area_characteristics"}
+    assert set(stats["test_patterns"]) == {"ns1_positive_rate", "igg_positive_rate", "igm_positive_rate"}
+    assert sum(stats["gender_distribution"].values()) == stats["total_cases_analyzed"]
+    print("OK summary structure")
+
+
+if __name__ == "__main__":
+    test_cube_matches_pandas_path()
+    test_summary_structure()
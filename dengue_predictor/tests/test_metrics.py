@@ -0,0 +1,101 @@
+import os
+import sys
+import threading
+
+# Add the parent directory to the path to import from other modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from utils.metrics import Counter, Histogram, MetricsMiddleware, MetricsRegistry, http_request_duration, \
+    http_request_errors, http_requests, stage_duration, stage_timer
+
+
+def test_histogram_buckets_and_quantiles():
+    """Values land in the bucket whose upper bound covers them; quantiles interpolate within it"""
+    histogram = Histogram("test_seconds", "test", ("endpoint",), buckets=(0.01, 0.1, 1.0))
+    for value in [0.005] * 50 + [0.05] * 45 + [0.5] * 4 + [5.0]:
+        histogram.observe(value, "/predict")
+
+    counts, total_sum, count = histogram.snapshot("/predict")
+    assert counts == [50, 45, 4, 1] and count == 100
+    assert abs(total_sum - (0.25 + 2.25 + 2.0 + 5.0)) < 1e-9
+    assert abs(histogram.quantile(0.5, "/predict") - 0.01) < 1e-9
+    assert 0.01 < histogram.quantile(0.95, "/predict") <= 0.1
+    assert 0.1 < histogram.quantile(0.99, "/predict") <= 1.0
+    assert histogram.quantile(0.5, "/chat") is None
+    print("OK histogram buckets and p50/p95/p99")
+
+
+def test_concurrent_observations_are_not_lost():
+    histogram = Histogram("test_concurrent_seconds", "test")
+    counter = Counter("test_concurrent_total", "test")
+
+    def record():
+        for _ in range(20000):
+            histogram.observe(0.001)
+            counter.inc()
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert histogram.snapshot()[2] == 80000 and counter.value() == 80000
+    print("OK no observations lost across threads")
+
+
+def test_prometheus_text_format():
+    registry = MetricsRegistry()
+    counter = registry.register(Counter("test_requests_total", "Requests", ("endpoint",)))
+    histogram = registry.register(Histogram("test_latency_seconds", "Latency", ("endpoint",), buckets=(0.1, 1.0)))
+    counter.inc('/say "hi"')
+    histogram.observe(0.5, "/predict")
+
+    lines = registry.render().splitlines()
+    assert "# TYPE test_requests_total counter" in lines
+    assert 'test_requests_total{endpoint="/say \\"hi\\""} 1' in lines
+    assert "# TYPE test_latency_seconds histogram" in lines
+    assert 'test_latency_seconds_bucket{endpoint="/predict",le="0.1"} 0' in lines
+    assert 'test_latency_seconds_bucket{endpoint="/predict",le="1"} 1' in lines
+    assert 'test_latency_seconds_bucket{endpoint="/predict",le="+Inf"} 1' in lines
+    assert 'test_latency_seconds_count{endpoint="/predict"} 1' in lines
+    assert any(line.startswith('test_latency_seconds_quantile{endpoint="/predict",quantile="0.99"}') for line in lines)
+    print("OK Prometheus text format")
+
+
+def test_middleware_labels_routes_and_counts_errors():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        with stage_timer("test_stage"):
+            return {"id": item_id}
+
+    @app.get("/fail")
+    async def fail():
+        raise HTTPException(status_code=503, detail="down")
+
+    before = http_requests.value("/items/{item_id}", "GET", "200")
+    errors = http_request_errors.value("/fail")
+    with TestClient(app) as client:
+        for item_id in range(3):
+            assert client.get(f"/items/{item_id}").status_code == 200
+        assert client.get("/fail").status_code == 503
+        assert client.get("/missing").status_code == 404
+
+    assert http_requests.value("/items/{item_id}", "GET", "200") == before + 3
+    assert http_request_errors.value("/fail") == errors + 1
+    assert http_requests.value("other", "GET", "404") >= 1
+    assert http_request_duration.snapshot("/items/{item_id}")[2] >= 3
+    assert stage_duration.snapshot("test_stage")[2] >= 3
+    print("OK requests labelled by route template, 5xx counted as errors")
+
+
+if __name__ == "__main__":
+    test_histogram_buckets_and_quantiles()
+    test_concurrent_observations_are_not_lost()
+    test_prometheus_text_format()
+    test_middleware_labels_routes_and_counts_errors()
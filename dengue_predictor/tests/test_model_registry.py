@@ -0,0 +1,69 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Add the parent directory to the path to import from other modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from core.model_registry import ModelRegistry, default_model_path
+
+
+def test_model_is_loaded_once_and_shared():
+    registry = ModelRegistry()
+    first = registry.get()
+    again = registry.get(os.path.join(os.path.dirname(default_model_path()), '.', os.path.basename(default_model_path())))
+    assert first is again
+    assert len(registry.stats()) == 1
+
+    info = registry.stats()[0]
+    assert info["type"] == "LogisticRegression"
+    assert info["load_ms"] > 0 and info["file_bytes"] == os.path.getsize(default_model_path())
+    assert info["array_bytes"] >= first.coef_.nbytes
+    assert not info["memory_mapped"] and not info["stale"]
+    print("OK one shared instance per file:", info)
+
+
+def test_shared_arrays_are_read_only():
+    model = ModelRegistry().get()
+    assert not model.coef_.flags.writeable
+    try:
+        model.coef_[0, 0] = 1.0
+        assert False, "expected a read-only array"
+    except ValueError:
+        pass
+    print("OK shared coefficients are read-only")
+
+
+def test_memory_mapped_coefficients_match():
+    plain = ModelRegistry().get()
+    mapped = ModelRegistry(mmap=True).get()
+    assert isinstance(mapped.coef_, np.memmap)
+    assert np.array_equal(plain.coef_, mapped.coef_)
+    print("OK memory-mapped coefficients match")
+
+
+def test_stale_file_and_reload():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'model.joblib')
+        shutil.copy(default_model_path(), path)
+        registry = ModelRegistry()
+        first = registry.get(path)
+        assert not registry.load(path).stale
+
+        later = time.time() + 10
+        os.utime(path, (later, later))
+        assert registry.load(path).stale
+        registry.reload(path)
+        assert registry.get(path) is not first and not registry.load(path).stale
+    print("OK changed files are reported stale and can be reloaded")
+
+
+if __name__ == "__main__":
+    test_model_is_loaded_once_and_shared()
+    test_shared_arrays_are_read_only()
+    test_memory_mapped_coefficients_match()
+    test_stale_file_and_reload()
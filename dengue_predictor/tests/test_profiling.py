@@ -0,0 +1,166 @@
+import asyncio
+import os
+import pstats
+import sys
+import tempfile
+import time
+
+# Add the parent directory to the path to import from other modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from utils import profiling
+from utils.profiling import Profiler, ProfilingMiddleware
+
+
+def busy_work():
+    return sum(i * i for i in range(20000))
+
+
+def _client(profiler):
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, profiler=profiler)
+
+    @app.post("/predict")
+    async def predict():
+        return {"total": busy_work()}
+
+    @app.post("/chat")
+    async def chat():
+        time.sleep(0.05)
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+def test_header_profiles_one_request_as_pstats():
+    with tempfile.TemporaryDirectory() as directory:
+        profiler = Profiler(directory)
+        client = _client(profiler)
+        assert client.post("/predict").status_code == 200
+        assert os.listdir(directory) == []
+
+        assert client.post("/predict", headers={"X-Profile": "pstats"}).status_code == 200
+        files = os.listdir(directory)
+        assert len(files) == 1 and files[0].endswith("-predict.prof")
+        stats = pstats.Stats(os.path.join(directory, files[0]))
+        assert any(function == "busy_work" for _, _, function in stats.stats)
+        assert profiler.status()["recent"][0]["endpoint"] == "/predict"
+    print("OK X-Profile header writes a pstats file for that request")
+
+
+def test_armed_profiler_takes_the_next_n_requests_of_an_endpoint():
+    with tempfile.TemporaryDirectory() as directory:
+        profiler = Profiler(directory)
+        client = _client(profiler)
+        profiler.arm(requests=2, endpoint="/predict")
+        client.post("/chat")
+        for _ in range(4):
+            client.post("/predict")
+        assert profiler.captured == 2
+        assert len(os.listdir(directory)) == 2
+        assert not profiler.status()["armed"]
+    print("OK armed for 2 /predict requests, other endpoints and later requests untouched")
+
+
+def test_sample_rate():
+    with tempfile.TemporaryDirectory() as directory:
+        profiler = Profiler(directory)
+        profiler.arm(sample_rate=0.25)
+        claimed = 0
+        for _ in range(2000):
+            if profiler.claim("/predict", None):
+                claimed += 1
+                profiler.release()
+        assert 400 < claimed < 600, claimed
+        assert profiler.status()["armed"]
+        profiler.disarm()
+        assert profiler.claim("/predict", None) is None
+    print("OK sampled fraction of requests, until disarmed")
+
+
+def test_collapsed_stacks():
+    with tempfile.TemporaryDirectory() as directory:
+        profiler = Profiler(directory, sample_interval=0.001)
+        client = _client(profiler)
+        client.post("/chat", headers={"X-Profile": "collapsed"})
+        [name] = os.listdir(directory)
+        assert name.endswith("-chat.collapsed")
+        with open(os.path.join(directory, name)) as f:
+            lines = f.read().splitlines()
+        assert lines
+        for line in lines:
+            stack, count = line.rsplit(" ", 1)
+            assert stack.startswith("thread ") and int(count) > 0
+        assert any("chat (test_profiling.py:" in line for line in lines)
+    print("OK collapsed stacks in flamegraph format")
+
+
+class FailingSampler(profiling.StackSampler):
+    def start(self):
+        raise RuntimeError("cannot start sampler thread")
+
+
+def test_profiler_is_released_and_files_are_written_off_the_loop():
+    with tempfile.TemporaryDirectory() as directory:
+        profiler = Profiler(directory)
+        client = _client(profiler)
+        original = profiling.StackSampler
+        profiling.StackSampler = FailingSampler
+        try:
+            client.post("/predict", headers={"X-Profile": "collapsed"})
+        except RuntimeError:
+            pass
+        finally:
+            profiling.StackSampler = original
+        # A capture that failed to start leaves the profiler free for the next one
+        assert profiler.claim("/predict", "pstats") == "pstats"
+        profiler.release()
+
+        on_loop = []
+        record = profiler.record
+
+        def recording(*args):
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(True)
+            except RuntimeError:
+                on_loop.append(False)
+            return record(*args)
+
+        profiler.record = recording
+        assert client.post("/predict", headers={"X-Profile": "pstats"}).status_code == 200
+        assert len(os.listdir(directory)) == 1
+        assert on_loop == [False]
+    print("OK profiler released after a failed start, profiles written on a worker thread")
+
+
+def test_token_and_validation():
+    with tempfile.TemporaryDirectory() as directory:
+        profiler = Profiler(directory, token="secret")
+        client = _client(profiler)
+        client.post("/predict", headers={"X-Profile": "pstats"})
+        client.post("/predict", headers={"X-Profile": "pstats", "X-Profile-Token": "wrong"})
+        assert os.listdir(directory) == []
+        client.post("/predict", headers={"X-Profile": "pstats", "X-Profile-Token": "secret"})
+        assert len(os.listdir(directory)) == 1
+
+    profiler = Profiler()
+    for kwargs in ({}, {"requests": 0}, {"sample_rate": 1.5}, {"requests": 1, "format": "svg"}):
+        try:
+            profiler.arm(**kwargs)
+        except ValueError:
+            continue
+        raise AssertionError(f"arm({kwargs}) should fail")
+    print("OK token required when set, invalid settings rejected")
+
+
+if __name__ == "__main__":
+    test_header_profiles_one_request_as_pstats()
+    test_armed_profiler_takes_the_next_n_requests_of_an_endpoint()
+    test_sample_rate()
+    test_collapsed_stacks()
+    test_profiler_is_released_and_files_are_written_off_the_loop()
+    test_token_and_validation()
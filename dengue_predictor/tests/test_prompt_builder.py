@@ -0,0 +1,89 @@
+import os
+import sys
+
+# Add the parent directory to the path to import from other modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agents.prompt_builder import PromptBuilder, estimate_tokens, summarize_turns
+
+SYSTEM = "You are a Dengue Intelligence Assistant. " * 10
+LOCATION = "LOCATION ANALYSIS FOR Mirpur, Dhaka:\n- Dengue Positive Rate: 42.0% (50 cases analyzed)"
+
+
+def make_history(n_turns, length=200):
+    history = []
+    for i in range(n_turns):
+        role = "user" if i % 2 == 0 else "assistant"
+        history.append({"role": role, "content": f"Turn {i} says something. " + "x" * length})
+    return history
+
+
+def test_history_and_location_are_included():
+    """Recent turns go in verbatim, older turns as a summary, plus location context"""
+    builder = PromptBuilder(budget_tokens=5000, recent_turns=4, summary_tokens=200)
+    history = make_history(10)
+    prompt = builder.build(SYSTEM, "Should I drink coconut water?", history, LOCATION)
+
+    assert prompt.text.startswith(SYSTEM.rstrip())
+    assert prompt.text.endswith("User query: Should I drink coconut water?")
+    assert LOCATION in prompt.text
+    for turn in history[-4:]:
+        assert turn["content"] in prompt.text
+    assert history[0]["content"] not in prompt.text
+    assert "Earlier conversation (summary):" in prompt.text
+    assert "- User: Turn 0 says something." in prompt.text
+
+    usage = prompt.usage()
+    assert usage["history_turns"] == 4
+    assert usage["summarized_turns"] == 6
+    assert usage["dropped"] == []
+    assert usage["prompt_tokens"] == estimate_tokens(prompt.text)
+    print("OK history, summary and location context included")
+
+
+def test_over_budget_drops_least_relevant_first():
+    """Summary goes first, then older turns, then location, keeping the latest exchange"""
+    history = make_history(10)
+    base = PromptBuilder(budget_tokens=100000, recent_turns=4).build(SYSTEM, "question?", history, LOCATION)
+    no_summary = base.token_count - base.sections["summary"] - 2
+
+    # Just under the full size: only the summary goes
+    prompt = PromptBuilder(budget_tokens=no_summary + 5, recent_turns=4).build(SYSTEM, "question?", history, LOCATION)
+    assert prompt.dropped == ["summary"]
+    assert prompt.history_turns == 4 and LOCATION in prompt.text
+
+    # Tight budget: older recent turns go before the location context
+    tight = estimate_tokens(SYSTEM) + estimate_tokens(LOCATION) + 2 * 60 + 20
+    prompt = PromptBuilder(budget_tokens=tight, recent_turns=4).build(SYSTEM, "question?", history, LOCATION)
+    assert prompt.dropped == ["summary", "turn", "turn"]
+    assert prompt.history_turns == 2 and LOCATION in prompt.text
+    assert history[-1]["content"] in prompt.text
+    assert prompt.token_count <= tight
+
+    # Tiny budget: system prompt and question are always kept
+    prompt = PromptBuilder(budget_tokens=10, recent_turns=4).build(SYSTEM, "question?", history, LOCATION)
+    assert "location_context" in prompt.dropped and prompt.history_turns == 0
+    assert prompt.text == SYSTEM.rstrip() + "\n\nUser query: question?"
+    print("OK over-budget prompts drop summary, old turns, then location")
+
+
+def test_summary_fits_its_budget_and_stats():
+    turns = make_history(30, length=400)
+    summary = summarize_turns(turns, max_tokens=60)
+    assert estimate_tokens(summary) <= 60
+    assert "Turn 29" in summary and "Turn 0 " not in summary
+
+    builder = PromptBuilder(budget_tokens=2000)
+    builder.build(SYSTEM, "hi")
+    builder.build(SYSTEM, "hello", make_history(2))
+    stats = builder.stats()
+    assert stats["requests"] == 2
+    assert stats["total_prompt_tokens"] > 2 * estimate_tokens(SYSTEM)
+    assert stats["over_budget"] == 0
+    print("OK summary budget and running stats")
+
+
+if __name__ == "__main__":
+    test_history_and_location_are_included()
+    test_over_budget_drops_least_relevant_first()
+    test_summary_fits_its_budget_and_stats()
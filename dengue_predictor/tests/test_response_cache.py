@@ -0,0 +1,122 @@
+import os
+import sys
+import tempfile
+import time
+
+# Add the parent directory to the path to import from other modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agents.response_cache import CachedLLM, ResponseCache, make_cache_key
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeLLM:
+    """Stand-in for genai.GenerativeModel that counts calls"""
+
+    def __init__(self, fail=False):
+        self.calls = 0
+        self.fail = fail
+
+    def generate_content(self, prompt, stream=False):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("quota exceeded")
+        if stream:
+            return iter([FakeResponse("answer "), FakeResponse(str(self.calls))])
+        return FakeResponse(f"answer {self.calls}")
+
+
+def test_repeated_questions_hit_cache():
+    """Near-identical questions in the same bucket and location reuse one answer"""
+    llm = FakeLLM()
+    cache = ResponseCache(max_entries=10)
+    cached = CachedLLM(llm, cache)
+
+    first = cached.generate("prompt", make_cache_key("Should I drink coconut water?", "High", "Mirpur Dhaka"))
+    again = cached.generate("prompt", make_cache_key("should i drink  coconut water", "high", "Mirpur, Dhaka"))
+    other_bucket = cached.generate("prompt", make_cache_key("Should I drink coconut water?", "Low", "Mirpur Dhaka"))
+
+    assert first == again == "answer 1"
+    assert other_bucket == "answer 2"
+    assert llm.calls == 2
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 2, 2)
+    print("OK cache hits for repeated questions")
+
+
+def test_lru_bound_and_ttl():
+    """Least recently used entries are evicted and old ones expire"""
+    cache = ResponseCache(max_entries=2, ttl_seconds=0.05)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    assert cache.get("a") == "A"
+    cache.put("c", "C")
+    assert cache.get("b") is None and cache.get("a") == "A"
+    assert cache.stats()["evictions"] == 1
+
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+    print("OK LRU bound and TTL")
+
+
+def test_errors_are_not_cached_and_disabled_cache_passes_through():
+    llm = FakeLLM(fail=True)
+    cached = CachedLLM(llm, ResponseCache(max_entries=10))
+    for _ in range(2):
+        try:
+            cached.generate("prompt", "key")
+        except RuntimeError:
+            pass
+    assert llm.calls == 2 and cached.cache.stats()["size"] == 0
+
+    llm = FakeLLM()
+    disabled = CachedLLM(llm, ResponseCache(max_entries=0))
+    disabled.generate("prompt", "key")
+    disabled.generate("prompt", "key")
+    assert llm.calls == 2
+    print("OK errors and disabled cache")
+
+
+def test_streamed_answers_are_cached_once_complete():
+    """A completed stream is cached and replayed whole; an abandoned one is not"""
+    llm = FakeLLM()
+    cached = CachedLLM(llm, ResponseCache(max_entries=10))
+
+    assert list(cached.stream("prompt", "key")) == ["answer ", "1"]
+    assert list(cached.stream("prompt", "key")) == ["answer 1"]
+    assert cached.generate("prompt", "key") == "answer 1"
+    assert llm.calls == 1
+
+    partial = cached.stream("prompt", "other")
+    next(partial)
+    partial.close()
+    assert cached.cache.get("other") is None
+    print("OK streamed answers cached")
+
+
+def test_persistence():
+    """Entries written to disk are served after a restart"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "llm_cache.json")
+        ResponseCache(path=path).put("key", "stored answer")
+
+        llm = FakeLLM()
+        restarted = CachedLLM(llm, ResponseCache(path=path))
+        assert restarted.generate("prompt", "key") == "stored answer"
+        assert llm.calls == 0
+
+        assert ResponseCache(path=path, ttl_seconds=1e-9).get("key") is None
+    print("OK persistence")
+
+
+if __name__ == "__main__":
+    test_repeated_questions_hit_cache()
+    test_lru_bound_and_ttl()
+    test_errors_are_not_cached_and_disabled_cache_passes_through()
+    test_streamed_answers_are_cached_once_complete()
+    test_persistence()
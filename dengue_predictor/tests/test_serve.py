@@ -0,0 +1,142 @@
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+# Add the parent directory to the path to import from other modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+BASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# A supervisor around a tiny ASGI app whose /slow request takes a second
+SUPERVISED_APP = """
+import asyncio, os, sys
+from api.serve import Supervisor, bind_socket
+
+async def app(scope, receive, send):
+    if scope["type"] != "http":
+        return
+    if scope["path"] == "/slow":
+        await asyncio.sleep(1.0)
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+    await send({"type": "http.response.body", "body": str(os.getpid()).encode()})
+
+sock = bind_socket("127.0.0.1", 0)
+print(sock.getsockname()[1], flush=True)
+Supervisor(app, sock, workers=2, graceful_timeout=5, log_level="warning").run()
+"""
+
+
+def _get(url, timeout=10):
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return response.read().decode()
+
+
+def _wait_for(url):
+    deadline = time.time() + 15
+    while time.time() < deadline:
+        try:
+            return _get(url, timeout=1)
+        except OSError:
+            time.sleep(0.1)
+    raise AssertionError(f"{url} did not come up")
+
+
+def test_supervisor_restarts_workers_and_drains():
+    if not hasattr(os, 'fork'):
+        print("SKIP no fork on this platform")
+        return
+    process = subprocess.Popen([sys.executable, '-c', SUPERVISED_APP], cwd=BASE_DIR,
+                               stdout=subprocess.PIPE, text=True)
+    try:
+        port = int(process.stdout.readline())
+        url = f"http://127.0.0.1:{port}"
+        worker = int(_wait_for(url + "/"))
+
+        # A crashed worker is replaced and the port keeps answering
+        os.kill(worker, signal.SIGKILL)
+        time.sleep(1.5)
+        for _ in range(5):
+            assert int(_get(url + "/")) != worker
+
+        # SIGTERM lets the in-flight request finish before the workers exit
+        result = {}
+        slow = threading.Thread(target=lambda: result.update(body=_get(url + "/slow")))
+        slow.start()
+        time.sleep(0.3)
+        process.send_signal(signal.SIGTERM)
+        slow.join(timeout=10)
+        assert result.get("body", "").isdigit()
+        assert process.wait(timeout=15) == 0
+    finally:
+        if process.poll() is None:
+            process.kill()
+    print("OK crashed workers are restarted and SIGTERM drains in-flight requests")
+
+
+def test_sigterm_persists_the_local_index():
+    """Workers leave with os._exit, so the shutdown hook must write the index header itself"""
+    if not hasattr(os, 'fork'):
+        print("SKIP no fork on this platform")
+        return
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    with tempfile.TemporaryDirectory() as directory:
+        index_path = os.path.join(directory, "index")
+        env = dict(os.environ, VECTOR_DB_BACKEND="local", LOCAL_VECTOR_DB_PATH=index_path,
+                   LOCAL_VECTOR_DB_FLUSH_INTERVAL="600", AREA_AGGREGATES_PATH=os.path.join(directory, "areas.json"),
+                   WARMUP_ON_STARTUP="0", API_WORKERS="1")
+        process = subprocess.Popen([sys.executable, '-m', 'api.serve', '--port', str(port), '--log-level', 'warning'],
+                                   cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            _wait_for(f"http://127.0.0.1:{port}/health")
+            patient = {'Age': 35, 'Gender': 1, 'NS1': 1, 'IgG': 1, 'IgM': 0, 'Area': 'Mirpur',
+                       'AreaType': 'Undeveloped', 'HouseType': 'Building', 'District': 'Dhaka'}
+            request = urllib.request.Request(f"http://127.0.0.1:{port}/predict", data=json.dumps(patient).encode(),
+                                             headers={'Content-Type': 'application/json'})
+            urllib.request.urlopen(request, timeout=30).read()
+            process.send_signal(signal.SIGTERM)
+            assert process.wait(timeout=60) == 0
+        finally:
+            if process.poll() is None:
+                process.kill()
+        with open(os.path.join(index_path, "index.json")) as f:
+            assert json.load(f)["size"] == 1
+    print("OK a drained worker writes the local index header")
+
+
+def test_falls_back_to_one_worker_with_per_process_state():
+    from api.serve import allowed_workers, default_workers, multi_worker_blockers
+
+    saved = {name: os.environ.pop(name, None) for name in ("CHAT_SESSION_DB", "VECTOR_DB_BACKEND", "API_WORKERS")}
+    try:
+        # Without API_WORKERS one worker, whatever the CPU count
+        assert default_workers() == 1
+        assert any("chat sessions" in reason for reason in multi_worker_blockers())
+        # Workers that would diverge are not forked, the API still starts
+        assert allowed_workers(4) == 1
+        os.environ["CHAT_SESSION_DB"] = "sessions.db"
+        if hasattr(os, 'fork'):
+            assert multi_worker_blockers() == [] and allowed_workers(4) == 4
+        os.environ["VECTOR_DB_BACKEND"] = "local"
+        assert any("local vector DB" in reason for reason in multi_worker_blockers())
+        assert allowed_workers(4) == 1
+    finally:
+        for name, value in saved.items():
+            os.environ.pop(name, None)
+            if value is not None:
+                os.environ[name] = value
+    print("OK one worker by default, and while sessions or the local index are per process")
+
+
+if __name__ == "__main__":
+    test_supervisor_restarts_workers_and_drains()
+    test_sigterm_persists_the_local_index()
+    test_falls_back_to_one_worker_with_per_process_state()
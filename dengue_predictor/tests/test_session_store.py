@@ -0,0 +1,122 @@
+import os
+import sys
+import tempfile
+import time
+
+# Add the parent directory to the path to import from other modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from agents.prompt_builder import estimate_tokens
+from agents.session_store import SessionStore, SqliteSessionStore, fold_summary
+
+
+def exchange(i):
+    return [
+        {"role": "user", "content": f"Question {i}? Some more detail about the patient."},
+        {"role": "assistant", "content": f"Answer {i}. " + "Keep hydrated and rest. " * 20}
+    ]
+
+
+def test_session_size_is_bounded():
+    """Old turns fold into the rolling summary, so a session stays the same size"""
+    store = SessionStore(max_turns=4, summary_tokens=80)
+    session = store.get_or_create()
+
+    sizes = []
+    for i in range(50):
+        store.append(session, exchange(i))
+        sizes.append(sum(len(t["content"]) for t in session.turns) + len(session.summary))
+
+    assert session.total_turns == 100
+    assert len(session.turns) == 4
+    assert session.turns[-2]["content"].startswith("Question 49?")
+    assert estimate_tokens(session.summary) <= 80
+    assert "Answer 47." in session.summary and "Question 0?" not in session.summary
+    assert max(sizes[10:]) - min(sizes[10:]) < 50
+    print("OK session size stays constant:", sizes[-1], "chars after 100 turns")
+
+
+def test_lookup_creates_and_evicts_lru():
+    store = SessionStore(max_sessions=2)
+    first = store.get_or_create("")
+    assert len(first.session_id) == 32
+    assert store.get_or_create(first.session_id) is first
+    # Unknown ids start a new session rather than failing
+    assert store.get_or_create("no-such-session").session_id != "no-such-session"
+
+    third = store.get_or_create()
+    assert store.get(first.session_id) is None   # least recently used
+    assert store.get(third.session_id) is third
+    assert store.stats()["evictions"] == 1
+    assert store.delete(third.session_id) and not store.delete(third.session_id)
+    print("OK sessions are created on demand and evicted LRU")
+
+
+def test_idle_sessions_expire():
+    store = SessionStore(ttl_seconds=0.05)
+    session = store.get_or_create()
+    time.sleep(0.1)
+    assert store.get(session.session_id) is None
+    assert store.stats()["expirations"] == 1
+    print("OK idle sessions expire")
+
+
+def test_fold_summary_keeps_newest_lines():
+    summary = ""
+    for i in range(10):
+        summary = fold_summary(summary, exchange(i), max_tokens=40)
+    assert estimate_tokens(summary) <= 40
+    assert summary.splitlines()[-1].startswith("- Assistant: Answer 9.")
+    print("OK rolling summary keeps the newest lines")
+
+
+def test_sqlite_sessions_are_shared_between_workers():
+    """Two stores on one file stand in for two worker processes"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'sessions.db')
+        first_worker = SqliteSessionStore(path, max_sessions=2, max_turns=4, summary_tokens=80)
+        second_worker = SqliteSessionStore(path, max_sessions=2, max_turns=4, summary_tokens=80)
+
+        session = first_worker.get_or_create("")
+        session.risk_assessment = {"risk_level": "High", "area": "Mirpur"}
+        first_worker.append(session, exchange(0))
+
+        # The follow-up reaches the other worker and continues the same conversation
+        follow_up = second_worker.get_or_create(session.session_id)
+        assert follow_up.session_id == session.session_id
+        assert follow_up.risk_assessment == {"risk_level": "High", "area": "Mirpur"}
+        for i in range(1, 5):
+            second_worker.append(follow_up, exchange(i))
+        again = first_worker.get(session.session_id)
+        assert again.total_turns == 10 and len(again.turns) == 4
+        assert "Answer 2." in again.summary
+
+        # Least recently used sessions are evicted across workers
+        second_worker.get_or_create()
+        first_worker.get(session.session_id)
+        second_worker.get_or_create()
+        assert len(first_worker) == 2 and first_worker.get(session.session_id) is not None
+        assert second_worker.delete(session.session_id) and first_worker.get(session.session_id) is None
+    print("OK SQLite sessions are shared between workers")
+
+
+def test_store_from_env():
+    os.environ.pop("CHAT_SESSION_DB", None)
+    assert not SessionStore.from_env().shared
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["CHAT_SESSION_DB"] = os.path.join(tmp, 'sessions.db')
+        try:
+            store = SessionStore.from_env()
+        finally:
+            del os.environ["CHAT_SESSION_DB"]
+        assert store.shared and store.stats()["sessions"] == 0
+    print("OK CHAT_SESSION_DB selects the shared store")
+
+
+if __name__ == "__main__":
+    test_session_size_is_bounded()
+    test_lookup_creates_and_evicts_lru()
+    test_idle_sessions_expire()
+    test_fold_summary_keeps_newest_lines()
+    test_sqlite_sessions_are_shared_between_workers()
+    test_store_from_env()
@@ -0,0 +1,95 @@
+import os
+import socket
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from start_full_system import ManagedService, ServiceNotReady, backend_service
+
+# Prints a line, then serves 200 on every GET after ``delay`` seconds, or exits with 3 when told to crash
+SERVER = """
+import sys, time
+from http.server import HTTPServer, BaseHTTPRequestHandler
+port, delay, crash = int(sys.argv[1]), float(sys.argv[2]), sys.argv[3] == 'crash'
+print('starting', flush=True)
+time.sleep(delay)
+if crash:
+    sys.exit(3)
+class Health(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.end_headers()
+HTTPServer(('127.0.0.1', port), Health).serve_forever()
+"""
+
+
+def _service(log_dir, delay, crash=False):
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    return ManagedService(
+        'Test server', [sys.executable, '-c', SERVER, str(port), str(delay), 'crash' if crash else 'ok'],
+        log_dir, f"http://127.0.0.1:{port}/health", os.path.join(log_dir, 'logs', 'test.log'), stop_timeout=5
+    )
+
+
+def test_waits_for_health_check_and_logs_to_file():
+    log_dir = tempfile.mkdtemp()
+    service = _service(log_dir, delay=0.5)
+    service.start()
+    try:
+        ready = service.wait_ready(timeout=20)
+        assert 0.5 <= ready < 10 and service.ready_seconds == ready
+    finally:
+        service.stop()
+    with open(service.log_path) as f:
+        assert 'starting' in f.read()
+    print(f"OK ready after {ready:.2f}s, output in the log file")
+
+
+def test_crash_before_ready_and_restart():
+    log_dir = tempfile.mkdtemp()
+    service = _service(log_dir, delay=0.2, crash=True)
+    service.start()
+    try:
+        service.wait_ready(timeout=20)
+        assert False, "expected ServiceNotReady"
+    except ServiceNotReady as e:
+        assert 'status 3' in str(e)
+
+    # Once the server stops crashing, a restart brings it back
+    service.command[-1] = 'ok'
+    service.restart(timeout=20)
+    try:
+        assert service.restarts == 1 and service.ready_seconds is not None
+        assert service.is_healthy()
+    finally:
+        service.stop()
+    assert service.exited()
+    print("OK a crash is reported and the server is restarted")
+
+
+def test_backend_falls_back_to_one_worker():
+    """API_WORKERS is ignored while chat sessions are per process"""
+    saved = {name: os.environ.pop(name, None) for name in ("API_WORKERS", "CHAT_SESSION_DB", "VECTOR_DB_BACKEND")}
+    try:
+        os.environ["API_WORKERS"] = "4"
+        with tempfile.TemporaryDirectory() as tmp:
+            assert 'uvicorn' in backend_service(tmp).command
+            os.environ["CHAT_SESSION_DB"] = os.path.join(tmp, 'sessions.db')
+            if hasattr(os, 'fork'):
+                assert 'api.serve' in backend_service(tmp).command
+    finally:
+        for name, value in saved.items():
+            os.environ.pop(name, None)
+            if value is not None:
+                os.environ[name] = value
+    print("OK one backend worker unless sessions are shared")
+
+
+if __name__ == "__main__":
+    test_waits_for_health_check_and_logs_to_file()
+    test_crash_before_ready_and_restart()
+    test_backend_falls_back_to_one_worker()
@@ -0,0 +1,141 @@
+import os
+import sys
+import threading
+import time
+
+# Add the parent directory to the path to import from other modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from db.write_behind import WriteBehindQueue
+
+
+class RecordingWriter:
+    """Stand-in for the bulk upsert that remembers every batch"""
+
+    def __init__(self, delay=0.0, fail=False):
+        self.batches = []
+        self.delay = delay
+        self.fail = fail
+        self.lock = threading.Lock()
+
+    def __call__(self, batch):
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("index unavailable")
+        with self.lock:
+            self.batches.append(list(batch))
+
+
+def test_flushes_by_size():
+    """A full batch is written without waiting for the interval"""
+    writer = RecordingWriter()
+    queue = WriteBehindQueue(writer, max_batch_size=5, flush_interval=60)
+    queue.start()
+    for i in range(10):
+        assert queue.put({'Age': i}, 0.5)
+    deadline = time.time() + 2
+    while queue.stats()['written'] < 10 and time.time() < deadline:
+        time.sleep(0.01)
+    assert [len(batch) for batch in writer.batches] == [5, 5]
+    queue.close()
+    print("OK batches are flushed by size")
+
+
+def test_flushes_by_time():
+    """A partial batch is written once flush_interval has passed"""
+    writer = RecordingWriter()
+    queue = WriteBehindQueue(writer, max_batch_size=100, flush_interval=0.05)
+    queue.start()
+    queue.put({'Age': 1}, 0.1)
+    time.sleep(0.3)
+    assert writer.batches == [[({'Age': 1}, 0.1)]]
+    queue.close()
+    print("OK partial batches are flushed by time")
+
+
+def test_drop_policy_bounds_memory():
+    """With the drop policy a full queue rejects new records immediately"""
+    writer = RecordingWriter()
+    queue = WriteBehindQueue(writer, max_batch_size=10, max_pending=3, policy="drop")
+    results = [queue.put({'Age': i}, 0.5) for i in range(5)]
+    assert results == [True, True, True, False, False]
+    assert queue.stats()['dropped'] == 2
+    queue.flush()
+    assert queue.stats()['written'] == 3
+    print("OK drop policy bounds the queue")
+
+
+def test_block_policy_waits_for_space():
+    """With the block policy a full queue waits for the writer to make room"""
+    writer = RecordingWriter(delay=0.05)
+    queue = WriteBehindQueue(writer, max_batch_size=2, max_pending=2,
+                             flush_interval=60, policy="block", block_timeout=2.0)
+    queue.start()
+    assert all(queue.put({'Age': i}, 0.5) for i in range(6))
+    queue.close()
+    assert queue.stats()['written'] == 6
+    assert queue.stats()['dropped'] == 0
+    print("OK block policy waits for space")
+
+
+def test_put_many_queues_a_batch_at_once():
+    """A bulk put queues what fits and drops the rest, or waits once for space"""
+    dropping = WriteBehindQueue(RecordingWriter(), max_batch_size=10, max_pending=3, flush_interval=60)
+    assert dropping.put_many([({'Age': i}, 0.5) for i in range(5)]) == 3
+    assert dropping.stats()['enqueued'] == 3 and dropping.stats()['dropped'] == 2
+    assert not dropping.may_block
+
+    writer = RecordingWriter(delay=0.02)
+    blocking = WriteBehindQueue(writer, max_batch_size=2, max_pending=2,
+                                flush_interval=60, policy="block", block_timeout=2.0)
+    blocking.start()
+    assert blocking.may_block
+    assert blocking.put_many([({'Age': i}, 0.5) for i in range(7)]) == 7
+    blocking.close()
+    assert sum(len(batch) for batch in writer.batches) == 7
+    print("OK bulk put")
+
+
+def test_timed_out_flush_keeps_batching():
+    """A flush that gives up does not make every later record due on its own"""
+    writer = RecordingWriter(delay=0.2)
+    queue = WriteBehindQueue(writer, max_batch_size=100, flush_interval=60)
+    queue.start()
+    queue.put({'Age': 0}, 0.5)
+    assert not queue.flush(timeout=0.01)
+    time.sleep(0.3)
+    for i in range(1, 4):
+        queue.put({'Age': i}, 0.5)
+    time.sleep(0.1)
+    assert queue.stats()['pending'] == 3
+    queue.close()
+    assert [len(batch) for batch in writer.batches] == [1, 3]
+    print("OK timed-out flush leaves batching on")
+
+
+def test_close_flushes_pending_and_survives_errors():
+    """Shutdown writes everything pending, failures are counted not raised"""
+    writer = RecordingWriter()
+    queue = WriteBehindQueue(writer, max_batch_size=100, flush_interval=60)
+    queue.start()
+    for i in range(7):
+        queue.put({'Age': i}, 0.5)
+    assert queue.close(timeout=2)
+    assert sum(len(batch) for batch in writer.batches) == 7
+    assert not queue.put({'Age': 99}, 0.5)
+
+    failing = WriteBehindQueue(RecordingWriter(fail=True), max_batch_size=2)
+    failing.put({'Age': 1}, 0.5)
+    failing.flush()
+    assert failing.stats()['failed'] == 1
+    print("OK close flushes pending records")
+
+
+if __name__ == "__main__":
+    test_flushes_by_size()
+    test_flushes_by_time()
+    test_drop_policy_bounds_memory()
+    test_block_policy_waits_for_space()
+    test_put_many_queues_a_batch_at_once()
+    test_timed_out_flush_keeps_batching()
+    test_close_flushes_pending_and_survives_errors()
@@ -0,0 +1,149 @@
+"""
+Lazily initialised dependencies
+
+Importing the API used to connect to Pinecone, configure Gemini and read the
+dataset before the server could answer anything, and an unreachable service
+made the import fail outright. A ``LazyResource`` wraps such a dependency in
+a factory that runs once, on first use, so modules can be imported in
+milliseconds. ``warm_in_background`` runs the factories on a daemon thread
+after the server has started, so the first chat does not pay for them.
+
+Every resource registers itself by name and ``dependency_status`` reports
+each one as pending, loading, ready or failed, with its load time and last
+error. A failed factory is retried on first use after ``retry_after``
+seconds; until then callers get ``DependencyUnavailable`` straight away
+instead of waiting on a service that is down.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+_registry: Dict[str, "LazyResource"] = {}
+_registry_lock = threading.Lock()
+
+
+class DependencyUnavailable(RuntimeError):
+    """A lazily initialised dependency could not be created"""
+
+    def __init__(self, name: str, error: BaseException):
+        super().__init__(f"{name} is unavailable: {error}")
+        self.name = name
+        self.error = error
+
+
+class LazyResource:
+    """Value created by ``factory`` on first use, exactly once, from any thread"""
+
+    def __init__(self, name: str, factory: Callable[[], Any], retry_after: float = 30.0):
+        self.name = name
+        self.factory = factory
+        self.retry_after = retry_after
+        self.state = PENDING
+        self.load_ms: Optional[float] = None
+        self.error: Optional[BaseException] = None
+        self._failed_at = 0.0
+        self._value = None
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry[name] = self
+
+    @property
+    def ready(self) -> bool:
+        return self.state == READY
+
+    def get(self):
+        """The value, created now if this is the first use"""
+        if self.state == READY:
+            return self._value
+        with self._lock:
+            if self.state == READY:
+                return self._value
+            if self.state == FAILED and time.time() - self._failed_at < self.retry_after:
+                raise DependencyUnavailable(self.name, self.error)
+
+            self.state = LOADING
+            start = time.perf_counter()
+            try:
+                value = self.factory()
+            except Exception as e:
+                self.state = FAILED
+                self.error = e
+                self._failed_at = time.time()
+                print(f"Warning: Could not initialise {self.name}: {e}")
+                raise DependencyUnavailable(self.name, e) from e
+            self.load_ms = (time.perf_counter() - start) * 1000
+            self._value = value
+            self.error = None
+            self.state = READY
+            return value
+
+    def set(self, value):
+        """Use ``value`` instead of running the factory (tests, benchmarks)"""
+        with self._lock:
+            self._value = value
+            self.error = None
+            self.state = READY
+
+    def warm(self) -> bool:
+        """Create the value if needed; failures are logged, not raised"""
+        try:
+            self.get()
+            return True
+        except DependencyUnavailable:
+            return False
+
+    def proxy(self) -> "LazyProxy":
+        return LazyProxy(self)
+
+    def status(self) -> Dict:
+        return {
+            "state": self.state,
+            "load_ms": round(self.load_ms, 1) if self.load_ms is not None else None,
+            "error": str(self.error) if self.error is not None else None
+        }
+
+
+class LazyProxy:
+    """Forwards attribute access to a LazyResource's value, creating it on first use"""
+
+    def __init__(self, resource: LazyResource):
+        self._resource = resource
+
+    def __getattr__(self, attr):
+        return getattr(self._resource.get(), attr)
+
+
+def dependency_status() -> Dict[str, Dict]:
+    """State of every registered resource, by name"""
+    with _registry_lock:
+        resources = list(_registry.values())
+    return {resource.name: resource.status() for resource in resources}
+
+
+def all_ready() -> bool:
+    with _registry_lock:
+        return all(resource.ready for resource in _registry.values())
+
+
+def warm_in_background(resources: Optional[Iterable[LazyResource]] = None) -> threading.Thread:
+    """Create ``resources`` (default: every registered one) on a daemon thread, in order"""
+    if resources is None:
+        with _registry_lock:
+            resources = list(_registry.values())
+    resources = list(resources)
+
+    def warm_all():
+        start = time.perf_counter()
+        ready = sum(resource.warm() for resource in resources)
+        print(f"Warm-up: {ready}/{len(resources)} dependencies ready "
+              f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    thread = threading.Thread(target=warm_all, name="warmup", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,293 @@
+"""
+Request metrics in the Prometheus text format
+
+The API had no instrumentation, so there was no telling where the time of
+a /predict or /chat went. This module keeps, per process:
+
+- ``http_requests`` / ``http_request_errors``: requests by endpoint, method
+  and status, and those that ended in a 5xx or an exception
+- ``http_request_duration``: latency histogram per endpoint, recorded by
+  ``MetricsMiddleware`` from the request until the last body byte (the end
+  of the stream for /chat/stream)
+- ``stage_duration``: time spent in each stage of a request (encode, score,
+  vector_db_write, prompt_build, llm_call), recorded with ``stage_timer``
+
+``registry.render()`` produces the text served by ``GET /metrics``. Next
+to each histogram it exports a ``<name>_quantile`` gauge with p50/p95/p99
+interpolated within the buckets, the same estimate ``histogram_quantile``
+gives in Prometheus. Recording a value only appends it to a deque, which
+is atomic under the GIL; the buffered values are folded into the buckets
+under a lock every FOLD_EVERY observations and before each export, so the
+request path never waits on the lock.
+
+Counters live in each process, so with several API workers every worker
+reports its own share of the traffic.
+"""
+
+import threading
+from bisect import bisect_left
+from collections import deque
+from time import perf_counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Seconds, from encoding one patient (tens of microseconds) to a long Gemini answer
+DEFAULT_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+QUANTILES = (0.5, 0.95, 0.99)
+# Observations buffered before they are folded into the totals
+FOLD_EVERY = 256
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic count per label combination"""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self._pending = deque()
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1.0):
+        self._pending.append((labels, amount))
+        if len(self._pending) >= FOLD_EVERY:
+            self._fold()
+
+    def _fold(self):
+        with self._lock:
+            pending = self._pending
+            values = self._values
+            while pending:
+                labels, amount = pending.popleft()
+                values[labels] = values.get(labels, 0.0) + amount
+
+    def value(self, *labels) -> float:
+        self._fold()
+        return self._values.get(labels, 0.0)
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        self._fold()
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class _Series:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, n_buckets: int):
+        self.counts = [0] * n_buckets
+        self.sum = 0.0
+        self.count = 0
+
+
+class _Timer:
+    """Context manager observing the time spent in its block"""
+
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: "Histogram", labels: Tuple):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        histogram = self.histogram
+        histogram._pending.append((self.labels, perf_counter() - self.start))
+        if len(histogram._pending) >= FOLD_EVERY:
+            histogram._fold()
+        return False
+
+
+class Histogram:
+    """Observations counted into fixed buckets per label combination"""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.bounds = tuple(sorted(buckets))
+        self._series: Dict[Tuple, _Series] = {}
+        self._pending = deque()
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        self._pending.append((labels, value))
+        if len(self._pending) >= FOLD_EVERY:
+            self._fold()
+
+    def _fold(self):
+        with self._lock:
+            pending = self._pending
+            bounds = self.bounds
+            while pending:
+                labels, value = pending.popleft()
+                series = self._series.get(labels)
+                if series is None:
+                    series = self._series[labels] = _Series(len(bounds) + 1)
+                # Bucket i counts values in (bounds[i-1], bounds[i]]; the last one is +Inf
+                series.counts[bisect_left(bounds, value)] += 1
+                series.sum += value
+                series.count += 1
+
+    def time(self, *labels) -> _Timer:
+        return _Timer(self, labels)
+
+    def snapshot(self, *labels) -> Optional[Tuple[List[int], float, int]]:
+        """(bucket counts, sum, count) for one label combination"""
+        self._fold()
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                return None
+            return list(series.counts), series.sum, series.count
+
+    def quantile(self, q: float, *labels) -> Optional[float]:
+        """Estimate of the q-quantile, interpolated linearly within its bucket"""
+        snapshot = self.snapshot(*labels)
+        if snapshot is None or snapshot[2] == 0:
+            return None
+        return self._quantile(q, snapshot[0], snapshot[2])
+
+    def _quantile(self, q: float, counts: List[int], total: int) -> float:
+        rank = q * total
+        cumulative = 0
+        for index, count in enumerate(counts):
+            if count and cumulative + count >= rank:
+                if index == len(self.bounds):
+                    # Beyond the last bound there is nothing to interpolate to
+                    return self.bounds[-1]
+                lower = self.bounds[index - 1] if index else 0.0
+                upper = self.bounds[index]
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.bounds[-1]
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        quantile_lines = [
+            f"# HELP {self.name}_quantile p50/p95/p99 of {self.name}, estimated from its buckets",
+            f"# TYPE {self.name}_quantile gauge"
+        ]
+        self._fold()
+        with self._lock:
+            series = sorted((labels, list(s.counts), s.sum, s.count) for labels, s in self._series.items())
+        for labels, counts, total_sum, total in series:
+            cumulative = 0
+            for bound, count in zip(self.bounds + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total_sum)}")
+            lines.append(f"{self.name}_count{label_text} {total}")
+            for q in QUANTILES:
+                value = self._quantile(q, counts, total)
+                quantile = f'quantile="{q}"'
+                quantile_lines.append(
+                    f"{self.name}_quantile{_format_labels(self.labelnames, labels, quantile)} {_format_value(value)}"
+                )
+        return lines + quantile_lines
+
+
+class MetricsRegistry:
+    """The metrics exported together on /metrics"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.register(Counter(
+    "dengue_http_requests_total", "HTTP requests by endpoint, method and status code",
+    ("endpoint", "method", "status")
+))
+http_request_errors = registry.register(Counter(
+    "dengue_http_request_errors_total", "HTTP requests that ended in a 5xx response or an exception",
+    ("endpoint",)
+))
+http_request_duration = registry.register(Histogram(
+    "dengue_http_request_duration_seconds", "Time from request to the last response byte",
+    ("endpoint",)
+))
+stage_duration = registry.register(Histogram(
+    "dengue_stage_duration_seconds", "Time spent in one stage of a request", ("stage",)
+))
+
+
+def stage_timer(stage: str) -> _Timer:
+    """``with stage_timer("score"): ...`` records the block under that stage"""
+    return _Timer(stage_duration, (stage,))
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware counting and timing every HTTP request. Requests are
+    labelled with the route's path template (``/chat/session/{session_id}``),
+    or ``other`` when no route matched, so the label set stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = perf_counter()
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        except BaseException:
+            status[0] = 500
+            raise
+        finally:
+            route = scope.get("route")
+            endpoint = getattr(route, "path", None) or "other"
+            http_request_duration.observe(perf_counter() - start, endpoint)
+            http_requests.inc(endpoint, scope["method"], str(status[0]))
+            if status[0] >= 500:
+                http_request_errors.inc(endpoint)
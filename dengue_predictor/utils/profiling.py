@@ -0,0 +1,275 @@
+"""
+On-demand profiles of live requests
+
+/metrics shows that a request was slow, not where the time went (building
+the patient's features, scoring, the vector DB queue, the prompt). With
+PROFILING_ENABLED=1 the API installs ``ProfilingMiddleware`` and the
+``/admin/profile`` endpoints, and a request is profiled when either
+
+- it carries an ``X-Profile: pstats`` (or ``collapsed``) header, or
+- the profiler was armed with ``POST /admin/profile`` to take the next N
+  requests, a sampled fraction of them, or both, optionally only for one
+  endpoint
+
+Each profiled request writes one file to PROFILE_DIR:
+
+- ``pstats``: a cProfile of everything the event loop thread ran during the
+  request, for ``python -m pstats`` or snakeviz. Several files combine with
+  ``pstats.Stats(file1, file2, ...)``.
+- ``collapsed``: stacks of every thread sampled every PROFILE_SAMPLE_INTERVAL
+  seconds, one ``frame;frame;frame count`` line per stack, the input of
+  flamegraph.pl and speedscope. Several files can simply be concatenated.
+  Sampling only sees requests that take a few intervals (chats, large
+  batches); use pstats for a single /predict.
+
+One request is profiled at a time; the others pass through untouched, and
+requests arriving while the event loop is busy with the profiled one show
+up in its profile. When PROFILING_TOKEN is set, the header and the admin
+endpoints require ``X-Profile-Token`` to match it.
+
+Unless PROFILING_ENABLED=1 neither the middleware nor the endpoints exist,
+so the requests pay nothing.
+"""
+
+import cProfile
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+FORMATS = ("pstats", "collapsed")
+# Captures listed by GET /admin/profile
+RECENT_CAPTURES = 20
+
+
+class StackSampler:
+    """Counts the stacks of every other thread, sampled on a daemon thread"""
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                if ident not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                self.stacks[self._collapse(names.get(ident, str(ident)), frame)] += 1
+            self.samples += 1
+
+    @staticmethod
+    def _collapse(thread_name: str, frame) -> str:
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        frames.append(f"thread {thread_name}")
+        # Root first, semicolons separate frames in the collapsed format
+        return ";".join(name.replace(";", ":") for name in reversed(frames))
+
+    def write(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
+
+
+class Profiler:
+    """Decides which requests get profiled and writes their profiles"""
+
+    def __init__(self, directory: str = "profiles", token: Optional[str] = None,
+                 sample_interval: float = 0.001):
+        self.directory = directory
+        self.token = token or None
+        self.sample_interval = sample_interval
+        self.remaining: Optional[int] = None
+        self.sample_rate: Optional[float] = None
+        self.format = "pstats"
+        self.endpoint: Optional[str] = None
+        self.captured = 0
+        self.recent = deque(maxlen=RECENT_CAPTURES)
+        self._armed = False
+        self._busy = False
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "Profiler":
+        return cls(
+            directory=os.getenv("PROFILE_DIR", "profiles"),
+            token=os.getenv("PROFILING_TOKEN"),
+            sample_interval=float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.001"))
+        )
+
+    def authorized(self, token: Optional[str]) -> bool:
+        return self.token is None or token == self.token
+
+    def arm(self, requests: Optional[int] = None, sample_rate: Optional[float] = None,
+            format: str = "pstats", endpoint: Optional[str] = None) -> Dict:
+        """Profile the next ``requests`` requests, a ``sample_rate`` fraction of them, or both"""
+        if requests is None and sample_rate is None:
+            raise ValueError("Give the number of requests to profile, a sample rate or both")
+        if requests is not None and requests < 1:
+            raise ValueError("requests must be at least 1")
+        if sample_rate is not None and not 0 < sample_rate <= 1:
+            raise ValueError("sample_rate must be in (0, 1]")
+        if format not in FORMATS:
+            raise ValueError(f"Unknown profile format '{format}', expected one of {', '.join(FORMATS)}")
+        with self._lock:
+            self.remaining = requests
+            self.sample_rate = sample_rate
+            self.format = format
+            self.endpoint = endpoint
+            self._armed = True
+        return self.status()
+
+    def disarm(self) -> Dict:
+        with self._lock:
+            self._armed = False
+            self.remaining = None
+            self.sample_rate = None
+            self.endpoint = None
+        return self.status()
+
+    def claim(self, path: str, requested: Optional[str]) -> Optional[str]:
+        """The format to profile this request with, or None; at most one request at a time"""
+        if not self._armed and requested is None:
+            return None
+        with self._lock:
+            if self._busy:
+                return None
+            if requested is not None:
+                profile_format = requested
+            elif not self._armed or (self.endpoint is not None and path != self.endpoint):
+                return None
+            elif self.sample_rate is not None and random.random() >= self.sample_rate:
+                return None
+            else:
+                profile_format = self.format
+                if self.remaining is not None:
+                    self.remaining -= 1
+                    if self.remaining <= 0:
+                        self._armed = False
+            self._busy = True
+            return profile_format
+
+    def release(self):
+        with self._lock:
+            self._busy = False
+
+    def _path_for(self, endpoint: str, profile_format: str) -> str:
+        with self._lock:
+            self._sequence += 1
+            sequence = self._sequence
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", endpoint).strip("_") or "root"
+        extension = "prof" if profile_format == "pstats" else "collapsed"
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{sequence:05d}-{slug}.{extension}"
+        return os.path.join(self.directory, name)
+
+    def record(self, endpoint: str, profile_format: str, capture, seconds: float) -> str:
+        """Write one request's profile and remember it for the status"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path_for(endpoint, profile_format)
+        if profile_format == "pstats":
+            capture.dump_stats(path)
+        else:
+            capture.write(path)
+        with self._lock:
+            self.captured += 1
+            self.recent.append({"file": path, "endpoint": endpoint, "format": profile_format,
+                                "duration_ms": round(seconds * 1000, 3)})
+        return path
+
+    def status(self) -> Dict:
+        with self._lock:
+            return {
+                "armed": self._armed,
+                "remaining": self.remaining if self._armed else None,
+                "sample_rate": self.sample_rate if self._armed else None,
+                "format": self.format,
+                "endpoint": self.endpoint if self._armed else None,
+                "directory": os.path.abspath(self.directory),
+                "captured": self.captured,
+                "recent": list(self.recent)
+            }
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling the requests the ``Profiler`` picks"""
+
+    def __init__(self, app, profiler: Profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profiler = self.profiler
+        requested = _header(scope, b"x-profile")
+        if requested is not None:
+            requested = requested.strip().lower()
+            if requested not in FORMATS:
+                requested = "pstats"
+            if not profiler.authorized(_header(scope, b"x-profile-token")):
+                requested = None
+        profile_format = profiler.claim(scope["path"], requested)
+        if profile_format is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            if profile_format == "pstats":
+                capture = cProfile.Profile()
+                capture.enable()
+            else:
+                capture = StackSampler(profiler.sample_interval)
+                capture.start()
+            start = time.perf_counter()
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                seconds = time.perf_counter() - start
+                # cProfile is disabled on the thread that enabled it
+                if profile_format == "pstats":
+                    capture.disable()
+                else:
+                    capture.stop()
+                route = scope.get("route")
+                endpoint = getattr(route, "path", None) or scope["path"]
+                try:
+                    # Writing the file is disk I/O, kept off the event loop
+                    await run_in_threadpool(profiler.record, endpoint, profile_format, capture, seconds)
+                except OSError as e:
+                    print(f"Warning: Could not write profile to {profiler.directory}: {e}")
+        finally:
+            profiler.release()